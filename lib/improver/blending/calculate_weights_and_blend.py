@@ -151,7 +151,7 @@ class WeightAndBlend():
         return weights
 
     def process(self, cubelist, cycletime=None, model_id_attr=None,
-                spatial_weights=False, fuzzy_length=20000):
+                spatial_weights=False, fuzzy_length=20000, chunk_size=None):
         """
         Merge a cubelist, calculate appropriate blend weights and compute the
         weighted mean. Returns a single cube collapsed over the dimension
@@ -172,6 +172,10 @@ class WeightAndBlend():
             fuzzy_length (float):
                 Distance (in metres) over which to smooth spatial weights.
                 Default is 20 km.
+            chunk_size (int or None):
+                The maximum number of grid points to blend at once when
+                blending percentiles. If None, all grid points are blended
+                together.
         """
         # Prepare cubes for weighted blending, including creating model_id and
         # model_configuration coordinates for multi-model blending. The merged
@@ -205,7 +209,7 @@ class WeightAndBlend():
 
             # blend across specified dimension
             BlendingPlugin = WeightedBlendAcrossWholeDimension(
-                self.blend_coord, cycletime=cycletime)
+                self.blend_coord, cycletime=cycletime, chunk_size=chunk_size)
             result = BlendingPlugin.process(cube, weights=weights)
 
         return result
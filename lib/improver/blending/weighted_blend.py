@@ -43,6 +43,8 @@ from improver.utilities.cube_checker import find_percentile_coordinate
 from improver.utilities.cube_manipulation import (
     enforce_coordinate_ordering, sort_coord_in_cube, build_coordinate,
     MergeCubes)
+from improver.utilities.mathematical_operations import (
+    interpolate_along_last_axis)
 from improver.utilities.temporal import (
     cycletime_to_datetime, cycletime_to_number, forecast_period_coord,
     unify_forecast_reference_time, find_latest_cycletime)
@@ -350,7 +352,8 @@ class PercentileBlendingAggregator:
         return result
 
     @staticmethod
-    def aggregate(data, axis, arr_percent, arr_weights, perc_dim):
+    def aggregate(data, axis, arr_percent, arr_weights, perc_dim,
+                  chunk_size=None):
         """ Blend percentile aggregate function to blend percentile data
             along a given axis of a cube.
 
@@ -368,6 +371,10 @@ class PercentileBlendingAggregator:
                      Array of weights, same size as the axis dimension of data.
             perc_dim (int):
                      The index of the percentile coordinate
+            chunk_size (int or None):
+                     The maximum number of grid points to blend at once.
+                     If None, all grid points are blended together, which
+                     is fastest but requires the most memory.
             (Note percent and weights have special meaning in Aggregator
              hence the rename.)
 
@@ -376,7 +383,13 @@ class PercentileBlendingAggregator:
                      containing the weighted percentile blend data across
                      the chosen coord. The dimension associated with axis
                      has been collapsed, and the rest of the dimensions remain.
+
+        Raises:
+            ValueError: If chunk_size is less than 1.
         """
+        if chunk_size is not None and chunk_size < 1:
+            msg = "chunk_size must be at least 1, got {}".format(chunk_size)
+            raise ValueError(msg)
         # Iris aggregators support indexing from the end of the array.
         if axis < 0:
             axis += data.ndim
@@ -394,13 +407,17 @@ class PercentileBlendingAggregator:
         # Create the resulting data array, which is the shape of the original
         # data without dimension we are collapsing over
         result = np.zeros(input_shape[1:], dtype=np.float32)
-        # Loop over the flattened data, i.e. across all the data points in
-        # each slice of the coordinate we are collapsing over, finding the
-        # blended percentile values at each point.
-        for i in range(data.shape[-1]):
-            result[:, i] = (
-                PercentileBlendingAggregator.blend_percentiles(
-                    data[:, :, i], arr_percent, arr_weights[:, :, i]))
+        # Blend the flattened data, i.e. all the data points in each slice of
+        # the coordinate we are collapsing over, in chunks of points to
+        # limit the size of the intermediate arrays if required.
+        n_points = data.shape[-1]
+        if chunk_size is None:
+            chunk_size = n_points
+        for start in range(0, n_points, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            result[:, chunk] = (
+                PercentileBlendingAggregator.blend_percentiles_batched(
+                    data[:, :, chunk], arr_percent, arr_weights[:, :, chunk]))
         # Reshape the data and put the percentile dimension
         # back in the right place
         shape = arr_percent.shape + shape
@@ -480,13 +497,86 @@ class PercentileBlendingAggregator:
                                           np.float32)
         return new_combined_perc
 
+    @staticmethod
+    def blend_percentiles_batched(perc_values, percentiles, weights):
+        """ Blend percentiles function, to calculate the weighted blend across
+            a given axis of percentile data for many grid points at once.
+
+            This gives the same result as calling blend_percentiles for each
+            grid point in turn. Only the loop over the axis being blended
+            remains, with the interpolation to and from probability space
+            performed for all grid points together. Any grid points at which
+            the percentile values do not increase monotonically are not
+            suitable for the batched interpolation, so are blended using
+            blend_percentiles to preserve its results.
+
+        Args:
+            perc_values (numpy.ndarray):
+                Array containing the percentile values to blend, with
+                shape: (length of coord to blend, num of percentiles,
+                num of grid points)
+            percentiles (numpy.ndarray):
+                Array of percentile values e.g [0, 20.0, 50.0, 70.0, 100.0],
+                same size as the percentile dimension of data.
+            weights (numpy.ndarray):
+                Array of weights, with the same shape as perc_values, that
+                we will blend over.
+
+        Returns:
+            new_combined_perc (numpy.ndarray):
+                Array containing the weighted percentile blend data
+                across the chosen coord, with shape: (num of percentiles,
+                num of grid points)
+        """
+        # Move the grid points to the leading dimension so that each point
+        # can be interpolated along the trailing percentile dimension.
+        weights = np.moveaxis(
+            np.broadcast_to(weights, perc_values.shape), -1, 0)
+        perc_values = np.moveaxis(perc_values, -1, 0)
+        num_points, num, num_percentiles = perc_values.shape
+
+        # Find the probability of each threshold in the pdf of every point
+        # across the axis we are blending over and add the probabilities
+        # multiplied by the correct weight to the running total.
+        all_values = perc_values.reshape(num_points, num * num_percentiles)
+        combined_pdf = np.zeros(perc_values.shape, dtype=np.float32)
+        for j in range(num):
+            recalc_values_in_pdf = interpolate_along_last_axis(
+                all_values, perc_values[:, j], percentiles).reshape(
+                    perc_values.shape)
+            recalc_values_in_pdf[:, j] = percentiles
+            combined_pdf += recalc_values_in_pdf * weights[:, j:j + 1]
+
+        # Combine and sort the threshold values and the blended probability
+        # values for all the points we are blending.
+        combined_perc_thres_data = np.sort(all_values, axis=-1)
+        combined_perc_values = np.sort(
+            combined_pdf.reshape(num_points, num * num_percentiles), axis=-1)
+
+        # Find the percentile values from this combined data by interpolating
+        # back from probability values to the original percentiles.
+        new_combined_perc = interpolate_along_last_axis(
+            np.broadcast_to(percentiles, (num_points, num_percentiles)),
+            combined_perc_values, combined_perc_thres_data).astype(
+                np.float32)
+        new_combined_perc = new_combined_perc.T
+
+        non_monotonic, = np.nonzero(
+            np.any(np.diff(perc_values, axis=-1) < 0, axis=(1, 2)))
+        for i in non_monotonic:
+            new_combined_perc[:, i] = (
+                PercentileBlendingAggregator.blend_percentiles(
+                    perc_values[i], percentiles, weights[i]))
+        return new_combined_perc
+
 
 class WeightedBlendAcrossWholeDimension:
     """Apply a Weighted blend to a cube, collapsing across the whole
        dimension. Uses one of two methods, either weighted average, or
        the maximum of the weighted probabilities."""
 
-    def __init__(self, coord, cycletime=None, timeblending=False):
+    def __init__(self, coord, cycletime=None, timeblending=False,
+                 chunk_size=None):
         """Set up for a Weighted Blending plugin
 
         Args:
@@ -501,17 +591,26 @@ class WeightedBlendAcrossWholeDimension:
                 all have the same validity time. Setting this to True will
                 bypass this test, as is necessary for triangular time
                 blending.
+            chunk_size (int or None):
+                The maximum number of grid points to blend at once when
+                blending percentiles, which bounds the memory used. If None,
+                all grid points are blended together.
 
         Raises:
             ValueError: If the blend coordinate is "threshold".
+            ValueError: If chunk_size is less than 1.
         """
         if coord == "threshold":
             msg = "Blending over thresholds is not supported"
             raise ValueError(msg)
+        if chunk_size is not None and chunk_size < 1:
+            msg = "chunk_size must be at least 1, got {}".format(chunk_size)
+            raise ValueError(msg)
 
         self.coord = coord
         self.cycletime = cycletime
         self.timeblending = timeblending
+        self.chunk_size = chunk_size
 
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
@@ -796,7 +895,8 @@ class WeightedBlendAcrossWholeDimension:
                                   PERCENTILE_BLEND,
                                   arr_percent=percentiles,
                                   arr_weights=weights_array,
-                                  perc_dim=perc_dim)
+                                  perc_dim=perc_dim,
+                                  chunk_size=self.chunk_size)
         cube_new.data = cube_new.data.astype(np.float32)
 
         # Ensure collapsed coordinates do not promote themselves
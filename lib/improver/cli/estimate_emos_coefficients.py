@@ -33,6 +33,7 @@
 Statistics (EMOS), otherwise known as Non-homogeneous Gaussian
 Regression (NGR)."""
 
+import glob
 import warnings
 
 import numpy as np
@@ -48,6 +49,31 @@ from improver.utilities.cli_utilities import (
 from improver.utilities.save import save_netcdf
 
 
+def expand_filepaths(patterns):
+    """
+    Expand any wildcards within the filepaths, sorting the files matched by
+    each pattern.
+
+    Args:
+        patterns (list of str):
+            Filepaths, which may contain wildcards.
+
+    Returns:
+        filepaths (list of str):
+            The filepaths matched by each pattern in turn.
+
+    Raises:
+        ValueError: If a pattern does not match any files.
+    """
+    filepaths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise ValueError("No files match the filepath {}".format(pattern))
+        filepaths.extend(matches)
+    return filepaths
+
+
 def main(argv=None):
     """Load in arguments for estimating coefficients for Ensemble Model Output
        Statistics (EMOS), otherwise known as Non-homogeneous Gaussian
@@ -161,11 +187,59 @@ def main(argv=None):
                              'then the number of iterations may require '
                              'increasing, as there will be more coefficients '
                              'to solve for.')
+    parser.add_argument('--minimisation_method', metavar='METHOD',
+                        choices=['Nelder-Mead', 'L-BFGS-B', 'BFGS', 'CG'],
+                        default='Nelder-Mead',
+                        help='The method used to minimise the CRPS. Either '
+                             '"Nelder-Mead" or a gradient based method '
+                             '("L-BFGS-B", "BFGS" or "CG"), for which the '
+                             'analytic gradient of the CRPS is used. '
+                             'Default: "Nelder-Mead".')
+    parser.add_argument('--previous_coefficients_filepath',
+                        metavar='PREVIOUS_COEFFICIENTS_FILEPATH',
+                        help='The path to a NetCDF file containing '
+                             'previously estimated coefficients, for example '
+                             'from the previous day, which are used as the '
+                             'initial guess for the minimisation.')
+    parser.add_argument('--streaming', action='store_true', default=False,
+                        help='Load the historic forecast and truth files '
+                             'one pair at a time, retaining only the data '
+                             'required for the minimisation, rather than '
+                             'loading all the historic forecasts at once. '
+                             'The historic_filepath and truth_filepath '
+                             'arguments must list the files for each '
+                             'validity time in the same order, once any '
+                             'wildcards have been expanded and sorted.')
+    parser.add_argument('--subsample_step', metavar='SUBSAMPLE_STEP',
+                        type=int, default=1,
+                        help='The step used to subsample the grid points '
+                             'along the y and x axes of the historic '
+                             'forecasts and truths used to estimate the '
+                             'coefficients. Default: 1.')
+    parser.add_argument('--window_length', metavar='WINDOW_LENGTH',
+                        type=int, default=None,
+                        help='The maximum number of validity times retained '
+                             'in the rolling window of training data when '
+                             'streaming. Once the window is full, the oldest '
+                             'validity time is dropped as each new validity '
+                             'time is added. Default: retain all the '
+                             'validity times.')
     args = parser.parse_args(args=argv)
 
     # Load Cubes
-    historic_forecast = load_cube(args.historic_filepath, allow_none=True)
-    truth = load_cube(args.truth_filepath, allow_none=True)
+    if args.streaming and args.historic_filepath and args.truth_filepath:
+        # Generators, so that each file is only loaded when required.
+        historic_forecast = (
+            load_cube(filepath)
+            for filepath in expand_filepaths(args.historic_filepath))
+        truth = (
+            load_cube(filepath)
+            for filepath in expand_filepaths(args.truth_filepath))
+    else:
+        historic_forecast = load_cube(args.historic_filepath, allow_none=True)
+        truth = load_cube(args.truth_filepath, allow_none=True)
+    previous_coefficients = load_cube(
+        args.previous_coefficients_filepath, allow_none=True)
 
     combined = (load_cubelist(args.combined_filepath)
                 if args.combined_filepath else None)
@@ -177,7 +251,10 @@ def main(argv=None):
     coefficients = process(historic_forecast, truth, combined,
                            historic_forecast_dict, truth_dict,
                            args.distribution, args.cycletime, args.units,
-                           args.predictor_of_mean, args.max_iterations)
+                           args.predictor_of_mean, args.max_iterations,
+                           args.minimisation_method, previous_coefficients,
+                           args.streaming, args.subsample_step,
+                           args.window_length)
     # Save Cube
     # Check whether a coefficients cube has been created. If the historic
     # forecasts and truths provided did not match in validity time, then
@@ -188,7 +265,9 @@ def main(argv=None):
 
 def process(historic_forecast, truth, combined, historic_forecast_dict,
             truth_dict, distribution, cycletime, units=None,
-            predictor_of_mean='mean', max_iterations=1000):
+            predictor_of_mean='mean', max_iterations=1000,
+            minimisation_method='Nelder-Mead', previous_coefficients=None,
+            streaming=False, subsample_step=1, window_length=None):
     """Module for estimate coefficients for Ensemble Model Output Statistics.
 
     Loads in arguments for estimating coefficients for Ensemble Model
@@ -198,10 +277,13 @@ def process(historic_forecast, truth, combined, historic_forecast_dict,
     The estimated coefficients are output as a cube.
 
     Args:
-        historic_forecast (iris.cube.Cube):
+        historic_forecast (iris.cube.Cube or iterable of iris.cube.Cube):
             The cube containing the historical forecasts used for calibration.
-        truth (iris.cube.Cube):
+            If streaming, an iterable of cubes, which are processed in turn.
+        truth (iris.cube.Cube or iterable of iris.cube.Cube):
             The cube containing the truth used for calibration.
+            If streaming, an iterable of cubes in the same order as the
+            historic forecasts.
         combined (iris.cube.CubeList):
             A cubelist containing a combination of historic forecasts and
             associated truths.
@@ -252,6 +334,27 @@ def process(historic_forecast, truth, combined, historic_forecast_dict,
             iterations may require increasing, as there will be more
             coefficients to solve.
             Default is 1000.
+        minimisation_method (str):
+            The method used to minimise the CRPS. Either "Nelder-Mead" or a
+            gradient based method e.g. "L-BFGS-B".
+            Default is 'Nelder-Mead'.
+        previous_coefficients (iris.cube.Cube):
+            Previously estimated coefficients used as the initial guess for
+            the minimisation.
+            Default is None.
+        streaming (bool):
+            If True, the historic forecasts and truths are iterables of
+            cubes, which are added to the training data one at a time.
+            Default is False.
+        subsample_step (int):
+            The step used to subsample the grid points along the y and x
+            axes of the historic forecasts and truths.
+            Default is 1.
+        window_length (int or None):
+            The maximum number of validity times retained in the rolling
+            window of training data when streaming. If None, all the
+            validity times are retained.
+            Default is None.
 
     Returns:
         result (iris.cube.Cube or None):
@@ -269,6 +372,8 @@ def process(historic_forecast, truth, combined, historic_forecast_dict,
         ValueError: All of the combined_filepath, historic_forecast_identifier
             and truth_identifier arguments should be specified if one of the
             arguments are specified.
+        ValueError: If streaming is requested without the historic forecast
+            and truth inputs.
 
     Warns:
         UserWarning: The metadata to identify the desired historic forecast or
@@ -310,6 +415,11 @@ def process(historic_forecast, truth, combined, historic_forecast_dict,
                    "specified.")
             raise ValueError(msg)
 
+    if streaming and not all([historic_forecast, truth]):
+        msg = ("Streaming requires the historic_filepath and truth_filepath "
+               "arguments to be specified.")
+        raise ValueError(msg)
+
     try:
         if combined is not None:
             historic_forecast, truth = SplitHistoricForecastAndTruth(
@@ -324,10 +434,20 @@ def process(historic_forecast, truth, combined, historic_forecast_dict,
         else:
             raise
     else:
-        result = EstimateCoefficientsForEnsembleCalibration(
+        plugin = EstimateCoefficientsForEnsembleCalibration(
             distribution, cycletime, desired_units=units,
             predictor_of_mean_flag=predictor_of_mean,
-            max_iterations=max_iterations).process(historic_forecast, truth)
+            max_iterations=max_iterations,
+            minimisation_method=minimisation_method,
+            subsample_step=subsample_step, window_length=window_length)
+        if streaming:
+            result = plugin.process_streaming(
+                historic_forecast, truth,
+                previous_coefficients=previous_coefficients)
+        else:
+            result = plugin.process(
+                historic_forecast, truth,
+                previous_coefficients=previous_coefficients)
 
     return result
 
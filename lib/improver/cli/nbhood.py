@@ -115,6 +115,17 @@ def main(argv=None):
                         help='Calculate values at the specified percentiles '
                              'from the neighbourhood surrounding each grid '
                              'point.')
+    parser.add_argument('--max_memory_mb', metavar='MAX_MEMORY_MB',
+                        default=None, type=float,
+                        help='Approximate maximum memory in megabytes to use '
+                             'for the neighbourhood values from which '
+                             'percentiles are calculated. If set, the '
+                             'percentiles are calculated for tiles of rows '
+                             'of the grid in turn, so that the memory '
+                             'required scales with the tile rather than the '
+                             'number of points within the kernel. Only '
+                             'applicable for calculating "percentiles" '
+                             'neighbourhood output. Default=None')
     parser.add_argument('input_filepath', metavar='INPUT_FILE',
                         help='A path to an input NetCDF file to be processed.')
     parser.add_argument('output_filepath', metavar='OUTPUT_FILE',
@@ -194,6 +205,11 @@ def main(argv=None):
         parser.wrong_args_error(
             'percentiles', 'neighbourhood_shape=probabilities')
 
+    if (args.neighbourhood_output == "probabilities" and
+            args.max_memory_mb is not None):
+        parser.wrong_args_error(
+            'max_memory_mb', 'neighbourhood_shape=probabilities')
+
     if args.input_mask_filepath and args.neighbourhood_shape == "circular":
         parser.wrong_args_error(
             'neighbourhood_shape=circular', 'input_mask_filepath')
@@ -224,7 +240,7 @@ def main(argv=None):
                      args.percentiles, mask_cube, args.halo_radius,
                      args.apply_recursive_filter, alphas_x_cube,
                      alphas_y_cube, args.alpha_x, args.alpha_y,
-                     args.iterations)
+                     args.iterations, args.max_memory_mb)
 
     # Save Cube
     save_netcdf(result, args.output_filepath)
@@ -235,7 +251,8 @@ def process(cube, neighbourhood_output, neighbourhood_shape, radius=None,
             weighted_mode=False, sum_or_fraction="fraction", re_mask=False,
             percentiles=DEFAULT_PERCENTILES, mask_cube=None,
             halo_radius=None, apply_recursive_filter=False, alphas_x_cube=None,
-            alphas_y_cube=None, alpha_x=None, alpha_y=None, iterations=1):
+            alphas_y_cube=None, alpha_x=None, alpha_y=None, iterations=1,
+            max_memory_mb=None):
     """Runs neighbourhood processing.
 
     Apply the requested neighbourhood method via the
@@ -326,6 +343,13 @@ def process(cube, neighbourhood_output, neighbourhood_shape, radius=None,
         iterations (int):
             The number of times to apply the filter. (typically < 5)
             Default is 1 (one).
+        max_memory_mb (float or None):
+            Approximate maximum memory in megabytes to use for the
+            neighbourhood values from which percentiles are calculated. If
+            set, the percentiles are calculated for tiles of rows of the grid
+            in turn. Only applicable for calculating "percentiles"
+            neighbourhood output.
+            Default is None.
 
     Returns:
         result (iris.cube.Cube):
@@ -340,6 +364,9 @@ def process(cube, neighbourhood_output, neighbourhood_shape, radius=None,
         RuntimeError:
             If neighbourhood_output='probabilities' and the default
             percentiles are used.
+        RuntimeError:
+            If max_memory_mb is used with neighbourhood_output=
+            'probabilities'.
         RuntimeError:
             If neighbourhood_shape='circular' is used with mask cube.
         ValueError:
@@ -368,6 +395,10 @@ def process(cube, neighbourhood_output, neighbourhood_shape, radius=None,
         raise RuntimeError('percentiles cannot be DEFAULT_PERCENTILES with'
                            'neighbourhood_output="probabilities"')
 
+    if neighbourhood_output == "probabilities" and max_memory_mb is not None:
+        raise RuntimeError('max_memory_mb cannot be used with '
+                           'neighbourhood_output="probabilities"')
+
     if mask_cube and neighbourhood_shape == "circular":
         raise RuntimeError('mask_cube cannot be used with'
                            'neighbourhood_output="circular"')
@@ -407,7 +438,8 @@ def process(cube, neighbourhood_output, neighbourhood_shape, radius=None,
             GeneratePercentilesFromANeighbourhood(
                 neighbourhood_shape, radius_or_radii,
                 lead_times=lead_times,
-                percentiles=percentiles
+                percentiles=percentiles,
+                max_memory_mb=max_memory_mb
             ).process(cube))
 
     # If the '--apply-recursive-filter' option has been specified in the
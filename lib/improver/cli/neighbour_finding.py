@@ -140,6 +140,19 @@ def main(argv=None):
         help="The y coordinate key within the JSON file. The plugin default is"
         " 'latitude', but can be changed using this option if required.")
 
+    c_group = parser.add_argument_group('Caching options')
+    c_group.add_argument(
+        "--cache_dir", metavar="CACHE_DIR",
+        help="Directory in which to cache neighbour cubes and the grid points"
+        " used to construct the KDTree. Results are reused by later runs with"
+        " identical grids, site lists and options. By default nothing is"
+        " cached.")
+    c_group.add_argument(
+        "--max_cache_entries", metavar="MAX_CACHE_ENTRIES", type=int,
+        help="The maximum number of entries to keep in the cache directory."
+        " The least recently used entries are removed once this is exceeded."
+        " By default the number of entries is not limited.")
+
     meta_group = parser.add_argument_group("Metadata")
     meta_group.add_argument(
         "--metadata_json", metavar="METADATA_JSON", default=None,
@@ -159,7 +172,8 @@ def main(argv=None):
                      args.all_methods, args.land_constraint, args.minimum_dz,
                      args.search_radius, args.node_limit,
                      args.site_coordinate_system,
-                     args.site_x_coordinate, args.site_y_coordinate)
+                     args.site_x_coordinate, args.site_y_coordinate,
+                     args.cache_dir, args.max_cache_entries)
 
     # Save Cube
     save_netcdf(result, args.output_filepath)
@@ -168,7 +182,8 @@ def main(argv=None):
 def process(orography, landmask, site_list, metadata_dict=None,
             all_methods=False, land_constraint=None, minimum_dz=None,
             search_radius=None, node_limit=None, site_coordinate_system=None,
-            site_x_coordinate=None, site_y_coordinate=None):
+            site_x_coordinate=None, site_y_coordinate=None, cache_dir=None,
+            max_cache_entries=None):
     """Module to create neighbour cubes for extracting spot data.
 
     Determine grid point coordinates within the provided cubes that neighbour
@@ -243,6 +258,15 @@ def process(orography, landmask, site_list, metadata_dict=None,
             The key that identifies site y coordinates in the provided site
             dictionary. Defaults to latitude.
             Default is None.
+        cache_dir (str):
+            Directory in which to cache neighbour cubes and the grid points
+            used to construct the KDTree, such that they can be reused by
+            later runs with identical grids, site lists and options.
+            Default is None, in which case nothing is cached.
+        max_cache_entries (int):
+            The maximum number of entries to keep in the cache directory. The
+            least recently used entries are removed once this is exceeded.
+            Default is None, in which case the number is not limited.
 
     Returns:
         result (iris.cube.Cube):
@@ -267,7 +291,9 @@ def process(orography, landmask, site_list, metadata_dict=None,
         'site_coordinate_system': site_coordinate_system,
         'site_x_coordinate': site_x_coordinate,
         'node_limit': node_limit,
-        'site_y_coordinate': site_y_coordinate
+        'site_y_coordinate': site_y_coordinate,
+        'cache_dir': cache_dir,
+        'max_cache_entries': max_cache_entries
     }
     fargs = (site_list, orography, landmask)
     kwargs = {k: v for (k, v) in args.items() if v is not None}
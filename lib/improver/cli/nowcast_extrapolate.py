@@ -33,7 +33,6 @@
 
 import os
 
-import iris
 import numpy as np
 from iris import Constraint
 
@@ -293,10 +292,7 @@ def process(input_cube, u_cube, v_cube, speed_cube, direction_cube,
         metadata_dict=metadata_dict)
 
     # extrapolate input data to required lead times
-    forecast_cubes = iris.cube.CubeList()
-    for i, lead_time in enumerate(lead_times):
-        forecast_cubes.append(
-            forecast_plugin.extrapolate(leadtime_minutes=lead_time))
+    forecast_cubes = forecast_plugin.extrapolate_multiple(lead_times)
 
     forecast_to_return = forecast_cubes[::lead_time_filter].copy()
     # return rate cubes
@@ -35,6 +35,7 @@ from improver.argparser import ArgParser
 
 from improver.psychrometric_calculations.psychrometric_calculations import (
     FallingSnowLevel)
+from improver.utilities.ancillary_creation import SaturatedVapourPressureTable
 from improver.utilities.load import load_cube
 from improver.utilities.save import save_netcdf
 
@@ -82,6 +83,27 @@ def main(argv=None):
                               "snow is deemed to have melted to become rain. "
                               "The default value is 90.0, an empirically "
                               "derived value."))
+    parser.add_argument("--fill_method", metavar="FILL_METHOD",
+                        default="griddata", choices=["griddata", "nearest"],
+                        help="Method used to fill in gaps in the falling "
+                        "snow level by horizontal interpolation. 'griddata' "
+                        "(default) uses linear interpolation over the whole "
+                        "grid. 'nearest' sets each gap to the value of the "
+                        "nearest valid point, which is much faster for "
+                        "large gaps.")
+    parser.add_argument("--svp_table_cache_dir",
+                        metavar="SVP_TABLE_CACHE_DIR",
+                        help="Directory in which to cache the table of "
+                        "saturated vapour pressures, so that a table created "
+                        "by an earlier run is read rather than recalculated. "
+                        "If not specified, the default static table is "
+                        "used.")
+    parser.add_argument("--svp_table_increment",
+                        metavar="SVP_TABLE_INCREMENT", type=float,
+                        default=0.1,
+                        help="The temperature increment in K of the cached "
+                        "table of saturated vapour pressures. Only used with "
+                        "svp_table_cache_dir. Default: 0.1.")
     args = parser.parse_args(args=argv)
 
     # Load Cubes
@@ -90,17 +112,24 @@ def main(argv=None):
     pressure = load_cube(args.pressure, no_lazy_load=True)
     orog = load_cube(args.orography, no_lazy_load=True)
     land_sea = load_cube(args.land_sea_mask, no_lazy_load=True)
+    svp_table_cube = None
+    if args.svp_table_cache_dir is not None:
+        svp_table_cube = SaturatedVapourPressureTable(
+            t_increment=args.svp_table_increment,
+            cache_dir=args.svp_table_cache_dir).process()
 
     # Process Cube
     result = process(temperature, relative_humidity, pressure, orog,
-                     land_sea, args.precision, args.falling_level_threshold)
+                     land_sea, args.precision, args.falling_level_threshold,
+                     args.fill_method, svp_table_cube)
 
     # Save Cube
     save_netcdf(result, args.output_filepath)
 
 
 def process(temperature, relative_humidity, pressure, orog, land_sea,
-            precision=0.005, falling_level_threshold=90.0):
+            precision=0.005, falling_level_threshold=90.0,
+            fill_method="griddata", svp_table_cube=None):
     """Module to calculate continuous snow falling level.
 
     Calculate the wet-bulb temperature integral by firstly calculating the
@@ -135,6 +164,15 @@ def process(temperature, relative_humidity, pressure, orog, land_sea,
             falling snow level. This threshold indicates the level at which
             falling snow is deemed to have melted to become rain.
             Default is 90.0.
+        fill_method (str):
+            Method used to fill in gaps in the falling snow level by
+            horizontal interpolation, either "griddata" or "nearest".
+            Default is "griddata".
+        svp_table_cube (iris.cube.Cube or None):
+            Cube of saturated vapour pressures, as created by
+            SaturatedVapourPressureTable, to use in place of the default
+            static table.
+            Default is None.
 
     Returns:
         result (iris.cube.Cube):
@@ -142,7 +180,9 @@ def process(temperature, relative_humidity, pressure, orog, land_sea,
     """
     result = FallingSnowLevel(
         precision=precision,
-        falling_level_threshold=falling_level_threshold).process(
+        falling_level_threshold=falling_level_threshold,
+        fill_method=fill_method,
+        svp_table_cube=svp_table_cube).process(
         temperature,
         relative_humidity,
         pressure,
@@ -36,6 +36,7 @@ from improver.argparser import ArgParser
 
 from improver.psychrometric_calculations.psychrometric_calculations import (
     WetBulbTemperature)
+from improver.utilities.ancillary_creation import SaturatedVapourPressureTable
 from improver.utilities.load import load_cube
 from improver.utilities.save import save_netcdf
 
@@ -69,21 +70,39 @@ def main(argv=None):
                         'iterator in K. When the wet bulb temperature '
                         'stops changing by more than this amount between'
                         ' iterations, the solution is accepted.')
+    parser.add_argument('--svp_table_cache_dir',
+                        metavar='SVP_TABLE_CACHE_DIR',
+                        help='Directory in which to cache the table of '
+                        'saturated vapour pressures, so that a table created '
+                        'by an earlier run is read rather than recalculated. '
+                        'If not specified, the default static table is '
+                        'used.')
+    parser.add_argument('--svp_table_increment',
+                        metavar='SVP_TABLE_INCREMENT', type=float,
+                        default=0.1,
+                        help='The temperature increment in K of the cached '
+                        'table of saturated vapour pressures. Only used with '
+                        'svp_table_cache_dir. Default: 0.1.')
 
     args = parser.parse_args(args=argv)
     # Load Cubes
     temperature = load_cube(args.temperature)
     relative_humidity = load_cube(args.relative_humidity)
     pressure = load_cube(args.pressure)
+    svp_table_cube = None
+    if args.svp_table_cache_dir is not None:
+        svp_table_cube = SaturatedVapourPressureTable(
+            t_increment=args.svp_table_increment,
+            cache_dir=args.svp_table_cache_dir).process()
     # Process Cube
     result = process(temperature, relative_humidity, pressure,
-                     args.convergence_condition)
+                     args.convergence_condition, svp_table_cube)
     # Save Cube
     save_netcdf(result, args.output_filepath)
 
 
 def process(temperature, relative_humidity, pressure,
-            convergence_condition=0.05):
+            convergence_condition=0.05, svp_table_cube=None):
     """Module to generate wet-bulb temperatures.
 
     Call the calculate_wet_bulb_temperature function to calculate wet-bulb
@@ -101,13 +120,19 @@ def process(temperature, relative_humidity, pressure,
             The precision to which the Newton iterator must converge before
             returning wet-bulb temperatures.
             Default is 0.05.
+        svp_table_cube (iris.cube.Cube or None):
+            Cube of saturated vapour pressures, as created by
+            SaturatedVapourPressureTable, to use in place of the default
+            static table.
+            Default is None.
 
     Returns:
         result (iris.cube.Cube):
             Cube of wet-bulb temperature (K).
 
     """
-    result = (WetBulbTemperature(precision=convergence_condition).
+    result = (WetBulbTemperature(precision=convergence_condition,
+                                 svp_table_cube=svp_table_cube).
               process(temperature, relative_humidity, pressure))
     return result
 
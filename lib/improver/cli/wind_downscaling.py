@@ -200,13 +200,12 @@ def process(wind_speed, silhouette_roughness, sigma, target_orog,
     except CoordinateNotFoundError:
         wind_speed_iterator = [wind_speed]
     wind_speed_list = iris.cube.CubeList()
+    plugin = wind_downscaling.RoughnessCorrection(
+        silhouette_roughness, sigma, target_orog, standard_orog,
+        model_resolution, z0_cube=veg_roughness_cube,
+        height_levels_cube=height_levels)
     for wind_speed_slice in wind_speed_iterator:
-        result = (
-            wind_downscaling.RoughnessCorrection(
-                silhouette_roughness, sigma, target_orog,
-                standard_orog, model_resolution,
-                z0_cube=veg_roughness_cube,
-                height_levels_cube=height_levels).process(wind_speed_slice))
+        result = plugin.process(wind_speed_slice)
         wind_speed_list.append(result)
     # Temporary fix for chunking problems when merging cubes
     max_npoints = max([np.prod(cube.data.shape) for cube in wind_speed_list])
@@ -34,6 +34,7 @@ This module defines all the "plugins" specific for ensemble calibration.
 """
 import datetime
 import warnings
+from multiprocessing import Pool
 
 import iris
 from iris.exceptions import CoordinateNotFoundError
@@ -50,6 +51,13 @@ from improver.utilities.temporal import (
     iris_time_to_datetime)
 
 
+class NoMatchingValidityTimesError(ValueError):
+    """
+    Raised when the historic forecasts and the truths have no validity
+    times in common.
+    """
+
+
 class ContinuousRankedProbabilityScoreMinimisers():
     """
     Minimise the Continuous Ranked Probability Score (CRPS)
@@ -61,10 +69,19 @@ class ContinuousRankedProbabilityScoreMinimisers():
     The number of coefficients that will be optimised depend upon the initial
     guess.
 
-    Minimisation is performed using the Nelder-Mead algorithm for 200
-    iterations to limit the computational expense.
+    By default, minimisation is performed using the Nelder-Mead algorithm
+    for 200 iterations to limit the computational expense.
     Note that the BFGS algorithm was initially trialled but had a bug
     in comparison to comparative results generated in R.
+    Alternatively, a gradient based algorithm, such as L-BFGS-B, can be
+    requested, in which case the analytic gradient of the CRPS with respect
+    to the coefficients is provided to the minimisation.
+
+    Coefficients can also be estimated independently for each grid point
+    using process_point_by_point. Each point is minimised separately, using
+    the analytic gradient of the CRPS with the requested gradient based
+    algorithm, or the L-BFGS-B algorithm if Nelder-Mead has been requested.
+    The points are split into blocks, which may be minimised in parallel.
 
     """
     # The tolerated percentage change for the final iteration when
@@ -75,7 +92,15 @@ class ContinuousRankedProbabilityScoreMinimisers():
     # as part of the minimisation.
     BAD_VALUE = np.float64(999999)
 
-    def __init__(self, max_iterations=1000):
+    # The value used in place of a zero initial guess for a coefficient that
+    # is squared, when minimising using the gradient of the CRPS.
+    ZERO_COEFFICIENT_OFFSET = np.float64(0.01)
+
+    # The scipy.optimize.minimize methods that are supported, other than
+    # Nelder-Mead, which make use of the analytic gradient of the CRPS.
+    GRADIENT_BASED_METHODS = ["L-BFGS-B", "BFGS", "CG"]
+
+    def __init__(self, max_iterations=1000, minimisation_method="Nelder-Mead"):
         """
         Initialise class for performing minimisation of the Continuous
         Ranked Probability Score (CRPS).
@@ -90,24 +115,91 @@ class ContinuousRankedProbabilityScoreMinimisers():
                 predictor_of_mean is "realizations", then the number of
                 iterations may require increasing, as there will be
                 more coefficients to solve for.
+            minimisation_method (str):
+                The scipy.optimize.minimize method used to minimise the CRPS,
+                either "Nelder-Mead" or one of the GRADIENT_BASED_METHODS.
+
+        Raises:
+            ValueError: If the minimisation method is not supported.
 
         """
+        supported_methods = ["Nelder-Mead"] + self.GRADIENT_BASED_METHODS
+        if minimisation_method not in supported_methods:
+            msg = ("Minimisation method {} is not supported. Supported "
+                   "methods are {}".format(
+                       minimisation_method, supported_methods))
+            raise ValueError(msg)
+        self.minimisation_method = minimisation_method
         # Dictionary containing the functions that will be minimised,
         # depending upon the distribution requested.
         self.minimisation_dict = {
             "gaussian": self.calculate_normal_crps,
             "truncated_gaussian": self.calculate_truncated_normal_crps}
-        # Maximum iterations for minimisation using Nelder-Mead.
+        # Dictionary containing the functions returning the CRPS and its
+        # gradient, which are used by the gradient based methods.
+        self.gradient_minimisation_dict = {
+            "gaussian": self.calculate_normal_crps_and_gradient,
+            "truncated_gaussian":
+                self.calculate_truncated_normal_crps_and_gradient}
+        # Dictionary containing the functions returning the CRPS and its
+        # gradient for each point, which are used when minimising each point
+        # independently.
+        self.point_by_point_minimisation_dict = {
+            "gaussian": self.calculate_normal_crps_by_point,
+            "truncated_gaussian":
+                self.calculate_truncated_normal_crps_by_point}
+        # Maximum iterations for minimisation.
         self.max_iterations = max_iterations
+        # Convergence diagnostics for each minimisation performed by the
+        # most recent call to process or process_point_by_point.
+        self.convergence_diagnostics = []
 
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
         result = ('<ContinuousRankedProbabilityScoreMinimisers: '
-                  'minimisation_dict: {}; max_iterations: {}>')
+                  'minimisation_dict: {}; max_iterations: {}; '
+                  'minimisation_method: {}>')
         print_dict = {}
         for key in self.minimisation_dict:
             print_dict.update({key: self.minimisation_dict[key].__name__})
-        return result.format(print_dict, self.max_iterations)
+        return result.format(
+            print_dict, self.max_iterations, self.minimisation_method)
+
+    @staticmethod
+    def _convergence_diagnostics(
+            optimised_coeffs, method, percentage_change=None):
+        """
+        Summarise the outcome of a minimisation.
+
+        Args:
+            optimised_coeffs (scipy.optimize.OptimizeResult):
+                The result of the minimisation.
+            method (str):
+                The minimisation method used.
+            percentage_change (numpy.ndarray or None):
+                The percentage change in each coefficient in the final
+                iteration, if available.
+
+        Returns:
+            dict:
+                Dictionary containing the method, whether the minimisation
+                was successful, the message returned by the minimisation, the
+                number of iterations, function evaluations and gradient
+                evaluations, the final CRPS and the percentage change in the
+                final iteration.
+        """
+        message = optimised_coeffs.message
+        if isinstance(message, bytes):
+            message = message.decode()
+        return {
+            "method": method,
+            "success": bool(optimised_coeffs.success),
+            "message": message,
+            "iterations": int(optimised_coeffs.nit),
+            "function_evaluations": int(optimised_coeffs.nfev),
+            "gradient_evaluations": int(optimised_coeffs.get("njev", 0)),
+            "crps": float(optimised_coeffs.fun),
+            "percentage_change": percentage_change}
 
     def process(
             self, initial_guess, forecast_predictor, truth, forecast_var,
@@ -157,6 +249,8 @@ class ContinuousRankedProbabilityScoreMinimisers():
             optimised_coeffs (list):
                 List of optimised coefficients.
                 Order of coefficients is [gamma, delta, alpha, beta].
+                The outcome of the minimisation is recorded in
+                self.convergence_diagnostics.
 
         Raises:
             KeyError: If the distribution is not supported.
@@ -177,6 +271,11 @@ class ContinuousRankedProbabilityScoreMinimisers():
                     List of numpy arrays containing the optimised coefficients,
                     after each iteration.
 
+            Returns:
+                numpy.ndarray:
+                    The percentage change in each coefficient within the last
+                    iteration.
+
             Warns:
                 Warning: If a satisfactory minimisation has not been achieved.
             """
@@ -195,6 +294,7 @@ class ContinuousRankedProbabilityScoreMinimisers():
                            last_iteration_percentage_change, allvecs[-1],
                            allvecs[-2], np.absolute(allvecs[-2]-allvecs[-1]))
                 warnings.warn(msg)
+            return last_iteration_percentage_change
 
         try:
             minimisation_function = self.minimisation_dict[distribution]
@@ -228,19 +328,40 @@ class ContinuousRankedProbabilityScoreMinimisers():
         truth_data = truth_data.astype(np.float64)
         sqrt_pi = np.sqrt(np.pi).astype(np.float64)
 
+        use_gradient = (
+            self.minimisation_method in self.GRADIENT_BASED_METHODS)
+        if use_gradient:
+            minimisation_function = (
+                self.gradient_minimisation_dict[distribution])
+            initial_guess = self._offset_zero_squared_coefficients(
+                initial_guess, predictor_of_mean_flag)
+        options = {"maxiter": self.max_iterations}
+        # The L-BFGS-B method does not record the coefficients after each
+        # iteration.
+        if self.minimisation_method != "L-BFGS-B":
+            options["return_all"] = True
+
         optimised_coeffs = minimize(
             minimisation_function, initial_guess,
             args=(forecast_predictor_data, truth_data,
                   forecast_var_data, sqrt_pi, predictor_of_mean_flag),
-            method="Nelder-Mead",
-            options={"maxiter": self.max_iterations, "return_all": True})
+            jac=use_gradient, method=self.minimisation_method,
+            options=options)
 
         if not optimised_coeffs.success:
             msg = ("Minimisation did not result in convergence after "
                    "{} iterations. \n{}".format(
                        self.max_iterations, optimised_coeffs.message))
             warnings.warn(msg)
-        calculate_percentage_change_in_last_iteration(optimised_coeffs.allvecs)
+        percentage_change = None
+        if "allvecs" in optimised_coeffs:
+            percentage_change = (
+                calculate_percentage_change_in_last_iteration(
+                    optimised_coeffs.allvecs))
+        self.convergence_diagnostics = [
+            self._convergence_diagnostics(
+                optimised_coeffs, self.minimisation_method,
+                percentage_change=percentage_change)]
         return optimised_coeffs.x.astype(np.float32)
 
     def calculate_normal_crps(
@@ -365,11 +486,613 @@ class ContinuousRankedProbabilityScoreMinimisers():
             result = self.BAD_VALUE
         return result
 
+    def _offset_zero_squared_coefficients(
+            self, initial_guess, predictor_of_mean_flag):
+        """
+        Replace zero values in the initial guess for the coefficients that
+        are squared within the CRPS calculation. These coefficients have a
+        gradient of zero when they are zero, so a gradient based minimisation
+        could not move away from them.
+
+        Args:
+            initial_guess (numpy.ndarray):
+                Array of coefficients, with the coefficients along the final
+                axis.
+                Order of coefficients is [gamma, delta, alpha, beta].
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+
+        Returns:
+            numpy.ndarray:
+                Copy of the initial guess with the zero values of the squared
+                coefficients replaced by the ZERO_COEFFICIENT_OFFSET.
+        """
+        n_coeffs = initial_guess.shape[-1]
+        squared = np.isin(np.arange(n_coeffs), [0, 1])
+        if predictor_of_mean_flag.lower() == "realizations":
+            squared[3:] = True
+        return np.where(
+            squared & (initial_guess == 0), self.ZERO_COEFFICIENT_OFFSET,
+            initial_guess)
+
+    @staticmethod
+    def _as_single_point(forecast_predictor, truth, forecast_var):
+        """
+        Reshape the inputs to calculate_normal_crps and
+        calculate_truncated_normal_crps into a block containing a single
+        point, for which every value is a sample.
+
+        Args:
+            forecast_predictor (numpy.ndarray):
+                Data to be used as the predictor, either the ensemble mean
+                or the ensemble realizations.
+            truth (numpy.ndarray):
+                Data to be used as truth.
+            forecast_var (numpy.ndarray):
+                Ensemble variance data.
+
+        Returns:
+            (tuple): tuple containing:
+                **forecast_predictor** (numpy.ndarray):
+                    Array of shape (1, n_predictors, n_samples).
+                **truth** (numpy.ndarray):
+                    Array of shape (1, n_samples).
+                **forecast_var** (numpy.ndarray):
+                    Array of shape (1, n_samples).
+        """
+        forecast_predictor = (
+            forecast_predictor.reshape(len(truth), -1).T[np.newaxis])
+        return forecast_predictor, truth[np.newaxis], forecast_var[np.newaxis]
+
+    def calculate_normal_crps_and_gradient(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            sqrt_pi, predictor_of_mean_flag):
+        """
+        Calculate the CRPS for a normal distribution, as in
+        calculate_normal_crps, along with its analytic gradient with respect
+        to the coefficients.
+
+        Args:
+            initial_guess (list):
+                List of optimised coefficients.
+                Order of coefficients is [gamma, delta, alpha, beta].
+            forecast_predictor (numpy.ndarray):
+                Data to be used as the predictor,
+                either the ensemble mean or the ensemble realizations.
+            truth (numpy.ndarray):
+                Data to be used as truth.
+            forecast_var (numpy.ndarray):
+                Ensemble variance data.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+
+        Returns:
+            (tuple): tuple containing:
+                **result** (float):
+                    CRPS for the current set of coefficients.
+                **gradient** (numpy.ndarray):
+                    The derivatives of the CRPS with respect to each
+                    coefficient.
+        """
+        return self._calculate_crps_by_point(
+            initial_guess,
+            *self._as_single_point(forecast_predictor, truth, forecast_var),
+            sqrt_pi, predictor_of_mean_flag, self._normal_crps_terms)
+
+    def calculate_truncated_normal_crps_and_gradient(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            sqrt_pi, predictor_of_mean_flag):
+        """
+        Calculate the CRPS for a truncated normal distribution, as in
+        calculate_truncated_normal_crps, along with its analytic gradient
+        with respect to the coefficients.
+
+        Args:
+            initial_guess (list):
+                List of optimised coefficients.
+                Order of coefficients is [gamma, delta, alpha, beta].
+            forecast_predictor (numpy.ndarray):
+                Data to be used as the predictor,
+                either the ensemble mean or the ensemble realizations.
+            truth (numpy.ndarray):
+                Data to be used as truth.
+            forecast_var (numpy.ndarray):
+                Ensemble variance data.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+
+        Returns:
+            (tuple): tuple containing:
+                **result** (float):
+                    CRPS for the current set of coefficients.
+                **gradient** (numpy.ndarray):
+                    The derivatives of the CRPS with respect to each
+                    coefficient.
+        """
+        return self._calculate_crps_by_point(
+            initial_guess,
+            *self._as_single_point(forecast_predictor, truth, forecast_var),
+            sqrt_pi, predictor_of_mean_flag, self._truncated_normal_crps_terms,
+            truncated=True)
+
+    def process_point_by_point(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            predictor_of_mean_flag, distribution, points_per_block=1000,
+            processes=1):
+        """
+        Estimate optimised values for the coefficients independently for
+        each grid point, using the historic forecasts and truths at that
+        point alone.
+
+        The points are split into blocks of up to points_per_block points,
+        which may be minimised in parallel. Within a block, the CRPS of each
+        point is minimised separately with respect to the coefficients of
+        that point, so that the convergence of one point, including a point
+        for which the coefficients give an unusable distribution, does not
+        affect the minimisation of any other point.
+
+        Args:
+            initial_guess (numpy.ndarray):
+                Array of coefficients to be used as the initial guess, either
+                of shape (n_coefficients,) to use the same initial guess for
+                every point, or of shape (n_coefficients, n_y, n_x) to provide
+                an initial guess for each point.
+                Order of coefficients is [gamma, delta, alpha, beta].
+            forecast_predictor (iris.cube.Cube):
+                Cube containing the fields to be used as the predictor,
+                either the ensemble mean or the ensemble realizations. The y
+                and x dimensions must be the final dimensions of the cube.
+            truth (iris.cube.Cube):
+                Cube containing the field, which will be used as truth. The y
+                and x dimensions must be the final dimensions of the cube.
+            forecast_var (iris.cube.Cube):
+                Cube containg the field containing the ensemble variance. The
+                y and x dimensions must be the final dimensions of the cube.
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+            distribution (str):
+                String used to access the appropriate function for use in the
+                minimisation within self.point_by_point_minimisation_dict.
+            points_per_block (int):
+                The maximum number of points in each block of points passed
+                to a process.
+            processes (int):
+                The number of processes used to minimise the blocks of
+                points. If 1, the blocks are minimised in turn within the
+                current process.
+
+        Returns:
+            optimised_coeffs (numpy.ndarray):
+                Array of optimised coefficients of shape
+                (n_coefficients, n_y, n_x).
+                Order of coefficients is [gamma, delta, alpha, beta].
+
+                The outcome of the minimisation of each point is recorded in
+                self.convergence_diagnostics.
+
+        Raises:
+            KeyError: If the distribution is not supported.
+
+        Warns:
+            Warning: If the minimisation did not converge for any of the
+                points within a block.
+
+        """
+        try:
+            minimisation_function = (
+                self.point_by_point_minimisation_dict[distribution])
+        except KeyError as err:
+            msg = ("Distribution requested {} is not supported in {}"
+                   "Error message is {}".format(
+                       distribution, self.point_by_point_minimisation_dict,
+                       err))
+            raise KeyError(msg)
+
+        # Ensure predictor_of_mean_flag is valid.
+        check_predictor_of_mean_flag(predictor_of_mean_flag)
+
+        # Reshape the inputs to (points, ..., samples), where the samples
+        # are all the historic forecasts at each point.
+        spatial_shape = truth.shape[-2:]
+        n_points = int(np.prod(spatial_shape))
+        truth_data = truth.data.reshape(-1, n_points).T
+        forecast_var_data = forecast_var.data.reshape(-1, n_points).T
+        if predictor_of_mean_flag.lower() == "mean":
+            forecast_predictor_data = (
+                forecast_predictor.data.reshape(1, -1, n_points))
+        elif predictor_of_mean_flag.lower() == "realizations":
+            forecast_predictor = (
+                enforce_coordinate_ordering(
+                    forecast_predictor, "realization"))
+            forecast_predictor_data = forecast_predictor.data.reshape(
+                len(forecast_predictor.coord("realization").points), -1,
+                n_points)
+        forecast_predictor_data = np.transpose(
+            forecast_predictor_data, (2, 0, 1))
+
+        # Increased precision is needed for stable coefficient calculation.
+        # The resulting coefficients are cast to float32 prior to output.
+        initial_guess = np.array(initial_guess, dtype=np.float64)
+        n_coeffs = len(initial_guess)
+        initial_guess = np.broadcast_to(
+            initial_guess.reshape(n_coeffs, -1), (n_coeffs, n_points)).T.copy()
+        initial_guess = self._offset_zero_squared_coefficients(
+            initial_guess, predictor_of_mean_flag)
+        forecast_predictor_data = forecast_predictor_data.astype(np.float64)
+        forecast_var_data = forecast_var_data.astype(np.float64)
+        truth_data = truth_data.astype(np.float64)
+        sqrt_pi = np.sqrt(np.pi).astype(np.float64)
+
+        # Minimising many coefficients at once is only practical using the
+        # gradient of the CRPS.
+        method = self.minimisation_method
+        if method not in self.GRADIENT_BASED_METHODS:
+            method = "L-BFGS-B"
+
+        block_args = []
+        for start in range(0, n_points, points_per_block):
+            block = slice(start, start + points_per_block)
+            block_args.append(
+                (minimisation_function, method, initial_guess[block],
+                 forecast_predictor_data[block], truth_data[block],
+                 forecast_var_data[block], sqrt_pi, predictor_of_mean_flag))
+
+        if processes > 1:
+            with Pool(processes) as pool:
+                optimised_blocks = pool.starmap(
+                    self._minimise_block, block_args)
+        else:
+            optimised_blocks = [
+                self._minimise_block(*args) for args in block_args]
+
+        self.convergence_diagnostics = [
+            diagnostics for _, block_diagnostics in optimised_blocks
+            for diagnostics in block_diagnostics]
+        optimised_coeffs = np.concatenate(
+            [block_coeffs for block_coeffs, _ in optimised_blocks]).T
+        return optimised_coeffs.reshape(
+            (n_coeffs,) + spatial_shape).astype(np.float32)
+
+    def _minimise_block(
+            self, minimisation_function, method, initial_guess,
+            forecast_predictor, truth, forecast_var, sqrt_pi,
+            predictor_of_mean_flag):
+        """
+        Minimise the CRPS of each point within a block separately with
+        respect to the coefficients of that point, using the analytic
+        gradient of the CRPS.
+
+        Args:
+            minimisation_function (function):
+                Function returning the summed CRPS over a block of points and
+                its gradient with respect to the coefficients of each point,
+                which is called with a block containing a single point.
+            method (str):
+                The gradient based scipy.optimize.minimize method to use.
+            initial_guess (numpy.ndarray):
+                Array of shape (n_points, n_coefficients) containing the
+                initial guess for each point.
+            forecast_predictor (numpy.ndarray):
+                Array of shape (n_points, n_predictors, n_samples) containing
+                the ensemble mean or realizations at each point.
+            truth (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the truths.
+            forecast_var (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the ensemble
+                variances.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+
+        Returns:
+            (tuple): tuple containing:
+                **optimised_coeffs** (numpy.ndarray):
+                    Array of shape (n_points, n_coefficients) containing the
+                    optimised coefficients for each point.
+                **diagnostics** (list of dict):
+                    The convergence diagnostics for the minimisation of each
+                    point.
+
+        Warns:
+            Warning: If the minimisation did not converge for any of the
+                points.
+        """
+        optimised_coeffs = np.empty_like(initial_guess)
+        diagnostics = []
+        for index in range(len(initial_guess)):
+            point = slice(index, index + 1)
+            optimised_point = minimize(
+                minimisation_function, initial_guess[index],
+                args=(forecast_predictor[point], truth[point],
+                      forecast_var[point], sqrt_pi, predictor_of_mean_flag),
+                jac=True, method=method,
+                options={"maxiter": self.max_iterations})
+            optimised_coeffs[index] = optimised_point.x
+            diagnostics.append(
+                self._convergence_diagnostics(optimised_point, method))
+
+        n_unconverged = sum(
+            not point_diagnostics["success"]
+            for point_diagnostics in diagnostics)
+        if n_unconverged:
+            msg = ("Minimisation did not result in convergence after "
+                   "{} iterations for {} of the {} points in a block.".format(
+                       self.max_iterations, n_unconverged,
+                       len(initial_guess)))
+            warnings.warn(msg)
+        return optimised_coeffs, diagnostics
+
+    @staticmethod
+    def _normal_crps_terms(mu, sigma, truth, sqrt_pi):
+        """
+        Calculate the CRPS of a normal distribution for each sample, along
+        with its derivatives with respect to the mean and standard deviation
+        of the distribution.
+
+        Args:
+            mu (numpy.ndarray):
+                The mean of the distribution for each sample.
+            sigma (numpy.ndarray):
+                The standard deviation of the distribution for each sample.
+            truth (numpy.ndarray):
+                The truth for each sample.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+
+        Returns:
+            (tuple): tuple containing:
+                **crps** (numpy.ndarray):
+                    The CRPS for each sample.
+                **dcrps_dmu** (numpy.ndarray):
+                    The derivative of the CRPS with respect to mu.
+                **dcrps_dsigma** (numpy.ndarray):
+                    The derivative of the CRPS with respect to sigma.
+        """
+        xz = (truth - mu) / sigma
+        normal_cdf = norm.cdf(xz)
+        normal_pdf = norm.pdf(xz)
+        crps = sigma * (
+            xz * (2 * normal_cdf - 1) + 2 * normal_pdf - 1 / sqrt_pi)
+        dcrps_dmu = 1 - 2 * normal_cdf
+        dcrps_dsigma = 2 * normal_pdf - 1 / sqrt_pi
+        return crps, dcrps_dmu, dcrps_dsigma
+
+    @staticmethod
+    def _truncated_normal_crps_terms(mu, sigma, truth, sqrt_pi):
+        """
+        Calculate the CRPS of a normal distribution truncated at zero for
+        each sample, along with its derivatives with respect to the location
+        and scale of the distribution.
+
+        Args:
+            mu (numpy.ndarray):
+                The location of the distribution for each sample.
+            sigma (numpy.ndarray):
+                The scale of the distribution for each sample.
+            truth (numpy.ndarray):
+                The truth for each sample.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+
+        Returns:
+            (tuple): tuple containing:
+                **crps** (numpy.ndarray):
+                    The CRPS for each sample.
+                **dcrps_dmu** (numpy.ndarray):
+                    The derivative of the CRPS with respect to mu.
+                **dcrps_dsigma** (numpy.ndarray):
+                    The derivative of the CRPS with respect to sigma.
+        """
+        xz = (truth - mu) / sigma
+        normal_cdf = norm.cdf(xz)
+        normal_pdf = norm.pdf(xz)
+        x0 = mu / sigma
+        normal_cdf_0 = norm.cdf(x0)
+        normal_pdf_0 = norm.pdf(x0)
+        normal_cdf_root_two = norm.cdf(np.sqrt(2) * x0)
+        normal_pdf_root_two = norm.pdf(np.sqrt(2) * x0)
+        # The CRPS is sigma * f(xz, x0), where the partial derivatives of f
+        # with respect to xz and x0 are calculated below.
+        scaled_crps = (
+            xz * (2 * normal_cdf + normal_cdf_0 - 2) / normal_cdf_0 +
+            2 * normal_pdf / normal_cdf_0 -
+            normal_cdf_root_two / (sqrt_pi * normal_cdf_0**2))
+        df_dxz = (2 * normal_cdf + normal_cdf_0 - 2) / normal_cdf_0
+        df_dx0 = (
+            -normal_pdf_0 * (xz * (2 * normal_cdf - 2) + 2 * normal_pdf) /
+            normal_cdf_0**2 -
+            np.sqrt(2) * normal_pdf_root_two / (sqrt_pi * normal_cdf_0**2) +
+            2 * normal_cdf_root_two * normal_pdf_0 /
+            (sqrt_pi * normal_cdf_0**3))
+        crps = sigma * scaled_crps
+        dcrps_dmu = df_dx0 - df_dxz
+        dcrps_dsigma = scaled_crps - xz * df_dxz - x0 * df_dx0
+        return crps, dcrps_dmu, dcrps_dsigma
+
+    def _calculate_crps_by_point(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            sqrt_pi, predictor_of_mean_flag, crps_terms, truncated=False):
+        """
+        Calculate the sum of the CRPS over a block of points, and its
+        gradient with respect to the coefficients of each point.
+
+        Args:
+            initial_guess (numpy.ndarray):
+                Flattened array of the coefficients for each point, which can
+                be reshaped to (n_points, n_coefficients).
+                Order of coefficients is [gamma, delta, alpha, beta].
+            forecast_predictor (numpy.ndarray):
+                Array of shape (n_points, n_predictors, n_samples) containing
+                the ensemble mean or realizations at each point.
+            truth (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the truths.
+            forecast_var (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the ensemble
+                variances.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+            crps_terms (function):
+                Function returning the CRPS for each sample and its
+                derivatives with respect to mu and sigma.
+            truncated (bool):
+                If True, points for which the distribution is truncated at
+                more than 3 standard deviations above the mean are given the
+                BAD_VALUE, as in calculate_truncated_normal_crps.
+
+        Returns:
+            (tuple): tuple containing:
+                **result** (float):
+                    The sum of the CRPS over all the points.
+                **gradient** (numpy.ndarray):
+                    Flattened array of the derivatives of the CRPS with
+                    respect to the coefficients of each point.
+        """
+        coeffs = initial_guess.reshape(len(truth), -1)
+        gamma, delta, alpha = coeffs[:, 0:1], coeffs[:, 1:2], coeffs[:, 2:3]
+        if predictor_of_mean_flag.lower() == "mean":
+            beta = coeffs[:, 3:]
+            dmu_dbeta = forecast_predictor
+        elif predictor_of_mean_flag.lower() == "realizations":
+            beta = coeffs[:, 3:]**2
+            dmu_dbeta = 2 * coeffs[:, 3:, np.newaxis] * forecast_predictor
+
+        mu = alpha + np.einsum("pk,pks->ps", beta, forecast_predictor)
+        sigma = np.sqrt(gamma**2 + delta**2 * forecast_var)
+        crps, dcrps_dmu, dcrps_dsigma = crps_terms(mu, sigma, truth, sqrt_pi)
+
+        # Samples with a NaN CRPS, e.g. due to missing truths, are excluded.
+        invalid = np.isnan(crps)
+        crps[invalid] = 0
+        dcrps_dmu[invalid] = 0
+        dcrps_dsigma[invalid] = 0
+
+        gradient = np.empty_like(coeffs)
+        gradient[:, 0] = np.sum(dcrps_dsigma * gamma / sigma, axis=1)
+        gradient[:, 1] = np.sum(
+            dcrps_dsigma * delta * forecast_var / sigma, axis=1)
+        gradient[:, 2] = np.sum(dcrps_dmu, axis=1)
+        gradient[:, 3:] = np.einsum("ps,pks->pk", dcrps_dmu, dmu_dbeta)
+        result = np.sum(crps, axis=1)
+
+        # Points for which the coefficients give an unusable distribution
+        # are given the BAD_VALUE, with no gradient.
+        min_x0 = np.min(mu / sigma, axis=1)
+        bad_points = ~np.isfinite(min_x0)
+        if truncated:
+            bad_points |= min_x0 < -3
+        result[bad_points] = self.BAD_VALUE
+        gradient[bad_points] = 0
+
+        return np.sum(result), gradient.flatten()
+
+    def calculate_normal_crps_by_point(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            sqrt_pi, predictor_of_mean_flag):
+        """
+        Calculate the sum of the CRPS for a normal distribution over a block
+        of points, where each point has its own coefficients, along with the
+        analytic gradient with respect to those coefficients.
+
+        Args:
+            initial_guess (numpy.ndarray):
+                Flattened array of the coefficients for each point, which can
+                be reshaped to (n_points, n_coefficients).
+                Order of coefficients is [gamma, delta, alpha, beta].
+            forecast_predictor (numpy.ndarray):
+                Array of shape (n_points, n_predictors, n_samples) containing
+                the ensemble mean or realizations at each point.
+            truth (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the truths.
+            forecast_var (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the ensemble
+                variances.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+
+        Returns:
+            (tuple): tuple containing:
+                **result** (float):
+                    The sum of the CRPS over all the points.
+                **gradient** (numpy.ndarray):
+                    Flattened array of the derivatives of the CRPS with
+                    respect to the coefficients of each point.
+        """
+        return self._calculate_crps_by_point(
+            initial_guess, forecast_predictor, truth, forecast_var, sqrt_pi,
+            predictor_of_mean_flag, self._normal_crps_terms)
+
+    def calculate_truncated_normal_crps_by_point(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            sqrt_pi, predictor_of_mean_flag):
+        """
+        Calculate the sum of the CRPS for a truncated normal distribution
+        over a block of points, where each point has its own coefficients,
+        along with the analytic gradient with respect to those coefficients.
+
+        Args:
+            initial_guess (numpy.ndarray):
+                Flattened array of the coefficients for each point, which can
+                be reshaped to (n_points, n_coefficients).
+                Order of coefficients is [gamma, delta, alpha, beta].
+            forecast_predictor (numpy.ndarray):
+                Array of shape (n_points, n_predictors, n_samples) containing
+                the ensemble mean or realizations at each point.
+            truth (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the truths.
+            forecast_var (numpy.ndarray):
+                Array of shape (n_points, n_samples) containing the ensemble
+                variances.
+            sqrt_pi (numpy.ndarray):
+                Square root of Pi
+            predictor_of_mean_flag (str):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+
+        Returns:
+            (tuple): tuple containing:
+                **result** (float):
+                    The sum of the CRPS over all the points.
+                **gradient** (numpy.ndarray):
+                    Flattened array of the derivatives of the CRPS with
+                    respect to the coefficients of each point.
+        """
+        return self._calculate_crps_by_point(
+            initial_guess, forecast_predictor, truth, forecast_var, sqrt_pi,
+            predictor_of_mean_flag, self._truncated_normal_crps_terms,
+            truncated=True)
+
 
 class EstimateCoefficientsForEnsembleCalibration():
     """
     Class focussing on estimating the optimised coefficients for ensemble
     calibration.
+
+    The coefficients can either be estimated from historic forecast and
+    truth cubes that are held in memory in their entirety, using process, or
+    from a rolling window of training data that is accumulated one day at a
+    time, using add_training_day and estimate_from_training_data, or
+    process_streaming. Each day added to the training data is reduced to the
+    forecast predictor, forecast variance and truth, which are optionally
+    subsampled, so that only the data required for the minimisation is
+    retained.
     """
     # Logical flag for whether initial guess estimates for the coefficients
     # will be estimated using linear regression i.e.
@@ -379,7 +1102,10 @@ class EstimateCoefficientsForEnsembleCalibration():
     ESTIMATE_COEFFICIENTS_FROM_LINEAR_MODEL_FLAG = True
 
     def __init__(self, distribution, current_cycle, desired_units=None,
-                 predictor_of_mean_flag="mean", max_iterations=1000):
+                 predictor_of_mean_flag="mean", max_iterations=1000,
+                 point_by_point=False, points_per_block=1000, processes=1,
+                 minimisation_method="Nelder-Mead", subsample_step=1,
+                 window_length=None):
         """
         Create an ensemble calibration plugin that, for Nonhomogeneous Gaussian
         Regression, calculates coefficients based on historical forecasts and
@@ -410,9 +1136,41 @@ class EstimateCoefficientsForEnsembleCalibration():
                 predictor_of_mean is "realizations", then the number of
                 iterations may require increasing, as there will be
                 more coefficients to solve for.
+            point_by_point (bool):
+                If True, coefficients are estimated independently for each
+                grid point, and the coefficients cube has x and y dimensions.
+                If False, a single set of coefficients is estimated for the
+                whole domain.
+            points_per_block (int):
+                The maximum number of points minimised together when
+                point_by_point is True.
+            processes (int):
+                The number of processes used to minimise the blocks of points
+                when point_by_point is True.
+            minimisation_method (str):
+                The scipy.optimize.minimize method used to minimise the CRPS.
+                Either "Nelder-Mead" or one of the gradient based methods
+                supported by ContinuousRankedProbabilityScoreMinimisers e.g.
+                "L-BFGS-B". The convergence diagnostics from the most recent
+                minimisation are available from
+                self.minimiser.convergence_diagnostics.
+            subsample_step (int):
+                The step used to subsample the grid points along the y and x
+                axes of the training data, so that only every subsample_step
+                point is used to estimate the coefficients. This cannot be
+                used if point_by_point is True.
+            window_length (int or None):
+                The maximum number of validity times retained in the rolling
+                window of training data accumulated using add_training_day.
+                When a new validity time is added to a full window, the
+                oldest validity time is dropped. If None, all the validity
+                times added are retained.
 
         Raises:
             ValueError: If the given distribution is not valid.
+            ValueError: If subsample_step is greater than 1 when
+                point_by_point is True.
+            ValueError: If window_length is less than 1.
 
         Warns:
             ImportWarning: If the statsmodels module can't be imported.
@@ -431,8 +1189,31 @@ class EstimateCoefficientsForEnsembleCalibration():
         check_predictor_of_mean_flag(predictor_of_mean_flag)
         self.predictor_of_mean_flag = predictor_of_mean_flag
         self.max_iterations = max_iterations
+        self.point_by_point = point_by_point
+        self.points_per_block = points_per_block
+        self.processes = processes
+        if point_by_point and subsample_step > 1:
+            msg = ("The training data can not be subsampled when estimating "
+                   "coefficients for each grid point. subsample_step: "
+                   "{}".format(subsample_step))
+            raise ValueError(msg)
+        self.subsample_step = subsample_step
+        if window_length is not None and window_length < 1:
+            msg = ("window_length must be at least 1, got {}".format(
+                window_length))
+            raise ValueError(msg)
+        self.window_length = window_length
+        # The rolling window of training data, keyed by validity time,
+        # containing the forecast predictor, forecast variance and truth
+        # for each validity time.
+        self.training_data = {}
+        # A single validity time of the most recent historic forecast added
+        # to the training data, which provides the metadata for the
+        # coefficients cube.
+        self.training_template = None
         self.minimiser = ContinuousRankedProbabilityScoreMinimisers(
-            max_iterations=self.max_iterations)
+            max_iterations=self.max_iterations,
+            minimisation_method=minimisation_method)
 
         # Setting default values for coeff_names. Beta is the final
         # coefficient name in the list, as there can potentially be
@@ -474,6 +1255,27 @@ class EstimateCoefficientsForEnsembleCalibration():
             self.predictor_of_mean_flag, self.minimiser.__class__,
             self.coeff_names, self.max_iterations)
 
+    def _get_coefficient_names(self, historic_forecast):
+        """
+        Get the names of the coefficients, including a beta coefficient for
+        each realization if the ensemble realizations are the predictor.
+
+        Args:
+            historic_forecast (iris.cube.Cube):
+                The cube containing the historic forecast.
+
+        Returns:
+            coeff_names (list):
+                The names of the coefficients.
+        """
+        if self.predictor_of_mean_flag.lower() == "realizations":
+            realization_coeffs = []
+            for realization in historic_forecast.coord("realization").points:
+                realization_coeffs.append(
+                    "{}{}".format(self.coeff_names[-1], np.int32(realization)))
+            return self.coeff_names[:-1] + realization_coeffs
+        return self.coeff_names
+
     def create_coefficients_cube(
             self, optimised_coeffs, historic_forecast):
         """Create a cube for storing the coefficients computed using EMOS.
@@ -483,8 +1285,10 @@ class EstimateCoefficientsForEnsembleCalibration():
            ensemble_calibration/create_coefficients_cube.rst
 
         Args:
-            optimised_coeffs (list):
-                List of optimised coefficients.
+            optimised_coeffs (list or numpy.ndarray):
+                List of optimised coefficients, or an array of shape
+                (n_coefficients, n_y, n_x) if the coefficients have been
+                estimated for each grid point.
                 Order of coefficients is [gamma, delta, alpha, beta].
             historic_forecast (iris.cube.Cube):
                 The cube containing the historic forecast.
@@ -496,20 +1300,16 @@ class EstimateCoefficientsForEnsembleCalibration():
                 a coefficient_index dimension coordinate where the points
                 of the coordinate are integer values and a
                 coefficient_name auxiliary coordinate where the points of
-                the coordinate are e.g. gamma, delta, alpha, beta.
+                the coordinate are e.g. gamma, delta, alpha, beta. If the
+                coefficients have been estimated for each grid point, the
+                cube also has the y and x dimension coordinates of the
+                historic_forecast.
 
         Raises:
             ValueError: If the number of coefficients in the optimised_coeffs
                 does not match the expected number.
         """
-        if self.predictor_of_mean_flag.lower() == "realizations":
-            realization_coeffs = []
-            for realization in historic_forecast.coord("realization").points:
-                realization_coeffs.append(
-                    "{}{}".format(self.coeff_names[-1], np.int32(realization)))
-            coeff_names = self.coeff_names[:-1] + realization_coeffs
-        else:
-            coeff_names = self.coeff_names
+        coeff_names = self._get_coefficient_names(historic_forecast)
 
         if len(optimised_coeffs) != len(coeff_names):
             msg = ("The number of coefficients in {} must equal the "
@@ -562,14 +1362,20 @@ class EstimateCoefficientsForEnsembleCalibration():
                 aux_coords_and_dims.append((time_coord, None))
 
         # Create x and y coordinates
-        for axis in ["x", "y"]:
-            historic_coord_points = historic_forecast.coord(axis=axis).points
-            coord_point = np.median(historic_coord_points)
-            coord_bounds = [historic_coord_points[0],
-                            historic_coord_points[-1]]
-            new_coord = historic_forecast.coord(axis=axis).copy(
-                points=coord_point, bounds=coord_bounds)
-            aux_coords_and_dims.append((new_coord, None))
+        if np.ndim(optimised_coeffs) > 1:
+            for index, axis in enumerate(["y", "x"], 1):
+                dim_coords_and_dims.append(
+                    (historic_forecast.coord(axis=axis).copy(), index))
+        else:
+            for axis in ["x", "y"]:
+                historic_coord_points = (
+                    historic_forecast.coord(axis=axis).points)
+                coord_point = np.median(historic_coord_points)
+                coord_bounds = [historic_coord_points[0],
+                                historic_coord_points[-1]]
+                new_coord = historic_forecast.coord(axis=axis).copy(
+                    points=coord_point, bounds=coord_bounds)
+                aux_coords_and_dims.append((new_coord, None))
 
         attributes = {"diagnostic_standard_name": historic_forecast.name()}
         for attribute in historic_forecast.attributes.keys():
@@ -733,8 +1539,9 @@ class EstimateCoefficientsForEnsembleCalibration():
                     the historic_forecasts cube have been removed.
 
         Raises:
-            ValueError: The filtering has found no matches in validity time
-                between the historic forecasts and the truths.
+            NoMatchingValidityTimesError: The filtering has found no matches
+                in validity time between the historic forecasts and the
+                truths.
 
         """
         matching_historic_forecasts = iris.cube.CubeList([])
@@ -750,28 +1557,23 @@ class EstimateCoefficientsForEnsembleCalibration():
         if not matching_historic_forecasts and not matching_truths:
             msg = ("The filtering has found no matches in validity time "
                    "between the historic forecasts and the truths.")
-            raise ValueError(msg)
+            raise NoMatchingValidityTimesError(msg)
         return (matching_historic_forecasts.merge_cube(),
                 matching_truths.merge_cube())
 
-    def process(self, historic_forecast, truth):
+    def _prepare_training_data(self, historic_forecast, truth):
         """
-        Using Nonhomogeneous Gaussian Regression/Ensemble Model Output
-        Statistics, estimate the required coefficients from historical
-        forecasts.
+        Prepare the historic forecasts and truths for estimating the
+        coefficients.
 
         The main contents of this method is:
 
-        1. Check that the predictor_of_mean_flag is valid.
-        2. Filter the historic forecasts and truth to ensure that these
+        1. Filter the historic forecasts and truth to ensure that these
            inputs match in validity time.
-        3. Apply unit conversion to ensure that the historic forecasts and
+        2. Apply unit conversion to ensure that the historic forecasts and
            truth have the desired units for calibration.
-        4. Calculate mean and variance.
-        5. Calculate initial guess at coefficient values by performing a
-           linear regression, if requested, otherwise default values are
-           used.
-        6. Perform minimisation.
+        3. Calculate the forecast predictor and variance.
+        4. Subsample the grid points, if requested.
 
         Args:
             historic_forecast (iris.cube.Cube):
@@ -781,23 +1583,20 @@ class EstimateCoefficientsForEnsembleCalibration():
                 The cube containing the truth used for calibration.
 
         Returns:
-            coefficients_cube (iris.cube.Cube):
-                Cube containing the coefficients estimated using EMOS.
-                The cube contains a coefficient_index dimension coordinate
-                and a coefficient_name auxiliary coordinate.
+            (tuple): tuple containing:
+                **historic_forecast** (iris.cube.Cube):
+                    The historic forecasts that match the truths.
+                **truth** (iris.cube.Cube):
+                    The truths that match the historic forecasts.
+                **forecast_predictor** (iris.cube.Cube):
+                    The ensemble mean or the ensemble realizations.
+                **forecast_var** (iris.cube.Cube):
+                    The ensemble variance.
 
         Raises:
             ValueError: If the units of the historic and truth cubes do not
                 match.
-
         """
-        # Ensure predictor_of_mean_flag is valid.
-        check_predictor_of_mean_flag(self.predictor_of_mean_flag)
-
-        # Set default values for whether there are NaN values within the
-        # initial guess.
-        nan_in_initial_guess = False
-
         historic_forecast, truth = (
             self._filter_non_matching_cubes(historic_forecast, truth))
 
@@ -812,31 +1611,129 @@ class EstimateCoefficientsForEnsembleCalibration():
                    "the coefficients can be estimated.")
             raise ValueError(msg)
 
+        if self.point_by_point or self.subsample_step > 1:
+            # The minimisation for each point and the subsampling require
+            # the y and x dimensions to be the final dimensions.
+            for cube in [historic_forecast, truth]:
+                enforce_coordinate_ordering(
+                    cube, [cube.coord(axis="y").name(),
+                           cube.coord(axis="x").name()], anchor="end")
+
         if self.predictor_of_mean_flag.lower() == "mean":
-            no_of_realizations = None
             forecast_predictor = historic_forecast.collapsed(
                 "realization", iris.analysis.MEAN)
         elif self.predictor_of_mean_flag.lower() == "realizations":
-            no_of_realizations = len(
-                historic_forecast.coord("realization").points)
             forecast_predictor = historic_forecast
 
         forecast_var = historic_forecast.collapsed(
             "realization", iris.analysis.VARIANCE)
 
-        # Computing initial guess for EMOS coefficients
-        # If no initial guess from a previous iteration, or if there
-        # are NaNs in the initial guess, calculate an initial guess.
-        if "initial_guess" not in locals() or nan_in_initial_guess:
+        if self.subsample_step > 1:
+            step = self.subsample_step
+            forecast_predictor = forecast_predictor[..., ::step, ::step]
+            forecast_var = forecast_var[..., ::step, ::step]
+            truth = truth[..., ::step, ::step]
+        return historic_forecast, truth, forecast_predictor, forecast_var
+
+    def _initial_guess_from_coefficients(
+            self, coefficients_cube, historic_forecast, truth):
+        """
+        Use a previously estimated coefficients cube, for example from the
+        previous day, as the initial guess for the minimisation.
+
+        Args:
+            coefficients_cube (iris.cube.Cube):
+                Cube containing the previously estimated coefficients.
+            historic_forecast (iris.cube.Cube):
+                The cube containing the historic forecast.
+            truth (iris.cube.Cube):
+                The cube containing the truth used for calibration.
+
+        Returns:
+            initial_guess (numpy.ndarray):
+                The coefficients to be used as the initial guess.
+
+        Raises:
+            ValueError: If the coefficient names do not match the
+                coefficients being estimated.
+            ValueError: If the coefficients have been estimated for each grid
+                point, but are not on the grid of the truth, or coefficients
+                are being estimated for the whole domain.
+        """
+        coeff_names = self._get_coefficient_names(historic_forecast)
+        previous_coeff_names = list(
+            coefficients_cube.coord("coefficient_name").points)
+        if previous_coeff_names != coeff_names:
+            msg = ("The coefficient names {} of the previous coefficients "
+                   "cube do not match the coefficient names {} being "
+                   "estimated.".format(previous_coeff_names, coeff_names))
+            raise ValueError(msg)
+        if coefficients_cube.ndim > 1 and (
+                not self.point_by_point or
+                coefficients_cube.shape[1:] != truth.shape[-2:]):
+            msg = ("The previous coefficients cube with shape {} can only "
+                   "be used as an initial guess when estimating "
+                   "coefficients for each point of a grid with shape "
+                   "{}.".format(coefficients_cube.shape, truth.shape[-2:]))
+            raise ValueError(msg)
+        return np.array(coefficients_cube.data, dtype=np.float32)
+
+    def _estimate_coefficients(
+            self, historic_forecast, truth, forecast_predictor, forecast_var,
+            previous_coefficients=None):
+        """
+        Calculate an initial guess and minimise the CRPS to estimate the
+        coefficients.
+
+        Args:
+            historic_forecast (iris.cube.Cube):
+                The cube containing the historic forecast, which provides the
+                metadata for the coefficients cube.
+            truth (iris.cube.Cube):
+                The cube containing the truth used for calibration.
+            forecast_predictor (iris.cube.Cube):
+                The ensemble mean or the ensemble realizations.
+            forecast_var (iris.cube.Cube):
+                The ensemble variance.
+            previous_coefficients (iris.cube.Cube or None):
+                Previously estimated coefficients, used as the initial guess
+                in place of the initial guess calculated from the training
+                data.
+
+        Returns:
+            coefficients_cube (iris.cube.Cube):
+                Cube containing the coefficients estimated using EMOS.
+        """
+        if self.predictor_of_mean_flag.lower() == "realizations":
+            no_of_realizations = len(
+                historic_forecast.coord("realization").points)
+        else:
+            no_of_realizations = None
+
+        initial_guess = None
+        if previous_coefficients is not None:
+            initial_guess = self._initial_guess_from_coefficients(
+                previous_coefficients, historic_forecast, truth)
+        # If no previous coefficients are available, or if there are NaNs
+        # in the previous coefficients, calculate an initial guess.
+        if initial_guess is None or np.any(np.isnan(initial_guess)):
             initial_guess = self.compute_initial_guess(
                 truth, forecast_predictor, self.predictor_of_mean_flag,
                 self.ESTIMATE_COEFFICIENTS_FROM_LINEAR_MODEL_FLAG,
                 no_of_realizations=no_of_realizations)
 
-        if np.any(np.isnan(initial_guess)):
-            nan_in_initial_guess = True
+        nan_in_initial_guess = np.any(np.isnan(initial_guess))
 
-        if not nan_in_initial_guess:
+        if not nan_in_initial_guess and self.point_by_point:
+            optimised_coeffs = (
+                self.minimiser.process_point_by_point(
+                    initial_guess, forecast_predictor,
+                    truth, forecast_var,
+                    self.predictor_of_mean_flag,
+                    self.distribution.lower(),
+                    points_per_block=self.points_per_block,
+                    processes=self.processes))
+        elif not nan_in_initial_guess:
             # Need to access the x attribute returned by the
             # minimisation function.
             optimised_coeffs = (
@@ -845,13 +1742,179 @@ class EstimateCoefficientsForEnsembleCalibration():
                     truth, forecast_var,
                     self.predictor_of_mean_flag,
                     self.distribution.lower()))
-            initial_guess = optimised_coeffs
+        elif self.point_by_point:
+            optimised_coeffs = np.broadcast_to(
+                initial_guess[:, np.newaxis, np.newaxis],
+                initial_guess.shape + truth.shape[-2:])
         else:
             optimised_coeffs = initial_guess
         coefficients_cube = (
             self.create_coefficients_cube(optimised_coeffs, historic_forecast))
         return coefficients_cube
 
+    def add_training_day(self, historic_forecast, truth):
+        """
+        Add historic forecasts and truths, typically for a single day, to
+        the rolling window of training data. Only the forecast predictor,
+        forecast variance and truth are retained for each validity time,
+        along with a single validity time of the historic forecast to
+        provide the metadata for the coefficients cube, so that the historic
+        forecasts can be discarded once added. If the window is full, the
+        oldest validity times are dropped.
+
+        Args:
+            historic_forecast (iris.cube.Cube):
+                The cube containing the historic forecasts to add.
+            truth (iris.cube.Cube):
+                The cube containing the truths to add.
+
+        Raises:
+            NoMatchingValidityTimesError: If the historic forecasts and
+                truths have no matching validity times.
+        """
+        historic_forecast, truth, forecast_predictor, forecast_var = (
+            self._prepare_training_data(historic_forecast, truth))
+        for predictor_slice, var_slice, truth_slice in zip(
+                forecast_predictor.slices_over("time"),
+                forecast_var.slices_over("time"),
+                truth.slices_over("time")):
+            time_point, = truth_slice.coord("time").points
+            self.training_data[time_point] = (
+                predictor_slice, var_slice, truth_slice)
+        self.training_template = next(historic_forecast.slices_over("time"))
+
+        if self.window_length is not None:
+            for time_point in sorted(self.training_data)[:-self.window_length]:
+                del self.training_data[time_point]
+
+    def estimate_from_training_data(self, previous_coefficients=None):
+        """
+        Estimate the coefficients from the rolling window of training data.
+
+        Args:
+            previous_coefficients (iris.cube.Cube or None):
+                Previously estimated coefficients, for example from the
+                previous day, which are used as the initial guess for the
+                minimisation, so that the minimisation only needs to account
+                for the change in the training data.
+
+        Returns:
+            coefficients_cube (iris.cube.Cube):
+                Cube containing the coefficients estimated using EMOS.
+
+        Raises:
+            ValueError: If no training data has been added.
+        """
+        if not self.training_data:
+            msg = ("No training data is available to estimate the "
+                   "coefficients.")
+            raise ValueError(msg)
+        forecast_predictor, forecast_var, truth = [
+            iris.cube.CubeList(cubes).merge_cube() for cubes in zip(
+                *[self.training_data[time_point]
+                  for time_point in sorted(self.training_data)])]
+        return self._estimate_coefficients(
+            self.training_template, truth, forecast_predictor, forecast_var,
+            previous_coefficients=previous_coefficients)
+
+    def process_streaming(
+            self, historic_forecasts, truths, previous_coefficients=None):
+        """
+        Estimate the coefficients from historic forecasts and truths that are
+        provided one day at a time, so that only a single day of historic
+        forecasts is held in memory.
+
+        Args:
+            historic_forecasts (iterable of iris.cube.Cube):
+                The historic forecasts, for example a generator that loads
+                the historic forecast for each day in turn.
+            truths (iterable of iris.cube.Cube):
+                The truths, in the same order as the historic forecasts.
+            previous_coefficients (iris.cube.Cube or None):
+                Previously estimated coefficients used as the initial guess.
+
+        Returns:
+            coefficients_cube (iris.cube.Cube):
+                Cube containing the coefficients estimated using EMOS.
+
+        Raises:
+            NoMatchingValidityTimesError: If none of the historic forecasts
+                and truths match in validity time.
+
+        Warns:
+            UserWarning: If a historic forecast and truth do not match in
+                validity time, in which case they are skipped.
+        """
+        for historic_forecast, truth in zip(historic_forecasts, truths):
+            try:
+                self.add_training_day(historic_forecast, truth)
+            except NoMatchingValidityTimesError:
+                msg = ("The historic forecast valid at {} does not match the "
+                       "truth in validity time, so has not been added to the "
+                       "training data.".format(", ".join(
+                           str(time) for time in iris_time_to_datetime(
+                               historic_forecast.coord("time")))))
+                warnings.warn(msg)
+        if not self.training_data:
+            msg = ("The filtering has found no matches in validity time "
+                   "between the historic forecasts and the truths.")
+            raise NoMatchingValidityTimesError(msg)
+        return self.estimate_from_training_data(
+            previous_coefficients=previous_coefficients)
+
+    def process(self, historic_forecast, truth, previous_coefficients=None):
+        """
+        Using Nonhomogeneous Gaussian Regression/Ensemble Model Output
+        Statistics, estimate the required coefficients from historical
+        forecasts.
+
+        The main contents of this method is:
+
+        1. Check that the predictor_of_mean_flag is valid.
+        2. Filter the historic forecasts and truth to ensure that these
+           inputs match in validity time.
+        3. Apply unit conversion to ensure that the historic forecasts and
+           truth have the desired units for calibration.
+        4. Calculate mean and variance.
+        5. Calculate initial guess at coefficient values by performing a
+           linear regression, if requested, otherwise default values are
+           used. If previous coefficients are provided, these are used as
+           the initial guess instead.
+        6. Perform minimisation, either for the whole domain or, if
+           point_by_point is True, for each grid point using the initial
+           guess from the whole domain as the starting point.
+
+        Args:
+            historic_forecast (iris.cube.Cube):
+                The cube containing the historical forecasts used
+                for calibration.
+            truth (iris.cube.Cube):
+                The cube containing the truth used for calibration.
+            previous_coefficients (iris.cube.Cube or None):
+                Previously estimated coefficients, for example from the
+                previous day, which are used as the initial guess for the
+                minimisation.
+
+        Returns:
+            coefficients_cube (iris.cube.Cube):
+                Cube containing the coefficients estimated using EMOS.
+                The cube contains a coefficient_index dimension coordinate
+                and a coefficient_name auxiliary coordinate.
+
+        Raises:
+            ValueError: If the units of the historic and truth cubes do not
+                match.
+
+        """
+        # Ensure predictor_of_mean_flag is valid.
+        check_predictor_of_mean_flag(self.predictor_of_mean_flag)
+
+        historic_forecast, truth, forecast_predictor, forecast_var = (
+            self._prepare_training_data(historic_forecast, truth))
+        return self._estimate_coefficients(
+            historic_forecast, truth, forecast_predictor, forecast_var,
+            previous_coefficients=previous_coefficients)
+
 
 class ApplyCoefficientsFromEnsembleCalibration():
     """
@@ -907,16 +1970,27 @@ class ApplyCoefficientsFromEnsembleCalibration():
         # Check that the domain of the current forecast and coefficients cube
         # matches.
         for axis in ["x", "y"]:
-            current_forecast_points = [
-                current_forecast.coord(axis=axis).points[0],
-                current_forecast.coord(axis=axis).points[-1]]
-            if not np.allclose(current_forecast_points,
-                               coefficients_cube.coord(axis=axis).bounds):
+            coefficients_coord = coefficients_cube.coord(axis=axis)
+            if coefficients_cube.coord_dims(coefficients_coord):
+                # Coefficients estimated for each grid point must be on the
+                # same grid as the current forecast.
+                current_forecast_points = (
+                    current_forecast.coord(axis=axis).points)
+                coefficients_domain = coefficients_coord.points
+            else:
+                current_forecast_points = [
+                    current_forecast.coord(axis=axis).points[0],
+                    current_forecast.coord(axis=axis).points[-1]]
+                coefficients_domain = coefficients_coord.bounds
+            if (np.size(current_forecast_points) !=
+                    np.size(coefficients_domain) or
+                    not np.allclose(current_forecast_points,
+                                    coefficients_domain)):
                 msg = ("The domain along the {} axis given by the "
                        "current forecast {} does not match the domain given "
                        "by the coefficients cube {}.".format(
                            axis, current_forecast_points,
-                           coefficients_cube.coord(axis=axis).bounds))
+                           coefficients_domain))
                 raise ValueError(msg)
 
         # Ensure predictor_of_mean_flag is valid.
@@ -992,7 +2066,15 @@ class ApplyCoefficientsFromEnsembleCalibration():
         # Calculate the predicted mean based on whether the coefficients
         # were estimated using the mean as the predictor or using the
         # ensemble realizations as the predictor.
-        if self.predictor_of_mean_flag.lower() == "mean":
+        # Coefficients estimated for each grid point have the y and x
+        # dimensions of the forecast, so are applied by broadcasting.
+        point_by_point = self.coefficients_cube.ndim > 1
+        if self.predictor_of_mean_flag.lower() == "mean" and point_by_point:
+            predicted_mean = (
+                optimised_coeffs["alpha"] +
+                optimised_coeffs["beta"] * forecast_predictors.data)
+            calibrated_forecast_predictor = forecast_predictors
+        elif self.predictor_of_mean_flag.lower() == "mean":
             # Calculate predicted mean = a + b*X, where X is the
             # raw ensemble mean. In this case, b = beta.
             a_and_b = [optimised_coeffs["alpha"], optimised_coeffs["beta"]]
@@ -1003,6 +2085,19 @@ class ApplyCoefficientsFromEnsembleCalibration():
                 np.column_stack((col_of_ones, forecast_predictor_flat)))
             predicted_mean = np.dot(ones_and_mean, a_and_b)
             calibrated_forecast_predictor = forecast_predictors
+        elif (self.predictor_of_mean_flag.lower() == "realizations" and
+              point_by_point):
+            beta_values = np.array(
+                [optimised_coeffs[key] for key in optimised_coeffs.keys()
+                 if key.startswith("beta")])
+            forecast_predictor_data = np.array(
+                [realization.data for realization in
+                 forecast_predictors.slices_over("realization")])
+            predicted_mean = optimised_coeffs["alpha"] + np.sum(
+                beta_values**2 * forecast_predictor_data, axis=0)
+            calibrated_forecast_predictor = (
+                forecast_predictors.collapsed(
+                    "realization", iris.analysis.MEAN))
         elif self.predictor_of_mean_flag.lower() == "realizations":
             # Calculate predicted mean = a + b*X, where X is the
             # raw ensemble mean. In this case, b = beta^2.
@@ -53,6 +53,8 @@ from improver.utilities.cube_checker import (
 from improver.utilities.cube_manipulation import (
     concatenate_cubes, enforce_coordinate_ordering)
 from improver.utilities.indexing_operations import choose
+from improver.utilities.mathematical_operations import (
+    interpolate_along_last_axis)
 
 
 class RebadgePercentilesAsRealizations(object):
@@ -127,7 +129,7 @@ class ResamplePercentiles(object):
 
     """
 
-    def __init__(self, ecc_bounds_warning=False):
+    def __init__(self, ecc_bounds_warning=False, max_points_per_chunk=None):
         """
         Initialise the class.
 
@@ -136,8 +138,13 @@ class ResamplePercentiles(object):
                 If true and ECC bounds are exceeded by the percentile values,
                 a warning will be generated rather than an exception.
                 Default value is FALSE.
+            max_points_per_chunk (int or None):
+                Maximum number of points for which the interpolation is
+                performed at once, in order to bound memory use. If None,
+                all points are interpolated at once.
         """
         self.ecc_bounds_warning = ecc_bounds_warning
+        self.max_points_per_chunk = max_points_per_chunk
 
     def _add_bounds_to_percentiles_and_forecast_at_percentiles(
             self, percentiles, forecast_at_percentiles, bounds_pairing):
@@ -240,17 +247,10 @@ class ResamplePercentiles(object):
                 original_percentiles, forecast_at_reshaped_percentiles,
                 bounds_pairing))
 
-        forecast_at_interpolated_percentiles = (
-            np.empty(
-                (len(desired_percentiles),
-                 forecast_at_reshaped_percentiles.shape[0]),
-                dtype=np.float32
-            )
-        )
-        for index in range(forecast_at_reshaped_percentiles.shape[0]):
-            forecast_at_interpolated_percentiles[:, index] = np.interp(
-                desired_percentiles, original_percentiles,
-                forecast_at_reshaped_percentiles[index, :])
+        forecast_at_interpolated_percentiles = interpolate_along_last_axis(
+            desired_percentiles, original_percentiles,
+            forecast_at_reshaped_percentiles,
+            max_rows=self.max_points_per_chunk).T.astype(np.float32)
 
         # Reshape forecast_at_percentiles, so the percentiles dimension is
         # first, and any other dimension coordinates follow.
@@ -338,7 +338,7 @@ class GeneratePercentilesFromProbabilities(object):
 
     """
 
-    def __init__(self, ecc_bounds_warning=False):
+    def __init__(self, ecc_bounds_warning=False, max_points_per_chunk=None):
         """
         Initialise the class.
 
@@ -347,8 +347,13 @@ class GeneratePercentilesFromProbabilities(object):
                 If true and ECC bounds are exceeded by the percentile values,
                 a warning will be generated rather than an exception.
                 Default value is FALSE.
+            max_points_per_chunk (int or None):
+                Maximum number of points for which the interpolation is
+                performed at once, in order to bound memory use. If None,
+                all points are interpolated at once.
         """
         self.ecc_bounds_warning = ecc_bounds_warning
+        self.max_points_per_chunk = max_points_per_chunk
 
     def _add_bounds_to_thresholds_and_probabilities(
             self, threshold_points, probabilities_for_cdf, bounds_pairing):
@@ -481,7 +486,9 @@ class GeneratePercentilesFromProbabilities(object):
             self._add_bounds_to_thresholds_and_probabilities(
                 threshold_points, probabilities_for_cdf, bounds_pairing))
 
-        if np.any(np.diff(probabilities_for_cdf) < 0):
+        non_monotonic_points = np.any(
+            np.diff(probabilities_for_cdf) < 0, axis=1)
+        if np.any(non_monotonic_points):
             msg = ("The probability values used to construct the "
                    "Cumulative Distribution Function (CDF) "
                    "must be ascending i.e. in order to yield "
@@ -493,11 +500,13 @@ class GeneratePercentilesFromProbabilities(object):
         percentiles = np.array([x/100.0 for x in percentiles],
                                dtype=np.float32)
 
-        forecast_at_percentiles = (
-            np.empty((len(percentiles), probabilities_for_cdf.shape[0]),
-                     dtype=np.float32)
-        )
-        for index in range(probabilities_for_cdf.shape[0]):
+        forecast_at_percentiles = interpolate_along_last_axis(
+            percentiles, probabilities_for_cdf, threshold_points,
+            max_rows=self.max_points_per_chunk).T.astype(np.float32)
+        # The interpolation for all points at once requires ascending
+        # probabilities, so interpolate any points with a CDF that is not
+        # monotonically increasing one at a time.
+        for index in np.flatnonzero(non_monotonic_points):
             forecast_at_percentiles[:, index] = np.interp(
                 percentiles, probabilities_for_cdf[index, :],
                 threshold_points)
@@ -34,12 +34,12 @@ import iris
 import numpy as np
 from iris.analysis.maths import multiply
 from iris.exceptions import CoordinateNotFoundError
-from numpy.linalg import lstsq
-from scipy.ndimage import generic_filter
+from numpy.lib.stride_tricks import as_strided
 
 from improver.constants import DALR
 from improver.utilities.cube_checker import (
     check_cube_not_float64, spatial_coords_match)
+from improver.utilities.cube_manipulation import enforce_coordinate_ordering
 
 
 def apply_gridded_lapse_rate(temperature, lapse_rate, source_orog, dest_orog):
@@ -114,51 +114,6 @@ def apply_gridded_lapse_rate(temperature, lapse_rate, source_orog, dest_orog):
     return iris.cube.CubeList(adjusted_temperature).merge_cube()
 
 
-class SaveNeighbourhood(object):
-    """Saves the neighbourhood around each central point.
-
-    The "generic_filter" module extracts the neighbourhood around each
-    point as "buffer". This buffer is passed to the "SaveNeighbourhood" class.
-    The "filter" function then saves this buffer into the "allbuffers" array.
-
-    """
-    def __init__(self, allbuffers):
-        """Initialise the class.
-
-        Create the global variables that allows the "filter" function
-        to save each extracted buffer into "allbuffers".
-
-        Args:
-            allbuffers (numpy.ndarray):
-                Where to save each extracted buffer.
-
-        """
-        # Initialises the iterator.
-        self.i = 0
-        # Saves all the buffers into this array.
-        self.allbuffers = allbuffers
-
-    def filter(self, buffer):
-        """Defines filter function to be applied to extracted buffers.
-
-        Saves the contents of the buffer into "allbuffers" array. Therefore
-        a return value isn't required. However "generic_filter"
-        requires a return value - so use zero.
-
-        Args:
-            buffer (numpy.ndarray):
-                Array containing neighourbood points.
-
-        Returns:
-            zero (float)
-                Blank return value required by "generic_filter".
-
-        """
-        self.allbuffers[self.i, :] = buffer
-        self.i += 1
-        return 0.0
-
-
 class LapseRate(object):
     """
     Plugin to calculate the lapse rate from orography and temperature
@@ -171,21 +126,19 @@ class LapseRate(object):
     Code methodology:
 
     1) Apply land/sea mask to temperature and orography datasets. Mask sea
-       points as NaN since image processing module does not recognise Numpy
-       masks.
+       points as NaN so that they are excluded from the calculation.
     2) Extracts neighbourhoods from both datasets:
-       Apply "generic_filter" image processing module to temperature data
-       to extract a neighbourhood for each single point and save this
-       neighbourhood into a larger array.
-       Repeat for orography data.
-       generic_filter mode="constant" ensures that points beyond edges of
-       dataset will be filled with "cval". (NaN in this case)
-    3) For all the stored orography neighbourhoods - take the neighbours around
-       the central point and create a mask where the height difference from
-       the central point is greater than 35m.
-    4) Loop through array of neighbourhoods and take the height and temperature
-       of all grid points and calculate the
-       temperature/height gradient = lapse rate
+       Pad the temperature and orography data with NaN values and create
+       sliding-window views, so that the neighbourhood around each point is
+       available without copying the data for the whole grid. The grid is
+       processed in blocks of rows, for all realizations at once, to bound
+       the memory used.
+    3) For all the orography neighbourhoods in a block - take the neighbours
+       around the central point and create a mask where the height difference
+       from the central point is greater than 35m.
+    4) Calculate the temperature/height gradient = lapse rate for all the
+       neighbourhoods in the block at once, from least-squares sums of the
+       unmasked heights and temperatures.
     5) Constrain the returned lapse rates between min_lapse_rate and
        max_lapse_rate. These default to > DALR and < -3.0*DALR but are user
        configurable
@@ -238,7 +191,7 @@ class LapseRate(object):
         # central point.
         self.nbhood_size = int((2*nbhood_radius) + 1)
 
-        # generic_filter extracts the neighbourhood and returns a 1D array.
+        # Each neighbourhood is flattened into a 1D array.
         # ind_central_point indicates where the central point would be on
         # this array
         self.nbhoodarray_size = self.nbhood_size**2
@@ -257,40 +210,65 @@ class LapseRate(object):
 
         This holds the function to determine the local lapse rate at a point by
         calculating a least-squares fit to local temperature and altitude data
-        to find the local lapse rate.
+        to find the local lapse rate. The fit is calculated for any number of
+        points at once from the sums of the heights, temperatures, their
+        products and squares over each neighbourhood.
+
+        Where all the valid heights in a neighbourhood are the same, the
+        minimum-norm least-squares solution is returned, consistent with
+        numpy.linalg.lstsq.
 
         Args:
-            temperature (1D numpy.ndarray):
+            temperature (numpy.ndarray):
                 Contains the temperature values for the central point and its
-                neighbours.
+                neighbours. The neighbourhood is the last dimension of the
+                array; any leading dimensions are treated as separate points.
+                NaN values are excluded from the calculation.
 
-            orography (1D numpy.ndarray):
+            orography (numpy.ndarray):
                 Contains the height values for the central point and its
-                neighbours.
+                neighbours, with the same shape as the temperature array.
 
         Returns:
-            gradient (float):
-                The gradient of the temperature/orography values. This
+            gradient (numpy.ndarray):
+                The gradient of the temperature/orography values, with the
+                shape of the leading dimensions of the input arrays. This
                 represents the lapse rate.
 
         """
-
-        # If central point NaN then return blank value.
-        if np.isnan(temperature[self.ind_central_point]):
-            return DALR
-
-        # Remove points where there are NaN temperature values from both arrays
-        # before calculation.
-        y_data = temperature[~np.isnan(temperature)]
-        x_data = orography[~np.isnan(temperature)]
-
-        # Return DALR if standard deviation of both datasets = 0 (where all
-        # points are the same value).
-        if np.isclose(np.std(x_data), 0.0) and np.isclose(np.std(y_data), 0.0):
-            return DALR
-
-        matrix = np.stack([x_data, np.ones(len(x_data))], axis=0).T
-        gradient, _ = lstsq(matrix, y_data, rcond=None)[0]
+        temperature = np.asarray(temperature, dtype=np.float64)
+        orography = np.asarray(orography, dtype=np.float64)
+
+        # Remove points where there are NaN temperature values from both
+        # arrays before calculation.
+        valid = ~np.isnan(temperature)
+        num_points = np.sum(valid, axis=-1)
+        y_data = np.where(valid, temperature, 0.)
+        x_data = np.where(valid, orography, 0.)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            y_mean = np.sum(y_data, axis=-1) / num_points
+            x_mean = np.sum(x_data, axis=-1) / num_points
+            y_anom = np.where(valid, y_data - y_mean[..., np.newaxis], 0.)
+            x_anom = np.where(valid, x_data - x_mean[..., np.newaxis], 0.)
+            x_variance = np.sum(x_anom * x_anom, axis=-1)
+            y_variance = np.sum(y_anom * y_anom, axis=-1)
+            covariance = np.sum(x_anom * y_anom, axis=-1)
+            gradient = covariance / x_variance
+
+            # Where all the heights are the same, use the minimum-norm
+            # solution to the least-squares problem.
+            x_constant = np.isclose(np.sqrt(x_variance / num_points), 0.0)
+            y_constant = np.isclose(np.sqrt(y_variance / num_points), 0.0)
+            gradient = np.where(x_constant,
+                                x_mean * y_mean / (x_mean * x_mean + 1.),
+                                gradient)
+
+        # Return DALR if the central point is NaN or if standard deviation of
+        # both datasets = 0 (where all points are the same value).
+        gradient = np.where(
+            np.isnan(temperature[..., self.ind_central_point]) |
+            (x_constant & y_constant), DALR, gradient)
 
         return gradient
 
@@ -306,27 +284,104 @@ class LapseRate(object):
         the maximum.
 
         Args:
-            all_orog_subsections(2D numpy.ndarray):
-               Each row contains the height values of each neighbourhood.
+            all_orog_subsections(numpy.ndarray):
+               The last dimension contains the height values of each
+               neighbourhood.
 
         Returns:
             height_diff_mask (numpy.ndarray):
-                A 2D array of boolean values.
+                An array of boolean values.
 
         """
+        central_points = (
+            all_orog_subsections[..., self.ind_central_point, np.newaxis])
 
-        self.all_orog_subsections = all_orog_subsections
+        height_diff = np.absolute(all_orog_subsections - central_points)
 
-        central_points = self.all_orog_subsections[:, self.ind_central_point]
-        central_points = np.swapaxes([central_points], 0, 1)
+        with np.errstate(invalid='ignore'):
+            height_diff_mask = height_diff >= self.max_height_diff
 
-        height_diff = np.subtract(self.all_orog_subsections, central_points)
-        height_diff = np.absolute(height_diff)
+        return height_diff_mask
 
-        height_diff_mask = np.where(height_diff >= self.max_height_diff, True,
-                                    False)
+    def _generate_lapse_rate_array(self, temperature_data, orography_data):
+        """
+        Calculate the lapse rate at every point of a stack of temperature
+        fields.
 
-        return height_diff_mask
+        The data are padded with NaN values by the neighbourhood radius, so
+        that points beyond the edges of the grid are excluded, and
+        neighbourhoods are taken from sliding-window views of the padded
+        data. Rows are processed in blocks so that the number of
+        neighbourhood values held in memory at once is bounded.
+
+        Args:
+            temperature_data (numpy.ndarray):
+                3D array of temperatures (K) with sea points set to NaN. The
+                leading dimension holds e.g. realizations and the trailing
+                dimensions are y and x.
+            orography_data (numpy.ndarray):
+                2D array of heights (metres) with sea points set to NaN.
+
+        Returns:
+            lapse_rate_array (numpy.ndarray):
+                3D array of lapse rates (K m-1) matching the shape of the
+                temperature array. The lapse rates are not constrained.
+        """
+        radius = self.nbhood_radius
+        num_fields, num_rows, num_cols = temperature_data.shape
+
+        # Enforce single precision to speed up calculations.
+        padded_temperature = np.pad(
+            temperature_data.astype(np.float32),
+            ((0, 0), (radius, radius), (radius, radius)),
+            mode='constant', constant_values=np.nan)
+        padded_orography = np.pad(
+            orography_data.astype(np.float32),
+            ((radius, radius), (radius, radius)),
+            mode='constant', constant_values=np.nan)
+
+        temperature_windows = as_strided(
+            padded_temperature,
+            shape=(num_fields, num_rows, num_cols,
+                   self.nbhood_size, self.nbhood_size),
+            strides=(padded_temperature.strides +
+                     padded_temperature.strides[1:]),
+            writeable=False)
+        orography_windows = as_strided(
+            padded_orography,
+            shape=(num_rows, num_cols, self.nbhood_size, self.nbhood_size),
+            strides=padded_orography.strides * 2,
+            writeable=False)
+
+        # Limit the number of neighbourhood values extracted at once.
+        max_block_size = 2**22
+        rows_per_block = max(
+            1, max_block_size // (num_fields * num_cols *
+                                  self.nbhoodarray_size))
+
+        lapse_rate_array = np.empty(temperature_data.shape, dtype=np.float32)
+        for start in range(0, num_rows, rows_per_block):
+            end = min(start + rows_per_block, num_rows)
+            orog_subsections = orography_windows[start:end].reshape(
+                end - start, num_cols, self.nbhoodarray_size)
+            temp_subsections = temperature_windows[:, start:end].reshape(
+                num_fields, end - start, num_cols, self.nbhoodarray_size)
+
+            # height_diff_mask is True for points where the height
+            # difference between the central point and its neighbours
+            # is > max_height_diff.
+            height_diff_mask = self._create_heightdiff_mask(orog_subsections)
+
+            # Mask points with extreme height differences as NaN.
+            orog_subsections = np.where(height_diff_mask, np.nan,
+                                        orog_subsections)
+            temp_subsections = np.where(height_diff_mask, np.nan,
+                                        temp_subsections)
+
+            lapse_rate_array[:, start:end] = self._calc_lapse_rate(
+                temp_subsections, orog_subsections)
+
+        return lapse_rate_array
 
     def process(self, temperature_cube, orography_cube, land_sea_mask_cube):
         """Calculates the lapse rate from the temperature and orography cubes.
@@ -383,86 +438,35 @@ class LapseRate(object):
         # Fill sea points with NaN values.
         orography_data = np.where(land_sea_mask, orography_data, np.nan)
 
-        # Extract data array dimensions to define output arrays.
-        dataarray_shape = next(temperature_cube.slices([y_coord,
-                                                        x_coord])).shape
-        dataarray_size = dataarray_shape[0] * dataarray_shape[1]
-
-        # Array containing all of the subsections extracted from data array.
-        # Also enforce single precision to speed up calculations.
-        all_temp_subsections = np.zeros(
-            (dataarray_size, self.nbhoodarray_size), dtype=np.float32)
-        all_orog_subsections = np.zeros(
-            (dataarray_size, self.nbhoodarray_size), dtype=np.float32)
-
-        # Attempts to extract realizations. If cube doesn't contain the
-        # dimension then place within list.
-        try:
-            slices_over_realization = temperature_cube.slices_over(
-                "realization")
-        except iris.exceptions.CoordinateNotFoundError:
-            slices_over_realization = [temperature_cube]
+        # Create a cube to store the lapse rate values, with the realizations
+        # (if present) leading and the x/y dimensions last.
+        lapse_rate_cube = temperature_cube.copy()
+        if lapse_rate_cube.coords("realization", dim_coords=True):
+            enforce_coordinate_ordering(lapse_rate_cube, "realization")
+        enforce_coordinate_ordering(lapse_rate_cube, [y_coord, x_coord],
+                                    anchor="end")
+        dataarray_shape = lapse_rate_cube.shape
 
-        # Creates cube list to hold lapse rate data.
-        lapse_rate_cube_list = iris.cube.CubeList([])
-
-        for temp_slice in slices_over_realization:
-
-            # Create slice to store lapse rate values.
-            lapse_rate_slice = temp_slice
-
-            temperature_data = temp_slice.data
-
-            # Fill sea points with NaN values. Can't use Numpy mask since not
-            # recognised by "generic_filter" function.
-            temperature_data = np.where(land_sea_mask, temperature_data,
-                                        np.nan)
-
-            # Saves all neighbourhoods into "all_temp_subsections".
-            # cval is value given to points outside the array.
-            fnc = SaveNeighbourhood(allbuffers=all_temp_subsections)
-            generic_filter(temperature_data, fnc.filter,
-                           size=self.nbhood_size,
-                           mode='constant', cval=np.nan)
-
-            fnc = SaveNeighbourhood(allbuffers=all_orog_subsections)
-            generic_filter(orography_data, fnc.filter,
-                           size=self.nbhood_size,
-                           mode='constant', cval=np.nan)
-
-            # height_diff_mask is True for points where the height
-            # difference between the central point and its neighbours
-            # is > max_height_diff.
-            height_diff_mask = self._create_heightdiff_mask(
-                all_orog_subsections)
-
-            # Mask points with extreme height differences as NaN.
-            all_orog_subsections = np.where(height_diff_mask, np.nan,
-                                            all_orog_subsections)
-            all_temp_subsections = np.where(height_diff_mask, np.nan,
-                                            all_temp_subsections)
-
-            # Loop through both arrays and find gradient of each subsection.
-            # The gradient indicates lapse rate - save into another array.
-            # TODO: This for loop is the bottleneck in the code and needs to
-            # be parallelised.
-            lapse_rate_array = [self._calc_lapse_rate(temp, orog)
-                                for temp, orog in zip(all_temp_subsections,
-                                                      all_orog_subsections)]
-
-            lapse_rate_array = np.array(
-                lapse_rate_array, dtype=np.float32).reshape(dataarray_shape)
-
-            # Enforces upper and lower limits on lapse rate values.
-            lapse_rate_array = np.where(lapse_rate_array < self.min_lapse_rate,
-                                        self.min_lapse_rate, lapse_rate_array)
-            lapse_rate_array = np.where(lapse_rate_array > self.max_lapse_rate,
-                                        self.max_lapse_rate, lapse_rate_array)
-
-            lapse_rate_slice.data = lapse_rate_array
-            lapse_rate_cube_list.append(lapse_rate_slice)
-
-        lapse_rate_cube = lapse_rate_cube_list.merge_cube()
+        # Fill sea points with NaN values.
+        temperature_data = np.where(
+            land_sea_mask, lapse_rate_cube.data, np.nan).reshape(
+                (-1,) + dataarray_shape[-2:])
+
+        lapse_rate_array = self._generate_lapse_rate_array(
+            temperature_data, orography_data).reshape(dataarray_shape)
+
+        # Enforces upper and lower limits on lapse rate values.
+        lapse_rate_array = np.where(lapse_rate_array < self.min_lapse_rate,
+                                    self.min_lapse_rate, lapse_rate_array)
+        lapse_rate_array = np.where(lapse_rate_array > self.max_lapse_rate,
+                                    self.max_lapse_rate, lapse_rate_array)
+
+        lapse_rate_cube.data = lapse_rate_array.astype(np.float32)
+        # A single realization is returned as a scalar coordinate.
+        if lapse_rate_cube.coords("realization", dim_coords=True):
+            if len(lapse_rate_cube.coord("realization").points) == 1:
+                lapse_rate_cube = next(
+                    lapse_rate_cube.slices_over("realization"))
         lapse_rate_cube.rename('air_temperature_lapse_rate')
         lapse_rate_cube.units = 'K m-1'
 
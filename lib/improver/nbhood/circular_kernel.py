@@ -220,7 +220,7 @@ class GeneratePercentilesFromACircularNeighbourhood(object):
     A maximum kernel radius of 500 grid cells is imposed in order to
     avoid computational ineffiency and possible memory errors.
     """
-    def __init__(self, percentiles=DEFAULT_PERCENTILES):
+    def __init__(self, percentiles=DEFAULT_PERCENTILES, max_memory_mb=None):
         """
         Initialise class.
 
@@ -228,25 +228,87 @@ class GeneratePercentilesFromACircularNeighbourhood(object):
             percentiles (list or float):
                 Percentile values at which to calculate; if not provided uses
                 DEFAULT_PERCENTILES.
+            max_memory_mb (float or None):
+                Approximate maximum size in megabytes of the array of
+                neighbourhood values from which the percentiles are
+                calculated. If set, the percentiles are calculated for tiles
+                of rows of the grid in turn, so that the memory required
+                scales with the size of the tile rather than with the number
+                of points in the kernel multiplied by the size of the grid.
+                If None, the percentiles are calculated for the whole grid
+                at once.
 
         """
         try:
             self.percentiles = tuple(percentiles)
         except TypeError:
             self.percentiles = tuple([percentiles])
+        self.max_memory_mb = max_memory_mb
 
     def __repr__(self):
         """Represent the configured class instance as a string."""
         result = ('<GeneratePercentilesFromACircularNeighbourhood: '
-                  'percentiles: {}>')
-        return result.format(self.percentiles)
+                  'percentiles: {}, max_memory_mb: {}>')
+        return result.format(self.percentiles, self.max_memory_mb)
+
+    def tiled_percentiles(self, padded, kernel, ranges_xy):
+        """
+        Calculate percentiles over the kernel for each point within the
+        unpadded region of a padded array, by building the array of
+        neighbourhood values for a tile of rows at a time. The number of rows
+        within each tile is chosen so that the array of neighbourhood values
+        does not exceed self.max_memory_mb, subject to a minimum of one row.
+
+        Args:
+            padded (numpy.ndarray):
+                2d array of data that has been padded by ranges_xy.
+            kernel (numpy.ndarray):
+                Kernel used to specify the neighbourhood to consider when
+                calculating the percentiles within a neighbourhood.
+            ranges_xy (numpy.ndarray):
+                Number of grid cells by which the data have been padded.
+
+        Returns:
+            perc_data (numpy.ndarray):
+                Array of percentiles with shape (number of percentiles,
+                unpadded y, unpadded x).
+        """
+        n_rows = padded.shape[0] - 2 * ranges_xy[0]
+        n_cols = padded.shape[1] - 2 * ranges_xy[1]
+        # Offsets match those of the np.roll shifts used by
+        # pad_and_unpad_cube, so that identical neighbourhoods are used.
+        offsets = [
+            (ranges_xy[0] - j, ranges_xy[1] - i)
+            for i in range(-ranges_xy[1], ranges_xy[1]+1)
+            for j in range(-ranges_xy[0], ranges_xy[0]+1)
+            if kernel[..., i+ranges_xy[1], j+ranges_xy[0]] > 0.]
+
+        bytes_per_row = len(offsets) * n_cols * padded.dtype.itemsize
+        rows_per_tile = max(
+            1, int(self.max_memory_mb * 1024**2 // bytes_per_row))
+
+        percentiles = np.array(self.percentiles, dtype=np.float32)
+        perc_data = np.empty((len(percentiles), n_rows, n_cols),
+                             dtype=np.float32)
+        for start in range(0, n_rows, rows_per_tile):
+            stop = min(start + rows_per_tile, n_rows)
+            nbhood_values = np.empty(
+                (len(offsets), stop - start, n_cols), dtype=padded.dtype)
+            for index, (y_offset, x_offset) in enumerate(offsets):
+                nbhood_values[index] = padded[
+                    start + y_offset:stop + y_offset,
+                    x_offset:x_offset + n_cols]
+            perc_data[:, start:stop] = np.percentile(
+                nbhood_values, percentiles, axis=0)
+        return perc_data
 
     def pad_and_unpad_cube(self, slice_2d, kernel):
         """
         Method to pad and unpad a two dimensional cube. The input array is
         padded and percentiles are calculated using a neighbourhood around
         each point. The resulting percentile data are unpadded and put into a
-        cube.
+        cube. If self.max_memory_mb is set, the percentiles are calculated
+        using tiled_percentiles rather than for the whole grid at once.
 
         Args:
             slice_2d (iris.cube.Cube):
@@ -357,6 +419,11 @@ class GeneratePercentilesFromACircularNeighbourhood(object):
         ranges_xy[1] = int(np.floor(kernel.shape[1] / 2.0))
         padded = np.pad(slice_2d.data, ranges_xy, mode='mean',
                         stat_length=np.max(ranges_xy))
+        if self.max_memory_mb is not None:
+            pctcube = self.make_percentile_cube(slice_2d)
+            pctcube.data = self.tiled_percentiles(padded, kernel, ranges_xy)
+            return pctcube
+
         padshape = np.shape(padded)  # Store size to make unflatten easier
         padded = padded.flatten()
         # Add 2nd dimension with each point's neighbourhood points along it.
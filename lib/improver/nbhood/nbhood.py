@@ -122,32 +122,54 @@ class BaseNeighbourhoodProcessing(object):
         return result.format(
             neighbourhood_method, self.radii, self.lead_times)
 
-    def process(self, cube, mask_cube=None):
+    def _find_radii_for_slices(self, cube):
+        """Find the radius required for each x-y slice of the cube, by
+        interpolating the radii to the forecast period of each slice.
+
+        Args:
+            cube (iris.cube.Cube):
+                Cube containing the forecast period or the time and
+                forecast reference time coordinates.
+
+        Returns:
+            radii (numpy.ndarray):
+                Required neighbourhood sizes, with the shape of the cube
+                excluding the y and x dimensions.
         """
-        Supply neighbourhood processing method, in order to smooth the
-        input cube.
+        fp_coord = forecast_period_coord(cube)
+        fp_coord.convert_units("hours")
+        required_radii = self._find_radii(cube_lead_times=fp_coord.points)
+
+        spatial_dims = (cube.coord_dims(cube.coord(axis="y")) +
+                        cube.coord_dims(cube.coord(axis="x")))
+        slice_dims = [dim for dim in range(cube.ndim)
+                      if dim not in spatial_dims]
+        slice_shape = tuple(cube.shape[dim] for dim in slice_dims)
+        if cube.coords("forecast_period"):
+            fp_dims = cube.coord_dims("forecast_period")
+        else:
+            fp_dims = cube.coord_dims("time")
+        if not fp_dims:
+            return np.full(slice_shape, required_radii[0])
+        return iris.util.broadcast_to_shape(
+            required_radii, slice_shape,
+            [slice_dims.index(dim) for dim in fp_dims])
+
+    def _process_slices(self, cube, mask_cube=None):
+        """
+        Apply the neighbourhood processing method to each realization and,
+        if the radii vary with lead time, each time of the cube in turn.
 
         Args:
             cube (iris.cube.Cube):
-                Cube to apply a neighbourhood processing method to, in order to
-                generate a smoother field.
+                Cube to apply a neighbourhood processing method to.
             mask_cube (iris.cube.Cube):
                 Cube containing the array to be used as a mask.
 
         Returns:
-            cube (iris.cube.Cube):
-                Cube after applying a neighbourhood processing method, so that
-                the resulting field is smoothed.
-
+            combined_cube (iris.cube.Cube):
+                Cube after applying a neighbourhood processing method.
         """
-        if (not getattr(self.neighbourhood_method, "run", None) or
-                not callable(self.neighbourhood_method.run)):
-            msg = ("{} is not valid as a neighbourhood_method. "
-                   "Please choose a valid neighbourhood_method with a "
-                   "run method.".format(
-                       self.neighbourhood_method))
-            raise ValueError(msg)
-
         # Check if a dimensional realization coordinate exists. If so, the
         # cube is sliced, so that it becomes a scalar coordinate.
         try:
@@ -157,9 +179,6 @@ class BaseNeighbourhoodProcessing(object):
         else:
             slices_over_realization = cube.slices_over("realization")
 
-        if np.isnan(cube.data).any():
-            raise ValueError("Error: NaN detected in input cube data")
-
         cubes_real = []
         for cube_realization in slices_over_realization:
             if self.lead_times is None:
@@ -193,6 +212,48 @@ class BaseNeighbourhoodProcessing(object):
                 cubes_real, coords_to_slice_over=["realization"])
         else:
             combined_cube = cubes_real[0]
+        return combined_cube
+
+    def process(self, cube, mask_cube=None):
+        """
+        Supply neighbourhood processing method, in order to smooth the
+        input cube.
+
+        Args:
+            cube (iris.cube.Cube):
+                Cube to apply a neighbourhood processing method to, in order to
+                generate a smoother field.
+            mask_cube (iris.cube.Cube):
+                Cube containing the array to be used as a mask.
+
+        Returns:
+            cube (iris.cube.Cube):
+                Cube after applying a neighbourhood processing method, so that
+                the resulting field is smoothed.
+
+        """
+        if (not getattr(self.neighbourhood_method, "run", None) or
+                not callable(self.neighbourhood_method.run)):
+            msg = ("{} is not valid as a neighbourhood_method. "
+                   "Please choose a valid neighbourhood_method with a "
+                   "run method.".format(
+                       self.neighbourhood_method))
+            raise ValueError(msg)
+
+        if np.isnan(cube.data).any():
+            raise ValueError("Error: NaN detected in input cube data")
+
+        if isinstance(self.neighbourhood_method, SquareNeighbourhood):
+            # The square neighbourhood is applied to all x-y slices at once,
+            # with the radius required for each slice.
+            if self.lead_times is None:
+                radii = self.radii
+            else:
+                radii = self._find_radii_for_slices(cube)
+            combined_cube = self.neighbourhood_method.run(
+                cube, radii, mask_cube=mask_cube)
+        else:
+            combined_cube = self._process_slices(cube, mask_cube=mask_cube)
 
         # Promote dimensional coordinates that used to be present.
         exception_coordinates = (
@@ -209,7 +270,7 @@ class GeneratePercentilesFromANeighbourhood(BaseNeighbourhoodProcessing):
 
     def __init__(
             self, neighbourhood_method, radii, lead_times=None,
-            percentiles=DEFAULT_PERCENTILES):
+            percentiles=DEFAULT_PERCENTILES, max_memory_mb=None):
         """
         Create a neighbourhood processing subclass that generates percentiles
         from a neighbourhood of points.
@@ -229,6 +290,11 @@ class GeneratePercentilesFromANeighbourhood(BaseNeighbourhoodProcessing):
             percentiles (list):
                 Percentile values at which to calculate; if not provided uses
                 DEFAULT_PERCENTILES.
+            max_memory_mb (float or None):
+                Approximate maximum size in megabytes of the array of
+                neighbourhood values from which the percentiles are
+                calculated. If None, the percentiles are calculated for the
+                whole grid at once.
         """
         super(GeneratePercentilesFromANeighbourhood, self).__init__(
             neighbourhood_method, radii, lead_times=lead_times)
@@ -237,7 +303,8 @@ class GeneratePercentilesFromANeighbourhood(BaseNeighbourhoodProcessing):
             "circular": GeneratePercentilesFromACircularNeighbourhood}
         try:
             method = methods[neighbourhood_method]
-            self.neighbourhood_method = method(percentiles=percentiles)
+            self.neighbourhood_method = method(
+                percentiles=percentiles, max_memory_mb=max_memory_mb)
         except KeyError:
             msg = ("The neighbourhood_method requested: {} is not a "
                    "supported method. Please choose from: {}".format(
@@ -30,13 +30,10 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Module to apply a recursive filter to neighbourhooded data."""
 
-import iris
 import numpy as np
+from scipy.signal import lfilter
 
-from improver.nbhood.square_kernel import SquareNeighbourhood
-from improver.utilities.cube_checker import check_cube_coordinates
-from improver.utilities.pad_spatial import (
-    pad_cube_with_halo, remove_halo_from_cube)
+from improver.utilities.pad_spatial import pad_coord, pad_cube_with_halo
 
 
 class RecursiveFilter(object):
@@ -123,30 +120,42 @@ class RecursiveFilter(object):
                 Bi = new value at gridpoint i, Ai = Old value at gridpoint i
                 Bi-1 = New value at gridpoint i-1
 
+        The grid may contain leading dimensions in addition to the spatial
+        dimensions, e.g. realizations or thresholds, which are all filtered
+        together. If alphas is a single value, the filter is applied as an
+        infinite impulse response filter using scipy.signal.lfilter, rather
+        than by stepping through the grid one row or column at a time.
+
         Args:
             grid (numpy.ndarray):
-                2D array containing the input data to which the recursive
+                Array containing the input data to which the recursive
                 filter will be applied.
-            alphas (numpy.ndarray):
-                Matching 2D array of alpha values that will be used when
-                applying the recursive filter along the specified axis.
+            alphas (numpy.ndarray or float):
+                Array of alpha values, broadcastable to the trailing
+                dimensions of grid, or a single alpha value, that will be
+                used when applying the recursive filter along the specified
+                axis.
             axis (int):
-                Index of the spatial axis (0 or 1) over which to recurse.
+                Index of the spatial axis over which to recurse. Negative
+                values index from the last dimension of grid.
 
         Returns:
             grid (numpy.ndarray):
-                2D array containing the smoothed field after the recursive
+                Array containing the smoothed field after the recursive
                 filter method has been applied to the input array in the
                 forward direction along the specified axis.
         """
-        lim = grid.shape[axis]
-        for i in range(1, lim):
-            if axis == 0:
-                grid[i, :] = ((1. - alphas[i, :]) * grid[i, :] +
-                              alphas[i, :] * grid[i-1, :])
-            if axis == 1:
-                grid[:, i] = ((1. - alphas[:, i]) * grid[:, i] +
-                              alphas[:, i] * grid[:, i-1])
+        if np.ndim(alphas) == 0:
+            initial = alphas * np.take(grid, [0], axis=axis)
+            grid[...] = lfilter([1. - alphas], [1., -alphas], grid,
+                                axis=axis, zi=initial)[0]
+            return grid
+
+        grid_view = np.moveaxis(grid, axis, 0)
+        alphas_view = np.moveaxis(alphas, axis, 0)
+        for i in range(1, grid_view.shape[0]):
+            grid_view[i] = ((1. - alphas_view[i]) * grid_view[i] +
+                            alphas_view[i] * grid_view[i-1])
         return grid
 
     @staticmethod
@@ -162,70 +171,79 @@ class RecursiveFilter(object):
                 Bi = new value at gridpoint i, Ai = Old value at gridpoint i
                 Bi+1 = New value at gridpoint i+1
 
+        The grid may contain leading dimensions in addition to the spatial
+        dimensions, which are all filtered together. If alphas is a single
+        value, the filter is applied as an infinite impulse response filter
+        as described in _recurse_forward.
+
         Args:
             grid (numpy.ndarray):
-                2D array containing the input data to which the recursive
+                Array containing the input data to which the recursive
                 filter will be applied.
-            alphas (numpy.ndarray):
-                Matching 2D array of alpha values that will be used when
-                applying the recursive filter along the specified axis.
+            alphas (numpy.ndarray or float):
+                Array of alpha values, broadcastable to the trailing
+                dimensions of grid, or a single alpha value, that will be
+                used when applying the recursive filter along the specified
+                axis.
             axis (int):
-                Index of the spatial axis (0 or 1) over which to recurse.
+                Index of the spatial axis over which to recurse. Negative
+                values index from the last dimension of grid.
 
         Returns:
             grid (numpy.ndarray):
-                2D array containing the smoothed field after the recursive
+                Array containing the smoothed field after the recursive
                 filter method has been applied to the input array in the
                 backwards direction along the specified axis.
         """
-        lim = grid.shape[axis]
-        for i in range(lim-2, -1, -1):
-            if axis == 0:
-                grid[i, :] = ((1. - alphas[i, :]) * grid[i, :] +
-                              alphas[i, :] * grid[i+1, :])
-            if axis == 1:
-                grid[:, i] = ((1. - alphas[:, i]) * grid[:, i] +
-                              alphas[:, i] * grid[:, i+1])
+        if np.ndim(alphas) == 0:
+            reversed_grid = np.flip(grid, axis=axis)
+            RecursiveFilter._recurse_forward(reversed_grid, alphas, axis)
+            return grid
+
+        grid_view = np.moveaxis(grid, axis, 0)
+        alphas_view = np.moveaxis(alphas, axis, 0)
+        for i in range(grid_view.shape[0]-2, -1, -1):
+            grid_view[i] = ((1. - alphas_view[i]) * grid_view[i] +
+                            alphas_view[i] * grid_view[i+1])
         return grid
 
     @staticmethod
-    def _run_recursion(cube, alphas_x, alphas_y, iterations):
+    def _run_recursion_on_array(data, alphas_x, alphas_y, iterations,
+                                x_index=-1, y_index=-2):
         """
-        Method to run the recursive filter.
+        Method to run the recursive filter over an array, which may contain
+        any number of leading dimensions that are filtered together.
 
         Args:
-            cube (iris.cube.Cube):
-                2D cube containing the input data to which the recursive
-                filter will be applied.
-            alphas_x (iris.cube.Cube):
-                2D cube containing array of alpha values that will be used
-                when applying the recursive filter along the x-axis.
-            alphas_y (iris.cube.Cube):
-                2D cube containing array of alpha values that will be used
-                when applying the recursive filter along the y-axis.
+            data (numpy.ndarray):
+                Array containing the input data to which the recursive
+                filter will be applied. This array is modified in place.
+            alphas_x (numpy.ndarray or float):
+                Array of alpha values, matching the spatial dimensions of
+                data, or a single alpha value, that will be used when
+                applying the recursive filter along the x-axis.
+            alphas_y (numpy.ndarray or float):
+                Array of alpha values, matching the spatial dimensions of
+                data, or a single alpha value, that will be used when
+                applying the recursive filter along the y-axis.
             iterations (int):
                 The number of iterations of the recursive filter
+            x_index (int):
+                Index of the x-axis within data.
+            y_index (int):
+                Index of the y-axis within data.
 
         Returns:
-            cube (iris.cube.Cube):
-                Cube containing the smoothed field after the recursive filter
-                method has been applied to the input cube.
+            data (numpy.ndarray):
+                Array containing the smoothed field after the recursive
+                filter method has been applied to the input array.
         """
-        x_index, = cube.coord_dims(cube.coord(axis="x").name())
-        y_index, = cube.coord_dims(cube.coord(axis="y").name())
-        output = cube.data
-
         for _ in range(iterations):
-            output = RecursiveFilter._recurse_forward(output, alphas_x.data,
-                                                      x_index)
-            output = RecursiveFilter._recurse_backward(output, alphas_x.data,
-                                                       x_index)
-            output = RecursiveFilter._recurse_forward(output, alphas_y.data,
-                                                      y_index)
-            output = RecursiveFilter._recurse_backward(output, alphas_y.data,
-                                                       y_index)
-            cube.data = output
-        return cube
+            data = RecursiveFilter._recurse_forward(data, alphas_x, x_index)
+            data = RecursiveFilter._recurse_backward(data, alphas_x, x_index)
+            data = RecursiveFilter._recurse_forward(data, alphas_y, y_index)
+            data = RecursiveFilter._recurse_backward(data, alphas_y, y_index)
+        return data
 
     def _set_alphas(self, cube, alpha, alphas_cube):
         """
@@ -286,20 +304,20 @@ class RecursiveFilter(object):
 
         The steps undertaken are:
 
-        1. Split the input cube into slices determined by the co-ordinates in
-           the x and y directions.
-        2. Construct an array of filter parameters (alphas_x and alphas_y) for
-           each cube slice that are used to weight the recursive filter in
-           the x- and y-directions.
-        3. Pad each cube slice with a square-neighbourhood halo and apply
-           the recursive filter for the required number of iterations.
-        4. Remove the halo from the cube slice and append the recursed cube
-           slice to a 'recursed cube'.
-        5. Merge all the cube slices in the 'recursed cube' into a 'new cube'.
-        6. Modify the 'new cube' so that its scalar dimension co-ordinates are
-           consistent with those in the original input cube.
-        7. Return the 'new cube' which now contains the recursively filtered
-           values for the original input cube.
+        1. Construct an array of filter parameters (alphas_x and alphas_y)
+           that are used to weight the recursive filter in the x- and
+           y-directions. Where a single alpha value has been provided for a
+           direction, the filter is applied using that value directly.
+        2. Reorder the data so that the y and x dimensions are the trailing
+           dimensions, allowing all the x-y slices of the cube (e.g.
+           realizations and thresholds) to be filtered together.
+        3. Set masked and NaN values to zero, pad the data with a
+           square-neighbourhood halo and apply the recursive filter to all
+           slices for the required number of iterations.
+        4. Remove the halo, optionally re-apply the mask and restore the
+           original dimension order.
+        5. Return a 'new cube' with the same metadata as the input cube,
+           which now contains the recursively filtered values.
 
         Args:
             cube (iris.cube.Cube):
@@ -324,34 +342,49 @@ class RecursiveFilter(object):
                                         cube.coord(axis='x')]))
         alphas_x = self._set_alphas(cube_format, self.alpha_x, alphas_x)
         alphas_y = self._set_alphas(cube_format, self.alpha_y, alphas_y)
-
-        recursed_cube = iris.cube.CubeList()
-        for output in cube.slices([cube.coord(axis='y'),
-                                   cube.coord(axis='x')]):
-
-            # Setup cube and mask for processing.
-            # This should set up a mask full of 1.0 if None is provided
-            # and set the data 0.0 where mask is 0.0 or the data is NaN
-            output, mask, nan_array = (
-                SquareNeighbourhood().set_up_cubes_to_be_neighbourhooded(
-                    output, mask_cube))
-            mask = mask.data.squeeze()
-
-            padded_cube = pad_cube_with_halo(
-                output, 2*self.edge_width, 2*self.edge_width)
-
-            new_cube = self._run_recursion(padded_cube, alphas_x, alphas_y,
-                                           self.iterations)
-            new_cube = remove_halo_from_cube(
-                new_cube, 2*self.edge_width, 2*self.edge_width)
-            if self.re_mask:
-                new_cube.data[nan_array.astype(bool)] = np.nan
-                new_cube.data = np.ma.masked_array(new_cube.data,
-                                                   mask=np.logical_not(mask))
-
-            recursed_cube.append(new_cube)
-
-        new_cube = recursed_cube.merge_cube()
-        new_cube = check_cube_coordinates(cube, new_cube)
-
+        alphas_x = self.alpha_x if self.alpha_x is not None else alphas_x.data
+        alphas_y = self.alpha_y if self.alpha_y is not None else alphas_y.data
+
+        # Move the y and x dimensions to the end of the data array.
+        y_dim, = cube.coord_dims(cube.coord(axis='y'))
+        x_dim, = cube.coord_dims(cube.coord(axis='x'))
+        order = [dim for dim in range(cube.ndim) if dim not in [y_dim, x_dim]]
+        order.extend([y_dim, x_dim])
+        data = np.ma.getdata(cube.data).transpose(order).copy()
+
+        # Set up a mask full of 1.0 if no mask_cube is provided, and set
+        # the data to 0.0 where the mask is 0.0 or the data is masked or NaN.
+        if mask_cube is None:
+            mask = np.ones(data.shape, dtype=data.dtype)
+        else:
+            mask = np.broadcast_to(mask_cube.data, data.shape).copy()
+        mask[np.ma.getmaskarray(cube.data).transpose(order)] = 0.0
+        nan_array = np.isnan(data)
+        mask[nan_array] = 0.0
+        data[nan_array] = 0.0
+        data = (data * mask).astype(data.dtype)
+
+        width = 2*self.edge_width
+        pad_width = [(0, 0)] * (data.ndim - 2) + [(width, width)] * 2
+        stat_length = [(1, 1)] * (data.ndim - 2) + [(0.5*width,
+                                                     0.5*width)] * 2
+        padded = np.pad(data, pad_width, "mean", stat_length=stat_length)
+
+        padded = self._run_recursion_on_array(
+            padded, alphas_x, alphas_y, self.iterations)
+        end = -width if width else None
+        data = padded[..., width:end, width:end]
+        if self.re_mask:
+            data[nan_array] = np.nan
+            data = np.ma.masked_array(data, mask=np.logical_not(mask))
+
+        new_cube = cube.copy(data=data.transpose(np.argsort(order)))
+        # Match the spatial coordinates to those produced by padding and
+        # unpadding the cube.
+        for axis in ['x', 'y']:
+            coord = new_cube.coord(axis=axis)
+            new_coord = pad_coord(pad_coord(coord, width, 'add'),
+                                  width, 'remove')
+            coord.points = new_coord.points
+            coord.bounds = new_coord.bounds
         return new_cube
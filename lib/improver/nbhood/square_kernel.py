@@ -33,17 +33,18 @@
 import iris
 import numpy as np
 
-from improver.utilities.cube_checker import (
-    check_for_x_and_y_axes, check_cube_coordinates)
-from improver.utilities.cube_manipulation import clip_cube_data
-from improver.utilities.pad_spatial import (
-    pad_cube_with_halo, remove_halo_from_cube)
+from improver.utilities.cube_checker import check_cube_coordinates
+from improver.utilities.cube_manipulation import enforce_coordinate_ordering
 from improver.utilities.spatial import (
     convert_distance_into_number_of_grid_cells)
 
 # Maximum radius of the neighbourhood width in grid cells.
 MAX_RADIUS_IN_GRID_CELLS = 500
 
+# Maximum number of grid points in a chunk of x-y slices that are
+# neighbourhood processed at once.
+MAX_POINTS_PER_CHUNK = 2 ** 20
+
 
 class SquareNeighbourhood(object):
 
@@ -93,61 +94,91 @@ class SquareNeighbourhood(object):
                              self.re_mask)
 
     @staticmethod
-    def cumulate_array(cube, iscomplex=False):
+    def _chunk_slices(index, slice_shape):
         """
-        Method to calculate the cumulative sum of an m x n array, by first
-        cumulating along the y direction so that the largest values
-        are in the nth row, and then cumulating along the x direction,
-        so that the largest values are in the mth column. Each grid point
-        will contain the cumulative sum from the origin to that grid point.
+        Split the x-y slices selected by a boolean array over the leading
+        dimensions into chunks, so that the number of grid points in each
+        chunk does not exceed MAX_POINTS_PER_CHUNK, unless a single slice is
+        larger than this.
 
         Args:
-            cube (iris.cube.Cube):
-                Cube to which the cumulative summing along the y and x
-                direction will be applied. The cube should contain only x and
-                y dimensions, so will generally be a slice of a cube ordered
-                so that y is first in the cube (i.e. axis=0).
-            iscomplex (bool):
-                Flag indicating whether cube.data contains complex values.
+            index (numpy.ndarray):
+                Boolean array with the shape of the leading dimensions, which
+                is True for the x-y slices to be included.
+            slice_shape (tuple):
+                The shape of each x-y slice.
 
         Returns:
-            summed_cube (iris.cube.Cube):
-                Cube to which the cumulative summing
-                along the y and x direction has been applied.
+            chunks (list of tuple):
+                List of tuples of index arrays, each of which selects a
+                chunk of x-y slices from an array with the leading
+                dimensions given by index.
         """
-        summed_cube = cube.copy()
-        if iscomplex:
-            data = cube.data.astype(complex)
-        elif cube.name().startswith("probability_of"):
-            # No need for high precision calculation, just between 0 and 1.
-            data = cube.data.astype(np.float32)
-        else:
-            # Go to high precision for safety.
-            data = cube.data.astype(np.longdouble)
-        data_summed_along_y = np.cumsum(data, axis=0)
-        data_summed_along_x = (
-            np.cumsum(data_summed_along_y, axis=1))
-        summed_cube.data = data_summed_along_x
-        return summed_cube
+        index = np.asarray(index)
+        if index.ndim == 0:
+            return [(Ellipsis,)] if index else []
+        n_slices = max(1, MAX_POINTS_PER_CHUNK // int(np.prod(slice_shape)))
+        positions = np.flatnonzero(index)
+        return [np.unravel_index(positions[start:start + n_slices],
+                                 index.shape)
+                for start in range(0, len(positions), n_slices)]
 
     @staticmethod
-    def calculate_neighbourhood(summed_cube,
-                                ymax_xmax_disp, ymin_xmax_disp,
-                                ymin_xmin_disp, ymax_xmin_disp,
-                                n_rows, n_columns):
+    def _compensated_cumsum(data, axis):
         """
-        Fast vectorised approach to calculating neighbourhood totals.
+        Calculate the cumulative sum along an axis, along with the
+        accumulated rounding error from each addition. The rounding error of
+        each addition is found exactly from the partial sums using the
+        TwoSum algorithm, so that the sum of the two returned arrays is a
+        more precise cumulative sum than either alone.
+
+        Args:
+            data (numpy.ndarray):
+                Array to be cumulatively summed.
+            axis (int):
+                The axis along which the cumulative sum is calculated.
 
-        Displacements are calculated as follows for the following input array,
-        where the accumulation has occurred from top to
-        bottom and left to right::
+        Returns:
+            (tuple): tuple containing:
+                **summed** (numpy.ndarray):
+                    The cumulative sum of the data.
+                **error** (numpy.ndarray):
+                    The cumulative sum of the rounding errors.
+        """
+        data = np.swapaxes(data, axis, -1)
+        summed = np.cumsum(data, axis=-1)
+        previous = np.zeros_like(summed)
+        previous[..., 1:] = summed[..., :-1]
+        # Calculate (previous - (summed - data_part)) + (data - data_part)
+        # in place, to limit the number of temporary arrays.
+        data_part = summed - previous
+        error = summed - data_part
+        np.subtract(previous, error, out=error)
+        del previous
+        np.subtract(data, data_part, out=data_part)
+        error += data_part
+        del data_part
+        np.cumsum(error, axis=-1, out=error)
+        return (np.swapaxes(summed, axis, -1),
+                np.swapaxes(error, axis, -1))
+
+    @staticmethod
+    def _difference_corners(summed, grid_cells_x, grid_cells_y):
+        """
+        Calculate the neighbourhood sums from a summed area table, using the
+        four corners of each neighbourhood. The summed area table is expected
+        to have been calculated from an array padded with grid_cells_y + 1
+        and grid_cells_x + 1 zeros before, and grid_cells_y and grid_cells_x
+        zeros after, the data along the y and x dimensions.
+
+        For example, for the following summed area table, where the
+        accumulation has occurred from top to bottom and left to right::
 
         | 1 | 2 | 2 | 2 |
         | 1 | 3 | 4 | 4 |
         | 2 | 4 | 5 | 6 |
         | 2 | 4 | 6 | 7 |
 
-
         For a 3x3 neighbourhood centred around the point with a value of 5::
 
         | 1 (C) | 2 | 2                 | 2 (D) |
@@ -155,301 +186,181 @@ class SquareNeighbourhood(object):
         | 2     | 4 | 5 (Central point) | 6     |
         | 2 (A) | 4 | 6                 | 7 (B) |
 
-        To calculate the value for the neighbourhood sum at the "Central point"
-        with a value of 5, calculate::
+        the neighbourhood sum at the "Central point" is::
 
-          Neighbourhood sum = B - A - D + C
-
-        At the central point, this will yield::
-
-          Neighbourhood sum = 7 - 2 - 2 +1 => 4
+          Neighbourhood sum = B - A - D + C = 7 - 2 - 2 + 1 => 4
 
         Args:
-            summed_cube (iris.cube.Cube):
-                cube on which to calculate the neighbourhood total.
-            ymax_xmax_disp (int):
-                Displacement from the point at the centre
-                of the neighbourhood.
-                Equivalent to point B in the docstring example.
-            ymax_xmin_disp (int):
-                Displacement from the point at the centre
-                of the neighbourhood.
-                Equivalent to point A in the docstring example.
-            ymin_xmax_disp (int):
-                Displacement from the point at the centre
-                of the neighbourhood.
-                Equivalent to point D in the docstring example.
-            ymin_xmin_disp (int):
-                Displacement from the point at the centre
-                of the neighbourhood.
-                Equivalent to point C in the docstring example.
-            n_rows (int):
-                Number of rows
-            n_columns (int):
-                Number of columns
+            summed (numpy.ndarray):
+                The summed area table, with the y and x dimensions as the
+                trailing dimensions.
+            grid_cells_x (int):
+                The radius of the neighbourhood in grid points, in the x
+                direction (excluding the central grid point).
+            grid_cells_y (int):
+                The radius of the neighbourhood in grid points, in the y
+                direction (excluding the central grid point).
 
         Returns:
             neighbourhood_total (numpy.ndarray):
-                Array containing the calculated neighbourhood total.
+                Array containing the neighbourhood sums, without padding.
         """
-        flattened = summed_cube.data.flatten()
-        ymax_xmax_array = np.roll(flattened, -ymax_xmax_disp)
-        ymin_xmax_array = np.roll(flattened, -ymin_xmax_disp)
-        ymin_xmin_array = np.roll(flattened, -ymin_xmin_disp)
-        ymax_xmin_array = np.roll(flattened, -ymax_xmin_disp)
-        neighbourhood_total = (ymax_xmax_array - ymin_xmax_array +
-                               ymin_xmin_array - ymax_xmin_array)
-        neighbourhood_total.resize(n_rows, n_columns)
-        return neighbourhood_total
+        n_rows = summed.shape[-2] - 2 * grid_cells_y - 1
+        n_columns = summed.shape[-1] - 2 * grid_cells_x - 1
+        ymax = slice(2 * grid_cells_y + 1, None)
+        xmax = slice(2 * grid_cells_x + 1, None)
+        ymin = slice(None, n_rows)
+        xmin = slice(None, n_columns)
+        return ((summed[..., ymax, xmax] - summed[..., ymin, xmax]) -
+                (summed[..., ymax, xmin] - summed[..., ymin, xmin]))
 
-    def mean_over_neighbourhood(self, summed_cube, summed_mask,
-                                cells_x, cells_y, iscomplex=False):
+    @staticmethod
+    def sum_over_neighbourhood(data, grid_cells_x, grid_cells_y):
         """
-        Method to calculate the average value in a square neighbourhood using
-        the 4-point algorithm to find the total sum over the neighbourhood.
-
-        The output from the cumulate_array method can be used to
-        calculate the sum over a neighbourhood of size
-        (2*cells_x+1)*(2*cells_y+1). This sum is then divided by the area of
-        the neighbourhood to calculate the mean value in the neighbourhood.
-
-        For all points, a fast vectorised approach is taken:
-
-        1. The displacements between the four points used to calculate the
-           neighbourhood total sum and the central grid point are calculated.
-        2. Within the function calculate_neighbourhood...
-           Four copies of the cumulate array output are flattened and rolled
-           by these displacements to align the four terms used in the
-           neighbourhood total sum calculation.
-        3. The neighbourhood total at all points can then be calculated
-           simultaneously in a single vector sum.
-
-        Neighbourhood mean = Neighbourhood sum / Neighbourhood area
-
-        Neighbourhood area = (2 * nb_width +1)^2 if there are no missing
-        points, nb_width is the neighbourhood width, which is equal to 1 for a
-        3x3 neighbourhood.
+        Calculate the sum over a square neighbourhood for every point of an
+        N-dimensional array with the y and x dimensions as the trailing
+        dimensions. Chunks of the x-y slices are padded with zeros and
+        cumulatively summed along the y and x dimensions, and the
+        neighbourhood sums are found from the four corners of each
+        neighbourhood. The size of the chunks is limited by
+        MAX_POINTS_PER_CHUNK, to bound the memory used by the padded and
+        cumulatively summed arrays.
+
+        Binary fields are accumulated as integers, so that the sums are
+        exact. Otherwise, the sums are accumulated in double precision
+        with the rounding errors accumulated separately and added back after
+        differencing the corners, to avoid the loss of precision from
+        differencing large cumulative sums.
 
         Args:
-            summed_cube (iris.cube.Cube):
-                Summed Cube to which neighbourhood processing is being
-                applied. Must be passed through cumulate_array method first.
-                The cube should contain only x and y dimensions,
-                so will generally be a slice of a cube.
-            summed_mask (iris.cube.Cube):
-                Summed Mask used to calculate neighbourhood size.
-                Must be passed through cumulate_array method first.
-                The cube should contain only x and y dimensions,
-                so will generally be a slice of a cube.
-            cells_x (int):
+            data (numpy.ndarray):
+                Array of data with the y and x dimensions as the trailing
+                dimensions.
+            grid_cells_x (int):
                 The radius of the neighbourhood in grid points, in the x
                 direction (excluding the central grid point).
-            cells_y (int):
+            grid_cells_y (int):
                 The radius of the neighbourhood in grid points, in the y
                 direction (excluding the central grid point).
-            iscomplex (bool):
-                Flag indicating whether cube.data contains complex values.
 
         Returns:
-            cube (iris.cube.Cube):
-                Cube to which square neighbourhood has been applied.
+            neighbourhood_total (numpy.ndarray):
+                Array containing the neighbourhood sum for each point.
         """
-        cube = summed_cube
-        check_for_x_and_y_axes(summed_cube)
-
-        # Calculate displacement factors to find 4-points after flattening the
-        # array.
-        n_rows = len(cube.coord(axis="y").points)
-        n_columns = len(cube.coord(axis="x").points)
-
-        # Displacements from the point at the centre of the neighbourhood.
-        # Equivalent to point B in the docstring example.
-        ymax_xmax_disp = (cells_y*n_columns) + cells_x
-        # Equivalent to point A in the docstring example.
-        ymax_xmin_disp = (cells_y*n_columns) - cells_x - 1
-
-        # Equivalent to point D in the docstring example.
-        ymin_xmax_disp = (-1*(cells_y+1)*n_columns) + cells_x
-        # Equivalent to point C in the docstring example.
-        ymin_xmin_disp = (-1*(cells_y+1)*n_columns) - cells_x - 1
-
-        # Flatten the cube data and create 4 copies of the flattened
-        # array which are rolled to align the 4-points which are needed
-        # for the calculation.
-        neighbourhood_total = self.calculate_neighbourhood(
-            summed_cube, ymax_xmax_disp, ymin_xmax_disp,
-            ymin_xmin_disp, ymax_xmin_disp,
-            n_rows, n_columns)
-
-        if self.sum_or_fraction == "fraction":
-            # Initialise and calculate the neighbourhood area.
-            neighbourhood_area = self.calculate_neighbourhood(
-                summed_mask, ymax_xmax_disp, ymin_xmax_disp,
-                ymin_xmin_disp, ymax_xmin_disp,
-                n_rows, n_columns)
-
-            with np.errstate(invalid='ignore', divide='ignore'):
-                if iscomplex:
-                    cube.data = (neighbourhood_total.astype(complex) /
-                                 neighbourhood_area.astype(complex))
-                else:
-                    cube.data = (neighbourhood_total.astype(float) /
-                                 neighbourhood_area.astype(float))
-                cube.data[~np.isfinite(cube.data)] = np.nan
-        elif self.sum_or_fraction == "sum":
-            if iscomplex:
-                cube.data = neighbourhood_total.astype(complex)
+        padded_shape = (data.shape[-2] + 2 * grid_cells_y + 1,
+                        data.shape[-1] + 2 * grid_cells_x + 1)
+        chunks = SquareNeighbourhood._chunk_slices(
+            np.ones(data.shape[:-2], dtype=bool), padded_shape)
+        if np.iscomplexobj(data):
+            dtype = np.complex128
+        elif all(np.all((data[chunk] == 0) | (data[chunk] == 1))
+                 for chunk in chunks):
+            if np.prod(padded_shape) <= np.iinfo(np.int32).max:
+                dtype = np.int32
             else:
-                cube.data = neighbourhood_total.astype(float)
-
-        return cube
+                dtype = np.int64
+        else:
+            dtype = np.float64
+
+        neighbourhood_total = np.empty(data.shape, dtype=dtype)
+        for chunk in chunks:
+            chunk_data = data[chunk]
+            padding = [(0, 0)] * (chunk_data.ndim - 2) + [
+                (grid_cells_y + 1, grid_cells_y),
+                (grid_cells_x + 1, grid_cells_x)]
+            padded = np.pad(chunk_data.astype(dtype), padding, "constant")
+            if np.issubdtype(dtype, np.integer):
+                summed = np.cumsum(np.cumsum(padded, axis=-2, dtype=dtype),
+                                   axis=-1, dtype=dtype)
+                neighbourhood_total[chunk] = (
+                    SquareNeighbourhood._difference_corners(
+                        summed, grid_cells_x, grid_cells_y))
+                continue
+            summed, error_y = SquareNeighbourhood._compensated_cumsum(
+                padded, -2)
+            del padded
+            summed, error = SquareNeighbourhood._compensated_cumsum(
+                summed, -1)
+            error += np.cumsum(error_y, axis=-1)
+            del error_y
+            neighbourhood_total[chunk] = (
+                SquareNeighbourhood._difference_corners(
+                    summed, grid_cells_x, grid_cells_y) +
+                SquareNeighbourhood._difference_corners(
+                    error, grid_cells_x, grid_cells_y))
+        return neighbourhood_total
 
     @staticmethod
-    def set_up_cubes_to_be_neighbourhooded(cube, mask_cube=None):
+    def _set_up_data_to_be_neighbourhooded(data, mask):
         """
-        Set up a cube ready for neighourhooding the data.
+        Set up the data and mask arrays ready for neighbourhooding, by
+        setting masked or NaN points to zero in both the data and the mask,
+        and applying the mask to the data.
 
         Args:
-            cube (iris.cube.Cube):
-                Cube that will be checked for whether the data is masked
-                or nan. The cube should contain only x and y dimensions,
-                so will generally be a slice of a cube.
-            mask_cube (iris.cube.Cube):
-                Input Cube containing the array to be used as a mask.
+            data (numpy.ndarray or numpy.ma.MaskedArray):
+                Array of data with the y and x dimensions as the trailing
+                dimensions.
+            mask (numpy.ndarray):
+                Array of the mask, which can be broadcast to the shape of the
+                data.
 
         Returns:
-            (tuple) : tuple containing:
-                **cube** (iris.cube.Cube):
-                    Cube with masked or NaN values set to 0.0
-                **mask** (iris.cube.Cube):
-                    Cube with masked or NaN values set to 0.0
+            (tuple): tuple containing:
+                **data** (numpy.ndarray):
+                    Array with masked or NaN values set to 0.0, to which the
+                    mask has been applied.
+                **mask** (numpy.ndarray):
+                    Array with masked or NaN values set to 0.0, with the shape
+                    of the data.
                 **nan_array** (numpy.ndarray):
-                    numpy array to be used to set the values within
-                    the data of the output cube to be NaN.
-
+                    Boolean array to be used to set the values within the
+                    output data to be NaN.
         """
-        # Set up mask_cube
-        if not mask_cube:
-            mask = cube.copy()
-            mask.data = np.real(np.ones_like(mask.data))
-        else:
-            mask = mask_cube
-        # If there is a mask, fill the data array of the mask_cube with a
-        # logical array, logically inverted compared to the integer version of
-        # the mask within the original data array.
-
-        if isinstance(cube.data, np.ma.MaskedArray):
-            index = np.where(cube.data.mask.astype(int) == 1)
-            mask.data[index] = 0.0
-            cube.data = cube.data.data
-        mask.rename('mask_data')
-        cube = iris.util.squeeze(cube)
-        mask = iris.util.squeeze(mask)
-        # Set NaN values to 0 in both the cube data and mask data.
-        nan_array = np.isnan(cube.data)
-        mask.data[nan_array] = 0.0
-        cube.data[nan_array] = 0.0
-        #  Set cube.data to 0.0 where mask_cube is 0.0
-        cube.data = (cube.data * mask.data).astype(
-            cube.data.dtype)
-        return cube, mask, nan_array
-
-    def _pad_and_calculate_neighbourhood(
-            self, cube, mask, grid_cells_x, grid_cells_y):
+        mask = np.array(np.broadcast_to(mask, data.shape))
+        if isinstance(data, np.ma.MaskedArray):
+            mask[np.ma.getmaskarray(data)] = 0.0
+            data = data.data
+        nan_array = np.isnan(data)
+        mask[nan_array] = 0.0
+        data = np.where(nan_array, 0.0, data).astype(data.dtype)
+        data = (data * mask).astype(data.dtype)
+        return data, mask, nan_array
+
+    def _calculate_neighbourhood_for_slices(
+            self, data, mask, grid_cells_x, grid_cells_y):
         """
-        Apply neighbourhood processing consisting of the following steps:
-
-        1. Pad a halo around the input cube to allow vectorised
-           neighbourhooding at edgepoints.
-        2. Cumulate the array along the x and y axes.
-        3. Apply neighbourhood processing to the cumulated array.
+        Calculate the neighbourhood sum or fraction for all the x-y slices
+        of an array at once.
 
         Args:
-            cube (iris.cube.Cube):
-                Cube with masked or NaN values set to 0.0
-            mask (iris.cube.Cube):
-                Cube with masked or NaN values set to 0.0
-            grid_cells_x (float):
-                The number of grid cells along the x axis used to create a
-                square neighbourhood.
-            grid_cells_y (float):
-                The number of grid cells along the y axis used to create a
-                square neighbourhood.
-
-        Returns:
-            neighbourhood_averaged_cube (iris.cube.Cube):
-                Cube containing the smoothed field after the square
-                neighbourhood method has been applied with halo added.
-        """
-        # Pad the iris cube with the neighbourhood radius plus 1 grid point.
-        # Since the neighbourhood size is 2*radius + 1, this means that all
-        # grid points within the original domain will have data available for
-        # the full neighbourhood size.  The halo is removed later.
-        padded_cube = pad_cube_with_halo(cube, grid_cells_x+1, grid_cells_y+1,
-                                         halo_mean_data=False)
-        padded_mask = pad_cube_with_halo(mask, grid_cells_x+1, grid_cells_y+1,
-                                         halo_mean_data=False)
-
-        # Check whether cube contains complex values
-        is_complex = np.any(np.iscomplex(cube.data))
-
-        summed_up_cube = self.cumulate_array(padded_cube, is_complex)
-        summed_up_mask = self.cumulate_array(padded_mask)
-        neighbourhood_averaged_cube = (
-            self.mean_over_neighbourhood(summed_up_cube, summed_up_mask,
-                                         grid_cells_x, grid_cells_y,
-                                         is_complex))
-        if neighbourhood_averaged_cube.dtype in [np.float64, np.longdouble]:
-            neighbourhood_averaged_cube.data = (
-                neighbourhood_averaged_cube.data.astype(np.float32))
-        return neighbourhood_averaged_cube
-
-    def _remove_padding_and_mask(
-            self, neighbourhood_averaged_cube,
-            original_cube, mask,
-            grid_cells_x, grid_cells_y):
-        """
-        Remove the halo from the padded array and apply the mask, if required.
-        If fraction option set, clip the data so values lie within
-        the range of the original cube.
-
-        Args:
-            neighbourhood_averaged_cube (iris.cube.Cube):
-                Cube containing the smoothed field after the square
-                neighbourhood method has been applied.
-            original_cube (iris.cube.Cube or None):
-                The original cube slice.
-            mask (iris.cube.Cube):
-                The mask cube created by set_up_cubes_to_be_neighbourhooded.
-            grid_cells_x (float):
-                The number of grid cells along the x axis used to create a
-                square neighbourhood.
-            grid_cells_y (float):
-                The number of grid cells along the y axis used to create a
-                square neighbourhood.
+            data (numpy.ndarray):
+                Array of data, to which the mask has been applied, with the
+                y and x dimensions as the trailing dimensions.
+            mask (numpy.ndarray):
+                Array of the mask with the same shape as the data.
+            grid_cells_x (int):
+                The radius of the neighbourhood in grid points, in the x
+                direction (excluding the central grid point).
+            grid_cells_y (int):
+                The radius of the neighbourhood in grid points, in the y
+                direction (excluding the central grid point).
 
         Returns:
-            neighbourhood_averaged_cube (iris.cube.Cube):
-                Cube containing the smoothed field after the square
-                neighbourhood method has been applied and halo removed.
+            neighbourhood_data (numpy.ndarray):
+                Array containing the neighbourhood sum or fraction for each
+                point.
         """
-        # Correct neighbourhood averages for masked data, which may have been
-        # calculated using larger neighbourhood areas than are present in
-        # reality.
-        neighbourhood_averaged_cube = remove_halo_from_cube(
-            neighbourhood_averaged_cube, grid_cells_x+1, grid_cells_y+1)
-        if self.re_mask and mask.data.min() < 1.0:
-            neighbourhood_averaged_cube.data = np.ma.masked_array(
-                neighbourhood_averaged_cube.data,
-                mask=np.logical_not(mask.data.squeeze()))
-        # Add clipping
-        if self.sum_or_fraction == "fraction":
-            minimum_value = np.nanmin(original_cube.data)
-            maximum_value = np.nanmax(original_cube.data)
-            neighbourhood_averaged_cube = (
-                clip_cube_data(neighbourhood_averaged_cube,
-                               minimum_value, maximum_value))
-        return neighbourhood_averaged_cube
+        neighbourhood_total = self.sum_over_neighbourhood(
+            data, grid_cells_x, grid_cells_y)
+        if self.sum_or_fraction == "sum":
+            return neighbourhood_total
+        neighbourhood_area = self.sum_over_neighbourhood(
+            mask, grid_cells_x, grid_cells_y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            neighbourhood_data = neighbourhood_total / neighbourhood_area
+        neighbourhood_data[~np.isfinite(neighbourhood_data)] = np.nan
+        return neighbourhood_data
 
     def run(self, cube, radius, mask_cube=None):
         """
@@ -458,19 +369,25 @@ class SquareNeighbourhood(object):
 
         The steps undertaken are:
 
-        1. Set up cubes by determining, if the arrays are masked.
-        2. Pad the input array with a halo and then calculate the neighbourhood
-           of the haloed array.
-        3. Remove the halo from the neighbourhooded array and deal with a mask,
-           if required.
+        1. Split the x-y slices with the same radius into chunks, the size
+           of which is limited by MAX_POINTS_PER_CHUNK.
+        2. Set up the data and mask for each chunk by setting masked or NaN
+           points to zero.
+        3. Calculate the neighbourhood of all x-y slices in the chunk at
+           once, using a summed area table, and clip the data to lie within
+           the range of the data within each slice.
+        4. Deal with a mask, if required.
 
         Args:
             cube (iris.cube.Cube):
                 Cube containing the array to which the square neighbourhood
                 will be applied.
-            radius (float):
+            radius (float or numpy.ndarray):
                 Radius in metres for use in specifying the number of
-                grid cells used to create a square neighbourhood.
+                grid cells used to create a square neighbourhood. If an
+                array is provided, this must contain a radius for each x-y
+                slice of the cube, with the shape of the cube excluding the
+                y and x dimensions.
             mask_cube (iris.cube.Cube):
                 Cube containing the array to be used as a mask.
 
@@ -479,36 +396,67 @@ class SquareNeighbourhood(object):
                 Cube containing the smoothed field after the square
                 neighbourhood method has been applied.
         """
-        # If the data is masked, the mask will be processed as well as the
-        # original_data * mask array.
-        original_attributes = cube.attributes
-        original_methods = cube.cell_methods
-        grid_cells_x, grid_cells_y = (
-            convert_distance_into_number_of_grid_cells(
-                cube, radius,
-                max_distance_in_grid_cells=MAX_RADIUS_IN_GRID_CELLS))
-        result_slices = iris.cube.CubeList()
-        for cube_slice in cube.slices([cube.coord(axis='y'),
-                                       cube.coord(axis='x')]):
-            (cube_slice, mask, nan_array) = (
-                self.set_up_cubes_to_be_neighbourhooded(cube_slice,
-                                                        mask_cube))
-            neighbourhood_averaged_cube = (
-                self._pad_and_calculate_neighbourhood(
-                    cube_slice, mask,
-                    grid_cells_x, grid_cells_y))
-            neighbourhood_averaged_cube = (
-                self._remove_padding_and_mask(
-                    neighbourhood_averaged_cube,
-                    cube_slice, mask,
-                    grid_cells_x, grid_cells_y))
-            neighbourhood_averaged_cube.data[nan_array.astype(bool)] = np.nan
-            result_slices.append(neighbourhood_averaged_cube)
-
-        neighbourhood_averaged_cube = result_slices.merge_cube()
-
-        neighbourhood_averaged_cube.cell_methods = original_methods
-        neighbourhood_averaged_cube.attributes = original_attributes
+        yname = cube.coord(axis='y').name()
+        xname = cube.coord(axis='x').name()
+        neighbourhood_averaged_cube = enforce_coordinate_ordering(
+            cube.copy(), [yname, xname], anchor="end")
+        data = neighbourhood_averaged_cube.data
+        if mask_cube is None:
+            mask = np.ones(data.shape[-2:], dtype=np.float32)
+        else:
+            mask = enforce_coordinate_ordering(
+                iris.util.squeeze(mask_cube), [yname, xname],
+                anchor="end").data
+        # The mask is broadcast to the shape of the data as a view, so that
+        # the full mask is only created for each chunk.
+        mask = np.broadcast_to(mask, data.shape)
+
+        if np.iscomplexobj(data):
+            dtype = np.complex128
+        else:
+            dtype = np.float32
+        neighbourhood_data = np.empty(data.shape, dtype=dtype)
+        neighbourhood_mask = np.zeros(data.shape, dtype=bool)
+        partially_masked = False
+        radii = np.broadcast_to(radius, data.shape[:-2])
+        grid_cells = {}
+        for unique_radius in np.unique(radii):
+            grid_cells.setdefault(
+                convert_distance_into_number_of_grid_cells(
+                    neighbourhood_averaged_cube, unique_radius,
+                    max_distance_in_grid_cells=MAX_RADIUS_IN_GRID_CELLS),
+                []).append(unique_radius)
+        for (grid_cells_x, grid_cells_y), radii_list in grid_cells.items():
+            for chunk in self._chunk_slices(np.isin(radii, radii_list),
+                                            data.shape[-2:]):
+                chunk_data, chunk_mask, nan_array = (
+                    self._set_up_data_to_be_neighbourhooded(
+                        data[chunk], mask[chunk]))
+                chunk_result = self._calculate_neighbourhood_for_slices(
+                    chunk_data, chunk_mask, grid_cells_x, grid_cells_y)
+                if self.sum_or_fraction == "fraction":
+                    chunk_result = np.clip(
+                        chunk_result,
+                        chunk_data.min(axis=(-2, -1), keepdims=True),
+                        chunk_data.max(axis=(-2, -1), keepdims=True))
+                chunk_result = chunk_result.astype(dtype)
+                chunk_result[nan_array] = np.nan
+                neighbourhood_data[chunk] = chunk_result
+                # Points that are NaN in the input are left unmasked.
+                neighbourhood_mask[chunk] = (
+                    np.logical_not(chunk_mask) & ~nan_array)
+                partially_masked |= chunk_mask.min() < 1.0
+
+        if self.re_mask and partially_masked:
+            neighbourhood_data = np.ma.masked_array(
+                neighbourhood_data, mask=neighbourhood_mask)
+        neighbourhood_averaged_cube.data = neighbourhood_data
+
+        # The spatial coordinates are given bounds, if not present, for
+        # consistency with the output from other neighbourhood processing.
+        for axis in ["x", "y"]:
+            if not neighbourhood_averaged_cube.coord(axis=axis).has_bounds():
+                neighbourhood_averaged_cube.coord(axis=axis).guess_bounds()
 
         neighbourhood_averaged_cube = check_cube_coordinates(
             cube, neighbourhood_averaged_cube)
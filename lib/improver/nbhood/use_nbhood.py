@@ -30,14 +30,20 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Utilities for using neighbourhood processing."""
 
+from copy import deepcopy
+
 import iris
 import numpy as np
 import numpy.ma as ma
 
 from improver.blending.weights import WeightsUtilities
-from improver.nbhood.nbhood import NeighbourhoodProcessing
-from improver.utilities.cube_checker import (
-    check_cube_coordinates, find_dimension_coordinate_mismatch)
+from improver.nbhood.square_kernel import (
+    MAX_RADIUS_IN_GRID_CELLS, SquareNeighbourhood)
+from improver.utilities.cube_checker import check_cube_coordinates
+from improver.utilities.cube_manipulation import enforce_coordinate_ordering
+from improver.utilities.spatial import (
+    convert_distance_into_number_of_grid_cells)
+from improver.utilities.temporal import forecast_period_coord
 
 
 class ApplyNeighbourhoodProcessingWithAMask(object):
@@ -142,13 +148,133 @@ class ApplyNeighbourhoodProcessingWithAMask(object):
             self.lead_times, self.weighted_mode,
             self.sum_or_fraction, self.re_mask)
 
+    def _find_radii(self, cube):
+        """
+        Find the radius to use for each x-y slice of the cube, interpolating
+        the radii to the forecast periods of the cube, if lead times have
+        been provided.
+
+        Args:
+            cube (iris.cube.Cube):
+                Cube with the y and x dimensions as the trailing dimensions.
+
+        Returns:
+            radii (numpy.ndarray):
+                Array of radii in metres, with a shape matching the leading
+                dimensions of the cube.
+        """
+        leading_shape = cube.shape[:-2]
+        if self.lead_times is None:
+            return np.full(leading_shape, float(self.radii))
+        fp_coord = forecast_period_coord(cube)
+        fp_coord.convert_units("hours")
+        radii = np.interp(fp_coord.points, self.lead_times, self.radii)
+        if cube.coords("forecast_period"):
+            fp_dims = cube.coord_dims("forecast_period")
+        else:
+            fp_dims = cube.coord_dims("time")
+        if not fp_dims:
+            return np.full(leading_shape, radii[0])
+        return iris.util.broadcast_to_shape(radii, leading_shape, fp_dims)
+
+    def _neighbourhood_with_masks(
+            self, data, masks, grid_cells_x, grid_cells_y):
+        """
+        Apply the square neighbourhood to a 2D slice of data for all the
+        masks at once, by stacking the masked data and the masks along a
+        leading dimension, so that the neighbourhood sums for every mask
+        are calculated from a single cumulative sum.
+
+        Args:
+            data (numpy.ndarray or numpy.ma.MaskedArray):
+                2D array of data to be neighbourhood processed.
+            masks (numpy.ndarray):
+                3D array of masks, with the masking dimension as the leading
+                dimension.
+            grid_cells_x (int):
+                The radius of the neighbourhood in grid points, in the x
+                direction (excluding the central grid point).
+            grid_cells_y (int):
+                The radius of the neighbourhood in grid points, in the y
+                direction (excluding the central grid point).
+
+        Returns:
+            (tuple): tuple containing:
+                **result** (numpy.ndarray):
+                    3D array of the neighbourhood processed data for each
+                    mask.
+                **masks** (numpy.ndarray):
+                    3D array of the masks, with any points masked within the
+                    input data also masked out.
+        """
+        if isinstance(data, np.ma.MaskedArray):
+            masks = masks * ~np.ma.getmaskarray(data)
+            data = data.data
+        masked_data = (data * masks).astype(data.dtype)
+
+        result = SquareNeighbourhood.sum_over_neighbourhood(
+            masked_data, grid_cells_x, grid_cells_y)
+        if self.sum_or_fraction == "fraction":
+            neighbourhood_area = SquareNeighbourhood.sum_over_neighbourhood(
+                masks, grid_cells_x, grid_cells_y)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = result / neighbourhood_area
+            result[~np.isfinite(result)] = np.nan
+            # Clip the data so that values lie within the range of the
+            # masked data for each mask.
+            result = np.clip(
+                result,
+                np.nanmin(masked_data, axis=(1, 2))[:, np.newaxis, np.newaxis],
+                np.nanmax(masked_data, axis=(1, 2))[:, np.newaxis, np.newaxis])
+        return result.astype(np.float32), masks
+
+    def _create_output_cube(self, cube, mask_cube, data):
+        """
+        Create the output cube from the input cube, with an additional
+        dimension for the coord_for_masking coordinate inserted before the
+        y and x dimensions.
+
+        Args:
+            cube (iris.cube.Cube):
+                The input cube with the y and x dimensions as the trailing
+                dimensions.
+            mask_cube (iris.cube.Cube):
+                Cube containing the coord_for_masking coordinate.
+            data (numpy.ndarray):
+                The data for the output cube.
+
+        Returns:
+            result (iris.cube.Cube):
+                Cube containing the neighbourhood processed data.
+        """
+        masking_dim = cube.ndim - 2
+        result = iris.cube.Cube(data, **deepcopy(cube.metadata._asdict()))
+        for coord in cube.coords():
+            coord_dims = tuple(
+                dim + 1 if dim >= masking_dim else dim
+                for dim in cube.coord_dims(coord))
+            if cube.coords(coord, dim_coords=True):
+                result.add_dim_coord(coord.copy(), coord_dims)
+            else:
+                result.add_aux_coord(coord.copy(), coord_dims)
+        result.add_dim_coord(
+            iris.coords.DimCoord.from_coord(
+                mask_cube.coord(self.coord_for_masking)), masking_dim)
+        # The bounds are added to the spatial coordinates for consistency
+        # with the output from neighbourhood processing.
+        for axis in ["x", "y"]:
+            if not result.coord(axis=axis).has_bounds():
+                result.coord(axis=axis).guess_bounds()
+        return result
+
     def process(self, cube, mask_cube):
         """
-        1. Iterate over the chosen coordinate within the mask_cube and apply
-           the mask at each iteration to the cube that is to be neighbourhood
-           processed.
-        2. Concatenate the cubes from each iteration together to create a
-           single cube.
+        1. Stack the masks along the chosen coordinate within the mask_cube.
+        2. For each x-y slice of the cube, apply the square neighbourhood to
+           the slice for all masks at once, reusing the result from the
+           previous slice, if the slices are identical.
+        3. Create a single cube containing the neighbourhood processed data
+           for each point along the chosen coordinate.
 
         Args:
             cube (iris.cube.Cube):
@@ -158,60 +284,79 @@ class ApplyNeighbourhoodProcessingWithAMask(object):
                 Cube containing the array to be used as a mask.
 
         Returns:
-            concatenated_cube (iris.cube.Cube):
+            result (iris.cube.Cube):
                 Cube containing the smoothed field after the square
                 neighbourhood method has been applied when applying masking
                 for each point along the coord_for_masking coordinate.
-                The resulting cube is concatenated so that the dimension
-                coordinates match the input cube.
-
+                The resulting cube has the dimension coordinates of the
+                input cube in the same order, with the coord_for_masking
+                dimension inserted before the y and x dimensions. The data
+                are only masked if re_mask is True and some points are
+                masked out.
+
+        Raises:
+            ValueError: If the input cube contains NaNs.
         """
+        if np.isnan(cube.data).any():
+            raise ValueError("Error: NaN detected in input cube data")
+
         yname = cube.coord(axis='y').name()
         xname = cube.coord(axis='x').name()
-        result_slices = iris.cube.CubeList([])
-        # Take 2D slices of the input cube for memory issues.
-        prev_x_y_slice = None
-        for x_y_slice in cube.slices([yname, xname]):
-            if (prev_x_y_slice is not None and
-                    np.array_equal(prev_x_y_slice.data, x_y_slice.data)):
+        spatial_dims = [cube.coord_dims(yname)[0], cube.coord_dims(xname)[0]]
+        leading_dims = [dim for dim in range(cube.ndim)
+                        if dim not in spatial_dims]
+        cube = enforce_coordinate_ordering(
+            cube.copy(), [yname, xname], anchor="end")
+        mask_cube = mask_cube.copy()
+        if not mask_cube.coord_dims(self.coord_for_masking):
+            mask_cube = iris.util.new_axis(mask_cube, self.coord_for_masking)
+        mask_cube = enforce_coordinate_ordering(
+            mask_cube, [self.coord_for_masking, yname, xname])
+        masks = mask_cube.data
+
+        radii = self._find_radii(cube)
+        grid_cells = {}
+        leading_shape = cube.shape[:-2]
+        result_data = np.empty(
+            leading_shape + masks.shape, dtype=np.float32)
+        result_mask = np.zeros(result_data.shape, dtype=bool)
+        prev_index = None
+        for index in np.ndindex(leading_shape):
+            x_y_data = cube.data[index]
+            radius = radii[index]
+            if (prev_index is not None and radius == radii[prev_index] and
+                    np.array_equal(cube.data[prev_index], x_y_data)):
                 # Use same result as last time!
-                prev_result = result_slices[-1].copy()
-                for coord in x_y_slice.coords(dim_coords=False):
-                    prev_result.coord(coord).points = coord.points.copy()
-                result_slices.append(prev_result)
+                result_data[index] = result_data[prev_index]
+                result_mask[index] = result_mask[prev_index]
                 continue
-            prev_x_y_slice = x_y_slice
-
-            cube_slices = iris.cube.CubeList([])
-            # Apply each mask in in mask_cube to the 2D input slice.
-            for cube_slice in mask_cube.slices_over(self.coord_for_masking):
-                output_cube = NeighbourhoodProcessing(
-                    self.neighbourhood_method, self.radii,
-                    lead_times=self.lead_times,
-                    weighted_mode=self.weighted_mode,
-                    sum_or_fraction=self.sum_or_fraction, re_mask=self.re_mask
-                    ).process(x_y_slice, mask_cube=cube_slice)
-                coord_object = cube_slice.coord(self.coord_for_masking).copy()
-                output_cube.add_aux_coord(coord_object)
-                output_cube = iris.util.new_axis(
-                    output_cube, self.coord_for_masking)
-                cube_slices.append(output_cube)
-            concatenated_cube = cube_slices.concatenate_cube()
-            exception_coordinates = (
-                find_dimension_coordinate_mismatch(
-                    x_y_slice, concatenated_cube, two_way_mismatch=False))
-            concatenated_cube = check_cube_coordinates(
-                x_y_slice, concatenated_cube,
-                exception_coordinates=exception_coordinates)
-            result_slices.append(concatenated_cube)
-        result = result_slices.merge_cube()
-        exception_coordinates = (
-            find_dimension_coordinate_mismatch(
-                cube, result, two_way_mismatch=False))
-        result = check_cube_coordinates(
-            cube, result,
-            exception_coordinates=exception_coordinates)
-
+            prev_index = index
+
+            if radius not in grid_cells:
+                grid_cells[radius] = (
+                    convert_distance_into_number_of_grid_cells(
+                        cube, radius,
+                        max_distance_in_grid_cells=MAX_RADIUS_IN_GRID_CELLS))
+            result_data[index], slice_masks = self._neighbourhood_with_masks(
+                x_y_data, masks, *grid_cells[radius])
+            result_mask[index] = np.logical_not(slice_masks)
+
+        if self.re_mask and result_mask.any():
+            result_data = np.ma.masked_array(result_data, mask=result_mask)
+        result = self._create_output_cube(cube, mask_cube, result_data)
+
+        # Restore the dimension order of the input cube, with the
+        # coord_for_masking dimension inserted before the spatial dimensions.
+        masking_dim = len(leading_dims)
+        new_order = []
+        for dim in range(len(leading_dims) + 2):
+            if dim == min(spatial_dims):
+                new_order.append(masking_dim)
+            if dim in leading_dims:
+                new_order.append(leading_dims.index(dim))
+            else:
+                new_order.append(masking_dim + 1 + spatial_dims.index(dim))
+        result.transpose(new_order)
         return result
 
 
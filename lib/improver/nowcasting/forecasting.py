@@ -33,7 +33,9 @@ This module defines plugins used to create nowcast extrapolation forecasts.
 """
 import datetime
 import warnings
+from multiprocessing import Pool
 
+import iris
 import numpy as np
 from iris.coords import AuxCoord
 from iris.exceptions import CoordinateNotFoundError, InvalidCubeError
@@ -224,27 +226,99 @@ class AdvectField():
 
         return adv_field
 
-    def process(self, cube, timestep):
+    @staticmethod
+    def _advect_field_multiple(data, grid_vel_x, grid_vel_y, timesteps):
         """
-        Extrapolates input cube data and updates validity time.  The input
-        cube should have precisely two non-scalar dimension coordinates
-        (spatial x/y), and is expected to be in a projection such that grid
-        spacing is the same (or very close) at all points within the spatial
-        domain.  The input cube should also have a "time" coordinate.
+        Performs the same backwards advection as _advect_field for a number
+        of time steps at once.  The source grids for all the time steps are
+        calculated together, and the contribution from each of the four
+        points surrounding each source location is gathered for all time
+        steps in a single pass.
+
+        Args:
+            data (numpy.ndarray or numpy.ma.MaskedArray):
+                2D numpy data array to be advected
+            grid_vel_x (numpy.ndarray):
+                Velocity in the x direction (in grid points per second)
+            grid_vel_y (numpy.ndarray):
+                Velocity in the y direction (in grid points per second)
+            timesteps (list of float):
+                Advection time steps in seconds
+
+        Returns:
+            adv_field (numpy.ma.MaskedArray):
+                3D float array of advected data values, with the leading
+                dimension corresponding to the time steps, with masked
+                "no data" regions
+        """
+        timesteps = np.asarray(timesteps, dtype=np.float32)
+        ydim, xdim = data.shape
+        (xgrid, ygrid) = np.meshgrid(np.arange(xdim, dtype=np.float32),
+                                     np.arange(ydim, dtype=np.float32))
+
+        # Trace the fractional source location of each point for all time
+        # steps, giving arrays of shape (time, y, x).
+        xsrc_point_frac = (-grid_vel_x[np.newaxis] *
+                           timesteps[:, np.newaxis, np.newaxis] + xgrid)
+        ysrc_point_frac = (-grid_vel_y[np.newaxis] *
+                           timesteps[:, np.newaxis, np.newaxis] + ygrid)
+
+        def point_in_bounds(x, y, nx, ny):
+            """Check point (y, x) lies within defined bounds"""
+            return (x >= 0.) & (x < nx) & (y >= 0.) & (y < ny)
+
+        cond_pt = point_in_bounds(xsrc_point_frac, ysrc_point_frac, xdim, ydim)
+
+        xsrc_point_lower = xsrc_point_frac.astype(int)
+        ysrc_point_lower = ysrc_point_frac.astype(int)
+        x_points = [xsrc_point_lower, xsrc_point_lower + 1]
+        y_points = [ysrc_point_lower, ysrc_point_lower + 1]
+
+        x_weight_upper = xsrc_point_frac - xsrc_point_lower.astype(float)
+        y_weight_upper = ysrc_point_frac - ysrc_point_lower.astype(float)
+        x_weights = np.array([1. - x_weight_upper, x_weight_upper],
+                             dtype=np.float32)
+        y_weights = np.array([1. - y_weight_upper, y_weight_upper],
+                             dtype=np.float32)
+
+        original_data = data
+        if isinstance(data, np.ma.MaskedArray):
+            data = np.where(data.mask, np.nan, data.data)
+
+        # Gather the contribution of each of the four source points, using
+        # clipped indices so that out of bounds points can be discarded
+        # after the lookup.
+        adv_field = np.zeros(cond_pt.shape, dtype=np.float32)
+        for xpt, xwt in zip(x_points, x_weights):
+            for ypt, ywt in zip(y_points, y_weights):
+                cond = point_in_bounds(xpt, ypt, xdim, ydim) & cond_pt
+                values = data[np.clip(ypt, 0, ydim - 1),
+                              np.clip(xpt, 0, xdim - 1)]
+                adv_field += np.where(cond, values*xwt*ywt, 0.)
+        adv_field[~cond_pt] = np.nan
+
+        adv_field = np.ma.masked_where(~np.isfinite(adv_field), adv_field)
+
+        # Cater for the special case where a timestep is 0
+        for index in np.flatnonzero(timesteps == 0):
+            adv_field[index] = original_data
+        return adv_field
+
+    def _get_grid_velocities(self, cube):
+        """
+        Check the input cube against the plugin velocities, and derive the
+        velocities in grid squares per second.
 
         Args:
             cube (iris.cube.Cube):
                 The 2D cube containing data to be advected
-            timestep (datetime.timedelta):
-                Advection time step
 
         Returns:
-            advected_cube (iris.cube.Cube):
-                New cube with updated time and extrapolated data.  New data
-                are filled with np.nan and masked where source data were
-                out of bounds (ie where data could not be advected from outside
-                the cube domain).
-
+            (tuple): tuple containing:
+                **grid_vel_x** (numpy.ndarray):
+                    Velocity in the x direction (in grid points per second)
+                **grid_vel_y** (numpy.ndarray):
+                    Velocity in the y direction (in grid points per second)
         """
         # check that the input cube has precisely two non-scalar dimension
         # coordinates (spatial x/y) and a scalar time coordinate
@@ -271,9 +345,26 @@ class AdvectField():
         if nan_count > 0:
             warnings.warn("input data contains unmasked NaNs")
 
-        # perform advection and create output cube
-        advected_data = self._advect_field(cube.data, grid_vel_x, grid_vel_y,
-                                           timestep.total_seconds())
+        return grid_vel_x, grid_vel_y
+
+    @staticmethod
+    def _update_time_coords(cube, advected_data, timestep):
+        """
+        Create a cube of advected data with the time coordinates updated to
+        describe the advected field.
+
+        Args:
+            cube (iris.cube.Cube):
+                The 2D cube containing the data that were advected
+            advected_data (numpy.ndarray or numpy.ma.MaskedArray):
+                2D array of advected data
+            timestep (datetime.timedelta):
+                Advection time step
+
+        Returns:
+            advected_cube (iris.cube.Cube):
+                New cube with updated time coordinates and advected data.
+        """
         advected_cube = cube.copy(data=advected_data)
 
         # increment output cube time and add a "forecast_period" coordinate
@@ -313,7 +404,21 @@ class AdvectField():
         except CoordinateNotFoundError:
             pass
         advected_cube.add_aux_coord(forecast_period_coord)
+        return advected_cube
 
+    def _update_attributes(self, advected_cube):
+        """
+        Update the attributes of the advected cube to describe a nowcast,
+        and amend the metadata as requested on initialisation.
+
+        Args:
+            advected_cube (iris.cube.Cube):
+                Cube of advected data
+
+        Returns:
+            advected_cube (iris.cube.Cube):
+                Cube of advected data with updated metadata
+        """
         # Modify the source attribute to describe the advected field as a
         # Nowcast
         if "institution" in advected_cube.attributes.keys():
@@ -326,6 +431,84 @@ class AdvectField():
         advected_cube = amend_metadata(advected_cube, **self.metadata_dict)
         return advected_cube
 
+    def process(self, cube, timestep):
+        """
+        Extrapolates input cube data and updates validity time.  The input
+        cube should have precisely two non-scalar dimension coordinates
+        (spatial x/y), and is expected to be in a projection such that grid
+        spacing is the same (or very close) at all points within the spatial
+        domain.  The input cube should also have a "time" coordinate.
+
+        Args:
+            cube (iris.cube.Cube):
+                The 2D cube containing data to be advected
+            timestep (datetime.timedelta):
+                Advection time step
+
+        Returns:
+            advected_cube (iris.cube.Cube):
+                New cube with updated time and extrapolated data.  New data
+                are filled with np.nan and masked where source data were
+                out of bounds (ie where data could not be advected from outside
+                the cube domain).
+
+        """
+        grid_vel_x, grid_vel_y = self._get_grid_velocities(cube)
+
+        # perform advection and create output cube
+        advected_data = self._advect_field(cube.data, grid_vel_x, grid_vel_y,
+                                           timestep.total_seconds())
+        advected_cube = self._update_time_coords(cube, advected_data, timestep)
+        advected_cube = self._update_attributes(advected_cube)
+        return advected_cube
+
+    def process_multiple(self, cube, timesteps, processes=1):
+        """
+        Extrapolates input cube data to a number of time steps at once.  The
+        source grids for all the time steps are calculated together, rather
+        than once per call to process.  The input cube requirements are the
+        same as for process.
+
+        Args:
+            cube (iris.cube.Cube):
+                The 2D cube containing data to be advected
+            timesteps (list of datetime.timedelta):
+                Advection time steps
+            processes (int):
+                Number of processes over which to share the time steps. If 1,
+                all the time steps are advected in the current process.
+
+        Returns:
+            advected_cube (iris.cube.Cube):
+                New cube with a leading time dimension containing the
+                extrapolated data for each of the time steps.  New data are
+                filled with np.nan and masked where source data were out of
+                bounds.
+        """
+        grid_vel_x, grid_vel_y = self._get_grid_velocities(cube)
+        seconds = [timestep.total_seconds() for timestep in timesteps]
+
+        if processes > 1:
+            chunks = [chunk for chunk in np.array_split(seconds, processes)
+                      if chunk.size > 0]
+            with Pool(processes) as pool:
+                advected_chunks = pool.starmap(
+                    self._advect_field_multiple,
+                    [(cube.data, grid_vel_x, grid_vel_y, chunk)
+                     for chunk in chunks])
+            advected_data = np.ma.concatenate(advected_chunks)
+        else:
+            advected_data = self._advect_field_multiple(
+                cube.data, grid_vel_x, grid_vel_y, seconds)
+
+        advected_cubes = iris.cube.CubeList(
+            [self._update_time_coords(cube, data, timestep)
+             for data, timestep in zip(advected_data, timesteps)])
+        advected_cube = advected_cubes.merge_cube()
+        if not advected_cube.coord_dims("time"):
+            advected_cube = iris.util.new_axis(advected_cube, "time")
+        return self._update_attributes(advected_cube)
+
 
 class CreateExtrapolationForecast():
     """
@@ -421,3 +604,37 @@ class CreateExtrapolationForecast():
                 forecast_cube, self.orographic_enhancement_cube)
 
         return forecast_cube
+
+    def extrapolate_multiple(self, leadtimes_minutes, processes=1):
+        """
+        Produce new forecast cubes for a number of lead times at once.  The
+        advection is performed for all lead times together, and then the
+        orographic enhancement is reapplied to each forecast if it is
+        supplied.
+
+        Args:
+            leadtimes_minutes (list of float):
+                The forecast leadtimes we want to generate forecasts for
+                in minutes.
+            processes (int):
+                Number of processes over which to share the advection of the
+                lead times.
+
+        Returns:
+            forecast_cubes (iris.cube.CubeList):
+                List of 2D forecast cubes, one for each lead time, with data
+                as described for extrapolate.
+        """
+        # cast to float as datetime.timedelta cannot accept np.int
+        timesteps = [datetime.timedelta(minutes=float(leadtime))
+                     for leadtime in leadtimes_minutes]
+        forecast_cube = self.advection_plugin.process_multiple(
+            self.input_cube, timesteps, processes=processes)
+        forecast_cubes = iris.cube.CubeList(
+            forecast_cube.slices_over("time"))
+        if self.orographic_enhancement_cube:
+            # Add orographic enhancement.
+            forecast_cubes = ApplyOrographicEnhancement("add").process(
+                forecast_cubes, self.orographic_enhancement_cube)
+
+        return forecast_cubes
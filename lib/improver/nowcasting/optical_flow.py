@@ -251,20 +251,52 @@ class OpticalFlow(object):
 
         """
         boxes = []
-        weights = []
-        weighting_factor = 0.5 / self.boxsize**2.
         for i in range(0, field.shape[0], self.boxsize):
             for j in range(0, field.shape[1], self.boxsize):
                 boxes.append(field[i:i+self.boxsize, j:j+self.boxsize])
-                weight = weighting_factor*(
-                    (self.data1[i:i+self.boxsize, j:j+self.boxsize]).sum() +
-                    (self.data2[i:i+self.boxsize, j:j+self.boxsize]).sum())
-                weight = 1. - np.exp(-1.*weight/0.8)
-                weights.append(weight)
-        weights = np.array(weights, dtype=np.float32)
-        weights[weights < 0.01] = 0
+        weights = self._calculate_box_weights().flatten()
         return boxes, weights
 
+    def _sum_over_subboxes(self, field):
+        """
+        Sum the input field over each of the non-overlapping "boxes" of size
+        self.boxsize**2 used by _make_subboxes.  The field is padded with
+        zeros to a multiple of "boxsize", so that the sums over the final
+        boxes only include the points within the field.
+
+        Args:
+            field (numpy.ndarray):
+                2D input field
+
+        Returns:
+            box_sums (numpy.ndarray):
+                2D array of the sum of the field over each box, on the box
+                grid
+        """
+        nboxes_y = int((field.shape[0]-1)/self.boxsize) + 1
+        nboxes_x = int((field.shape[1]-1)/self.boxsize) + 1
+        padded = np.zeros((nboxes_y*self.boxsize, nboxes_x*self.boxsize),
+                          dtype=field.dtype)
+        padded[:field.shape[0], :field.shape[1]] = field
+        return padded.reshape(nboxes_y, self.boxsize,
+                              nboxes_x, self.boxsize).sum(axis=(1, 3))
+
+    def _calculate_box_weights(self):
+        """
+        Calculate the weight of each box based on the data values at times 1
+        and 2, as described in _make_subboxes.
+
+        Returns:
+            weights (numpy.ndarray):
+                2D array of weights on the box grid
+        """
+        weighting_factor = 0.5 / self.boxsize**2.
+        weights = weighting_factor*(self._sum_over_subboxes(self.data1) +
+                                    self._sum_over_subboxes(self.data2))
+        weights = (1. - np.exp(-1.*weights/0.8)).astype(np.float32)
+        weights[weights < 0.01] = 0
+        return weights
+
     def _box_to_grid(self, box_data):
         """
         Regrids calculated displacements from "box grid" (on which OFC
@@ -472,6 +504,53 @@ class OpticalFlow(object):
             velocity = -m_inverted.dot(scale)[:, 0]
         return velocity
 
+    def _solve_for_uv_by_box(self, partial_dx, partial_dy, partial_dt):
+        """
+        Solve the equations for u and v, as in solve_for_uv, for all the
+        boxes at once.  The 2x2 normal equations for each box are formed from
+        sums of products of the derivatives over the box, and are then
+        inverted directly.  Where the normal equations are singular, the
+        displacements are set to 0.
+
+        Args:
+            partial_dx (numpy.ndarray):
+                2D array of partial input field derivatives d/dx
+            partial_dy (numpy.ndarray):
+                2D array of partial input field derivatives d/dy
+            partial_dt (numpy.ndarray):
+                2D array of partial input field derivatives d/dt
+
+        Returns:
+            (tuple) : tuple containing:
+                **umat** (numpy.ndarray):
+                    2D array of displacements in the x-direction on the box
+                    grid
+                **vmat** (numpy.ndarray):
+                    2D array of displacements in the y-direction on the box
+                    grid
+        """
+        # The derivatives must be float64 in order to work OK.
+        deriv_x = partial_dx.astype(np.float64)
+        deriv_y = partial_dy.astype(np.float64)
+        deriv_t = partial_dt.astype(np.float64)
+
+        sum_xx = self._sum_over_subboxes(deriv_x*deriv_x)
+        sum_xy = self._sum_over_subboxes(deriv_x*deriv_y)
+        sum_yy = self._sum_over_subboxes(deriv_y*deriv_y)
+        sum_xt = self._sum_over_subboxes(deriv_x*deriv_t)
+        sum_yt = self._sum_over_subboxes(deriv_y*deriv_t)
+
+        determinant = sum_xx*sum_yy - sum_xy*sum_xy
+        invertible = determinant != 0
+        # Avoid division by zero for boxes that are not invertible, whose
+        # velocities are set to zero below.
+        determinant[~invertible] = 1.
+        umat = -(sum_yy*sum_xt - sum_xy*sum_yt) / determinant
+        vmat = -(sum_xx*sum_yt - sum_xy*sum_xt) / determinant
+        umat[~invertible] = 0
+        vmat[~invertible] = 0
+        return umat.astype(np.float32), vmat.astype(np.float32)
+
     @staticmethod
     def extreme_value_check(umat, vmat, weights):
         """
@@ -514,41 +593,19 @@ class OpticalFlow(object):
                     2D array of displacements in the y-direction
         """
 
-        # (a) Generate lists of subboxes over which velocity is constant
-        dx_boxed, box_weights = self._make_subboxes(partial_dx)
-        dy_boxed, _ = self._make_subboxes(partial_dy)
-        dt_boxed, _ = self._make_subboxes(partial_dt)
-
-        # (b) Solve optical flow displacement calculation on each subbox
-        velocity = ([], [])
-        for deriv_x, deriv_y, deriv_t in zip(dx_boxed, dy_boxed, dt_boxed):
-
-            # Flatten arrays to create the system of linear simultaneous
-            # equations to solve for this subbox
-            deriv_x = deriv_x.flatten()
-            deriv_y = deriv_y.flatten()
-            deriv_t = deriv_t.flatten()
-            # deriv_xy must be float64 in order to work OK.
-            deriv_xy = (
-                np.array([deriv_x, deriv_y], dtype=np.float64)).transpose()
-
-            # Solve equations for u and v through matrix inversion
-            u, v = self.solve_for_uv(deriv_xy, deriv_t)
-            velocity[0].append(u)
-            velocity[1].append(v)
-
-        # (c) Reshape displacement arrays to match array of subbox points
-        newshape = [int((self.shape[0]-1)/self.boxsize) + 1,
-                    int((self.shape[1]-1)/self.boxsize) + 1]
-        umat = np.array(velocity[0], dtype=np.float32).reshape(newshape)
-        vmat = np.array(velocity[1], dtype=np.float32).reshape(newshape)
-        weights = box_weights.reshape(newshape)
-
-        # (d) Check for extreme advection displacements (over a significant
+        # (a) Calculate weights for the subboxes over which velocity is
+        #     constant
+        weights = self._calculate_box_weights()
+
+        # (b) Solve optical flow displacement calculation on all subboxes
+        umat, vmat = self._solve_for_uv_by_box(
+            partial_dx, partial_dy, partial_dt)
+
+        # (c) Check for extreme advection displacements (over a significant
         #     proportion of the domain size) and set to zero
         self.extreme_value_check(umat, vmat, weights)
 
-        # (e) smooth and reshape displacement arrays to match input data grid
+        # (d) smooth and reshape displacement arrays to match input data grid
         umat = self._smooth_advection_fields(umat, weights)
         vmat = self._smooth_advection_fields(vmat, weights)
 
@@ -64,7 +64,7 @@ class OrographicEnhancement:
             and Planetary Sciences, 33, 645-671.
     """
 
-    def __init__(self):
+    def __init__(self, max_rows_per_chunk=None):
         """
         Initialise the plugin with thresholds from STEPS code.  Usage as
         follows:
@@ -89,6 +89,13 @@ class OrographicEnhancement:
         Create placeholder class members for regridded variable cubes
         (orography, temperature, humidity, pressure and wind components),
         saturation vapour pressure, V.gradZ (uplift) array and grid spacing.
+
+        Args:
+            max_rows_per_chunk (int or None):
+                Maximum number of grid rows for which the upstream
+                contributions are calculated at once.  This bounds the memory
+                used by the 3D arrays of upstream source points.  If None,
+                all rows are calculated at once.
         """
         self.orog_thresh_m = 20.
         self.rh_thresh_ratio = 0.8
@@ -97,6 +104,7 @@ class OrographicEnhancement:
         self.upstream_range_of_influence_km = 15.
         self.cloud_lifetime_s = 102.
         self.efficiency_factor = 0.23265
+        self.max_rows_per_chunk = max_rows_per_chunk
 
         # initialise class members to store regridded variables for
         # orographic enhancement calculation
@@ -324,18 +332,20 @@ class OrographicEnhancement:
         max_roi = (upstream_roi * max_sin_cos).astype(int)
 
         length = np.amax(max_roi)
-        shape = (length, wind_speed.shape[0], wind_speed.shape[1])
-        distance = np.full(shape, np.nan, dtype=np.float32)
-        for y in range(distance.shape[1]):
-            for x in range(distance.shape[2]):
-                distance[:max_roi[y, x], y, x] = (
-                    np.arange(max_roi[y, x]) / max_sin_cos[y, x])
+        steps = np.arange(length).reshape(length, 1, 1)
+        in_range = steps < max_roi
+
+        # points with no upstream range of influence may have a max_sin_cos
+        # of zero, but are set to np.nan below
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = np.where(in_range, steps / max_sin_cos,
+                                np.nan).astype(np.float32)
 
         return distance
 
     @staticmethod
     def _locate_source_points(
-            wind_speed, distance, sin_wind_dir, cos_wind_dir):
+            wind_speed, distance, sin_wind_dir, cos_wind_dir, rows=None):
         """
         Generate 3D arrays of source points from which to add upstream
         orographic enhancement contribution.  Assumes spatial coordinate
@@ -343,13 +353,17 @@ class OrographicEnhancement:
 
         Args:
             wind_speed (numpy.ndarray):
-                2D array of wind speed magnitudes
+                2D array of wind speed magnitudes over the full domain
             distance (numpy.ndarray):
                 3D array of grid point source-to-destination distances
             sin_wind_dir (numpy.ndarray):
                 2D array of sin wind direction wrt grid north
             cos_wind_dir (numpy.ndarray):
                 2D array of cos wind direction wrt grid north
+            rows (slice or None):
+                Rows of the full domain for which distance, sin_wind_dir
+                and cos_wind_dir are provided.  If None, these arrays cover
+                the full domain.
 
         Returns:
             (tuple): tuple containing:
@@ -358,8 +372,10 @@ class OrographicEnhancement:
                 **y_source** (numpy.ndarray):
                     3D array of source point y-coordinates
         """
+        if rows is None:
+            rows = slice(0, wind_speed.shape[0])
         xpos, ypos = np.meshgrid(np.arange(wind_speed.shape[1]),
-                                 np.arange(wind_speed.shape[0]))
+                                 np.arange(wind_speed.shape[0])[rows])
         x_source = np.around(xpos - np.multiply(distance,
                                                 sin_wind_dir)).astype(int)
         y_source = np.around(ypos - np.multiply(distance,
@@ -404,10 +420,7 @@ class OrographicEnhancement:
                 **sum_of_weights** (numpy.ndarray):
                     2D array containing weights for normalisation
         """
-        source_values = np.fromiter(
-            (point_orogenh[y, x] for (x, y) in zip(x_source.flatten(),
-                                                   y_source.flatten())),
-            np.float32, count=x_source.size).reshape(x_source.shape)
+        source_values = point_orogenh[y_source, x_source].astype(np.float32)
 
         # set standard deviation for Gaussian weighting function in grid
         # squares
@@ -453,16 +466,30 @@ class OrographicEnhancement:
         max_sin_cos = np.where(abs(sin_wind_dir) > abs(cos_wind_dir),
                                abs(sin_wind_dir), abs(cos_wind_dir))
 
-        # generate 3D array of distances to source points
-        distance = self._get_point_distances(wind_speed, max_sin_cos)
-
-        # calculate positions of source points
-        x_source, y_source = self._locate_source_points(
-            wind_speed, distance, sin_wind_dir, cos_wind_dir)
-
-        # compute weighted enhancements summed over all source points
-        orogenh, sum_of_weights = self._compute_weighted_values(
-            point_orogenh, x_source, y_source, distance, wind_speed)
+        orogenh_chunks = []
+        sum_of_weights_chunks = []
+        nrows = wind_speed.shape[0]
+        chunk_size = self.max_rows_per_chunk or nrows
+        for start in range(0, nrows, chunk_size):
+            rows = slice(start, min(start + chunk_size, nrows))
+
+            # generate 3D array of distances to source points
+            distance = self._get_point_distances(
+                wind_speed[rows], max_sin_cos[rows])
+
+            # calculate positions of source points
+            x_source, y_source = self._locate_source_points(
+                wind_speed, distance, sin_wind_dir[rows], cos_wind_dir[rows],
+                rows=rows)
+
+            # compute weighted enhancements summed over all source points
+            orogenh, sum_of_weights = self._compute_weighted_values(
+                point_orogenh, x_source, y_source, distance, wind_speed[rows])
+            orogenh_chunks.append(orogenh)
+            sum_of_weights_chunks.append(sum_of_weights)
+
+        orogenh = np.concatenate(orogenh_chunks)
+        sum_of_weights = np.concatenate(sum_of_weights_chunks)
 
         # normalise by weights and scale by efficiency factor
         orogenh[mask] = self.efficiency_factor * np.divide(
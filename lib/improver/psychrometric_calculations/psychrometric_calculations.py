@@ -34,6 +34,7 @@ import warnings
 
 import iris
 import numpy as np
+import scipy.ndimage
 from cf_units import Unit
 from scipy.interpolate import griddata
 from scipy.spatial.qhull import QhullError
@@ -208,24 +209,29 @@ class Utilities(object):
         WetBulbTemperature.check_range(temperature, 173., 373.)
 
         data = temperature.data.copy()
-        for cell in np.nditer(data, op_flags=['readwrite']):
-            if cell > triple_pt:
-                n0 = constants[1] * (1. - triple_pt / cell)
-                n1 = constants[2] * np.log10(cell / triple_pt)
-                n2 = constants[3] * (1. - np.power(10.,
-                                                   (constants[4] *
-                                                    (cell / triple_pt - 1.))))
-                n3 = constants[5] * (np.power(10., (constants[6] *
-                                                    (1. - triple_pt / cell))) -
-                                     1.)
-                log_es = n0 - n1 + n2 + n3 + constants[7]
-                cell[...] = (np.power(10., log_es))
-            else:
-                n0 = constants[8] * ((triple_pt / cell) - 1.)
-                n1 = constants[9] * np.log10(triple_pt / cell)
-                n2 = constants[10] * (1. - (cell / triple_pt))
-                log_es = n0 - n1 + n2 + constants[11]
-                cell[...] = (np.power(10., log_es))
+        temperatures = np.ma.getdata(data).astype(np.float64)
+        log_es = np.empty_like(temperatures)
+
+        # Saturation with respect to water above the triple point.
+        above = temperatures > triple_pt
+        cell = temperatures[above]
+        n0 = constants[1] * (1. - triple_pt / cell)
+        n1 = constants[2] * np.log10(cell / triple_pt)
+        n2 = constants[3] * (1. - np.power(10., (constants[4] *
+                                                 (cell / triple_pt - 1.))))
+        n3 = constants[5] * (np.power(10., (constants[6] *
+                                            (1. - triple_pt / cell))) - 1.)
+        log_es[above] = n0 - n1 + n2 + n3 + constants[7]
+
+        # Saturation with respect to ice at or below the triple point.
+        below = ~above
+        cell = temperatures[below]
+        n0 = constants[8] * ((triple_pt / cell) - 1.)
+        n1 = constants[9] * np.log10(triple_pt / cell)
+        n2 = constants[10] * (1. - (cell / triple_pt))
+        log_es[below] = n0 - n1 + n2 + constants[11]
+
+        np.ma.getdata(data)[...] = np.power(10., log_es)
 
         # Create SVP cube
         svp = iris.cube.Cube(
@@ -243,13 +249,16 @@ class WetBulbTemperature(object):
     iterator, with saturated vapour pressures drawn from a lookup table using
     linear interpolation.
 
-    The svp_table used in this plugin is imported (see top of file). It is a
-    table of saturated vapour pressures calculated for a range of temperatures.
-    The import also brings in attributes that describe the range of
-    temperatures covered by the table and the increments in the table.
+    By default the svp_table used in this plugin is imported (see top of
+    file). It is a table of saturated vapour pressures calculated for a range
+    of temperatures. The import also brings in attributes that describe the
+    range of temperatures covered by the table and the increments in the
+    table. Alternatively a table generated by the
+    utilities.ancillary_creation SaturatedVapourPressureTable plugin, e.g. at
+    a finer temperature increment, can be provided.
 
     """
-    def __init__(self, precision=0.005):
+    def __init__(self, precision=0.005, svp_table_cube=None):
         """
         Initialise class.
 
@@ -257,8 +266,25 @@ class WetBulbTemperature(object):
             precision (float):
                 The precision to which the Newton iterator must converge before
                 returning wet bulb temperatures.
+            svp_table_cube (iris.cube.Cube or None):
+                A saturated vapour pressure table (Pa) created by the
+                SaturatedVapourPressureTable plugin, to be used in place of
+                the default svp_table.
         """
         self.precision = precision
+        if svp_table_cube is None:
+            self.svp_data = svp_table.DATA
+            self.t_min = svp_table.T_MIN
+            self.t_max = svp_table.T_MAX
+            self.t_increment = svp_table.T_INCREMENT
+        else:
+            svp_table_cube = svp_table_cube.copy()
+            svp_table_cube.convert_units('Pa')
+            self.svp_data = svp_table_cube.data
+            self.t_min = svp_table_cube.attributes['minimum_temperature']
+            self.t_max = svp_table_cube.attributes['maximum_temperature']
+            self.t_increment = (
+                svp_table_cube.attributes['temperature_increment'])
 
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
@@ -297,7 +323,8 @@ class WetBulbTemperature(object):
         Looks up a value for the saturation vapour pressure of water vapour
         using the temperature and a table of values. These tabulated values
         have been calculated using the utilities.ancillary_creation
-        SaturatedVapourPressureTable plugin that uses the Goff-Gratch method.
+        SaturatedVapourPressureTable plugin that uses the Goff-Gratch method,
+        either in advance (the default svp_table) or at initialisation.
 
         Args:
             temperature (iris.cube.Cube):
@@ -306,12 +333,12 @@ class WetBulbTemperature(object):
             svp (iris.cube.Cube):
                 A cube of saturated vapour pressures (Pa).
         """
-        # We subtract T_INCREMENT from T_MAX to get the upper bound to which we
-        # clip input temperatures. This ensures that we do not attempt an
-        # interpolation that requires a value beyond the SVP table maximum.
-        T_max = svp_table.T_MAX - svp_table.T_INCREMENT
-        T_min = svp_table.T_MIN
-        delta_T = svp_table.T_INCREMENT
+        # We subtract the increment from the maximum to get the upper bound to
+        # which we clip input temperatures. This ensures that we do not attempt
+        # an interpolation that requires a value beyond the SVP table maximum.
+        T_max = self.t_max - self.t_increment
+        T_min = self.t_min
+        delta_T = self.t_increment
         self.check_range(temperature, T_min, T_max)
         temperatures = temperature.data
         T_clipped = np.clip(temperatures, T_min, T_max)
@@ -321,8 +348,8 @@ class WetBulbTemperature(object):
         table_position = (T_clipped - T_min + delta_T)/delta_T - 1.
         table_index = table_position.astype(int)
         interpolation_factor = table_position - table_index
-        svps = ((1.0 - interpolation_factor) * svp_table.DATA[table_index] +
-                interpolation_factor * svp_table.DATA[table_index + 1])
+        svps = ((1.0 - interpolation_factor) * self.svp_data[table_index] +
+                interpolation_factor * self.svp_data[table_index + 1])
 
         svp = temperature.copy(data=svps)
         svp.units = Unit('Pa')
@@ -527,7 +554,7 @@ class WetBulbTemperatureIntegral(object):
 
     def __init__(self, precision=0.005, coord_name_to_integrate="height",
                  start_point=None, end_point=None,
-                 direction_of_integration="negative"):
+                 direction_of_integration="negative", svp_table_cube=None):
         """
         Initialise class.
 
@@ -552,9 +579,13 @@ class WetBulbTemperatureIntegral(object):
                 increasing as the array index increases.
                 'negative' corresponds to the values within the array
                 decreasing as the array index increases.
+            svp_table_cube (iris.cube.Cube or None):
+                A saturated vapour pressure table to be used by the
+                WetBulbTemperature plugin in place of the default svp_table.
         """
         self.wet_bulb_temperature_plugin = (
-            WetBulbTemperature(precision=precision))
+            WetBulbTemperature(precision=precision,
+                               svp_table_cube=svp_table_cube))
         self.integration_plugin = Integration(
             coord_name_to_integrate, start_point=start_point,
             end_point=end_point,
@@ -612,7 +643,8 @@ class FallingSnowLevel(object):
     """Calculate a field of continuous falling snow level."""
 
     def __init__(self, precision=0.005, falling_level_threshold=90.0,
-                 grid_point_radius=2):
+                 grid_point_radius=2, svp_table_cube=None,
+                 fill_method='griddata'):
         """
         Initialise class.
 
@@ -630,11 +662,34 @@ class FallingSnowLevel(object):
                 The radius in grid points used to calculate the maximum
                 height of the orography in a neighbourhood as part of this
                 calculation.
+            svp_table_cube (iris.cube.Cube or None):
+                A saturated vapour pressure table to be used by the
+                WetBulbTemperature plugin in place of the default svp_table.
+            fill_method (str):
+                The method used to fill in the remaining gaps in the snow
+                falling level by horizontal interpolation.
+                "griddata" (default) uses linear and then nearest neighbour
+                interpolation with scipy.interpolate.griddata over the whole
+                grid.
+                "nearest" sets each gap to the value of the nearest valid
+                point, found using a distance transform of the grid. This is
+                much faster than "griddata" for large gaps, but does not
+                interpolate linearly between the valid points.
+
+        Raises:
+            ValueError: If the fill_method is not recognised.
 
         """
+        fill_methods = ['griddata', 'nearest']
+        if fill_method not in fill_methods:
+            msg = ('Invalid option for keyword fill_method ({}), '
+                   'expected one of {}'.format(fill_method, fill_methods))
+            raise ValueError(msg)
+        self.fill_method = fill_method
         self.precision = precision
         self.wet_bulb_integral_plugin = (
-            WetBulbTemperatureIntegral(precision=precision))
+            WetBulbTemperatureIntegral(precision=precision,
+                                       svp_table_cube=svp_table_cube))
         self.falling_level_threshold = falling_level_threshold
         self.missing_data = -300.0
         self.grid_point_radius = grid_point_radius
@@ -643,10 +698,11 @@ class FallingSnowLevel(object):
         """Represent the configured plugin instance as a string."""
         result = ('<FallingSnowLevel: precision:'
                   '{}, falling_level_threshold:{}, '
-                  'grid_point_radius: {}>'.format(
+                  'grid_point_radius: {}, fill_method: {}>'.format(
                       self.precision,
                       self.falling_level_threshold,
-                      self.grid_point_radius))
+                      self.grid_point_radius,
+                      self.fill_method))
         return result
 
     def find_falling_level(self, wb_int_data, orog_data, height_points):
@@ -923,43 +979,20 @@ class FallingSnowLevel(object):
                                              sea_points)
 
     @staticmethod
-    def fill_in_by_horizontal_interpolation(
-            snow_level_data, max_in_nbhood_orog, orog_data):
+    def _fill_by_griddata_interpolation(snow_level_data, max_in_nbhood_orog):
         """
-        Fill in any remaining unset areas in the snow falling level by using
-        linear horizontal interpolation across the grid. As snow falling levels
-        at the highest height levels will be filled in by this point any
-        points that still don't have a valid snow falling level have the snow
-        falling level at or below the surface orography.
-        This function uses the following steps to help ensure that the filled
-        in values are above or below the orography:
-
-        1. Fill in the snow-level for points with no value yet
-           set using horizontal interpolation from surrounding set points.
-           Only interpolate from surrounding set points at which the snow
-           falling level is below the maximum orography height in the region
-           around the unset point. This helps us avoid spreading very high
-           snow falling levels across areas where we had missing data.
-        2. Fill any gaps that still remain where the linear interpolation has
-           not been able to find a value because there is not enough
-           data (e.g at the corners of the domain). Use nearest neighbour
-           interpolation.
-        3. Check whether despite our efforts we have still filled in some
-           of the missing points with snow falling levels above the orography.
-           In these cases set the missing points to the height of orography.
-
-        We then return the filled in array, which hopefully has no more
-        missing data.
+        Fill in the snow falling level for a single y-x slice using linear
+        interpolation from the valid points with scipy.interpolate.griddata,
+        then nearest neighbour interpolation for any points, such as those at
+        the corners of the domain, that the linear interpolation cannot
+        reach.
 
         Args:
             snow_level_data (numpy.ndarray):
-                The snow falling level array, filled with values for points
-                whose wet bulb temperature integral crossed the theshold.
+                The 2D snow falling level array.
             max_in_nbhood_orog (numpy.ndarray):
-                The array containing maximum of the orography field in
+                The 2D array containing maximum of the orography field in
                 a given radius.
-            orog_data(numpy.data):
-                The array containing the orography data.
         Returns:
             snow_filled (numpy.ndarray):
                 The snow falling level array with missing data filled by
@@ -1000,10 +1033,94 @@ class FallingSnowLevel(object):
                     np.where(index), values, (y_points, x_points),
                     method='nearest')
                 snow_filled = snow_level_data_updated_2
+        return snow_filled
+
+    @staticmethod
+    def _fill_by_nearest_interpolation(snow_level_data, max_in_nbhood_orog):
+        """
+        Fill in the snow falling level for a single y-x slice by setting each
+        point to the value of the nearest valid point, found using a
+        Euclidean distance transform of the grid. This is the nearest
+        neighbour fill that the griddata method uses for points that the
+        linear interpolation cannot reach, applied to every point. The cost
+        of the distance transform grows linearly with the size of the grid,
+        rather than with the size of a triangulation of the valid points.
+
+        Args:
+            snow_level_data (numpy.ndarray):
+                The 2D snow falling level array.
+            max_in_nbhood_orog (numpy.ndarray):
+                The 2D array containing maximum of the orography field in
+                a given radius.
+        Returns:
+            snow_filled (numpy.ndarray):
+                The snow falling level array with missing data filled by
+                horizontal interpolation. If there are no valid points, the
+                array is returned unchanged.
+        """
+        index = np.isfinite(snow_level_data)
+        index[index] = snow_level_data[index] <= max_in_nbhood_orog[index]
+        if not np.any(index):
+            return snow_level_data
+        nearest_points = scipy.ndimage.distance_transform_edt(
+            ~index, return_distances=False, return_indices=True)
+        return snow_level_data[tuple(nearest_points)]
+
+    def fill_in_by_horizontal_interpolation(
+            self, snow_level_data, max_in_nbhood_orog, orog_data):
+        """
+        Fill in any remaining unset areas in the snow falling level by using
+        horizontal interpolation across the grid. As snow falling levels
+        at the highest height levels will be filled in by this point any
+        points that still don't have a valid snow falling level have the snow
+        falling level at or below the surface orography.
+        This function uses the following steps to help ensure that the filled
+        in values are above or below the orography:
+
+        1. Fill in the snow-level for points with no value yet
+           set using horizontal interpolation from surrounding set points.
+           Only interpolate from surrounding set points at which the snow
+           falling level is below the maximum orography height in the region
+           around the unset point. This helps us avoid spreading very high
+           snow falling levels across areas where we had missing data.
+           The interpolation uses the method set by self.fill_method.
+        2. Check whether despite our efforts we have still filled in some
+           of the missing points with snow falling levels above the orography.
+           In these cases set the missing points to the height of orography.
+
+        We then return the filled in array, which hopefully has no more
+        missing data.
+
+        Args:
+            snow_level_data (numpy.ndarray):
+                The snow falling level array, filled with values for points
+                whose wet bulb temperature integral crossed the theshold.
+                The y and x dimensions must be the trailing dimensions, and
+                each y-x slice (e.g. each realization) is filled in
+                separately.
+            max_in_nbhood_orog (numpy.ndarray):
+                The 2D array containing maximum of the orography field in
+                a given radius.
+            orog_data(numpy.data):
+                The 2D array containing the orography data.
+        Returns:
+            snow_filled (numpy.ndarray):
+                The snow falling level array with missing data filled by
+                horizontal interpolation.
+        """
+        if self.fill_method == 'nearest':
+            fill_function = self._fill_by_nearest_interpolation
+        else:
+            fill_function = self._fill_by_griddata_interpolation
+        snow_filled = np.empty_like(snow_level_data)
+        for index in np.ndindex(snow_level_data.shape[:-2]):
+            snow_filled[index] = fill_function(
+                snow_level_data[index], max_in_nbhood_orog)
 
         # Set the snow falling level at any points that have been filled with
         # snow falling levels that are above the orography back to the
         # height of the orography.
+        orog_data = np.broadcast_to(orog_data, snow_filled.shape)
         index = (~np.isfinite(snow_level_data))
         snow_level_above_orog = (snow_filled[index] > orog_data[index])
         index[index] = snow_level_above_orog
@@ -1100,15 +1217,16 @@ class FallingSnowLevel(object):
             self.fill_in_sea_points(
                 snow_cube.data, land_sea_data, wb_integral.data.max(axis=0),
                 wet_bulb_temp.data,  heights)
-            max_nbhood_orog = self.find_max_in_nbhood_orography(orography)
-            updated_snow_level = self.fill_in_by_horizontal_interpolation(
-                snow_cube.data, max_nbhood_orog.data, orog_data)
-            points = np.where(~np.isfinite(snow_cube.data))
-            snow_cube.data[points] = updated_snow_level[points]
-            # Fill in any remaining points with missing data:
-            remaining_points = np.where(np.isnan(snow_cube.data))
-            snow_cube.data[remaining_points] = self.missing_data
             snow.append(snow_cube)
 
         falling_snow_level = snow.merge_cube()
+        # Fill in the remaining missing data for all slices at once.
+        max_nbhood_orog = self.find_max_in_nbhood_orography(orography)
+        updated_snow_level = self.fill_in_by_horizontal_interpolation(
+            falling_snow_level.data, max_nbhood_orog.data, orog_data)
+        points = ~np.isfinite(falling_snow_level.data)
+        falling_snow_level.data[points] = updated_snow_level[points]
+        # Fill in any remaining points with missing data:
+        remaining_points = np.isnan(falling_snow_level.data)
+        falling_snow_level.data[remaining_points] = self.missing_data
         return falling_snow_level
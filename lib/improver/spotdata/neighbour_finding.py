@@ -31,6 +31,8 @@
 
 """Neighbour finding for the Improver site specific process chain."""
 
+import glob
+import os
 import warnings
 
 import cartopy.crs as ccrs
@@ -39,7 +41,8 @@ from scipy.spatial import cKDTree
 
 from improver.spotdata.build_spotdata_cube import build_spotdata_cube
 from improver.utilities.cube_manipulation import enforce_coordinate_ordering
-from improver.utilities.cube_metadata import create_coordinate_hash
+from improver.utilities.cube_metadata import (
+    create_coordinate_hash, generate_hash)
 
 
 class NeighbourSelection:
@@ -60,13 +63,31 @@ class NeighbourSelection:
     3. A combination of the above, where the land constraint is primary and out
        of available land points, the one with the minimal vertical displacement
        is chosen.
+
+    If a cache directory is provided, the inputs used to build the KDTree and
+    the arrays that make up the resulting neighbour cubes are stored on disk
+    as numpy .npz files, keyed by hashes of the model grid, the orography and
+    land mask data, the site list and the neighbour selection options.
+    Repeated calls with identical inputs then read the results from the cache
+    rather than recalculating them.
     """
 
+    # Incremented whenever the cached content changes, such that entries
+    # written by previous versions are not reused.
+    CACHE_VERSION = 2
+    # The names of the arrays stored in each type of cache entry.
+    CACHE_ARRAYS = {
+        'kdtree': ['nodes', 'index_nodes'],
+        'neighbours': ['data', 'altitude', 'latitude', 'longitude', 'wmo_id',
+                       'neighbour_selection_method_name',
+                       'grid_attributes_key', 'model_grid_hash']}
+
     def __init__(self, land_constraint=False, minimum_dz=False,
                  search_radius=1.0E4,
                  site_coordinate_system=ccrs.PlateCarree(),
                  site_x_coordinate='longitude', site_y_coordinate='latitude',
-                 node_limit=36):
+                 node_limit=36, n_jobs=1, cache_dir=None,
+                 max_cache_entries=None):
         """
         Args:
             land_constraint (bool):
@@ -93,6 +114,17 @@ class NeighbourSelection:
                 The upper limit for the number of nearest neighbours to return
                 when querying the tree for a selection of neighbours from which
                 one matching the minimum_dz constraint will be picked.
+            n_jobs (int):
+                The number of processes used to query the KDTree. This is
+                passed to the scipy cKDTree query method, where -1 uses all
+                available processors. Defaults to 1.
+            cache_dir (str or None):
+                Directory in which to cache the KDTree inputs and neighbour
+                cubes. If None, nothing is cached.
+            max_cache_entries (int or None):
+                The maximum number of entries to keep in the cache directory.
+                Once this is exceeded, the least recently used entries are
+                removed. If None, the number of entries is not limited.
         """
         self.minimum_dz = minimum_dz
         self.land_constraint = land_constraint
@@ -102,6 +134,9 @@ class NeighbourSelection:
         self.site_y_coordinate = site_y_coordinate
         self.site_altitude = 'altitude'
         self.node_limit = node_limit
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.max_cache_entries = max_cache_entries
         self.global_coordinate_system = False
 
     def __repr__(self):
@@ -227,11 +262,67 @@ class NeighbourSelection:
         site_y_coords = site_y_coords[domain_valid]
         return sites, site_coords, site_x_coords, site_y_coords
 
+    @staticmethod
+    def _nearest_indices_along_coord(coord, values):
+        """
+        Find the indices of the cells of a one dimensional coordinate that
+        are nearest to each of an array of values. This follows the
+        behaviour of the iris coordinate method nearest_neighbour_index, but
+        handles all the values at once by searching a sorted array of the
+        edges between neighbouring cells.
+
+        Where the coordinate has bounds, the edges are taken half way between
+        the bounds of neighbouring cells and a value lying on an edge is
+        assigned to the cell with the lower centre. Without bounds, the edges
+        are the midpoints between coordinate points and a value lying on an
+        edge is assigned to the point with the lowest index. Circular
+        coordinates are handled by wrapping the values onto the range of the
+        coordinate, such that the nearest cell may be found across the wrap.
+
+        Args:
+            coord (iris.coords.DimCoord):
+                A one dimensional coordinate to search.
+            values (numpy.ndarray):
+                An array of values for which the nearest cells are required.
+        Returns:
+            numpy.ndarray:
+                An array of the same shape as values containing the index of
+                the nearest cell of the coordinate to each value.
+        """
+        points = coord.points
+        if coord.has_bounds():
+            lower = coord.bounds.min(axis=1)
+            upper = coord.bounds.max(axis=1)
+            centres = 0.5 * (lower + upper)
+        else:
+            lower = upper = centres = points
+
+        order = np.argsort(centres, kind='mergesort')
+        lower, upper, centres = lower[order], upper[order], centres[order]
+
+        values = np.asarray(values)
+        if coord.circular and coord.units.modulus:
+            # Append the first cell shifted by the modulus, such that values
+            # wrapped onto the coordinate range can be nearest to it.
+            modulus = coord.units.modulus
+            values = centres[0] + np.mod(values - centres[0], modulus)
+            order = np.append(order, order[0])
+            lower = np.append(lower, lower[0] + modulus)
+            upper = np.append(upper, upper[0] + modulus)
+
+        edges = 0.5 * (upper[:-1] + lower[1:])
+        # For descending points the lowest index corresponds to the higher
+        # of two equidistant points, so ties must be resolved upwards.
+        side = 'left'
+        if not coord.has_bounds() and points[-1] < points[0]:
+            side = 'right'
+        return order[np.searchsorted(edges, values, side=side)]
+
     @staticmethod
     def get_nearest_indices(site_coords, cube):
         """
-        Uses the iris cube method nearest_neighbour_index to find the nearest
-        grid points to a site.
+        Find the nearest grid points to each site, searching the x and y
+        coordinates of the cube for all the sites at once.
 
         Args:
             site_coords (numpy.ndarray):
@@ -244,13 +335,13 @@ class NeighbourSelection:
                 A list of shape (n_sites, 2) that contains the x and y indices
                 of the nearest grid points to the sites.
         """
-        nearest_indices = np.zeros((len(site_coords), 2)).astype(np.int)
-        for index, (x_point, y_point) in enumerate(site_coords):
-            nearest_indices[index, 0] = (
-                cube.coord(axis='x').nearest_neighbour_index(x_point))
-            nearest_indices[index, 1] = (
-                cube.coord(axis='y').nearest_neighbour_index(y_point))
-        return nearest_indices
+        site_coords = np.asarray(site_coords).reshape(-1, 2)
+        nearest_indices = np.stack((
+            NeighbourSelection._nearest_indices_along_coord(
+                cube.coord(axis='x'), site_coords[:, 0]),
+            NeighbourSelection._nearest_indices_along_coord(
+                cube.coord(axis='y'), site_coords[:, 1])), axis=1)
+        return nearest_indices.astype(np.int)
 
     @staticmethod
     def geocentric_cartesian(cube, x_coords, y_coords):
@@ -284,11 +375,221 @@ class NeighbourSelection:
             coordinate_system, x_coords, y_coords, z_coords)
         return cartesian_nodes
 
+    def _cache_path(self, prefix, cache_key):
+        """
+        Return the path of the file in which a cache entry is stored.
+
+        Args:
+            prefix (str):
+                The type of entry, one of the keys of CACHE_ARRAYS.
+            cache_key (str):
+                The hash identifying the entry.
+        Returns:
+            (str):
+                Path of the cache file within the cache directory.
+        """
+        filename = '{}_{}.npz'.format(prefix, cache_key)
+        return os.path.join(self.cache_dir, filename)
+
+    def _read_cache(self, prefix, cache_key):
+        """
+        Read an entry from the cache. Reading an entry updates its
+        modification time, such that the least recently used entries are the
+        first to be evicted. The arrays are loaded without allowing pickled
+        objects, so that reading a cache entry cannot execute code.
+
+        Args:
+            prefix (str):
+                The type of entry, one of the keys of CACHE_ARRAYS.
+            cache_key (str):
+                The hash identifying the entry.
+        Returns:
+            (dict or None):
+                Dictionary of the cached arrays, keyed by the names given in
+                CACHE_ARRAYS, or None if no cache directory has been provided
+                or the entry could not be read.
+        """
+        if self.cache_dir is None:
+            return None
+        cache_path = self._cache_path(prefix, cache_key)
+        try:
+            with np.load(cache_path, allow_pickle=False) as cache_file:
+                cached = {name: cache_file[name]
+                          for name in self.CACHE_ARRAYS[prefix]}
+            os.utime(cache_path)
+        except Exception:
+            # Any entry that cannot be read, e.g. because it is missing,
+            # incomplete or was written in another format, is a cache miss.
+            return None
+        return cached
+
+    def _write_cache(self, prefix, cache_key, arrays):
+        """
+        Write an entry to the cache, then evict the least recently used
+        entries if there are more than max_cache_entries. The entry is
+        written to a temporary file which is then moved into place, so that
+        concurrent readers never encounter a partially written entry.
+
+        Args:
+            prefix (str):
+                The type of entry, one of the keys of CACHE_ARRAYS.
+            cache_key (str):
+                The hash identifying the entry.
+            arrays (dict):
+                Dictionary of the arrays to cache, keyed by the names given
+                in CACHE_ARRAYS.
+        """
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self._cache_path(prefix, cache_key)
+        temporary_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+        with open(temporary_path, 'wb') as cache_file:
+            np.savez(cache_file, **arrays)
+        os.replace(temporary_path, cache_path)
+        self._evict_cache_entries()
+
+    def _cache_entries(self):
+        """
+        List the entries in the cache directory.
+
+        Returns:
+            (list of str):
+                Paths of the cache files, ordered from the most to the least
+                recently used.
+        """
+        cache_paths = []
+        for prefix in self.CACHE_ARRAYS:
+            cache_paths.extend(glob.glob(self._cache_path(prefix, '*')))
+        return sorted(cache_paths, key=os.path.getmtime, reverse=True)
+
+    def _evict_cache_entries(self):
+        """
+        Remove the least recently used cache entries in excess of
+        max_cache_entries.
+        """
+        if self.max_cache_entries is None:
+            return
+        for cache_path in self._cache_entries()[self.max_cache_entries:]:
+            try:
+                os.remove(cache_path)
+            except FileNotFoundError:
+                # The entry has been removed by another process.
+                pass
+
+    def clear_cache(self):
+        """
+        Remove all the entries in the cache directory, such that subsequent
+        calls recalculate the KDTree inputs and neighbour cubes.
+        """
+        if self.cache_dir is None or not os.path.exists(self.cache_dir):
+            return
+        for cache_path in self._cache_entries():
+            os.remove(cache_path)
+
+    def _kdtree_cache_key(self, land_mask):
+        """
+        Generate the key identifying the cached KDTree inputs for a land
+        mask. This depends upon the grid and land mask data, whether the land
+        constraint is applied and whether the grid is global.
+
+        Args:
+            land_mask (iris.cube.Cube):
+                A land mask cube for the model/grid from which grid point
+                neighbours are being selected.
+        Returns:
+            (str):
+                A hash identifying the KDTree inputs.
+        """
+        return generate_hash([
+            self.CACHE_VERSION, create_coordinate_hash(land_mask),
+            land_mask.data, self.land_constraint,
+            self.global_coordinate_system])
+
+    def _neighbour_cache_key(self, sites, orography, land_mask):
+        """
+        Generate the key identifying a cached neighbour cube. This depends
+        upon the grid, the orography and land mask data, the site list and
+        all the options that affect the selection of neighbours.
+
+        Args:
+            sites (list of dict):
+                A list of dictionaries defining the spot sites for which
+                neighbours are to be found.
+            orography (iris.cube.Cube):
+                A cube of orography, used to obtain the grid point altitudes.
+            land_mask (iris.cube.Cube):
+                A land mask cube for the model/grid from which grid point
+                neighbours are being selected.
+        Returns:
+            (str):
+                A hash identifying the neighbour cube.
+        """
+        options = [
+            self.land_constraint, self.minimum_dz, self.search_radius,
+            self.site_coordinate_system.__class__.__name__,
+            sorted(self.site_coordinate_system.proj4_params.items()),
+            self.site_x_coordinate, self.site_y_coordinate, self.node_limit]
+        site_list = [sorted(site.items()) for site in sites]
+        return generate_hash([
+            self.CACHE_VERSION, create_coordinate_hash(orography),
+            orography.data, land_mask.data, site_list, options])
+
+    @staticmethod
+    def _neighbour_cube_to_arrays(neighbour_cube):
+        """
+        Extract the arrays needed to rebuild a neighbour cube, so that the
+        cube can be cached without pickling it.
+
+        Args:
+            neighbour_cube (iris.cube.Cube):
+                A neighbour cube, as returned by the process method.
+        Returns:
+            (dict):
+                Dictionary of the arrays, keyed by the names given in
+                CACHE_ARRAYS['neighbours'].
+        """
+        arrays = {'data': neighbour_cube.data,
+                  'model_grid_hash': np.array(
+                      neighbour_cube.attributes['model_grid_hash'])}
+        for name in ['altitude', 'latitude', 'longitude', 'wmo_id',
+                     'neighbour_selection_method_name',
+                     'grid_attributes_key']:
+            arrays[name] = neighbour_cube.coord(name).points
+        return arrays
+
+    @staticmethod
+    def _neighbour_cube_from_arrays(arrays):
+        """
+        Rebuild a neighbour cube from the arrays extracted by
+        _neighbour_cube_to_arrays.
+
+        Args:
+            arrays (dict):
+                Dictionary of the arrays, keyed by the names given in
+                CACHE_ARRAYS['neighbours'].
+        Returns:
+            neighbour_cube (iris.cube.Cube):
+                The neighbour cube.
+        """
+        neighbour_cube = build_spotdata_cube(
+            arrays['data'], 'grid_neighbours', 1, arrays['altitude'],
+            arrays['latitude'], arrays['longitude'],
+            arrays['wmo_id'].tolist(),
+            neighbour_methods=arrays[
+                'neighbour_selection_method_name'].tolist(),
+            grid_attributes=arrays['grid_attributes_key'].tolist())
+        neighbour_cube.attributes['model_grid_hash'] = str(
+            arrays['model_grid_hash'])
+        return neighbour_cube
+
     def build_KDTree(self, land_mask):
         """
         Build a KDTree for extracting the nearest point or points to a site.
         The tree can be built with a constrained set of grid points, e.g. only
-        land points, if required.
+        land points, if required. If a cache directory has been provided, the
+        nodes of the tree are read from the cache if available, and written to
+        it otherwise.
 
         Args:
             land_mask (iris.cube.Cube):
@@ -305,6 +606,13 @@ class NeighbourSelection:
                     e.g. node=100 -->  x_coord_index=10, y_coord_index=300,
                     index_nodes[100] = [10, 300]
         """
+        cache_key = None
+        if self.cache_dir is not None:
+            cache_key = self._kdtree_cache_key(land_mask)
+            cached = self._read_cache('kdtree', cache_key)
+            if cached is not None:
+                return cKDTree(cached['nodes']), cached['index_nodes']
+
         if self.land_constraint:
             included_points = np.nonzero(land_mask.data)
         else:
@@ -322,6 +630,11 @@ class NeighbourSelection:
 
         index_nodes = np.array(list(zip(x_indices, y_indices)))
 
+        if cache_key is not None:
+            self._write_cache('kdtree', cache_key,
+                              {'nodes': np.asarray(nodes),
+                               'index_nodes': index_nodes})
+
         return cKDTree(nodes), index_nodes
 
     def select_minimum_dz(self, orography, site_altitude, index_nodes,
@@ -357,40 +670,93 @@ class NeighbourSelection:
                 point neighbour. Returns None if no valid neighbours were found
                 in the tree query.
         """
-        # Values beyond the imposed search radius are set to inf,
-        # these need to be excluded.
-        valid_indices = np.where(np.isfinite(distance))
+        grid_points, valid_sites = self.select_minimum_dz_multiple(
+            orography, np.array([site_altitude]), index_nodes,
+            np.array([distance]), np.array([indices]))
 
         # If no valid neighbours are available in the tree, return None.
-        if valid_indices[0].shape[0] == 0:
+        if not valid_sites[0]:
             return None
+        return grid_points[0]
+
+    def select_minimum_dz_multiple(self, orography, site_altitudes,
+                                   index_nodes, distances, indices):
+        """
+        Select the neighbour with the minimum vertical displacement for many
+        sites at once. This is equivalent to calling select_minimum_dz for
+        each site, but the grid point altitudes of all the candidate
+        neighbours are gathered in a single operation. A single warning is
+        raised if the node_limit may be insufficient to fill the search_radius
+        for any of the sites.
+
+        Args:
+            orography (iris.cube.Cube):
+                A cube of orography, used to obtain the grid point altitudes.
+            site_altitudes (numpy.ndarray):
+                An array of shape (n_sites,) containing the altitudes of the
+                spot sites being considered.
+            index_nodes (numpy.ndarray):
+                An array of shape (n_nodes, 2) that contains the x and y
+                indices that correspond to the selected node,
+            distances (numpy.ndarray):
+                An array of shape (n_sites, n_neighbours) that contains the
+                distances from each spot site to each grid point neighbour
+                being considered. Neighbours beyond the search_radius have a
+                distance of np.inf.
+            indices (numpy.ndarray):
+                An array of shape (n_sites, n_neighbours) of tree node indices
+                identifying the neigbouring grid points, corresponding to the
+                array of distances. Indices associated with an infinite
+                distance are ignored, so may lie outside of index_nodes.
+        Returns:
+            (tuple): tuple containing:
+                grid_points (numpy.ndarray):
+                    An array of shape (n_sites, 2) giving the x and y indices
+                    of the chosen grid point neighbour for each site. Sites
+                    with no valid neighbours are given the indices of their
+                    nearest tree node.
+                valid_sites (numpy.ndarray):
+                    A boolean array of shape (n_sites,) which is False for
+                    sites with no valid neighbours in the tree query.
+        """
+        distances = np.atleast_2d(distances)
+        indices = np.atleast_2d(indices)
+
+        # Values beyond the imposed search radius are set to inf,
+        # these need to be excluded.
+        valid_neighbours = np.isfinite(distances)
+        valid_sites = valid_neighbours.any(axis=1)
 
         # If the last distance is finite the number of tree nodes may not be
         # sufficient to fill the search radius, raise a warning.
-        if np.isfinite(distance[-1]):
+        if np.isfinite(distances[:, -1]).any():
             msg = ('Limit on number of nearest neighbours to return, {}, may '
                    'not be sufficiently large to fill search_radius {}'.format(
                        self.node_limit, self.search_radius))
             warnings.warn(msg)
 
-        distance = distance[valid_indices]
-        indices = indices[valid_indices]
-
-        # Calculate the difference in height between the spot site
-        # and grid point.
-        grid_point_altitudes = orography.data[tuple(index_nodes[indices].T)]
-        vertical_displacements = abs(grid_point_altitudes - site_altitude)
-
-        # The tree returns an ordered array, the first element
-        # being the closest. We search the array for the first
-        # element that matches the minimum vertical displacement
-        # found, giving us the nearest such point.
-        index_of_minimum = (
-            np.argmax(vertical_displacements ==
-                      vertical_displacements.min()))
-        grid_point = index_nodes[indices][index_of_minimum]
-
-        return grid_point
+        # The tree returns an index equal to the number of nodes for missing
+        # neighbours, so these are replaced before the lookup.
+        neighbour_points = index_nodes[np.where(valid_neighbours, indices, 0)]
+
+        # Calculate the difference in height between the spot sites
+        # and grid points, excluding the invalid neighbours.
+        grid_point_altitudes = orography.data[
+            neighbour_points[..., 0], neighbour_points[..., 1]]
+        vertical_displacements = np.where(
+            valid_neighbours,
+            abs(grid_point_altitudes -
+                np.asarray(site_altitudes, dtype=float)[:, np.newaxis]),
+            np.inf)
+
+        # The tree returns ordered arrays, the first element being the
+        # closest. argmin returns the first element that matches the minimum
+        # vertical displacement found, giving us the nearest such point.
+        index_of_minimum = np.argmin(vertical_displacements, axis=1)
+        grid_points = neighbour_points[
+            np.arange(len(index_of_minimum)), index_of_minimum]
+
+        return grid_points, valid_sites
 
     def process(self, sites, orography, land_mask):
         """
@@ -398,7 +764,9 @@ class NeighbourSelection:
         to the given spot sites for the model/grid given by the input cubes.
         Returned is a cube that contains the defining characteristics of the
         spot sites (e.g. x coordinate, y coordinate, altitude) and the indices
-        of the selected grid point neighbour.
+        of the selected grid point neighbour. If a cache directory has been
+        provided, a previously calculated cube for identical inputs is read
+        from the cache, and newly calculated cubes are written to it.
 
         Args:
             sites (list of dict):
@@ -436,6 +804,15 @@ class NeighbourSelection:
                    'grid.')
             raise ValueError(msg)
 
+        # Return the cached neighbour cube if these inputs have previously
+        # been processed.
+        cache_key = None
+        if self.cache_dir is not None:
+            cache_key = self._neighbour_cache_key(sites, orography, land_mask)
+            cached = self._read_cache('neighbours', cache_key)
+            if cached is not None:
+                return self._neighbour_cube_from_arrays(cached)
+
         # Enforce x-y coordinate order for input cubes.
         orography = enforce_coordinate_ordering(
             orography, [orography.coord(axis='x').name(),
@@ -485,7 +862,8 @@ class NeighbourSelection:
             if not self.minimum_dz:
                 # Query the tree for the nearest neighbour, in this case a land
                 # neighbour is returned along with the distance to it.
-                distances, node_indices = tree.query([site_coords])
+                distances, node_indices = tree.query([site_coords],
+                                                     n_jobs=self.n_jobs)
                 # Look up the grid coordinates that correspond to the tree node
                 land_neighbour_indices, = index_nodes[node_indices]
                 # Use the found land neighbour if it is within the
@@ -497,19 +875,17 @@ class NeighbourSelection:
             else:
                 # Query the tree for self.node_limit nearby neighbours.
                 distances, node_indices = tree.query(
-                    [site_coords], distance_upper_bound=self.search_radius,
-                    k=self.node_limit)
-                # Loop over the sites and for each choose the returned
-                # neighbour with the minimum vertical displacement.
-                for index, (distance, indices) in enumerate(zip(
-                        distances[0], node_indices[0])):
-                    grid_point = self.select_minimum_dz(
-                        orography, site_altitudes[index], index_nodes,
-                        distance, indices)
-                    # None is returned if the tree query returned no neighbours
-                    # within the search radius.
-                    if grid_point is not None:
-                        nearest_indices[index] = grid_point
+                    site_coords, distance_upper_bound=self.search_radius,
+                    k=self.node_limit, n_jobs=self.n_jobs)
+                # For each site choose the returned neighbour with the minimum
+                # vertical displacement.
+                grid_points, valid_sites = self.select_minimum_dz_multiple(
+                    orography, site_altitudes, index_nodes,
+                    distances.reshape(len(site_coords), -1),
+                    node_indices.reshape(len(site_coords), -1))
+                # Sites for which the tree query returned no neighbours within
+                # the search radius retain their nearest neighbour.
+                nearest_indices[valid_sites] = grid_points[valid_sites]
 
         # Calculate the vertical displacements between the chosen grid point
         # and the spot site.
@@ -540,4 +916,8 @@ class NeighbourSelection:
         grid_hash = create_coordinate_hash(orography)
         neighbour_cube.attributes['model_grid_hash'] = grid_hash
 
+        if cache_key is not None:
+            self._write_cache('neighbours', cache_key,
+                              self._neighbour_cube_to_arrays(neighbour_cube))
+
         return neighbour_cube
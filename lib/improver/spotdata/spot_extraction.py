@@ -35,7 +35,6 @@ import iris
 import numpy as np
 
 from improver.spotdata.build_spotdata_cube import build_spotdata_cube
-from improver.utilities.cube_manipulation import enforce_coordinate_ordering
 from improver.utilities.cube_metadata import create_coordinate_hash
 
 
@@ -103,8 +102,10 @@ class SpotExtraction():
         """
         Extracts diagnostic data from the desired grid points in the diagnostic
         cube. The neighbour finding routine that produces the coordinate cube
-        works in x-y order. As such, the diagnostic cube is changed to match
-        before the indices are used to extract data.
+        works in x-y order. As such, the x and y dimensions of the diagnostic
+        data are moved to the front, in that order, before the indices are
+        used to extract data. Any leading dimensions, such as realization or
+        threshold, are extracted together in the same indexing operation.
 
         Args:
             coordinate_cube (iris.cube.Cube):
@@ -115,12 +116,14 @@ class SpotExtraction():
         Returns:
             spot_values (numpy.ndarray):
                 An array of diagnostic values at the grid coordinates found
-                within the coordinate cube.
+                within the coordinate cube. The first dimension of the array
+                is the spot index, followed by any other dimensions of the
+                diagnostic cube in their original order.
         """
-        diagnostic_cube = enforce_coordinate_ordering(
-            diagnostic_cube, [diagnostic_cube.coord(axis='x').name(),
-                              diagnostic_cube.coord(axis='y').name()])
-        spot_values = diagnostic_cube.data[tuple(coordinate_cube.data.T)]
+        x_dim, = diagnostic_cube.coord_dims(diagnostic_cube.coord(axis='x'))
+        y_dim, = diagnostic_cube.coord_dims(diagnostic_cube.coord(axis='y'))
+        data = np.moveaxis(diagnostic_cube.data, [x_dim, y_dim], [0, 1])
+        spot_values = data[tuple(coordinate_cube.data.T)]
         return spot_values
 
     @staticmethod
@@ -152,6 +155,49 @@ class SpotExtraction():
             neighbour_cube.coord('wmo_id').points)
         return neighbour_cube
 
+    @staticmethod
+    def add_leading_coordinates(spotdata_cube, diagnostic_cube):
+        """
+        Add the coordinates of the diagnostic cube that do not describe the
+        x and y dimensions to a spot data cube whose data includes the
+        leading dimensions of the diagnostic cube after the spot index
+        dimension, and then move the spot index dimension to the end.
+
+        Args:
+            spotdata_cube (iris.cube.Cube):
+                A spot data cube with the spot index as its first dimension,
+                followed by the non-spatial dimensions of the diagnostic cube
+                in their original order.
+            diagnostic_cube (iris.cube.Cube):
+                The cube of diagnostic data from which the spot data were
+                taken.
+        Returns:
+            spotdata_cube (iris.cube.Cube):
+                The spot data cube with leading dimension, auxiliary and
+                scalar coordinates copied from the diagnostic cube, and the
+                spot index as its last dimension.
+        """
+        spatial_dims = set(
+            diagnostic_cube.coord_dims(diagnostic_cube.coord(axis='x')) +
+            diagnostic_cube.coord_dims(diagnostic_cube.coord(axis='y')))
+        leading_dims = [dim for dim in range(diagnostic_cube.ndim)
+                        if dim not in spatial_dims]
+
+        for coord in diagnostic_cube.coords():
+            coord_dims = diagnostic_cube.coord_dims(coord)
+            if spatial_dims.intersection(coord_dims):
+                continue
+            new_dims = tuple(leading_dims.index(dim) + 1
+                             for dim in coord_dims)
+            if coord in diagnostic_cube.coords(dim_coords=True):
+                spotdata_cube.add_dim_coord(coord.copy(), new_dims)
+            else:
+                spotdata_cube.add_aux_coord(coord.copy(), new_dims)
+
+        if leading_dims:
+            spotdata_cube.transpose(list(range(1, spotdata_cube.ndim)) + [0])
+        return spotdata_cube
+
     def process(self, neighbour_cube, diagnostic_cube):
         """
         Create a spot data cube containing diagnostic data extracted at the
@@ -176,24 +222,61 @@ class SpotExtraction():
         check_grid_match([neighbour_cube, diagnostic_cube])
 
         coordinate_cube = self.extract_coordinates(neighbour_cube)
+        return self._extract_spotdata_cube(
+            neighbour_cube, coordinate_cube, diagnostic_cube)
 
-        # Deal with leading dimensions such as thresholds, realizations, etc.
-        data_cubes = iris.cube.CubeList()
-        for cube in diagnostic_cube.slices(
-                [diagnostic_cube.coord(axis='x').name(),
-                 diagnostic_cube.coord(axis='y').name()]):
+    def process_multiple(self, neighbour_cube, diagnostic_cubes):
+        """
+        Create spot data cubes for a number of diagnostics on the same grid,
+        extracting the neighbour coordinates once for all of them.
 
-            spot_values = self.extract_diagnostic_data(coordinate_cube, cube)
-            spotdata_cube = self.build_diagnostic_cube(neighbour_cube, cube,
-                                                       spot_values)
+        Args:
+            neighbour_cube (iris.cube.Cube):
+                A cube containing information about the spot data sites and
+                their grid point neighbours.
+            diagnostic_cubes (iris.cube.CubeList or list of iris.cube.Cube):
+                Cubes of diagnostic data from which spot data are being
+                taken.
+        Returns:
+            spotdata_cubes (iris.cube.CubeList):
+                A cube for each diagnostic containing the data for each spot
+                site, as well as information about the sites themselves.
+        """
+        check_grid_match([neighbour_cube] + list(diagnostic_cubes))
 
-            # Add scalar coordinates onto the spot cube which can be promoted
-            # to reform and leading dimensions.
-            for coord in cube.coords(dim_coords=False):
-                spotdata_cube.add_aux_coord(coord)
-            data_cubes.append(spotdata_cube)
+        coordinate_cube = self.extract_coordinates(neighbour_cube)
+        return iris.cube.CubeList(
+            [self._extract_spotdata_cube(
+                neighbour_cube, coordinate_cube, diagnostic_cube)
+             for diagnostic_cube in diagnostic_cubes])
 
-        spotdata_cube = data_cubes.merge_cube()
+    def _extract_spotdata_cube(self, neighbour_cube, coordinate_cube,
+                               diagnostic_cube):
+        """
+        Extract the data for all the spot sites, and for all the leading
+        dimensions such as thresholds, realizations, etc., at once and build
+        the spot data cube.
+
+        Args:
+            neighbour_cube (iris.cube.Cube):
+                A cube containing information about the spot data sites and
+                their grid point neighbours.
+            coordinate_cube (iris.cube.Cube):
+                A cube containing the x and y grid coordinates for the grid
+                point neighbours.
+            diagnostic_cube (iris.cube.Cube):
+                A cube of diagnostic data from which spot data is being taken.
+        Returns:
+            spotdata_cube (iris.cube.Cube):
+                A cube containing diagnostic data for each spot site, as well
+                as information about the sites themselves.
+        """
+        spot_values = self.extract_diagnostic_data(coordinate_cube,
+                                                   diagnostic_cube)
+        spotdata_cube = self.build_diagnostic_cube(
+            neighbour_cube, diagnostic_cube, spot_values)
+        spotdata_cube = self.add_leading_coordinates(spotdata_cube,
+                                                     diagnostic_cube)
 
         # Copy attributes from the diagnostic cube that describe the data's
         # provenance.
@@ -249,6 +249,33 @@ class Test_aggregate(IrisTest):
         self.assertArrayAlmostEqual(result, expected_result)
         self.assertEqual(result.shape, expected_result_shape)
 
+    def test_chunked(self):
+        """Test that blending the grid points in chunks gives the same result
+           as blending all the grid points at once."""
+        weights = np.array([0.6, 0.3, 0.1])
+        weights = generate_matching_weights_array(weights, (4, 6, 3))
+        weights = np.moveaxis(weights, (0, 1, 2), (2, 1, 0))
+
+        percentiles = np.array([0, 20, 40, 60, 80, 100]).astype(np.float32)
+        result = PercentileBlendingAggregator.aggregate(
+            np.reshape(PERCENTILE_DATA, (6, 3, 2, 2)), 1,
+            percentiles,
+            weights, 0, chunk_size=3)
+        self.assertArrayAlmostEqual(result, BLENDED_PERCENTILE_DATA)
+
+    def test_invalid_chunk_size(self):
+        """Test that a chunk_size of less than one grid point raises an
+           error rather than blending nothing."""
+        weights = np.array([0.6, 0.3, 0.1])
+        weights = generate_matching_weights_array(weights, (4, 6, 3))
+        weights = np.moveaxis(weights, (0, 1, 2), (2, 1, 0))
+        percentiles = np.array([0, 20, 40, 60, 80, 100]).astype(np.float32)
+        msg = "chunk_size must be at least 1, got 0"
+        with self.assertRaisesRegex(ValueError, msg):
+            PercentileBlendingAggregator.aggregate(
+                np.reshape(PERCENTILE_DATA, (6, 3, 2, 2)), 1,
+                percentiles, weights, 0, chunk_size=0)
+
 
 class Test_blend_percentiles(IrisTest):
     """Test the blend_percentiles method"""
@@ -301,5 +328,61 @@ class Test_blend_percentiles(IrisTest):
         self.assertArrayAlmostEqual(result, expected_result)
 
 
+class Test_blend_percentiles_batched(IrisTest):
+    """Test the blend_percentiles_batched method"""
+
+    def setUp(self):
+        """Set up percentile values for several grid points."""
+        self.percentiles = np.array([0., 10., 20., 30., 40., 50.,
+                                     60., 70., 80., 90., 100.])
+        self.perc_values = np.stack(
+            [PERCENTILE_VALUES, PERCENTILE_VALUES[::-1],
+             PERCENTILE_VALUES + 1.5], axis=-1).astype(np.float32)
+        self.weights = np.broadcast_to(
+            np.array([0.38872692, 0.33041788, 0.2808552],
+                     dtype=np.float32)[:, np.newaxis, np.newaxis],
+            self.perc_values.shape)
+
+    def test_matches_blend_percentiles(self):
+        """Test that the result matches that of blend_percentiles for each
+           grid point."""
+        expected = np.stack([
+            PercentileBlendingAggregator.blend_percentiles(
+                self.perc_values[:, :, i], self.percentiles,
+                self.weights[:, :, i]) for i in range(3)], axis=-1)
+        result = PercentileBlendingAggregator.blend_percentiles_batched(
+            self.perc_values, self.percentiles, self.weights)
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(result.shape, (11, 3))
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_repeated_values(self):
+        """Test that the result matches that of blend_percentiles where
+           percentile values are repeated, as occurs for bounded diagnostics
+           such as precipitation."""
+        self.perc_values[:, :4, 1] = 0.
+        self.perc_values[1, :, 2] = self.perc_values[0, :, 2]
+        expected = np.stack([
+            PercentileBlendingAggregator.blend_percentiles(
+                self.perc_values[:, :, i], self.percentiles,
+                self.weights[:, :, i]) for i in range(3)], axis=-1)
+        result = PercentileBlendingAggregator.blend_percentiles_batched(
+            self.perc_values, self.percentiles, self.weights)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_non_monotonic_values(self):
+        """Test that grid points at which the percentile values do not
+           increase monotonically give the same result as
+           blend_percentiles."""
+        self.perc_values[0, :, 1] = self.perc_values[0, ::-1, 1]
+        expected = np.stack([
+            PercentileBlendingAggregator.blend_percentiles(
+                self.perc_values[:, :, i], self.percentiles,
+                self.weights[:, :, i]) for i in range(3)], axis=-1)
+        result = PercentileBlendingAggregator.blend_percentiles_batched(
+            self.perc_values, self.percentiles, self.weights)
+        self.assertArrayAlmostEqual(result, expected)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -116,6 +116,13 @@ class Test__init__(IrisTest):
         with self.assertRaisesRegex(ValueError, msg):
             WeightedBlendAcrossWholeDimension('threshold')
 
+    def test_invalid_chunk_size(self):
+        """Test that the __init__ raises an error if the chunk_size is less
+        than one grid point."""
+        msg = "chunk_size must be at least 1, got 0"
+        with self.assertRaisesRegex(ValueError, msg):
+            WeightedBlendAcrossWholeDimension('time', chunk_size=0)
+
 
 class Test__repr__(IrisTest):
 
@@ -752,6 +759,18 @@ class Test_process(Test_weighted_blend):
         with self.assertRaisesRegex(ValueError, msg):
             _ = plugin.process(self.cube_with_scalar, weights)
 
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_percentiles_in_chunks(self):
+        """Test that blending percentile data with a chunk_size, so that the
+        grid points are blended a few at a time, gives the same result as
+        blending all the grid points at once."""
+        perc_cube = percentile_cube()
+        plugin = WeightedBlendAcrossWholeDimension(
+            "forecast_reference_time", chunk_size=3)
+        result = plugin.process(perc_cube, self.weights1d)
+        self.assertArrayAlmostEqual(result.data, BLENDED_PERCENTILE_DATA)
+
     @ManageWarnings(
         ignored_messages=["Collapsing a non-contiguous coordinate."])
     def tests_threshold_cube_with_weights_weighted_mean(self):
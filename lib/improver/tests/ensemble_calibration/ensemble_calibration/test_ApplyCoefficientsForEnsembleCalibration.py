@@ -150,6 +150,20 @@ class Test__init__(IrisTest):
         with self.assertRaisesRegex(ValueError, msg):
             Plugin(current_forecast, self.coefficients_cube)
 
+    def test_matching_domain_point_by_point(self):
+        """Test whether the grid of the forecast and the grid of a
+        coefficients cube containing coefficients for each grid point
+        matches."""
+        estimator = EstimateCoefficientsForEnsembleCalibration(
+            "gaussian", "20171110T0000Z")
+        coefficients_cube = estimator.create_coefficients_cube(
+            np.ones((4, 2, 2), dtype=np.float32), self.current_forecast)
+        Plugin(self.current_forecast, coefficients_cube)
+        current_forecast = self.current_forecast[0:1, :]
+        msg = "The domain along the"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin(current_forecast, coefficients_cube)
+
 
 class Test__repr__(IrisTest):
 
@@ -471,6 +485,67 @@ class Test__apply_params(
             forecast_variance.data,
             self.expected_calibrated_variance_mean, decimal=0)
 
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate.",
+                          "invalid escape sequence"],
+        warning_types=[UserWarning, DeprecationWarning])
+    def test_point_by_point(self):
+        """
+        Test that coefficients provided for each grid point give the same
+        calibrated ensemble mean and variance as the equivalent coefficients
+        for the whole domain, when the ensemble mean is the predictor.
+        """
+        cube = self.current_temperature_forecast_cube
+        predictor_cube = cube.collapsed("realization", iris.analysis.MEAN)
+        variance_cube = cube.collapsed("realization", iris.analysis.VARIANCE)
+        estimator = EstimateCoefficientsForEnsembleCalibration(
+            "gaussian", "20171110T0000Z", desired_units="Celsius")
+        coefficients_cube = estimator.create_coefficients_cube(
+            np.broadcast_to(
+                np.reshape(self.expected_mean_predictor_gaussian, (4, 1, 1)),
+                (4, 3, 3)), cube)
+
+        plugin = Plugin(cube, coefficients_cube)
+        forecast_predictor, forecast_variance = plugin._apply_params(
+            predictor_cube, variance_cube)
+        self.assertCalibratedVariablesAlmostEqual(
+            forecast_predictor.data, self.expected_calibrated_predictor_mean)
+        self.assertCalibratedVariablesAlmostEqual(
+            forecast_variance.data, self.expected_calibrated_variance_mean)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate.",
+                          "invalid escape sequence"],
+        warning_types=[UserWarning, DeprecationWarning])
+    def test_point_by_point_realizations(self):
+        """
+        Test that coefficients provided for each grid point give the same
+        calibrated ensemble mean and variance as the equivalent coefficients
+        for the whole domain, when the ensemble realizations are the
+        predictor.
+        """
+        cube = self.current_temperature_forecast_cube
+        predictor_cube = cube.copy()
+        variance_cube = cube.collapsed("realization", iris.analysis.VARIANCE)
+        estimator = EstimateCoefficientsForEnsembleCalibration(
+            "gaussian", "20171110T0000Z", desired_units="Celsius",
+            predictor_of_mean_flag="realizations")
+        coefficients_cube = estimator.create_coefficients_cube(
+            np.broadcast_to(
+                np.reshape(self.expected_realizations_gaussian_no_statsmodels,
+                           (6, 1, 1)), (6, 3, 3)), cube)
+
+        plugin = Plugin(cube, coefficients_cube,
+                        predictor_of_mean_flag="realizations")
+        forecast_predictor, forecast_variance = plugin._apply_params(
+            predictor_cube, variance_cube)
+        self.assertCalibratedVariablesAlmostEqual(
+            forecast_predictor.data,
+            self.expected_calibrated_predictor_no_statsmodels_realizations)
+        self.assertCalibratedVariablesAlmostEqual(
+            forecast_variance.data,
+            self.expected_calibrated_variance_no_statsmodels_realizations)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -59,7 +59,7 @@ class Test__repr__(IrisTest):
         msg = ("<ContinuousRankedProbabilityScoreMinimisers: "
                "minimisation_dict: {'gaussian': 'calculate_normal_crps', "
                "'truncated_gaussian': 'calculate_truncated_normal_crps'}; "
-               "max_iterations: 1000>")
+               "max_iterations: 1000; minimisation_method: Nelder-Mead>")
         self.assertEqual(result, msg)
 
     def test_update_max_iterations(self):
@@ -69,9 +69,30 @@ class Test__repr__(IrisTest):
         msg = ("<ContinuousRankedProbabilityScoreMinimisers: "
                "minimisation_dict: {'gaussian': 'calculate_normal_crps', "
                "'truncated_gaussian': 'calculate_truncated_normal_crps'}; "
-               "max_iterations: 10>")
+               "max_iterations: 10; minimisation_method: Nelder-Mead>")
         self.assertEqual(result, msg)
 
+    def test_update_minimisation_method(self):
+        """A test to update the minimisation_method keyword argument."""
+        result = str(Plugin(minimisation_method="L-BFGS-B"))
+        msg = ("<ContinuousRankedProbabilityScoreMinimisers: "
+               "minimisation_dict: {'gaussian': 'calculate_normal_crps', "
+               "'truncated_gaussian': 'calculate_truncated_normal_crps'}; "
+               "max_iterations: 1000; minimisation_method: L-BFGS-B>")
+        self.assertEqual(result, msg)
+
+
+class Test__init__(IrisTest):
+
+    """Test the __init__ method."""
+
+    def test_unsupported_minimisation_method(self):
+        """Test that an unsupported minimisation method raises an
+        exception."""
+        msg = "Minimisation method Powell is not supported"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin(minimisation_method="Powell")
+
 
 class SetupInputs(IrisTest):
 
@@ -195,6 +216,74 @@ class Test_calculate_normal_crps(SetupGaussianInputs):
         self.assertAlmostEqual(result, plugin.BAD_VALUE)
 
 
+class Test_calculate_normal_crps_and_gradient(SetupGaussianInputs):
+
+    """
+    Test calculating the CRPS and its analytic gradient for a gaussian
+    distribution.
+    """
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_basic_mean_predictor(self):
+        """Test that the CRPS matches calculate_normal_crps, when the
+        ensemble mean is the predictor."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_normal_crps_and_gradient(
+            self.initial_guess_for_mean, self.forecast_predictor_data,
+            self.truth_data, self.forecast_variance_data, self.sqrt_pi,
+            "mean")
+        expected = plugin.calculate_normal_crps(
+            self.initial_guess_for_mean, self.forecast_predictor_data,
+            self.truth_data, self.forecast_variance_data, self.sqrt_pi,
+            "mean")
+        self.assertAlmostEqual(result, expected, places=4)
+        self.assertEqual(gradient.shape, (4,))
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_basic_realizations_predictor(self):
+        """Test that the CRPS matches calculate_normal_crps, when the
+        ensemble realizations are the predictor. The coefficients are only
+        used at float32 precision by calculate_normal_crps."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_normal_crps_and_gradient(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_data_realizations, self.truth_data,
+            self.forecast_variance_data, self.sqrt_pi, "realizations")
+        expected = plugin.calculate_normal_crps(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_data_realizations, self.truth_data,
+            self.forecast_variance_data, self.sqrt_pi, "realizations")
+        self.assertAlmostEqual(result, expected, places=3)
+        self.assertEqual(gradient.shape, (6,))
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_gradient(self):
+        """Test that the analytic gradient matches a finite difference
+        estimate for both the ensemble mean and the ensemble realizations as
+        the predictor."""
+        crps_and_gradient = Plugin().calculate_normal_crps_and_gradient
+        for coeffs, forecast_predictor, predictor_of_mean_flag in [
+                (np.array([0.5, 0.8, 0.1, 0.95]), self.forecast_predictor_data,
+                 "mean"),
+                (np.array([0.5, 0.8, 0.3, 0.6, 0.5, 0.7]),
+                 self.forecast_predictor_data_realizations, "realizations")]:
+            args = (forecast_predictor, self.truth_data,
+                    self.forecast_variance_data, self.sqrt_pi,
+                    predictor_of_mean_flag)
+            _, gradient = crps_and_gradient(coeffs, *args)
+            step = 1e-5
+            expected = []
+            for index in range(len(coeffs)):
+                offset = np.zeros_like(coeffs)
+                offset[index] = step
+                upper, _ = crps_and_gradient(coeffs + offset, *args)
+                lower, _ = crps_and_gradient(coeffs - offset, *args)
+                expected.append((upper - lower) / (2 * step))
+            self.assertArrayAlmostEqual(gradient, expected, decimal=4)
+
+
 class Test_process_gaussian_distribution(
         SetupGaussianInputs, EnsembleCalibrationAssertions):
 
@@ -259,6 +348,62 @@ class Test_process_gaussian_distribution(
         self.assertEMOSCoefficientsAlmostEqual(
             result, self.expected_realizations_coefficients)
 
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_mean_predictor_gradient_based_method(self):
+        """
+        Test that minimising using the L-BFGS-B method with the analytic
+        gradient achieves a CRPS that is no larger than that achieved using
+        the Nelder-Mead method, and that the convergence diagnostics are
+        recorded. The ensemble mean is the predictor.
+        """
+        plugin = Plugin(minimisation_method="L-BFGS-B")
+        result = plugin.process(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian")
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(result.dtype, np.float32)
+        crps = plugin.calculate_normal_crps(
+            result.astype(np.float64), self.forecast_predictor_data,
+            self.truth_data, self.forecast_variance_data, self.sqrt_pi,
+            "mean")
+        expected_crps = plugin.calculate_normal_crps(
+            np.array(self.expected_mean_coefficients, dtype=np.float64),
+            self.forecast_predictor_data, self.truth_data,
+            self.forecast_variance_data, self.sqrt_pi, "mean")
+        self.assertLess(crps, expected_crps)
+        self.assertEqual(len(plugin.convergence_diagnostics), 1)
+        diagnostics = plugin.convergence_diagnostics[0]
+        self.assertEqual(diagnostics["method"], "L-BFGS-B")
+        self.assertTrue(diagnostics["success"])
+        self.assertGreater(diagnostics["gradient_evaluations"], 0)
+        self.assertAlmostEqual(diagnostics["crps"], crps, places=3)
+        self.assertIsNone(diagnostics["percentage_change"])
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate.",
+                          "Minimisation did not result in convergence",
+                          "divide by zero encountered in"],
+        warning_types=[UserWarning, UserWarning, RuntimeWarning])
+    def test_convergence_diagnostics(self):
+        """Test that the convergence diagnostics are recorded when using the
+        Nelder-Mead method. The ensemble mean is the predictor."""
+        plugin = Plugin()
+        plugin.process(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian")
+        self.assertEqual(len(plugin.convergence_diagnostics), 1)
+        diagnostics = plugin.convergence_diagnostics[0]
+        self.assertEqual(
+            sorted(diagnostics.keys()),
+            ["crps", "function_evaluations", "gradient_evaluations",
+             "iterations", "message", "method", "percentage_change",
+             "success"])
+        self.assertEqual(diagnostics["method"], "Nelder-Mead")
+        self.assertEqual(diagnostics["gradient_evaluations"], 0)
+        self.assertLessEqual(diagnostics["iterations"], 1000)
+        self.assertEqual(diagnostics["percentage_change"].shape, (4,))
+
     @ManageWarnings(
         ignored_messages=["Collapsing a non-contiguous coordinate."])
     def test_mean_predictor_keyerror(self):
@@ -488,6 +633,76 @@ class Test_calculate_truncated_normal_crps(SetupTruncatedGaussianInputs):
         self.assertAlmostEqual(result, plugin.BAD_VALUE)
 
 
+class Test_calculate_truncated_normal_crps_and_gradient(
+        SetupTruncatedGaussianInputs):
+
+    """
+    Test calculating the CRPS and its analytic gradient for a truncated
+    gaussian distribution.
+    """
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_basic_mean_predictor(self):
+        """Test that the CRPS matches calculate_truncated_normal_crps, when the
+        ensemble mean is the predictor."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_truncated_normal_crps_and_gradient(
+            self.initial_guess_for_mean, self.forecast_predictor_data,
+            self.truth_data, self.forecast_variance_data, self.sqrt_pi,
+            "mean")
+        expected = plugin.calculate_truncated_normal_crps(
+            self.initial_guess_for_mean, self.forecast_predictor_data,
+            self.truth_data, self.forecast_variance_data, self.sqrt_pi,
+            "mean")
+        self.assertAlmostEqual(result, expected, places=4)
+        self.assertEqual(gradient.shape, (4,))
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_basic_realizations_predictor(self):
+        """Test that the CRPS matches calculate_truncated_normal_crps, when the
+        ensemble realizations are the predictor. The coefficients are only
+        used at float32 precision by calculate_truncated_normal_crps."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_truncated_normal_crps_and_gradient(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_data_realizations, self.truth_data,
+            self.forecast_variance_data, self.sqrt_pi, "realizations")
+        expected = plugin.calculate_truncated_normal_crps(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_data_realizations, self.truth_data,
+            self.forecast_variance_data, self.sqrt_pi, "realizations")
+        self.assertAlmostEqual(result, expected, places=3)
+        self.assertEqual(gradient.shape, (6,))
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_gradient(self):
+        """Test that the analytic gradient matches a finite difference
+        estimate for both the ensemble mean and the ensemble realizations as
+        the predictor."""
+        crps_and_gradient = (
+            Plugin().calculate_truncated_normal_crps_and_gradient)
+        for coeffs, forecast_predictor, predictor_of_mean_flag in [
+                (np.array([0.5, 0.8, 0.3, 0.9]), self.forecast_predictor_data,
+                 "mean"),
+                (np.array([0.5, 0.8, 0.3, 0.6, 0.5, 0.7]),
+                 self.forecast_predictor_data_realizations, "realizations")]:
+            args = (forecast_predictor, self.truth_data,
+                    self.forecast_variance_data, self.sqrt_pi,
+                    predictor_of_mean_flag)
+            _, gradient = crps_and_gradient(coeffs, *args)
+            step = 1e-5
+            expected = []
+            for index in range(len(coeffs)):
+                offset = np.zeros_like(coeffs)
+                offset[index] = step
+                upper, _ = crps_and_gradient(coeffs + offset, *args)
+                lower, _ = crps_and_gradient(coeffs - offset, *args)
+                expected.append((upper - lower) / (2 * step))
+            self.assertArrayAlmostEqual(gradient, expected, decimal=4)
+
+
 class Test_process_truncated_gaussian_distribution(
         SetupTruncatedGaussianInputs, EnsembleCalibrationAssertions):
 
@@ -552,6 +767,44 @@ class Test_process_truncated_gaussian_distribution(
         self.assertEMOSCoefficientsAlmostEqual(
             result, self.expected_realizations_coefficients)
 
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_gradient_based_methods(self):
+        """
+        Test that minimising using each of the gradient based methods with
+        the analytic gradient achieves a CRPS that is similar to that
+        achieved using the Nelder-Mead method, for both the ensemble mean and
+        the ensemble realizations as the predictor.
+        """
+        for method in Plugin.GRADIENT_BASED_METHODS:
+            for (initial_guess, forecast_predictor, forecast_predictor_data,
+                 expected_coefficients, predictor_of_mean_flag) in [
+                    (self.initial_guess_for_mean,
+                     self.forecast_predictor_mean,
+                     self.forecast_predictor_data,
+                     self.expected_mean_coefficients, "mean"),
+                    (self.initial_guess_for_realization,
+                     self.forecast_predictor_realizations,
+                     self.forecast_predictor_data_realizations,
+                     self.expected_realizations_coefficients,
+                     "realizations")]:
+                plugin = Plugin(minimisation_method=method)
+                result = plugin.process(
+                    initial_guess, forecast_predictor, self.truth,
+                    self.forecast_variance, predictor_of_mean_flag,
+                    "truncated_gaussian")
+                crps = plugin.calculate_truncated_normal_crps(
+                    result.astype(np.float64), forecast_predictor_data,
+                    self.truth_data, self.forecast_variance_data,
+                    self.sqrt_pi, predictor_of_mean_flag)
+                expected_crps = plugin.calculate_truncated_normal_crps(
+                    np.array(expected_coefficients, dtype=np.float64),
+                    forecast_predictor_data, self.truth_data,
+                    self.forecast_variance_data, self.sqrt_pi,
+                    predictor_of_mean_flag)
+                self.assertLess(crps, expected_crps + 0.001)
+                self.assertTrue(plugin.convergence_diagnostics[0]["success"])
+
     @ManageWarnings(
         ignored_messages=["Collapsing a non-contiguous coordinate."])
     def test_mean_predictor_keyerror(self):
@@ -704,5 +957,361 @@ class Test_process_truncated_gaussian_distribution(
                             for item in warning_list))
 
 
+class Test_calculate_normal_crps_by_point(SetupGaussianInputs):
+
+    """
+    Test calculating the CRPS and its gradient for a gaussian distribution
+    over a block of points, where each point has its own coefficients.
+    """
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def setUp(self):
+        """Set up the inputs for a block containing a single point, which
+        contains all the samples used by calculate_normal_crps."""
+        super().setUp()
+        self.forecast_predictor_block = (
+            self.forecast_predictor_data.reshape(1, 1, -1))
+        self.forecast_predictor_block_realizations = (
+            self.forecast_predictor_data_realizations.T[np.newaxis])
+        self.truth_block = self.truth_data.reshape(1, -1)
+        self.forecast_variance_block = (
+            self.forecast_variance_data.reshape(1, -1))
+
+    def test_basic_mean_predictor(self):
+        """Test that the CRPS matches calculate_normal_crps, when the
+        ensemble mean is the predictor."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_normal_crps_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_block,
+            self.truth_block, self.forecast_variance_block, self.sqrt_pi,
+            "mean")
+        expected = plugin.calculate_normal_crps(
+            self.initial_guess_for_mean, self.forecast_predictor_data,
+            self.truth_data, self.forecast_variance_data, self.sqrt_pi,
+            "mean")
+        self.assertAlmostEqual(result, expected, places=4)
+        self.assertEqual(gradient.shape, (4,))
+
+    def test_basic_realizations_predictor(self):
+        """Test that the CRPS matches calculate_normal_crps, when the
+        ensemble realizations are the predictor. The coefficients are only
+        used at float32 precision by calculate_normal_crps."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_normal_crps_by_point(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_block_realizations, self.truth_block,
+            self.forecast_variance_block, self.sqrt_pi, "realizations")
+        expected = plugin.calculate_normal_crps(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_data_realizations, self.truth_data,
+            self.forecast_variance_data, self.sqrt_pi, "realizations")
+        self.assertAlmostEqual(result, expected, places=3)
+        self.assertEqual(gradient.shape, (6,))
+
+    def test_multiple_points(self):
+        """Test that the CRPS of a block of points is the sum of the CRPS of
+        each point, and that the gradient for each point only depends upon
+        the coefficients of that point."""
+        plugin = Plugin()
+        coeffs = np.array([[0.5, 1, 0, 1], [1, 0.5, 1, 0.9]])
+        block_inputs = (
+            np.concatenate([self.forecast_predictor_block] * 2),
+            np.concatenate([self.truth_block] * 2),
+            np.concatenate([self.forecast_variance_block] * 2))
+        result, gradient = plugin.calculate_normal_crps_by_point(
+            coeffs.flatten(), *block_inputs, self.sqrt_pi, "mean")
+        for index, point_coeffs in enumerate(coeffs):
+            point_result, point_gradient = (
+                plugin.calculate_normal_crps_by_point(
+                    point_coeffs, self.forecast_predictor_block,
+                    self.truth_block, self.forecast_variance_block,
+                    self.sqrt_pi, "mean"))
+            self.assertArrayAlmostEqual(
+                gradient.reshape(2, 4)[index], point_gradient)
+            result -= point_result
+        self.assertAlmostEqual(result, 0)
+
+    def test_gradient(self):
+        """Test that the analytic gradient matches a finite difference
+        estimate, when the ensemble realizations are the predictor."""
+        plugin = Plugin()
+        coeffs = np.array([0.5, 0.8, 0.1, 0.6, 0.5, 0.7])
+        args = (self.forecast_predictor_block_realizations, self.truth_block,
+                self.forecast_variance_block, self.sqrt_pi, "realizations")
+        _, gradient = plugin.calculate_normal_crps_by_point(coeffs, *args)
+        step = 1e-5
+        expected = []
+        for index in range(len(coeffs)):
+            offset = np.zeros_like(coeffs)
+            offset[index] = step
+            upper, _ = plugin.calculate_normal_crps_by_point(
+                coeffs + offset, *args)
+            lower, _ = plugin.calculate_normal_crps_by_point(
+                coeffs - offset, *args)
+            expected.append((upper - lower) / (2 * step))
+        self.assertArrayAlmostEqual(gradient, expected, decimal=4)
+
+    @ManageWarnings(
+        ignored_messages=["invalid value encountered in",
+                          "divide by zero encountered in"],
+        warning_types=[RuntimeWarning, RuntimeWarning])
+    def test_bad_value(self):
+        """Test that a point with unusable coefficients is given the
+        BAD_VALUE and a zero gradient."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_normal_crps_by_point(
+            np.zeros(4), self.forecast_predictor_block, self.truth_block,
+            self.forecast_variance_block, self.sqrt_pi, "mean")
+        self.assertAlmostEqual(result, plugin.BAD_VALUE)
+        self.assertArrayEqual(gradient, np.zeros(4))
+
+
+class Test_calculate_truncated_normal_crps_by_point(
+        SetupTruncatedGaussianInputs):
+
+    """
+    Test calculating the CRPS and its gradient for a truncated gaussian
+    distribution over a block of points, where each point has its own
+    coefficients.
+    """
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def setUp(self):
+        """Set up the inputs for a block containing a single point, which
+        contains all the samples used by calculate_truncated_normal_crps."""
+        super().setUp()
+        self.forecast_predictor_block = (
+            self.forecast_predictor_data.reshape(1, 1, -1))
+        self.forecast_predictor_block_realizations = (
+            self.forecast_predictor_data_realizations.T[np.newaxis])
+        self.truth_block = self.truth_data.reshape(1, -1)
+        self.forecast_variance_block = (
+            self.forecast_variance_data.reshape(1, -1))
+
+    def test_basic_mean_predictor(self):
+        """Test that the CRPS matches calculate_truncated_normal_crps, when
+        the ensemble mean is the predictor."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_truncated_normal_crps_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_block,
+            self.truth_block, self.forecast_variance_block, self.sqrt_pi,
+            "mean")
+        expected = plugin.calculate_truncated_normal_crps(
+            self.initial_guess_for_mean, self.forecast_predictor_data,
+            self.truth_data, self.forecast_variance_data, self.sqrt_pi,
+            "mean")
+        self.assertAlmostEqual(result, expected, places=4)
+        self.assertEqual(gradient.shape, (4,))
+
+    def test_basic_realizations_predictor(self):
+        """Test that the CRPS matches calculate_truncated_normal_crps, when
+        the ensemble realizations are the predictor. The coefficients are
+        only used at float32 precision by
+        calculate_truncated_normal_crps."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_truncated_normal_crps_by_point(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_block_realizations, self.truth_block,
+            self.forecast_variance_block, self.sqrt_pi, "realizations")
+        expected = plugin.calculate_truncated_normal_crps(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_data_realizations, self.truth_data,
+            self.forecast_variance_data, self.sqrt_pi, "realizations")
+        self.assertAlmostEqual(result, expected, places=3)
+        self.assertEqual(gradient.shape, (6,))
+
+    def test_gradient(self):
+        """Test that the analytic gradient matches a finite difference
+        estimate, when the ensemble mean is the predictor."""
+        plugin = Plugin()
+        coeffs = np.array([0.5, 0.8, 0.3, 0.9])
+        args = (self.forecast_predictor_block, self.truth_block,
+                self.forecast_variance_block, self.sqrt_pi, "mean")
+        _, gradient = plugin.calculate_truncated_normal_crps_by_point(
+            coeffs, *args)
+        step = 1e-5
+        expected = []
+        for index in range(len(coeffs)):
+            offset = np.zeros_like(coeffs)
+            offset[index] = step
+            upper, _ = plugin.calculate_truncated_normal_crps_by_point(
+                coeffs + offset, *args)
+            lower, _ = plugin.calculate_truncated_normal_crps_by_point(
+                coeffs - offset, *args)
+            expected.append((upper - lower) / (2 * step))
+        self.assertArrayAlmostEqual(gradient, expected, decimal=4)
+
+    def test_bad_value(self):
+        """Test that a point for which the distribution is truncated at more
+        than 3 standard deviations above the mean is given the BAD_VALUE."""
+        plugin = Plugin()
+        result, gradient = plugin.calculate_truncated_normal_crps_by_point(
+            np.array([0.1, 0.1, -100, 1]), self.forecast_predictor_block,
+            self.truth_block, self.forecast_variance_block, self.sqrt_pi,
+            "mean")
+        self.assertAlmostEqual(result, plugin.BAD_VALUE)
+        self.assertArrayEqual(gradient, np.zeros(4))
+
+
+class Test_process_point_by_point(SetupGaussianInputs):
+
+    """Test minimising the CRPS independently for each grid point."""
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def setUp(self):
+        """Set up historic forecasts that differ between days, so that the
+        coefficients at each point are well defined."""
+        super().setUp()
+        offsets = np.linspace(-1, 1, self.truth.shape[0], dtype=np.float32)
+        self.truth.data = (
+            self.truth.data + offsets[:, np.newaxis, np.newaxis])
+        self.forecast_predictor_mean.data = (
+            self.forecast_predictor_mean.data +
+            0.8 * offsets[:, np.newaxis, np.newaxis])
+        self.forecast_predictor_realizations.data = (
+            self.forecast_predictor_realizations.data +
+            0.8 * offsets[:, np.newaxis, np.newaxis, np.newaxis])
+
+    def crps_sum(self, plugin, coeffs):
+        """Calculate the CRPS summed over all points for an array of
+        coefficients of shape (n_coefficients, n_y, n_x)."""
+        n_points = np.prod(self.truth.shape[-2:])
+        result, _ = plugin.calculate_normal_crps_by_point(
+            coeffs.reshape(len(coeffs), -1).T.flatten().astype(np.float64),
+            self.forecast_predictor_mean.data.reshape(
+                1, -1, n_points).transpose(2, 0, 1).astype(np.float64),
+            self.truth.data.reshape(-1, n_points).T.astype(np.float64),
+            self.forecast_variance.data.reshape(
+                -1, n_points).T.astype(np.float64),
+            self.sqrt_pi, "mean")
+        return result
+
+    @ManageWarnings(
+        ignored_messages=["Minimisation did not result in convergence"])
+    def test_basic_mean_predictor(self):
+        """Test that a coefficient is returned for each point, and that the
+        minimisation reduces the CRPS from the initial guess."""
+        plugin = Plugin()
+        result = plugin.process_point_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian")
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(result.shape, (4, 3, 3))
+        initial_guess = np.broadcast_to(
+            np.array([0.01, 1, 0, 1]).reshape(4, 1, 1), (4, 3, 3))
+        self.assertLess(self.crps_sum(plugin, result),
+                        self.crps_sum(plugin, initial_guess))
+
+    @ManageWarnings(
+        ignored_messages=["Minimisation did not result in convergence"])
+    def test_basic_realizations_predictor(self):
+        """Test that a coefficient is returned for each point, when the
+        ensemble realizations are the predictor."""
+        plugin = Plugin()
+        result = plugin.process_point_by_point(
+            self.initial_guess_for_realization,
+            self.forecast_predictor_realizations, self.truth,
+            self.forecast_variance, "realizations", "gaussian")
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(result.shape, (6, 3, 3))
+
+    @ManageWarnings(
+        ignored_messages=["Minimisation did not result in convergence"])
+    def test_initial_guess_per_point(self):
+        """Test that an initial guess can be provided for each point, and
+        that starting from the optimised coefficients leaves them
+        unchanged."""
+        plugin = Plugin()
+        expected = plugin.process_point_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian",
+            points_per_block=1)
+        result = plugin.process_point_by_point(
+            expected, self.forecast_predictor_mean, self.truth,
+            self.forecast_variance, "mean", "gaussian", points_per_block=1)
+        self.assertEqual(result.shape, (4, 3, 3))
+        self.assertArrayAlmostEqual(
+            self.crps_sum(plugin, result), self.crps_sum(plugin, expected),
+            decimal=4)
+
+    @ManageWarnings(
+        ignored_messages=["Minimisation did not result in convergence"])
+    def test_multiple_processes(self):
+        """Test that minimising the blocks of points in parallel gives the
+        same result as minimising them in turn."""
+        plugin = Plugin()
+        expected = plugin.process_point_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian",
+            points_per_block=4)
+        result = plugin.process_point_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian",
+            points_per_block=4, processes=2)
+        self.assertArrayAlmostEqual(result, expected)
+
+    @ManageWarnings(
+        ignored_messages=["Minimisation did not result in convergence"])
+    def test_points_minimised_independently(self):
+        """Test that the coefficients of each point do not depend upon the
+        other points within the block, including a point without any valid
+        truths."""
+        self.truth.data[:, 0, 0] = np.nan
+        plugin = Plugin()
+        expected = plugin.process_point_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian",
+            points_per_block=1)
+        result = plugin.process_point_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian")
+        self.assertArrayAlmostEqual(result, expected)
+        self.assertArrayAlmostEqual(result[:, 0, 0], [0.01, 1, 0, 1])
+
+    @ManageWarnings(
+        ignored_messages=["Minimisation did not result in convergence"])
+    def test_convergence_diagnostics(self):
+        """Test that convergence diagnostics are recorded for each point,
+        and that the L-BFGS-B method is used in place of the
+        Nelder-Mead method, whilst other gradient based methods are used as
+        requested."""
+        for method, expected_method in [
+                ("Nelder-Mead", "L-BFGS-B"), ("BFGS", "BFGS")]:
+            plugin = Plugin(minimisation_method=method)
+            plugin.process_point_by_point(
+                self.initial_guess_for_mean, self.forecast_predictor_mean,
+                self.truth, self.forecast_variance, "mean", "gaussian",
+                points_per_block=4)
+            self.assertEqual(len(plugin.convergence_diagnostics), 9)
+            for diagnostics in plugin.convergence_diagnostics:
+                self.assertEqual(diagnostics["method"], expected_method)
+                self.assertGreater(diagnostics["gradient_evaluations"], 0)
+
+    def test_keyerror(self):
+        """Test that a KeyError is raised for an unsupported
+        distribution."""
+        plugin = Plugin()
+        msg = "Distribution requested"
+        with self.assertRaisesRegex(KeyError, msg):
+            plugin.process_point_by_point(
+                self.initial_guess_for_mean, self.forecast_predictor_mean,
+                self.truth, self.forecast_variance, "mean", "foo")
+
+    @ManageWarnings(record=True)
+    def test_catch_warnings(self, warning_list=None):
+        """Test that a warning is raised if the minimisation of the points
+        within a block does not converge."""
+        plugin = Plugin(max_iterations=1)
+        plugin.process_point_by_point(
+            self.initial_guess_for_mean, self.forecast_predictor_mean,
+            self.truth, self.forecast_variance, "mean", "gaussian")
+        warning_msg = ("Minimisation did not result in convergence after "
+                       "1 iterations for 9 of the 9 points in a block.")
+        self.assertTrue(any(warning_msg in str(item)
+                            for item in warning_list))
+
+
 if __name__ == '__main__':
     unittest.main()
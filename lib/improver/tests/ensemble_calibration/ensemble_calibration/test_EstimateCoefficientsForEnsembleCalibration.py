@@ -46,6 +46,8 @@ from improver.ensemble_calibration.ensemble_calibration import (
     ContinuousRankedProbabilityScoreMinimisers)
 from improver.ensemble_calibration.ensemble_calibration import (
     EstimateCoefficientsForEnsembleCalibration as Plugin)
+from improver.ensemble_calibration.ensemble_calibration import (
+    NoMatchingValidityTimesError)
 from improver.tests.ensemble_calibration.ensemble_calibration. \
     helper_functions import (_create_historic_forecasts, SetupCubes,
                              EnsembleCalibrationAssertions)
@@ -200,6 +202,20 @@ class Test__init__(SetupCubes):
         with self.assertRaisesRegex(ValueError, msg):
             Plugin(distribution, self.desired_units)
 
+    def test_subsample_point_by_point(self):
+        """Test an error is raised if the training data is subsampled when
+        estimating coefficients for each grid point."""
+        msg = "The training data can not be subsampled"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin(self.distribution, self.desired_units,
+                   point_by_point=True, subsample_step=2)
+
+    def test_invalid_window_length(self):
+        """Test an error is raised if the window length is less than 1."""
+        msg = "window_length must be at least 1"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin(self.distribution, self.desired_units, window_length=0)
+
     @unittest.skipIf(
         STATSMODELS_FOUND is True, "statsmodels module is available.")
     @ManageWarnings(
@@ -460,6 +476,25 @@ class Test_create_coefficients_cube(IrisTest):
             plugin.create_coefficients_cube(
                 optimised_coeffs, self.historic_forecast_with_realizations)
 
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_coefficients_for_each_point(self):
+        """Test that the coefficients cube has the y and x dimension
+        coordinates of the historic forecast, when the coefficients have been
+        estimated for each grid point."""
+        optimised_coeffs = np.broadcast_to(
+            self.optimised_coeffs[:, np.newaxis, np.newaxis], (4, 3, 3))
+        result = self.plugin.create_coefficients_cube(
+            optimised_coeffs, self.historic_forecast)
+        self.assertEqual(result.shape, (4, 3, 3))
+        self.assertArrayEqual(result.data, optimised_coeffs)
+        self.assertEqual(result.coord_dims("coefficient_name"), (0,))
+        for index, axis in enumerate(["y", "x"], 1):
+            self.assertEqual(result.coord_dims(result.coord(axis=axis)),
+                             (index,))
+            self.assertEqual(result.coord(axis=axis),
+                             self.historic_forecast.coord(axis=axis))
+
 
 class Test_compute_initial_guess(IrisTest):
 
@@ -707,7 +742,7 @@ class Test__filter_non_matching_cubes(SetupCubes):
         raised."""
         partial_truth = self.truth[2]
         msg = "The filtering has found no matches in validity time "
-        with self.assertRaisesRegex(ValueError, msg):
+        with self.assertRaisesRegex(NoMatchingValidityTimesError, msg):
             Plugin._filter_non_matching_cubes(
                 self.partial_historic_forecasts, partial_truth)
 
@@ -1003,6 +1038,301 @@ class Test_process(SetupCubes, EnsembleCalibrationAssertions,
                 self.historic_temperature_forecast_cube,
                 self.temperature_truth_cube)
 
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_gradient_based_minimisation_method(self):
+        """Ensure that the requested minimisation method is used, and that
+        the convergence diagnostics are available from the minimiser."""
+        plugin = Plugin(self.distribution, self.current_cycle,
+                        minimisation_method="L-BFGS-B")
+        result = plugin.process(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        self.assertEqual(len(result.data), len(self.coeff_names))
+        self.assertEqual(plugin.minimiser.minimisation_method, "L-BFGS-B")
+        self.assertEqual(
+            plugin.minimiser.convergence_diagnostics[0]["method"],
+            "L-BFGS-B")
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_point_by_point(self):
+        """Ensure that coefficients are estimated for each grid point, when
+        point_by_point is True."""
+        plugin = Plugin(self.distribution, self.current_cycle,
+                        point_by_point=True)
+        result = plugin.process(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        self.assertEqual(result.shape, (len(self.coeff_names), 3, 3))
+        self.assertEqual(result.dtype, np.float32)
+        self.assertArrayEqual(
+            result.coord("coefficient_name").points, self.coeff_names)
+        self.assertEqual(result.coord_dims(result.coord(axis="y")), (1,))
+        self.assertEqual(result.coord_dims(result.coord(axis="x")), (2,))
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_point_by_point_realizations(self):
+        """Ensure that coefficients are estimated for each grid point, when
+        point_by_point is True and the ensemble realizations are the
+        predictor, with the blocks of points minimised in parallel."""
+        plugin = Plugin(
+            self.distribution, self.current_cycle,
+            predictor_of_mean_flag="realizations", point_by_point=True,
+            points_per_block=5, processes=2)
+        result = plugin.process(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        self.assertEqual(
+            result.shape, (len(self.coeff_names_realizations), 3, 3))
+        self.assertArrayEqual(
+            result.coord("coefficient_name").points,
+            self.coeff_names_realizations)
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_previous_coefficients(self):
+        """Ensure that previously estimated coefficients can be used as the
+        initial guess for the minimisation."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        previous_coefficients = plugin.process(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        result = plugin.process(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube,
+            previous_coefficients=previous_coefficients)
+        self.assertEqual(result.shape, previous_coefficients.shape)
+        self.assertArrayEqual(
+            result.coord("coefficient_name").points, self.coeff_names)
+        self.assertTrue(np.all(np.isfinite(result.data)))
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_previous_coefficients_mismatching_names(self):
+        """Ensure that an error is raised if the previous coefficients do not
+        have the coefficient names required by the plugin."""
+        plugin = Plugin(self.distribution, self.current_cycle,
+                        predictor_of_mean_flag="realizations")
+        previous_coefficients = Plugin(
+            self.distribution, self.current_cycle).process(
+                self.historic_temperature_forecast_cube,
+                self.temperature_truth_cube)
+        msg = "The coefficient names"
+        with self.assertRaisesRegex(ValueError, msg):
+            plugin.process(
+                self.historic_temperature_forecast_cube,
+                self.temperature_truth_cube,
+                previous_coefficients=previous_coefficients)
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_previous_coefficients_point_by_point(self):
+        """Ensure that coefficients estimated for each grid point can be used
+        as the initial guess when estimating coefficients for each grid
+        point, but not when estimating coefficients for the whole domain."""
+        plugin = Plugin(self.distribution, self.current_cycle,
+                        point_by_point=True)
+        previous_coefficients = plugin.process(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        result = plugin.process(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube,
+            previous_coefficients=previous_coefficients)
+        self.assertEqual(result.shape, (len(self.coeff_names), 3, 3))
+        plugin = Plugin(self.distribution, self.current_cycle)
+        msg = "The previous coefficients cube with shape"
+        with self.assertRaisesRegex(ValueError, msg):
+            plugin.process(
+                self.historic_temperature_forecast_cube,
+                self.temperature_truth_cube,
+                previous_coefficients=previous_coefficients)
+
+
+class Test_add_training_day(SetupCubes):
+
+    """Test the add_training_day method."""
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def setUp(self):
+        """Set up multiple cubes for testing."""
+        super().setUp()
+        self.current_cycle = "20171110T0000Z"
+        self.distribution = "gaussian"
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_basic(self):
+        """Ensure that the forecast predictor, forecast variance and truth
+        are stored for each validity time."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        for historic_forecast, truth in zip(
+                self.historic_forecasts, self.truth):
+            plugin.add_training_day(historic_forecast, truth)
+        self.assertEqual(len(plugin.training_data), 5)
+        self.assertArrayEqual(
+            sorted(plugin.training_data),
+            self.temperature_truth_cube.coord("time").points)
+        forecast_predictor, forecast_var, truth = (
+            plugin.training_data[min(plugin.training_data)])
+        self.assertEqual(forecast_predictor.shape, (3, 3))
+        self.assertEqual(forecast_var.shape, (3, 3))
+        self.assertArrayAlmostEqual(
+            forecast_predictor.data,
+            self.historic_forecasts[0].collapsed(
+                "realization", iris.analysis.MEAN).data)
+        self.assertArrayAlmostEqual(truth.data, self.truth[0].data)
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_window_length(self):
+        """Ensure that only the latest validity times are retained when the
+        rolling window is full."""
+        plugin = Plugin(self.distribution, self.current_cycle,
+                        window_length=3)
+        for historic_forecast, truth in zip(
+                self.historic_forecasts, self.truth):
+            plugin.add_training_day(historic_forecast, truth)
+        self.assertArrayEqual(
+            sorted(plugin.training_data),
+            self.temperature_truth_cube.coord("time").points[-3:])
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_training_template(self):
+        """Ensure that only a single validity time of the most recent
+        historic forecast is retained as the template for the coefficients
+        cube."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        plugin.add_training_day(
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        template = plugin.training_template
+        self.assertEqual(len(template.coord("time").points), 1)
+        self.assertEqual(template.shape, (3, 3, 3))
+        self.assertEqual(
+            template.coord("realization"),
+            self.historic_temperature_forecast_cube.coord("realization"))
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_subsample_step(self):
+        """Ensure that the training data is subsampled along the x and y
+        dimensions."""
+        plugin = Plugin(self.distribution, self.current_cycle,
+                        subsample_step=2)
+        plugin.add_training_day(self.historic_forecasts[0], self.truth[0])
+        for cube in plugin.training_data[min(plugin.training_data)]:
+            self.assertEqual(cube.shape, (2, 2))
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_no_matches_exception(self):
+        """Ensure that an error is raised if the historic forecast and truth
+        do not match in validity time."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        msg = "The filtering has found no matches"
+        with self.assertRaisesRegex(NoMatchingValidityTimesError, msg):
+            plugin.add_training_day(self.historic_forecasts[0], self.truth[1])
+
+
+class Test_estimate_from_training_data(
+        SetupCubes, EnsembleCalibrationAssertions, SetupExpectedCoefficients):
+
+    """Test the estimate_from_training_data method."""
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def setUp(self):
+        """Set up multiple cubes for testing."""
+        super().setUp()
+        self.current_cycle = "20171110T0000Z"
+        self.distribution = "gaussian"
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_matches_process(self):
+        """Ensure that adding the training data one day at a time gives the
+        same coefficients as providing all of the training data at once."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        for historic_forecast, truth in zip(
+                self.historic_forecasts, self.truth):
+            plugin.add_training_day(historic_forecast, truth)
+        result = plugin.estimate_from_training_data()
+        self.assertEMOSCoefficientsAlmostEqual(
+            result.data, self.expected_mean_predictor_gaussian)
+        self.assertArrayEqual(
+            result.coord("coefficient_name").points,
+            ["gamma", "delta", "alpha", "beta"])
+
+    def test_no_training_data(self):
+        """Ensure that an error is raised if no training data has been
+        added."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        msg = "No training data is available"
+        with self.assertRaisesRegex(ValueError, msg):
+            plugin.estimate_from_training_data()
+
+
+class Test_process_streaming(
+        SetupCubes, EnsembleCalibrationAssertions, SetupExpectedCoefficients):
+
+    """Test the process_streaming method."""
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def setUp(self):
+        """Set up multiple cubes for testing."""
+        super().setUp()
+        self.current_cycle = "20171110T0000Z"
+        self.distribution = "gaussian"
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_basic(self):
+        """Ensure that the expected coefficients are estimated when the
+        historic forecasts and truths are provided by generators."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        result = plugin.process_streaming(
+            (cube for cube in self.historic_forecasts),
+            (cube for cube in self.truth))
+        self.assertEMOSCoefficientsAlmostEqual(
+            result.data, self.expected_mean_predictor_gaussian)
+
+    @ManageWarnings(
+        record=True,
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_mismatching_day_skipped(self, warning_list=None):
+        """Ensure that a historic forecast and truth that do not match in
+        validity time are skipped with a warning."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        historic_forecasts = self.historic_forecasts[:3]
+        truths = iris.cube.CubeList(
+            [self.truth[1], self.truth[1], self.truth[2]])
+        plugin.process_streaming(historic_forecasts, truths)
+        warning_msg = "does not match the truth in validity time"
+        self.assertTrue(any(item.category == UserWarning
+                            for item in warning_list))
+        self.assertTrue(any(warning_msg in str(item)
+                            for item in warning_list))
+        self.assertEqual(len(plugin.training_data), 2)
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES + [
+            "does not match the truth in validity time"],
+        warning_types=WARNING_TYPES + [UserWarning])
+    def test_no_matches_exception(self):
+        """Ensure that an error is raised if none of the historic forecasts
+        and truths match in validity time."""
+        plugin = Plugin(self.distribution, self.current_cycle)
+        msg = "The filtering has found no matches"
+        with self.assertRaisesRegex(ValueError, msg):
+            plugin.process_streaming(
+                self.historic_forecasts[:2], self.truth[2:4])
+
 
 if __name__ == '__main__':
     unittest.main()
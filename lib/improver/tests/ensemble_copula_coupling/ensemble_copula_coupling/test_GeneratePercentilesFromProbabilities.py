@@ -356,6 +356,21 @@ class Test__probabilities_to_percentiles(IrisTest):
             cube, percentiles, bounds_pairing)
         self.assertArrayAlmostEqual(result.data, expected, decimal=5)
 
+    def test_max_points_per_chunk(self):
+        """
+        Test that the plugin returns the same data values when the
+        interpolation is performed for a limited number of points at a time.
+        """
+        cube = self.current_temperature_forecast_cube
+        percentiles = [10, 50, 90]
+        bounds_pairing = (-40, 50)
+        expected = Plugin()._probabilities_to_percentiles(
+            cube, percentiles, bounds_pairing)
+        plugin = Plugin(max_points_per_chunk=2)
+        result = plugin._probabilities_to_percentiles(
+            cube, percentiles, bounds_pairing)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
     @ManageWarnings(record=True)
     def test_probabilities_not_monotonically_increasing(self,
                                                         warning_list=None):
@@ -383,6 +398,30 @@ class Test__probabilities_to_percentiles(IrisTest):
         self.assertTrue(any(warning_msg in str(item)
                             for item in warning_list))
 
+    @ManageWarnings(
+        ignored_messages=["The probability values used to construct the"])
+    def test_probabilities_not_monotonically_increasing_data(self):
+        """
+        Test that the plugin returns the same values as linear interpolation
+        of each point separately when the probabilities of the Cumulative
+        Distribution Function are not monotonically increasing.
+        """
+        data = np.array([0.05, 0.7, 0.95])
+        data = data[:, np.newaxis, np.newaxis, np.newaxis]
+        cube = add_forecast_reference_time_and_forecast_period(
+            set_up_probability_threshold_cube(
+                data, "air_temperature", "degreesC",
+                forecast_thresholds=[8, 10, 12], y_dimension_length=1,
+                x_dimension_length=1, spp__relative_to_threshold='above'))
+        percentiles = [10, 50, 90]
+        bounds_pairing = (-40, 50)
+        expected = np.array([-34.94737, -14.736842, 5.473683])
+        plugin = Plugin()
+        result = plugin._probabilities_to_percentiles(
+            cube, percentiles, bounds_pairing)
+        self.assertArrayAlmostEqual(result.data.flatten(), expected,
+                                    decimal=5)
+
     def test_result_cube_has_no_air_temperature_threshold_coordinate(self):
         """
         Test that the plugin returns a cube with coordinates that
@@ -300,6 +300,21 @@ class Test__interpolate_percentiles(IrisTest):
             cube, percentiles, bounds_pairing, self.perc_coord)
         self.assertArrayAlmostEqual(result.data, data)
 
+    def test_max_points_per_chunk(self):
+        """
+        Test that the plugin returns the same data values when the
+        interpolation is performed for a limited number of points at a time.
+        """
+        cube = self.percentile_cube
+        percentiles = [20, 60, 80]
+        bounds_pairing = (-40, 50)
+        expected = Plugin()._interpolate_percentiles(
+            cube, percentiles, bounds_pairing, self.perc_coord)
+        plugin = Plugin(max_points_per_chunk=2)
+        result = plugin._interpolate_percentiles(
+            cube, percentiles, bounds_pairing, self.perc_coord)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
     def test_check_data_multiple_timesteps(self):
         """
         Test that the plugin returns an Iris.cube.Cube with the expected
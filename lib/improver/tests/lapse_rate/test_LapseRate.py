@@ -91,6 +91,26 @@ class Test__calc_lapse_rate(IrisTest):
                                                              self.orography)
         self.assertArrayAlmostEqual(result, expected_out)
 
+    def test_multiple_neighbourhoods(self):
+        """Test that the function returns the expected lapse rate for each
+           neighbourhood when several are passed in at once."""
+        temperature = np.stack([self.temperature, self.temperature])
+        orography = np.stack([self.orography, self.orography])
+        temperature[1, 4] = np.nan
+        expected_out = np.array([-0.00765005774676, DALR])
+        result = LapseRate(nbhood_radius=1)._calc_lapse_rate(temperature,
+                                                             orography)
+        self.assertArrayAlmostEqual(result, expected_out)
+
+    def test_constant_orography(self):
+        """Test that the function returns the minimum-norm least-squares
+           solution when all the heights are the same."""
+        self.orography[:] = 10.
+        expected_out = 10. * np.mean(self.temperature) / 101.
+        result = LapseRate(nbhood_radius=1)._calc_lapse_rate(self.temperature,
+                                                             self.orography)
+        self.assertArrayAlmostEqual(result, expected_out)
+
 
 class Test__create_heightdiff_mask(IrisTest):
     """Test the _create_heightdiff_mask function."""
@@ -449,6 +469,29 @@ class Test_process(IrisTest):
                                                     self.land_sea_mask)
         self.assertArrayAlmostEqual(result.data, expected_out)
 
+    def test_multiple_realizations(self):
+        """Test that each realization is processed as it would be
+           individually."""
+        orography = np.array([[10., 20., 30., 40., 50.],
+                              [15., 25., 35., 45., 55.],
+                              [20., 30., 40., 50., 60.],
+                              [25., 35., 45., 55., 65.],
+                              [30., 40., 50., 60., 70.]], dtype=np.float32)
+        self.orography.data = orography
+        data = np.stack([0.005 * orography, -0.006 * orography])
+        data[1, 1, 1] = np.nan
+        temperature = set_up_variable_cube(
+            data.astype(np.float32), spatial_grid='equalarea')
+        plugin = LapseRate(nbhood_radius=1)
+        result = plugin.process(temperature, self.orography,
+                                self.land_sea_mask)
+        self.assertEqual(result.shape, (2, 5, 5))
+        for index, temp_slice in enumerate(
+                temperature.slices_over("realization")):
+            expected = plugin.process(temp_slice, self.orography,
+                                      self.land_sea_mask)
+            self.assertArrayAlmostEqual(result.data[index], expected.data)
+
     @ManageWarnings(
         ignored_messages=["invalid value encountered in greater_equal"],
         warning_types=[RuntimeWarning])
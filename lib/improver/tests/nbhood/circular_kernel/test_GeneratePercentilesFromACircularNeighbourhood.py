@@ -55,7 +55,8 @@ class Test__repr__(IrisTest):
         """Test that the __repr__ returns the expected string."""
         result = str(GeneratePercentilesFromACircularNeighbourhood())
         msg = ('<GeneratePercentilesFromACircularNeighbourhood: '
-               'percentiles: {}>'.format(DEFAULT_PERCENTILES))
+               'percentiles: {}, max_memory_mb: None>'.format(
+                   DEFAULT_PERCENTILES))
         self.assertEqual(str(result), msg)
 
 
@@ -182,6 +183,26 @@ class Test_pad_and_unpad_cube(IrisTest):
         self.assertIsInstance(result, Cube)
         self.assertArrayAlmostEqual(result.data, expected)
 
+    def test_tiled_matches_whole_grid(self):
+        """Test that calculating the percentiles over tiles of rows gives the
+        same result as calculating them for the whole grid at once, using an
+        irregular kernel to check the orientation of the neighbourhood."""
+        kernel = np.array(
+            [[0., 1., 0.],
+             [1., 0., 1.],
+             [0., 0., 1.]])
+        cube = self.cube[0, 0, :, :]
+        cube.data = np.arange(25, dtype=np.float32).reshape(5, 5)
+        plugin = GeneratePercentilesFromACircularNeighbourhood(
+            percentiles=[10, 50, 90])
+        expected = plugin.pad_and_unpad_cube(cube, kernel)
+        # A memory limit of zero gives tiles of a single row.
+        plugin.max_memory_mb = 0.
+        result = plugin.pad_and_unpad_cube(cube, kernel)
+        self.assertIsInstance(result, Cube)
+        self.assertEqual(result.data.dtype, np.float32)
+        self.assertArrayEqual(result.data, expected.data)
+
     def test_single_point_almost_edge(self):
         """Test behaviour for a non-zero grid cell quite near the edge."""
         cube = set_up_cube(
@@ -357,6 +378,21 @@ class Test_run(IrisTest):
                     self.cube, radius))
         self.assertArrayAlmostEqual(result.data, expected)
 
+    def test_single_point_max_memory(self):
+        """Test behaviour for a single non-zero grid cell when the percentiles
+        are calculated over tiles of rows."""
+        percentiles = np.array([10, 50, 90])
+        radius = 2000.
+        expected = (
+            GeneratePercentilesFromACircularNeighbourhood(
+                percentiles=percentiles).run(
+                    self.cube, radius))
+        result = (
+            GeneratePercentilesFromACircularNeighbourhood(
+                percentiles=percentiles, max_memory_mb=0.0001).run(
+                    self.cube, radius))
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
     def test_multi_point_multitimes(self):
         """Test behaviour for points over multiple times."""
         cube = set_up_cube(
@@ -338,6 +338,26 @@ class Test__find_radii(IrisTest):
         self.assertArrayAlmostEqual(result, expected_result)
 
 
+class Test__find_radii_for_slices(IrisTest):
+
+    """Test the _find_radii_for_slices function is working correctly."""
+
+    def test_basic(self):
+        """Test that the radii are interpolated to the forecast period of
+        each x-y slice of the cube."""
+        cube = set_up_cube(num_time_points=3)
+        iris.util.promote_aux_coord_to_dim_coord(cube, "time")
+        time_points = cube.coord("time").points
+        fp_points = [2, 3, 4]
+        cube = add_forecast_reference_time_and_forecast_period(
+            cube, time_point=time_points, fp_point=fp_points)
+        plugin = NBHood(SquareNeighbourhood(), [10000, 30000],
+                        lead_times=[2, 4])
+        result = plugin._find_radii_for_slices(cube)
+        expected_result = np.array([[10000., 20000., 30000.]])
+        self.assertArrayAlmostEqual(result, expected_result)
+
+
 class Test_process(IrisTest):
 
     """Tests for the process method of NeighbourhoodProcessing."""
@@ -533,6 +553,30 @@ class Test_process(IrisTest):
         result = plugin.process(cube)
         self.assertArrayAlmostEqual(result.data, expected)
 
+    def test_square_radii_varying_with_lead_time_check_data(self):
+        """
+        Test that the expected data is produced when the radius varies with
+        lead time and the square neighbourhood is applied to all the times
+        at once.
+        """
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 7, 7), (0, 1, 7, 7,), (0, 2, 7, 7)),
+            num_time_points=3)
+        iris.util.promote_aux_coord_to_dim_coord(cube, "time")
+        time_points = cube.coord("time").points
+        fp_points = [2, 3, 4]
+        cube = add_forecast_reference_time_and_forecast_period(
+            cube, time_point=time_points, fp_point=fp_points)
+        radii = [2000, 4000, 6000]
+        lead_times = [2, 3, 4]
+        plugin = NBHood(SquareNeighbourhood(), radii, lead_times)
+        result = plugin.process(cube)
+        self.assertEqual(result.shape, cube.shape)
+        for index, radius in enumerate(radii):
+            expected = NBHood(SquareNeighbourhood(), radius).process(
+                cube[:, index])
+            self.assertArrayAlmostEqual(result.data[:, index], expected.data)
+
     def test_use_mask_cube_occurrences_not_masked(self):
         """Test that the plugin returns an iris.cube.Cube with the correct
         data array if a mask cube is used and the mask cube does not mask
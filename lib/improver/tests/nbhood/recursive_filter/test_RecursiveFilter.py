@@ -220,6 +220,26 @@ class Test__recurse_forward(Test_RecursiveFilter):
         self.assertIsInstance(result, np.ndarray)
         self.assertArrayAlmostEqual(result, expected_result)
 
+    def test_multiple_slices(self):
+        """Test that a stack of fields is filtered as each field would be
+           individually."""
+        data = np.stack([self.cube.data[0], 2.*self.cube.data[0]])
+        expected_result = np.stack(
+            [RecursiveFilter()._recurse_forward(
+                field.copy(), self.alphas_cube.data, 0) for field in data])
+        result = RecursiveFilter()._recurse_forward(
+            data, self.alphas_cube.data, -2)
+        self.assertArrayAlmostEqual(result, expected_result)
+
+    def test_constant_alpha(self):
+        """Test that using a single alpha value gives the same result as
+           using an array of identical alpha values."""
+        expected_result = RecursiveFilter()._recurse_forward(
+            self.cube.data[0].copy(), self.alphas_cube.data, 1)
+        result = RecursiveFilter()._recurse_forward(
+            self.cube.data[0].copy(), 0.5, 1)
+        self.assertArrayAlmostEqual(result, expected_result)
+
 
 class Test__recurse_backward(Test_RecursiveFilter):
 
@@ -253,46 +273,57 @@ class Test__recurse_backward(Test_RecursiveFilter):
         self.assertIsInstance(result, np.ndarray)
         self.assertArrayAlmostEqual(result, expected_result)
 
+    def test_constant_alpha(self):
+        """Test that using a single alpha value gives the same result as
+           using an array of identical alpha values."""
+        expected_result = RecursiveFilter()._recurse_backward(
+            self.cube.data[0].copy(), self.alphas_cube.data, 0)
+        result = RecursiveFilter()._recurse_backward(
+            self.cube.data[0].copy(), 0.5, 0)
+        self.assertArrayAlmostEqual(result, expected_result)
+
 
-class Test__run_recursion(Test_RecursiveFilter):
+class Test__run_recursion_on_array(Test_RecursiveFilter):
 
-    """Test the _run_recursion method"""
+    """Test the _run_recursion_on_array method"""
 
     def test_return_type(self):
-        """Test that the _run_recursion method returns an iris.cube.Cube."""
+        """Test that the _run_recursion_on_array method returns a numpy
+        array."""
         edge_width = 1
         cube = iris.util.squeeze(self.cube)
         alphas_x = RecursiveFilter()._set_alphas(cube, self.alpha_x, None)
         alphas_y = RecursiveFilter()._set_alphas(cube, self.alpha_y, None)
         padded_cube = pad_cube_with_halo(cube, 2*edge_width, 2*edge_width)
-        result = RecursiveFilter()._run_recursion(
-            padded_cube, alphas_x, alphas_y, self.iterations)
-        self.assertIsInstance(result, Cube)
+        result = RecursiveFilter()._run_recursion_on_array(
+            padded_cube.data, alphas_x.data, alphas_y.data, self.iterations)
+        self.assertIsInstance(result, np.ndarray)
 
     def test_result_basic(self):
-        """Test that the _run_recursion method returns the expected value."""
+        """Test that the _run_recursion_on_array method returns the expected
+        value."""
         edge_width = 1
         cube = iris.util.squeeze(self.cube)
         alphas_x = RecursiveFilter()._set_alphas(cube, self.alpha_x, None)
         alphas_y = RecursiveFilter()._set_alphas(cube, self.alpha_y, None)
         padded_cube = pad_cube_with_halo(cube, 2*edge_width, 2*edge_width)
-        result = RecursiveFilter()._run_recursion(
-            padded_cube, alphas_x, alphas_y, self.iterations)
+        result = RecursiveFilter()._run_recursion_on_array(
+            padded_cube.data, alphas_x.data, alphas_y.data, self.iterations)
         expected_result = 0.13382206
-        self.assertAlmostEqual(result.data[4][4], expected_result)
+        self.assertAlmostEqual(result[4][4], expected_result)
 
     def test_different_alphas(self):
-        """Test that the _run_recursion method returns expected values when
-        alpha values are different in the x and y directions."""
+        """Test that the _run_recursion_on_array method returns expected
+        values when alpha values are different in the x and y directions."""
         cube = iris.util.squeeze(self.cube)
         alpha_y = 0.5*self.alpha_x
         alphas_x = RecursiveFilter()._set_alphas(cube, self.alpha_x, None)
         alphas_y = RecursiveFilter()._set_alphas(cube, alpha_y, None)
         padded_cube = pad_cube_with_halo(cube, 2, 2)
-        result = RecursiveFilter()._run_recursion(
-            padded_cube, alphas_x, alphas_y, 1)
+        result = RecursiveFilter()._run_recursion_on_array(
+            padded_cube.data, alphas_x.data, alphas_y.data, 1)
         # slice back down to the source grid - easier to visualise!
-        unpadded_result = result.data[2:-2, 2:-2]
+        unpadded_result = result[2:-2, 2:-2]
 
         expected_result = np.array(
             [[0.01620921, 0.02866841, 0.05077430, 0.02881413, 0.01657352],
@@ -383,6 +414,40 @@ class Test_process(Test_RecursiveFilter):
         self.assertEqual(result.data.shape, expected_shape)
         self.assertEqual(result.data.shape, expected_shape)
 
+    def test_zero_edge_width(self):
+        """Test that the RecursiveFilter plugin returns a data array with
+           the correct dimensions and values when no halo is added"""
+        plugin = RecursiveFilter(alpha_x=self.alpha_x, alpha_y=self.alpha_y,
+                                 iterations=self.iterations, edge_width=0)
+        result = plugin.process(self.cube, alphas_x=None, alphas_y=None)
+        expected = RecursiveFilter._run_recursion_on_array(
+            self.cube.data.copy(), self.alpha_x, self.alpha_y,
+            self.iterations)
+        self.assertEqual(result.data.shape, (1, 5, 5))
+        self.assertArrayAlmostEqual(result.data, expected)
+        self.assertArrayEqual(result.coord(axis="x").points,
+                              self.cube.coord(axis="x").points)
+
+    def test_multiple_realizations(self):
+        """Test that each realization is filtered as it would be
+           individually, using alpha cubes so that the alphas vary in
+           space."""
+        data = np.stack([self.cube.data[0], 2.*self.cube.data[0]])
+        data[1, 0, 0] = np.nan
+        cube = set_up_variable_cube(
+            data, name="precipitation_amount", units="kg m^-2 s^-1")
+        alphas_x = self.alphas_cube.copy(
+            data=np.linspace(0.1, 0.9, 25, dtype=np.float32).reshape(5, 5))
+        plugin = RecursiveFilter(iterations=2, re_mask=True)
+        result = plugin.process(cube, alphas_x=alphas_x,
+                                alphas_y=self.alphas_cube)
+        for index, cube_slice in enumerate(cube.slices_over("realization")):
+            expected = plugin.process(cube_slice, alphas_x=alphas_x,
+                                      alphas_y=self.alphas_cube)
+            self.assertArrayAlmostEqual(result.data[index], expected.data)
+            self.assertArrayEqual(result.data.mask[index],
+                                  expected.data.mask)
+
     def test_coordinate_reordering_with_different_alphas(self):
         """Test that x and y alphas still apply to the right coordinate when
         the input cube spatial dimensions are (x, y) not (y, x)"""
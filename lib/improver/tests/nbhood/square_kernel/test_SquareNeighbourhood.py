@@ -32,17 +32,16 @@
 
 
 import unittest
+from unittest.mock import patch
 
-import iris
 import numpy as np
-from iris.coords import CellMethod, DimCoord
+from iris.coords import CellMethod
 from iris.cube import Cube
 from iris.tests import IrisTest
 
 from improver.nbhood.square_kernel import SquareNeighbourhood
 from improver.tests.nbhood.nbhood.test_NeighbourhoodProcessing import (
     set_up_cube)
-from improver.wind_calculations.wind_direction import WindDirection
 
 
 class Test__init__(IrisTest):
@@ -71,464 +70,149 @@ class Test__repr__(IrisTest):
         self.assertEqual(result, msg)
 
 
-class Test_cumulate_array(IrisTest):
+class Test__chunk_slices(IrisTest):
 
-    """Test for cumulating an array in the y and x dimension."""
+    """Test splitting the x-y slices into chunks."""
 
+    @patch('improver.nbhood.square_kernel.MAX_POINTS_PER_CHUNK', 40)
     def test_basic(self):
-        """
-        Test that the y-dimension and x-dimension accumulation produces the
-        intended result. A 2d cube is passed in.
-        """
-        data = np.array([[1., 2., 3., 4., 5.],
-                         [2., 4., 6., 8., 10.],
-                         [3., 6., 8., 11., 14.],
-                         [4., 8., 11., 15., 19.],
-                         [5., 10., 14., 19., 24.]])
-        cube = set_up_cube(
-            zero_point_indices=((0, 0, 2, 2),), num_time_points=1,
-            num_grid_points=5)
-        cube = iris.util.squeeze(cube)
-        result_cube = SquareNeighbourhood().cumulate_array(cube)
-        self.assertIsInstance(result_cube, Cube)
-        self.assertArrayAlmostEqual(result_cube.data, data)
-
-
-class Test_calculate_neighbourhood(IrisTest):
-
-    """ Test calculating neighbourhood """
-
-    def setUp(self):
-        """Set up cube and expected results for tests."""
-
-        # This array is the output from cumulate_array when a 3x3 array of 1's
-        # with a 0 at the centre point (1,1) is passed in.
-        # A Halo has been added to the data.
-        self.data = np.array(
-            [[0., 0., 0., 0., 0., 0., 0.],
-             [0., 0., 0., 0., 0., 0., 0.],
-             [0., 0., 1., 2., 3., 3., 3.],
-             [0., 0., 2., 3., 5., 5., 5.],
-             [0., 0., 3., 5., 8., 8., 8.],
-             [0., 0., 3., 5., 8., 8., 8.],
-             [0., 0., 3., 5., 8., 8., 8.]])
-        self.cube = Cube(self.data, long_name='test')
-        self.x_coord = DimCoord([0, 1, 2, 3, 4, 5, 6],
-                                standard_name='longitude')
-        self.y_coord = DimCoord([0, 1, 2, 3, 4, 5, 6],
-                                standard_name='latitude')
-        self.cube.add_dim_coord(self.x_coord, 1)
-        self.cube.add_dim_coord(self.y_coord, 0)
-        cells_x = cells_y = 1
-        self.n_rows = 7
-        self.n_columns = 7
-        self.ymax_xmax_disp = (cells_y*self.n_columns) + cells_x
-        self.ymax_xmin_disp = (cells_y*self.n_columns) - cells_x - 1
-        self.ymin_xmax_disp = (-1*(cells_y+1)*self.n_columns) + cells_x
-        self.ymin_xmin_disp = (-1*(cells_y+1)*self.n_columns) - cells_x - 1
+        """Test that the selected slices are split into chunks of at most
+        MAX_POINTS_PER_CHUNK points."""
+        index = np.array([[True, False, True], [True, True, True]])
+        result = SquareNeighbourhood._chunk_slices(index, (4, 5))
+        self.assertEqual(len(result), 3)
+        self.assertArrayEqual(result[0][0], [0, 0])
+        self.assertArrayEqual(result[0][1], [0, 2])
+        self.assertArrayEqual(result[1][0], [1, 1])
+        self.assertArrayEqual(result[1][1], [0, 1])
+        self.assertArrayEqual(result[2][0], [1])
+        self.assertArrayEqual(result[2][1], [2])
+
+    @patch('improver.nbhood.square_kernel.MAX_POINTS_PER_CHUNK', 10)
+    def test_large_slices(self):
+        """Test that each chunk contains one slice if a slice is larger than
+        MAX_POINTS_PER_CHUNK."""
+        index = np.ones(3, dtype=bool)
+        result = SquareNeighbourhood._chunk_slices(index, (4, 5))
+        self.assertEqual(len(result), 3)
+        for chunk in result:
+            self.assertEqual(len(chunk[0]), 1)
+
+    def test_no_leading_dimensions(self):
+        """Test that a single chunk selecting the whole array is returned if
+        there are no leading dimensions."""
+        result = SquareNeighbourhood._chunk_slices(np.array(True), (4, 5))
+        self.assertEqual(result, [(Ellipsis,)])
+        result = SquareNeighbourhood._chunk_slices(np.array(False), (4, 5))
+        self.assertEqual(result, [])
+
+
+class Test__compensated_cumsum(IrisTest):
+
+    """Test the compensated cumulative sum."""
 
     def test_basic(self):
-        """ Test that calculate neighbourhood returns correct values """
-        expected = np.array(
-            [[8., 5., -5., -8., -5., -3., 8.],
-             [8., 6., -3., -5., -3., -2., 5.],
-             [5., 7., 3., 5., 3., 2., -5.],
-             [-5., -2., 5., 8., 5., 3., -8.],
-             [-8., -6., 3., 5., 3., 2., -5.],
-             [-5., -4., 2., 3., 2., 1., -3.],
-             [-3., -6., -5., -8., -5., -3., 8.]])
-        result = (
-            SquareNeighbourhood().calculate_neighbourhood(self.cube,
-                                                          self.ymax_xmax_disp,
-                                                          self.ymin_xmax_disp,
-                                                          self.ymin_xmin_disp,
-                                                          self.ymax_xmin_disp,
-                                                          self.n_rows,
-                                                          self.n_columns))
-        self.assertArrayEqual(result, expected)
-
+        """Test that the cumulative sum is calculated along the requested
+        axis, and that the rounding errors are zero for exact sums."""
+        data = np.arange(12, dtype=np.float64).reshape(3, 4)
+        summed, error = SquareNeighbourhood._compensated_cumsum(data, 0)
+        self.assertArrayAlmostEqual(summed, np.cumsum(data, axis=0))
+        self.assertArrayAlmostEqual(error, np.zeros(data.shape))
 
-class Test_mean_over_neighbourhood(IrisTest):
+    def test_rounding_errors(self):
+        """Test that the rounding errors are accumulated, so that the sum
+        of the outputs gives the exact cumulative sum."""
+        data = np.array([1.e16, 1., 1., 1., 1.])
+        summed, error = SquareNeighbourhood._compensated_cumsum(data, 0)
+        self.assertEqual(summed[-1], 1.e16)
+        self.assertArrayEqual(error, [0., 1., 2., 3., 4.])
 
-    """Test for calculating mean value in neighbourhood."""
 
-    def setUp(self):
-        """Set up cube and expected results for tests."""
-
-        # This array is the output from cumulate_array when a 3x3 array of 1's
-        # with a 0 at the centre point (1,1) is passed in.
-        # A Halo has been added to the data.
-        self.data = np.array(
-            [[0., 0., 0., 0., 0., 0., 0.],
-             [0., 0., 0., 0., 0., 0., 0.],
-             [0., 0., 1., 2., 3., 3., 3.],
-             [0., 0., 2., 3., 5., 5., 5.],
-             [0., 0., 3., 5., 8., 8., 8.],
-             [0., 0., 3., 5., 8., 8., 8.],
-             [0., 0., 3., 5., 8., 8., 8.]])
-        self.cube = Cube(self.data, long_name='test')
-        self.x_coord = DimCoord([0, 1, 2, 3, 4, 5, 6],
-                                standard_name='longitude')
-        self.y_coord = DimCoord([0, 1, 2, 3, 4, 5, 6],
-                                standard_name='latitude')
-        self.cube.add_dim_coord(self.x_coord, 1)
-        self.cube.add_dim_coord(self.y_coord, 0)
-        self.mask = self.cube.copy()
-        self.mask.rename('mask_data')
-        # This array is the output from cumulate_array when a 3x3 array of 1's
-        # A Halo of missing points has been added to the data.
-        self.mask.data = np.array(
-            [[0., 0., 0., 0., 0., 0., 0.],
-             [0., 0., 0., 0., 0., 0., 0.],
-             [0., 0., 1., 2., 3., 3., 3.],
-             [0., 0., 2., 4., 6., 6., 6.],
-             [0., 0., 3., 6., 9., 9., 9.],
-             [0., 0., 3., 6., 9., 9., 9.],
-             [0., 0., 3., 6., 9., 9., 9.]])
-        self.nan_mask = np.zeros(self.cube.data.shape, dtype=int)
-        self.width = 1
-        self.expected = np.array(
-            [[0.88888889, 0.83333333, 0.83333333, 0.88888889,
-              0.83333333, 1.0, 0.88888889],
-             [0.88888889, 0.85714286, 0.75000000, 0.83333333,
-              0.75000000, 1.0, 0.83333333],
-             [0.83333333, 0.87500000, 0.75000000, 0.83333333,
-              0.75000000, 1.0, 0.83333333],
-             [0.83333333, 0.66666667, 0.83333333, 0.88888889,
-              0.83333333, 1.0, 0.88888889],
-             [0.88888889, 0.85714286, 0.75000000, 0.83333333,
-              0.75000000, 1.0, 0.83333333],
-             [0.83333333, 0.80000000, 1.00000000, 1.00000000,
-              1.00000000, 1.0, 1.00000000],
-             [1.00000000, 1.00000000, 0.83333333, 0.88888889,
-              0.83333333, 1.0, 0.88888889]])
-
-    def test_basic_fraction(self):
-        """Test cube with correct data is produced when mean over
-           neighbourhood is calculated where the sum_or_fraction option is
-           set to "fraction"."""
-        result = SquareNeighbourhood().mean_over_neighbourhood(
-            self.cube, self.mask, self.width, self.width)
-        self.assertIsInstance(result, Cube)
-        self.assertArrayAlmostEqual(result.data, self.expected)
-
-    def test_basic_sum(self):
-        """Test cube with correct data is produced when mean over
-           neighbourhood is calculated where the sum_or_fraction option is
-           set to "sum"."""
-        expected = np.array(
-            [[8., 5., -5., -8., -5., -3., 8.],
-             [8., 6., -3., -5., -3., -2., 5.],
-             [5., 7., 3., 5., 3., 2., -5.],
-             [-5., -2., 5., 8., 5., 3., -8.],
-             [-8., -6., 3., 5., 3., 2., -5.],
-             [-5., -4., 2., 3., 2., 1., -3.],
-             [-3., -6., -5., -8., -5., -3., 8.]])
-        result = SquareNeighbourhood(
-            sum_or_fraction="sum").mean_over_neighbourhood(
-                self.cube, self.mask, self.width, self.width)
-        self.assertIsInstance(result, Cube)
-        self.assertArrayAlmostEqual(result.data, expected)
+class Test_sum_over_neighbourhood(IrisTest):
 
-
-class Test_set_up_cubes_to_be_neighbourhooded(IrisTest):
-
-    """Test the set up of cubes prior to neighbourhooding."""
-
-    def setUp(self):
-        """Set up a cube."""
-        self.cube = set_up_cube(
-            zero_point_indices=((0, 0, 2, 2),), num_time_points=1,
-            num_grid_points=5)
-        self.cube = iris.util.squeeze(self.cube)
-
-    def test_without_masked_data(self):
-        """Test setting up cubes to be neighbourhooded when the input cube
-        does not contain masked arrays."""
-        expected_mask = np.ones((5, 5))
-        expected_nans = expected_mask.astype(bool)*False
-        cube, mask, nan_array = (
-            SquareNeighbourhood.set_up_cubes_to_be_neighbourhooded(self.cube))
-        self.assertIsInstance(cube, Cube)
-        self.assertIsInstance(mask, Cube)
-        self.assertEqual(cube, self.cube)
-        self.assertArrayEqual(nan_array, expected_nans)
-        self.assertArrayEqual(mask.data, expected_mask)
-
-    def test_with_masked_data(self):
-        """Test setting up cubes to be neighbourhooded when the input cube
-        contains masked arrays."""
-        cube = self.cube
-        data = cube.data
-        cube.data[1, 3] = 0.5
-        cube.data[3, 3] = 0.5
-        cube.data = np.ma.masked_equal(data, 0.5)
-        mask = np.logical_not(cube.data.mask.astype(int))
-        expected_nans = np.ones((5, 5)).astype(bool)*False
-        data = cube.data.data * mask
-        result_cube, result_mask, result_nan_array = (
-            SquareNeighbourhood.set_up_cubes_to_be_neighbourhooded(
-                cube.copy()))
-        self.assertArrayAlmostEqual(result_cube.data, data)
-        self.assertArrayAlmostEqual(result_mask.data, mask)
-        self.assertArrayEqual(result_nan_array, expected_nans)
-
-    def test_with_separate_mask_cube(self):
-        """Test for an input cube and an additional mask cube."""
-        self.cube.data[1, 3] = 0.5
-        self.cube.data[3, 3] = 0.5
-        mask_cube = self.cube.copy()
-        mask_cube.data = np.ones((5, 5))
-        mask_cube.data[self.cube.data == 0.5] = 0
-        mask_cube.data = mask_cube.data.astype(int)
-        expected_data = self.cube.data * mask_cube.data
-        expected_mask = np.ones((5, 5))
-        expected_mask[1, 3] = 0.0
-        expected_mask[3, 3] = 0.0
-        expected_nans = np.ones((5, 5)).astype(bool)*False
-        result_cube, result_mask, result_nan_array = (
-            SquareNeighbourhood.set_up_cubes_to_be_neighbourhooded(
-                self.cube.copy(), mask_cube=mask_cube))
-        self.assertIsInstance(result_cube, Cube)
-        self.assertIsInstance(result_mask, Cube)
-        self.assertArrayAlmostEqual(result_cube.data, expected_data)
-        self.assertArrayAlmostEqual(result_mask.data, expected_mask)
-        self.assertArrayEqual(result_nan_array, expected_nans)
-
-    def test_with_separate_mask_cube_and_nan(self):
-        """Test for an input cube and an additional mask cube."""
-        mask_cube = self.cube.copy()
-        self.cube.data[1, 3] = 0.5
-        self.cube.data[3, 3] = 0.5
-        self.cube.data[1, 2] = np.nan
-        self.cube.data[3, 1] = np.nan
-        mask_cube.data = np.ones((5, 5))
-        mask_cube.data[self.cube.data == 0.5] = 0
-        mask_cube.data = mask_cube.data.astype(int)
-
-        expected_mask = np.ones((5, 5))
-        expected_mask[1, 3] = 0.0
-        expected_mask[3, 3] = 0.0
-        expected_mask[1, 2] = 0.0
-        expected_mask[3, 1] = 0.0
-        expected_data = self.cube.data * expected_mask
-        expected_data[1, 2] = 0.0
-        expected_data[3, 1] = 0.0
-        expected_nans = np.ones((5, 5)).astype(bool)*False
-        expected_nans[1, 2] = True
-        expected_nans[3, 1] = True
-
-        result_cube, result_mask, result_nan_array = (
-            SquareNeighbourhood.set_up_cubes_to_be_neighbourhooded(
-                self.cube.copy(), mask_cube=mask_cube))
-
-        self.assertIsInstance(result_cube, Cube)
-        self.assertIsInstance(result_mask, Cube)
-        self.assertArrayAlmostEqual(result_cube.data, expected_data)
-        self.assertArrayAlmostEqual(result_mask.data, expected_mask)
-        self.assertArrayEqual(result_nan_array, expected_nans)
-
-
-class Test__pad_and_calculate_neighbourhood(IrisTest):
-
-    """Test the padding and calculation of neighbourhood processing."""
+    """Test the summed area table calculation of the neighbourhood sums."""
 
     def setUp(self):
-        """Set up a cube."""
-        self.cube = set_up_cube(
-            zero_point_indices=((0, 0, 1, 1),), num_time_points=1,
-            num_grid_points=3)
-        for sliced_cube in self.cube.slices(["projection_y_coordinate",
-                                             "projection_x_coordinate"]):
-            break
-        sliced_cube.remove_coord("realization")
-        sliced_cube.remove_coord("time")
-        self.cube = sliced_cube
-        self.mask = self.cube.copy()
-        self.mask.data[::] = 1.0
-        self.mask.rename('masked_data')
+        """Set up the expected neighbourhood sums by explicitly summing
+        each neighbourhood."""
+        self.data = np.arange(60, dtype=np.float32).reshape(3, 4, 5) / 7.
+        self.expected = np.zeros(self.data.shape)
+        for index in np.ndindex(self.data.shape):
+            leading, row, column = index
+            self.expected[index] = self.data[
+                leading, max(row-1, 0):row+2, max(column-2, 0):column+3].sum()
 
     def test_basic(self):
-        """Test setting up cubes to be padded and then passed into
-        neighbourhood processing."""
-        expected_data = np.array(
-            [[0.85714286, 0.75, 0.83333333, 0.85714286, 0.75, 1., 0.85714286],
-             [0.85714286, 0.8, 0.75, 0.75, 0.5, np.nan, 0.75],
-             [0.75, 0.83333333, 0.75, 0.8, 0.66666667, 1., 0.8],
-             [0.8, 0.5, 0.83333333, 0.85714286, 0.75, 1., 0.85714286],
-             [0.85714286, 0.8, 0.75, 0.75, 0.5, np.nan, 0.75],
-             [0.75, 0.66666667, 1., 1., 1., np.nan, 1.],
-             [1., 1., 0.83333333, 0.85714286, 0.75, 1., 0.85714286]])
-
-        grid_cells_x = grid_cells_y = 1
-        cube = self.cube
-        mask_cube = cube.copy()
-        mask_cube.data[::] = 1.0
-        mask_cube.data[1, 2] = 0.0
-        mask_cube.data[2, 2] = 0.0
-        # set_up_cubes_to_be_neighbourhooded would set masked points to 0.0
-        cube.data[1, 2] = 0.0
-        cube.data[2, 2] = 0.0
-        mask_cube.rename('mask_data')
-
-        nbcube = (
-            SquareNeighbourhood()._pad_and_calculate_neighbourhood(
-                cube, mask_cube, grid_cells_x, grid_cells_y))
-        self.assertIsInstance(nbcube, Cube)
-        self.assertArrayAlmostEqual(nbcube.data, expected_data)
+        """Test that the neighbourhood sums are calculated for all the
+        leading dimensions at once, in double precision."""
+        result = SquareNeighbourhood.sum_over_neighbourhood(self.data, 2, 1)
+        self.assertEqual(result.dtype, np.float64)
+        self.assertArrayAlmostEqual(result, self.expected)
+
+    def test_binary(self):
+        """Test that binary fields are accumulated as integers."""
+        data = (self.data > 4).astype(np.float32)
+        expected = np.zeros(data.shape)
+        for index in np.ndindex(data.shape):
+            leading, row, column = index
+            expected[index] = data[
+                leading, max(row-1, 0):row+2, max(column-2, 0):column+3].sum()
+        result = SquareNeighbourhood.sum_over_neighbourhood(data, 2, 1)
+        self.assertEqual(result.dtype, np.int32)
+        self.assertArrayEqual(result, expected)
 
     def test_complex(self):
-        """Test neighbourhooding with an array of complex wind directions"""
-        # set up cube with complex wind directions 30-60 degrees
-        a = 0.54066949+0.82535591j
-        b = 0.56100423+0.80502117j
-        c = 0.5+0.8660254j
-        d = 0.59150635+0.77451905j
-
-        expected_data_complex = np.array(
-            [[a, b, b, a, b, c, a],
-             [a, 0.55228934+0.81373606j, d, b, d, c, b],
-             [b, 0.54575318+0.82027223j, d, b, d, c, b],
-             [b, 0.62200847+0.74401694j, b, a, b, c, a],
-             [a, 0.55228934+0.81373606j, d, b, d, c, b],
-             [b, 0.57320508+0.79282032j, c, c, c, c, c],
-             [c, c, b, a, b, c, a]])
-
-        expected_data_deg = np.array(
-            [[56.77222443, 55.12808228, 55.12808228, 56.77222443, 55.12808228,
-              60.00000381, 56.77222443],
-             [56.77222443, 55.83494186, 52.63074112, 55.12808228, 52.63074112,
-              60.00000381, 55.12808228],
-             [55.12808228, 56.36291885, 52.63074112, 55.12808228, 52.63074112,
-              60.00000381, 55.12808228],
-             [55.12808228, 50.10391235, 55.12808228, 56.77222443, 55.12808228,
-              60.00000381, 56.77222443],
-             [56.77222443, 55.83494186, 52.63074112, 55.12808228, 52.63074112,
-              60.00000381, 55.12808228],
-             [55.12808228, 54.13326263, 60.00000381, 60.00000381, 60.00000381,
-              60.00000381, 60.00000381],
-             [60.00000381, 60.00000381, 55.12808228, 56.77222443, 55.12808228,
-              60.00000381, 56.77222443]],
-            dtype=np.float32
-        )
-
-        self.cube.data = WindDirection.deg_to_complex(30.*self.cube.data + 30.)
-        nbcube = (
-            SquareNeighbourhood()._pad_and_calculate_neighbourhood(
-                self.cube, self.mask, 1, 1))
-        self.assertTrue(np.any(np.iscomplex(nbcube.data)))
-        self.assertArrayAlmostEqual(nbcube.data, expected_data_complex)
-        self.assertArrayAlmostEqual(WindDirection.complex_to_deg(nbcube.data),
-                                    expected_data_deg)
-
-    def test_complex_masked(self):
-        """Test complex neighbourhooding works with a mask"""
-
-        mask_cube = self.cube.copy()
-        mask_cube.data[::] = 1.0
-        mask_cube.data[1, 2] = 0.0
-        mask_cube.data[2, 2] = 0.0
-
-        self.cube.data = WindDirection.deg_to_complex(30.*self.cube.data + 30.)
-
-        # set_up_cubes_to_be_neighbourhooded would set masked points to 0.0
-        self.cube.data[1, 2] = 0.0
-        self.cube.data[2, 2] = 0.0
-        mask_cube.rename('mask_data')
-
-        nbcube = (
-            SquareNeighbourhood()._pad_and_calculate_neighbourhood(
-                self.cube, mask_cube, 1, 1))
-        self.assertIsInstance(nbcube, Cube)
-
-
-class Test__remove_padding_and_mask(IrisTest):
-
-    """Test the removal of padding and dealing with masked data."""
-
-    def setUp(self):
-        """Set up a cube."""
-        self.padded_cube = set_up_cube(
-            zero_point_indices=((0, 0, 3, 3),), num_time_points=1,
-            num_grid_points=7)
-        self.padded_cube = iris.util.squeeze(self.padded_cube)
-        self.cube = set_up_cube(
-            zero_point_indices=((0, 0, 1, 1),), num_time_points=1,
-            num_grid_points=3)
-        self.cube = iris.util.squeeze(self.cube)
-        self.mask_cube = self.cube.copy()
-        masked_array = np.ones(self.mask_cube.data.shape)
-        masked_array[1, 2] = 0
-        masked_array[0, 1] = 0
-        self.mask_cube.data = masked_array
-        self.mask_cube.rename('mask_data')
-        self.no_mask = self.mask_cube.copy()
-        self.no_mask.data = np.ones(self.mask_cube.data.shape)
-
-    def test_without_masked_data(self):
-        """Test that removing a halo of points from the data on a cube
-        has worked as intended when the input data is not masked."""
-        expected = np.array(
-            [[1., 1., 1.],
-             [1., 0., 1.],
-             [1., 1., 1.]])
-        grid_cells_x = grid_cells_y = 1
-        nbcube = (
-            SquareNeighbourhood()._remove_padding_and_mask(
-                self.padded_cube, self.cube, self.no_mask,
-                grid_cells_x, grid_cells_y))
-        self.assertIsInstance(nbcube, Cube)
-        self.assertArrayAlmostEqual(nbcube.data, expected)
-
-    def test_with_masked_data(self):
-        """Test that removing a halo of points from the data on a cube
-        has worked as intended when the input data has an associated mask."""
-        expected = np.array(
-            [[1., 1., 1.],
-             [1., 0., 1.],
-             [1., 1., 1.]])
+        """Test that complex fields are summed."""
+        data = self.data + 1j * self.data[::-1]
+        expected = self.expected + 1j * self.expected[::-1]
+        result = SquareNeighbourhood.sum_over_neighbourhood(data, 2, 1)
+        self.assertEqual(result.dtype, np.complex128)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_precision(self):
+        """Test that the neighbourhood sums keep their precision when the
+        cumulative sums are much larger than the neighbourhood sums."""
+        data = np.full((1, 400, 400), 1.e8)
+        data[0, -1, -1] += 0.1
+        result = SquareNeighbourhood.sum_over_neighbourhood(data, 1, 1)
+        self.assertAlmostEqual(result[0, -1, -1] - 4.e8, 0.1, places=6)
+
+    @patch('improver.nbhood.square_kernel.MAX_POINTS_PER_CHUNK', 50)
+    def test_chunked(self):
+        """Test that the neighbourhood sums are the same when the slices are
+        processed in chunks."""
+        result = SquareNeighbourhood.sum_over_neighbourhood(self.data, 2, 1)
+        self.assertEqual(result.dtype, np.float64)
+        self.assertArrayAlmostEqual(result, self.expected)
+
+
+class Test__set_up_data_to_be_neighbourhooded(IrisTest):
+
+    """Test setting up the data and mask arrays."""
+
+    def test_masked_and_nan_data(self):
+        """Test that masked and NaN points are set to zero in the data and
+        the mask, and that the mask is applied to the data."""
+        data = np.ma.masked_array(
+            [[[1., 2.], [np.nan, 4.]], [[5., 6.], [7., 8.]]],
+            mask=[[[False, True], [False, False]],
+                  [[False, False], [False, False]]])
+        mask = np.array([[1., 1.], [1., 0.]])
+        expected_data = np.array(
+            [[[1., 0.], [0., 0.]], [[5., 6.], [7., 0.]]])
         expected_mask = np.array(
-            [[False, True, False],
-             [False, False, True],
-             [False, False, False]])
-        grid_cells_x = grid_cells_y = 1
-        nbcube = (
-            SquareNeighbourhood()._remove_padding_and_mask(
-                self.padded_cube, self.cube, self.mask_cube,
-                grid_cells_x, grid_cells_y))
-        self.assertIsInstance(nbcube, Cube)
-        self.assertArrayAlmostEqual(nbcube.data.data, expected)
-        self.assertArrayAlmostEqual(nbcube.data.mask, expected_mask)
-
-    def test_with_masked_data_and_no_remasking(self):
-        """Test that removing halo works correctly with remask=False"""
-        expected = np.array(
-            [[1., 1., 1.],
-             [1., 0., 1.],
-             [1., 1., 1.]])
-        grid_cells_x = grid_cells_y = 1
-        nbcube = (
-            SquareNeighbourhood(re_mask=False)._remove_padding_and_mask(
-                self.padded_cube, self.cube, self.mask_cube,
-                grid_cells_x, grid_cells_y))
-        self.assertIsInstance(nbcube, Cube)
-        self.assertArrayAlmostEqual(nbcube.data, expected)
-
-    def test_clipping(self):
-        """Test that clipping is working"""
-        expected = np.array(
-            [[1., 1., 1.],
-             [1., 0., 1.],
-             [1., 1., 1.]])
-        grid_cells_x = grid_cells_y = 1
-        self.padded_cube.data[2, 2] = 1.1
-        self.padded_cube.data[3, 3] = -0.1
-        nbcube = (
-            SquareNeighbourhood(re_mask=False)._remove_padding_and_mask(
-                self.padded_cube, self.cube, self.mask_cube,
-                grid_cells_x, grid_cells_y))
-        self.assertIsInstance(nbcube, Cube)
-        self.assertArrayAlmostEqual(nbcube.data, expected)
+            [[[1., 0.], [0., 0.]], [[1., 1.], [1., 0.]]])
+        expected_nans = np.array(
+            [[[False, False], [True, False]],
+             [[False, False], [False, False]]])
+        result_data, result_mask, nan_array = (
+            SquareNeighbourhood._set_up_data_to_be_neighbourhooded(
+                data, mask))
+        self.assertNotIsInstance(result_data, np.ma.MaskedArray)
+        self.assertArrayEqual(result_data, expected_data)
+        self.assertArrayEqual(result_mask, expected_mask)
+        self.assertArrayEqual(nan_array, expected_nans)
+        self.assertArrayEqual(mask, [[1., 1.], [1., 0.]])
 
 
 class Test_run(IrisTest):
@@ -755,6 +439,36 @@ class Test_run(IrisTest):
         result = SquareNeighbourhood().run(cube, self.RADIUS)
         self.assertArrayAlmostEqual(result.data, expected_data)
 
+    def test_complex_masked(self):
+        """Test that a cube containing complex numbers is sensibly processed
+        when a mask cube is provided, with the masked points excluded from
+        the neighbourhood means and re-masked in the output."""
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 2, 2),), num_time_points=1,
+            num_grid_points=5)
+        cube.data = cube.data.astype(complex)
+        cube.data[0, 0, 1, 3] = 0.5+0.5j
+        cube.data[0, 0, 4, 3] = 0.4+0.6j
+        mask_cube = cube.copy(data=np.ones(cube.shape))
+        mask_cube.data[0, 0, 1, 2] = 0.
+        mask_cube.data[0, 0, 3, 1] = 0.
+        expected_data = np.array(
+            [[[[1.0+0.0j, 1.0+0.0j, 0.9+0.1j, 0.9+0.1j, 0.875+0.125j],
+               [1.0+0.0j, 0.875+0.0j, 0.8125+0.0625j, 0.8125+0.0625j,
+                0.91666667+0.083333333j],
+               [1.0+0.0j, 0.85714286+0.0j, 0.78571429+0.071428571j,
+                0.8125+0.0625j, 0.91666667+0.083333333j],
+               [1.0+0.0j, 0.875+0.0j, 0.8+0.075j,
+                0.82222222+0.066666667j, 0.9+0.1j],
+               [1.0+0.0j, 1.0+0.0j, 0.88+0.12j, 0.9+0.1j, 0.85+0.15j]]]])
+        expected_mask = np.zeros(cube.shape, dtype=bool)
+        expected_mask[0, 0, 1, 2] = True
+        expected_mask[0, 0, 3, 1] = True
+        result = SquareNeighbourhood().run(
+            cube, self.RADIUS, mask_cube=mask_cube)
+        self.assertArrayAlmostEqual(result.data.data, expected_data)
+        self.assertArrayEqual(result.data.mask, expected_mask)
+
     def test_multiple_times(self):
         """Test that a cube with correct data is produced by the run method
         when multiple times are supplied."""
@@ -846,6 +560,40 @@ class Test_run(IrisTest):
         self.assertArrayAlmostEqual(result.data[0, 0], expected_1)
         self.assertArrayAlmostEqual(result.data[0, 1], expected_2)
 
+    def test_radius_for_each_slice(self):
+        """Test that a different radius can be used for each x-y slice of
+        the cube."""
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 2, 2), (0, 1, 2, 2)),
+            num_time_points=2, num_grid_points=5)
+        expected_1 = SquareNeighbourhood().run(
+            cube[:, 0:1], self.RADIUS).data
+        expected_2 = SquareNeighbourhood().run(
+            cube[:, 1:2], 2 * self.RADIUS).data
+        result = SquareNeighbourhood().run(
+            cube, np.array([[self.RADIUS, 2 * self.RADIUS]]))
+        self.assertArrayAlmostEqual(result.data[:, 0:1], expected_1)
+        self.assertArrayAlmostEqual(result.data[:, 1:2], expected_2)
+        self.assertFalse(
+            np.allclose(result.data[:, 0], result.data[:, 1]))
+
+    def test_chunked(self):
+        """Test that the same result is produced when the x-y slices are
+        processed in chunks, with a mask and NaN values."""
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 2, 2), (0, 1, 1, 2)),
+            num_time_points=3, num_grid_points=5)
+        cube.data[0, 1, 0, 0] = np.nan
+        mask = np.zeros(cube.shape, dtype=bool)
+        mask[0, 2, 3, 3] = True
+        cube.data = np.ma.masked_array(cube.data, mask=mask)
+        expected = SquareNeighbourhood().run(cube, self.RADIUS)
+        with patch('improver.nbhood.square_kernel.MAX_POINTS_PER_CHUNK',
+                   60):
+            result = SquareNeighbourhood().run(cube, self.RADIUS)
+        self.assertArrayEqual(result.data.data, expected.data.data)
+        self.assertArrayEqual(result.data.mask, expected.data.mask)
+
     def test_metadata(self):
         """Test that a cube with correct metadata is produced by the run
         method."""
@@ -128,6 +128,36 @@ class Test__repr__(IrisTest):
         self.assertEqual(result, msg)
 
 
+class Test__find_radii(IrisTest):
+
+    """Test the _find_radii method of ApplyNeighbourhoodProcessingWithAMask."""
+
+    def setUp(self):
+        """Set up a cube with two forecast periods."""
+        self.cube = set_up_cube(
+            zero_point_indices=((0, 0, 2, 2),), num_time_points=2,
+            num_grid_points=5)
+        fp_coord = iris.coords.AuxCoord(
+            [3, 5], standard_name="forecast_period", units="hours")
+        self.cube.add_aux_coord(fp_coord, 1)
+
+    def test_no_lead_times(self):
+        """Test that the radius is returned for each x-y slice, if no lead
+        times are provided."""
+        plugin = ApplyNeighbourhoodProcessingWithAMask(
+            "topographic_zone", 2000)
+        result = plugin._find_radii(self.cube)
+        self.assertArrayAlmostEqual(result, [[2000., 2000.]])
+
+    def test_lead_times(self):
+        """Test that the radii are interpolated to the forecast period of
+        each x-y slice, if lead times are provided."""
+        plugin = ApplyNeighbourhoodProcessingWithAMask(
+            "topographic_zone", [2000, 6000], lead_times=[3, 7])
+        result = plugin._find_radii(self.cube)
+        self.assertArrayAlmostEqual(result, [[2000., 4000.]])
+
+
 class Test_process(IrisTest):
 
     """Test the process method of ApplyNeighbourhoodProcessingWithAMask."""
@@ -197,6 +227,37 @@ class Test_process(IrisTest):
         self.assertEqual(result.data.shape, expected_shape)
         self.assertArrayAlmostEqual(result.data, expected)
 
+    def test_re_mask(self):
+        """Test that the result is masked outside of each mask, when
+        re_mask is True."""
+        coord_for_masking = "topographic_zone"
+        radii = 2000
+        result = ApplyNeighbourhoodProcessingWithAMask(
+            coord_for_masking, radii, re_mask=True).process(
+                self.cube, self.mask_cube)
+        self.assertIsInstance(result.data, np.ma.MaskedArray)
+        self.assertArrayEqual(
+            result.data.mask, np.logical_not(self.mask_cube.data))
+        self.assertArrayAlmostEqual(
+            result.data[1].compressed(), [0.75, 0.75, 0.75, 0.75])
+
+    def test_re_mask_nothing_masked(self):
+        """Test that the result is not a masked array, when re_mask is True
+        but none of the points are masked out."""
+        self.mask_cube.data = np.ones_like(self.mask_cube.data)
+        result = ApplyNeighbourhoodProcessingWithAMask(
+            "topographic_zone", 2000, re_mask=True).process(
+                self.cube, self.mask_cube)
+        self.assertNotIsInstance(result.data, np.ma.MaskedArray)
+
+    def test_nan_input(self):
+        """Test that an error is raised if the input cube contains NaNs."""
+        self.cube.data[2, 2] = np.nan
+        msg = "NaN detected in input cube data"
+        with self.assertRaisesRegex(ValueError, msg):
+            ApplyNeighbourhoodProcessingWithAMask(
+                "topographic_zone", 2000).process(self.cube, self.mask_cube)
+
     def test_preserve_dimensions_input(self):
         """Test that the dimensions on the output cube are the same as the
            input cube, apart from the additional topographic zone coordinate.
@@ -239,6 +300,25 @@ class Test_process(IrisTest):
         self.assertEqual(result.coord_dims("projection_y_coordinate"), (3,))
         self.assertEqual(result.coord_dims("projection_x_coordinate"), (4,))
 
+    def test_preserve_dimension_order(self):
+        """Test that the dimension order of the input cube is retained when
+        the y and x dimensions are not the trailing dimensions, with the
+        topographic zone dimension inserted before the y and x dimensions.
+        """
+        self.cube.remove_coord("realization")
+        cube = add_dimensions_to_cube(self.cube, {"realization": 2})
+        plugin = ApplyNeighbourhoodProcessingWithAMask(
+            "topographic_zone", 2000)
+        expected = plugin.process(cube, self.mask_cube)
+        cube.transpose([1, 2, 0])
+        result = plugin.process(cube, self.mask_cube)
+        self.assertEqual(result.coord_dims("topographic_zone"), (0,))
+        self.assertEqual(result.coord_dims("projection_y_coordinate"), (1,))
+        self.assertEqual(result.coord_dims("projection_x_coordinate"), (2,))
+        self.assertEqual(result.coord_dims("realization"), (3,))
+        self.assertArrayAlmostEqual(
+            result.data, np.moveaxis(expected.data, 0, -1))
+
     def test_identical_slices(self):
         """Test that identical successive slices of the cube produce
            identical results."""
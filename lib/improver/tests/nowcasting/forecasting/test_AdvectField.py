@@ -231,6 +231,48 @@ class Test__advect_field(IrisTest):
         self.assertArrayEqual(result.mask, expected_mask)
 
 
+class Test__advect_field_multiple(IrisTest):
+    """Tests for the _advect_field_multiple method"""
+
+    def setUp(self):
+        """Set up dimensionless velocity arrays and gridded data"""
+        vel_x = set_up_xy_velocity_cube("advection_velocity_x")
+        vel_y = vel_x.copy(data=2.*np.ones(shape=(4, 3)))
+        self.dummy_plugin = AdvectField(vel_x, vel_y)
+
+        self.grid_vel_x = 0.5*vel_x.data
+        self.grid_vel_y = 0.5*vel_y.data
+        self.data = np.array([[2., 3., 4.],
+                              [1., 2., 3.],
+                              [0., 1., 2.],
+                              [0., 0., 1.]])
+        self.timesteps = [0., 0.5, 2.]
+
+    def test_basic(self):
+        """Test function returns a masked array with a leading time
+        dimension"""
+        result = self.dummy_plugin._advect_field_multiple(
+            self.data, self.grid_vel_x, self.grid_vel_y, self.timesteps)
+        self.assertIsInstance(result, np.ma.MaskedArray)
+        self.assertEqual(result.shape, (3, 4, 3))
+
+    def test_matches_single_timesteps(self):
+        """Test data advected for several time steps at once match those
+        advected one time step at a time"""
+        mask = np.zeros(self.data.shape, dtype=bool)
+        mask[1, 1] = True
+        masked_data = np.ma.MaskedArray(self.data, mask=mask)
+        result = self.dummy_plugin._advect_field_multiple(
+            masked_data, self.grid_vel_x, self.grid_vel_y, self.timesteps)
+        for index, timestep in enumerate(self.timesteps):
+            expected = np.ma.asarray(self.dummy_plugin._advect_field(
+                masked_data, self.grid_vel_x, self.grid_vel_y, timestep))
+            self.assertArrayEqual(result[index].mask,
+                                  np.ma.getmaskarray(expected))
+            self.assertArrayAlmostEqual(result[index][~result[index].mask],
+                                        expected[~result[index].mask])
+
+
 class Test_process(IrisTest):
     """Test dimensioned cube data is correctly advected"""
 
@@ -479,5 +521,67 @@ class Test_process(IrisTest):
             result.coord("forecast_reference_time").dtype, np.int64)
 
 
+class Test_process_multiple(IrisTest):
+    """Test dimensioned cube data is correctly advected to several time
+    steps at once"""
+
+    def setUp(self):
+        """Set up plugin instance and a cube to advect"""
+        vel_x = set_up_xy_velocity_cube("advection_velocity_x")
+        vel_y = vel_x.copy(data=2.*np.ones(shape=(4, 3)))
+        vel_y.rename("advection_velocity_y")
+        self.plugin = AdvectField(vel_x, vel_y)
+        data = np.array([[2., 3., 4.],
+                         [1., 2., 3.],
+                         [0., 1., 2.],
+                         [0., 0., 1.]], dtype=np.float32)
+        self.cube = iris.cube.Cube(
+            data, standard_name='rainfall_rate', units='mm h-1',
+            dim_coords_and_dims=[(self.plugin.y_coord, 0),
+                                 (self.plugin.x_coord, 1)])
+        self.cube.add_aux_coord(
+            DimCoord(1519099200, standard_name="time",
+                     units='seconds since 1970-01-01 00:00:00'))
+        self.timesteps = [datetime.timedelta(seconds=seconds)
+                          for seconds in [0, 300, 600]]
+
+    def test_basic(self):
+        """Test plugin returns a cube with a leading time dimension"""
+        result = self.plugin.process_multiple(self.cube, self.timesteps)
+        self.assertIsInstance(result, iris.cube.Cube)
+        self.assertEqual(result.shape, (3, 4, 3))
+        self.assertEqual(result.coord_dims("time"), (0,))
+        self.assertArrayEqual(result.coord("time").points,
+                              [1519099200, 1519099500, 1519099800])
+        self.assertArrayEqual(result.coord("forecast_period").points,
+                              [0, 300, 600])
+        self.assertEqual(result.attributes["source"], "Nowcast")
+
+    def test_matches_process(self):
+        """Test the data for each time step match those from process"""
+        result = self.plugin.process_multiple(self.cube, self.timesteps)
+        for index, timestep in enumerate(self.timesteps):
+            expected = self.plugin.process(self.cube, timestep)
+            self.assertArrayEqual(np.ma.getmaskarray(result.data[index]),
+                                  np.ma.getmaskarray(expected.data))
+            self.assertArrayAlmostEqual(
+                np.ma.filled(result.data[index], np.nan),
+                np.ma.filled(expected.data, np.nan))
+
+    def test_single_timestep(self):
+        """Test a single time step still produces a time dimension"""
+        result = self.plugin.process_multiple(self.cube, self.timesteps[2:])
+        self.assertEqual(result.shape, (1, 4, 3))
+        self.assertEqual(result.coord_dims("time"), (0,))
+
+    def test_processes(self):
+        """Test the same results are produced using several processes"""
+        expected = self.plugin.process_multiple(self.cube, self.timesteps)
+        result = self.plugin.process_multiple(
+            self.cube, self.timesteps, processes=2)
+        self.assertArrayEqual(result.data.mask, expected.data.mask)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
+
 if __name__ == '__main__':
     unittest.main()
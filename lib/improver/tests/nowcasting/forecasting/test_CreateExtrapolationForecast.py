@@ -32,6 +32,7 @@
 
 import unittest
 
+import iris
 import numpy as np
 from iris.tests import IrisTest
 
@@ -238,5 +239,30 @@ class Test_extrapolate(SetUpCubes):
             plugin.extrapolate()
 
 
+class Test_extrapolate_multiple(SetUpCubes):
+    """Test the extrapolate_multiple method."""
+
+    def test_with_orographic_enhancement(self):
+        """Test plugin returns a forecast cube for each lead time, matching
+        those from the extrapolate method."""
+        plugin = CreateExtrapolationForecast(
+                self.precip_cube, self.vel_x, self.vel_y,
+                orographic_enhancement_cube=self.oe_cube)
+        result = plugin.extrapolate_multiple([0, 10])
+        self.assertIsInstance(result, iris.cube.CubeList)
+        self.assertEqual(len(result), 2)
+        for cube, leadtime in zip(result, [0, 10]):
+            expected = plugin.extrapolate(leadtime_minutes=leadtime)
+            self.assertEqual(cube.shape, (4, 3))
+            self.assertArrayEqual(np.ma.getmaskarray(cube.data),
+                                  np.ma.getmaskarray(expected.data))
+            self.assertArrayAlmostEqual(np.ma.filled(cube.data, np.nan),
+                                        np.ma.filled(expected.data, np.nan))
+            self.assertEqual(cube.coord("forecast_period").points,
+                             expected.coord("forecast_period").points)
+            self.assertEqual(cube.coord("time").points,
+                             expected.coord("time").points)
+
+
 if __name__ == '__main__':
     unittest.main()
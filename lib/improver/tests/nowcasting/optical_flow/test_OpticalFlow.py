@@ -229,6 +229,32 @@ class Test__make_subboxes(OpticalFlowUtilityTest):
         self.assertArrayAlmostEqual(weights, expected_weights)
 
 
+class Test__sum_over_subboxes(OpticalFlowUtilityTest):
+    """Test _sum_over_subboxes function"""
+
+    def test_values(self):
+        """Test function sums over boxes, including the smaller boxes at the
+        edges of the field"""
+        expected_sums = np.array([[4., 12., 9.],
+                                  [0., 3., 3.]])
+        self.plugin.boxsize = 2
+        result = self.plugin._sum_over_subboxes(self.plugin.data1)
+        self.assertArrayAlmostEqual(result, expected_sums)
+
+
+class Test__calculate_box_weights(OpticalFlowUtilityTest):
+    """Test _calculate_box_weights function"""
+
+    def test_values(self):
+        """Test weights match those from _make_subboxes on the box grid"""
+        self.plugin.boxsize = 2
+        _, expected_weights = self.plugin._make_subboxes(self.plugin.data1)
+        result = self.plugin._calculate_box_weights()
+        self.assertEqual(result.dtype, np.float32)
+        self.assertArrayAlmostEqual(result,
+                                    expected_weights.reshape((2, 3)))
+
+
 class OpticalFlowDisplacementTest(IrisTest):
     """Class with shared plugin definition for smoothing and regridding
     tests"""
@@ -378,6 +404,31 @@ class Test_solve_for_uv(IrisTest):
         self.assertAlmostEqual(v, 2.)
 
 
+class Test__solve_for_uv_by_box(IrisTest):
+    """Test _solve_for_uv_by_box function"""
+
+    def setUp(self):
+        """Define derivative fields covering two boxes, the second of which
+        gives singular equations"""
+        self.plugin = OpticalFlow()
+        self.plugin.boxsize = 2
+        self.partial_dx = np.array([[2., 1., 0., 0.],
+                                    [0., 0., 0., 0.]])
+        self.partial_dy = np.array([[3., -2., 0., 0.],
+                                    [0., 0., 0., 0.]])
+        self.partial_dt = np.array([[-8., 3., 0., 0.],
+                                    [0., 0., 0., 0.]])
+
+    def test_values(self):
+        """Test output values match solve_for_uv, with zeros for singular
+        boxes"""
+        umat, vmat = self.plugin._solve_for_uv_by_box(
+            self.partial_dx, self.partial_dy, self.partial_dt)
+        self.assertEqual(umat.dtype, np.float32)
+        self.assertArrayAlmostEqual(umat, np.array([[1., 0.]]))
+        self.assertArrayAlmostEqual(vmat, np.array([[2., 0.]]))
+
+
 class Test_extreme_value_check(IrisTest):
     """Test extreme_value_check function"""
 
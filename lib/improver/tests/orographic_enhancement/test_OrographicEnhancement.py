@@ -139,7 +139,8 @@ class Test__init__(IrisTest):
 
         none_type_attributes = [
             'topography', 'temperature', 'humidity', 'pressure',
-            'uwind', 'vwind', 'svp', 'vgradz', 'grid_spacing_km']
+            'uwind', 'vwind', 'svp', 'vgradz', 'grid_spacing_km',
+            'max_rows_per_chunk']
         for attr in none_type_attributes:
             self.assertIsNone(getattr(plugin, attr))
 
@@ -529,6 +530,20 @@ class Test__locate_source_points(IrisTest):
         self.assertArrayEqual(xsrc, expected_xsrc)
         self.assertArrayEqual(ysrc, expected_ysrc)
 
+    def test_rows(self):
+        """Test location of source points for a subset of rows"""
+        rows = slice(1, 3)
+        distance = self.plugin._get_point_distances(
+            self.wind_speed, self.cos_wind_dir)
+        expected_xsrc, expected_ysrc = self.plugin._locate_source_points(
+            self.wind_speed, distance,
+            self.sin_wind_dir, self.cos_wind_dir)
+        xsrc, ysrc = self.plugin._locate_source_points(
+            self.wind_speed, distance[:, rows],
+            self.sin_wind_dir[rows], self.cos_wind_dir[rows], rows=rows)
+        self.assertArrayEqual(xsrc, expected_xsrc[:, rows])
+        self.assertArrayEqual(ysrc, expected_ysrc[:, rows])
+
 
 class Test__compute_weighted_values(IrisTest):
     """Test the _compute_weighted_values method"""
@@ -620,6 +635,15 @@ class Test__add_upstream_component(IrisTest):
         result = self.plugin._add_upstream_component(self.point_orogenh)
         self.assertArrayAlmostEqual(result, expected_values)
 
+    def test_chunked(self):
+        """Test output values are unchanged when calculated in chunks of
+        rows"""
+        expected_values = self.plugin._add_upstream_component(
+            self.point_orogenh)
+        self.plugin.max_rows_per_chunk = 2
+        result = self.plugin._add_upstream_component(self.point_orogenh)
+        self.assertArrayAlmostEqual(result, expected_values)
+
 
 class Test__create_output_cubes(IrisTest):
     """Test the _create_output_cubes method"""
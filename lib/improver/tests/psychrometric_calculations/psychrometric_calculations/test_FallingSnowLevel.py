@@ -42,6 +42,22 @@ from improver.tests.set_up_test_cubes import (set_up_variable_cube,
                                               add_coordinate)
 
 
+class Test__init__(IrisTest):
+
+    """Test the init method."""
+
+    def test_fill_method(self):
+        """Test that the fill_method keyword is accepted."""
+        result = FallingSnowLevel(fill_method='nearest')
+        self.assertEqual(result.fill_method, 'nearest')
+
+    def test_invalid_fill_method(self):
+        """Test that an unrecognised fill_method raises an error."""
+        msg = 'Invalid option for keyword fill_method'
+        with self.assertRaisesRegex(ValueError, msg):
+            FallingSnowLevel(fill_method='invalid')
+
+
 class Test__repr__(IrisTest):
 
     """Test the repr method."""
@@ -51,7 +67,7 @@ class Test__repr__(IrisTest):
         result = str(FallingSnowLevel())
         msg = ('<FallingSnowLevel: '
                'precision:0.005, falling_level_threshold:90.0,'
-               ' grid_point_radius: 2>')
+               ' grid_point_radius: 2, fill_method: griddata>')
         self.assertEqual(result, msg)
 
 
@@ -402,6 +418,66 @@ class Test_fill_in_by_horizontal_interpolation(IrisTest):
             snow_falling_level, max_in_nbhood_orog, orography)
         self.assertArrayEqual(snow_level_updated, expected)
 
+    def test_nearest_method(self):
+        """Test that the nearest method sets each gap to the value of the
+           closest valid point, rather than interpolating linearly between
+           the valid points."""
+        plugin = FallingSnowLevel(fill_method='nearest')
+        snow_level_data = np.array([[1.0, np.nan, np.nan, 4.0],
+                                    [1.0, np.nan, np.nan, 4.0],
+                                    [1.0, np.nan, np.nan, 4.0]])
+        max_in_nbhood_orog = np.full((3, 4), 7.0)
+        orog_data = np.full((3, 4), 6.0)
+        expected = np.array([[1.0, 1.0, 4.0, 4.0],
+                             [1.0, 1.0, 4.0, 4.0],
+                             [1.0, 1.0, 4.0, 4.0]])
+        snow_level_updated = plugin.fill_in_by_horizontal_interpolation(
+            snow_level_data, max_in_nbhood_orog, orog_data)
+        self.assertArrayEqual(snow_level_updated, expected)
+
+    def test_nearest_method_above_max_orography(self):
+        """Test that the nearest method does not fill from points where the
+           snow falling level is above the maximum orography. As for the
+           griddata method, these points are filled in as well."""
+        plugin = FallingSnowLevel(fill_method='nearest')
+        snow_level_data = np.array([[1.0, np.nan, np.nan, 8.0],
+                                    [1.0, np.nan, np.nan, 8.0],
+                                    [1.0, np.nan, np.nan, 8.0]])
+        max_in_nbhood_orog = np.full((3, 4), 7.0)
+        orog_data = np.full((3, 4), 6.0)
+        expected = np.ones((3, 4))
+        snow_level_updated = plugin.fill_in_by_horizontal_interpolation(
+            snow_level_data, max_in_nbhood_orog, orog_data)
+        self.assertArrayEqual(snow_level_updated, expected)
+
+    def test_multiple_realizations(self):
+        """Test that each realization is filled in independently for each
+           fill method."""
+        snow_level_data = np.stack([np.ones((3, 3)),
+                                    np.full((3, 3), np.nan)])
+        snow_level_data[0, 1, 1] = np.nan
+        snow_level_data[1, 0, 1] = 3.0
+        expected = np.stack([np.ones((3, 3)), np.full((3, 3), 3.0)])
+        for fill_method in ['griddata', 'nearest']:
+            plugin = FallingSnowLevel(fill_method=fill_method)
+            snow_level_updated = plugin.fill_in_by_horizontal_interpolation(
+                snow_level_data.copy(), self.max_in_nbhood_orog,
+                self.orog_data)
+            self.assertArrayEqual(snow_level_updated, expected)
+
+    def test_no_valid_points_not_filled(self):
+        """Test that with no valid points in a realization nothing is
+           filled in for that realization, for each fill method."""
+        snow_level_data = np.stack([self.snow_level_data,
+                                    np.full((3, 3), np.nan)])
+        for fill_method in ['griddata', 'nearest']:
+            plugin = FallingSnowLevel(fill_method=fill_method)
+            snow_level_updated = plugin.fill_in_by_horizontal_interpolation(
+                snow_level_data.copy(), self.max_in_nbhood_orog,
+                self.orog_data)
+            self.assertTrue(np.isfinite(snow_level_updated[0]).all())
+            self.assertTrue(np.isnan(snow_level_updated[1]).all())
+
 
 class Test_find_max_in_nbhood_orography(IrisTest):
 
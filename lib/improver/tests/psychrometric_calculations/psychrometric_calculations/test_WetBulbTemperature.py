@@ -39,8 +39,9 @@ from iris.cube import Cube
 from iris.tests import IrisTest
 
 from improver.psychrometric_calculations.psychrometric_calculations import (
-    WetBulbTemperature)
+    Utilities, WetBulbTemperature)
 from improver.tests.set_up_test_cubes import set_up_variable_cube
+from improver.utilities.ancillary_creation import SaturatedVapourPressureTable
 from improver.utilities.warnings_handler import ManageWarnings
 
 
@@ -119,6 +120,20 @@ class Test_lookup_svp(Test_WetBulbTemperature):
         self.assertArrayAlmostEqual(result.data, expected)
         self.assertEqual(result.units, Unit('Pa'))
 
+    def test_svp_table_cube(self):
+        """Test that a table created at a finer increment can be used in place
+        of the default table, giving values consistent with those calculated
+        directly using the Goff-Gratch method."""
+        self.temperature.data[0, 1] = 260.56833
+        svp_table_cube = SaturatedVapourPressureTable(
+            t_min=250., t_max=270., t_increment=0.01).process()
+        plugin = WetBulbTemperature(svp_table_cube=svp_table_cube)
+        result = plugin.lookup_svp(self.temperature[:, 1:2])
+        expected = Utilities.saturation_vapour_pressure_goff_gratch(
+            self.temperature[:, 1:2])
+        self.assertArrayAlmostEqual(result.data, expected.data, decimal=3)
+        self.assertEqual(result.units, Unit('Pa'))
+
 
 class Test_pressure_correct_svp(Test_WetBulbTemperature):
 
@@ -30,7 +30,10 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Unit tests for NeighbourSelection class"""
 
+import os
+import shutil
 import unittest
+from tempfile import mkdtemp
 
 import cartopy.crs as ccrs
 import iris
@@ -380,6 +383,49 @@ class Test_get_nearest_indices(Test_NeighbourSelection):
                                             self.region_orography)
         self.assertArrayEqual(result, expected)
 
+    def test_multiple_sites(self):
+        """Test that the expected coordinates are returned for several sites
+        at once, including a site that falls exactly half way between two
+        grid points, for which the lower index is returned."""
+
+        plugin = NeighbourSelection()
+        site_coords = np.array([[-4.0E4, 0.0], [1.0E5, -5.0E4],
+                                [-8.75E4, 1.9E4]])
+
+        expected = [[2, 4], [8, 0], [0, 6]]
+        result = plugin.get_nearest_indices(site_coords,
+                                            self.region_orography)
+        self.assertArrayEqual(result, expected)
+
+    def test_circular_coordinate(self):
+        """Test that for a global grid with a circular longitude coordinate,
+        a site beyond the last grid point is matched with the nearest grid
+        point across the dateline."""
+
+        plugin = NeighbourSelection()
+        site_coords = np.array([[185.0, 0.0], [-185.0, 0.0], [350.0, 0.0]])
+
+        expected = [[0, 4], [8, 4], [4, 4]]
+        result = plugin.get_nearest_indices(site_coords,
+                                            self.global_orography)
+        self.assertArrayEqual(result, expected)
+
+    def test_descending_coordinate(self):
+        """Test that the expected indices are returned for a coordinate
+        without bounds in which the points are descending, and that a site
+        half way between two grid points is matched with the lower index."""
+
+        plugin = NeighbourSelection()
+        cube = self.region_orography
+        ycoord = cube.coord(axis='y')
+        ycoord.bounds = None
+        ycoord.points = ycoord.points[::-1]
+        site_coords = np.array([[-4.0E4, 5.0E4], [-4.0E4, 3.75E4]])
+
+        expected = [[2, 0], [2, 0]]
+        result = plugin.get_nearest_indices(site_coords, cube)
+        self.assertArrayEqual(result, expected)
+
 
 class Test_geocentric_cartesian(Test_NeighbourSelection):
 
@@ -595,6 +641,78 @@ class Test_select_minimum_dz(Test_NeighbourSelection):
                             for item in warning_list))
 
 
+class Test_select_minimum_dz_multiple(Test_NeighbourSelection):
+
+    """Test extraction of the minimum height difference points for many sites
+    at once, comparing with the single site method."""
+
+    def setUp(self):
+        """Set up nodes, distances and indices for several sites."""
+        super().setUp()
+        self.nodes = np.array([[0, 4], [1, 4], [2, 4], [3, 4], [4, 4]])
+        self.distances = np.array([[0, 1, 2, 3, np.inf],
+                                   [0, 1, np.inf, np.inf, np.inf],
+                                   [np.inf, np.inf, np.inf, np.inf, np.inf]])
+        self.indices = np.array([[0, 1, 2, 3, 5],
+                                 [4, 3, 5, 5, 5],
+                                 [5, 5, 5, 5, 5]])
+
+    def test_basic(self):
+        """Test that the neighbour with the minimum vertical displacement is
+        returned for each site, and that sites with no valid neighbours are
+        flagged as invalid. Indices associated with infinite distances lie
+        outside of the nodes array, as returned by the KDTree."""
+
+        plugin = NeighbourSelection()
+        site_altitudes = np.array([5., 3., 5.])
+
+        grid_points, valid_sites = plugin.select_minimum_dz_multiple(
+            self.region_orography, site_altitudes, self.nodes,
+            self.distances, self.indices)
+
+        self.assertArrayEqual(grid_points[:2], [[1, 4], [4, 4]])
+        self.assertArrayEqual(valid_sites, [True, True, False])
+
+    def test_matches_single_site(self):
+        """Test that the results match those of select_minimum_dz applied to
+        each site in turn."""
+
+        plugin = NeighbourSelection()
+        site_altitudes = np.array([1., 0., 5.])
+
+        grid_points, valid_sites = plugin.select_minimum_dz_multiple(
+            self.region_orography, site_altitudes, self.nodes,
+            self.distances, self.indices)
+
+        for index, site_altitude in enumerate(site_altitudes):
+            expected = plugin.select_minimum_dz(
+                self.region_orography, site_altitude, self.nodes,
+                self.distances[index], self.indices[index])
+            if expected is None:
+                self.assertFalse(valid_sites[index])
+            else:
+                self.assertArrayEqual(grid_points[index], expected)
+
+    @ManageWarnings(record=True)
+    def test_incomplete_search(self, warning_list=None):
+        """Test a single warning is raised when the number of nearest
+        neighbours searched does not exhaust the search_radius for any of the
+        sites."""
+
+        plugin = NeighbourSelection(search_radius=6)
+        site_altitudes = np.array([3., 3.])
+        distances = np.array([np.arange(5), np.arange(5)])
+        indices = np.array([np.arange(5), np.arange(5)])
+
+        plugin.select_minimum_dz_multiple(
+            self.region_orography, site_altitudes, self.nodes,
+            distances, indices)
+
+        msg = "Limit on number of nearest neighbours"
+        self.assertEqual(
+            sum([msg in str(warning) for warning in warning_list]), 1)
+
+
 class Test_process(Test_NeighbourSelection):
 
     """Test the process method of the NeighbourSelection class."""
@@ -827,6 +945,181 @@ class Test_process(Test_NeighbourSelection):
 
         self.assertArrayEqual(result.data, expected)
 
+    def test_multiple_sites_minimum_dz(self):
+        """Test that when processing several sites with a land constraint and
+        minimum height difference condition, each site is given the expected
+        neighbour. The first site has two land points within the search
+        radius and the lower of these is chosen. The second site has no land
+        within the search radius, so retains its nearest neighbour. The KDTree
+        is queried using two processes."""
+
+        self.region_sites.append(
+            {'altitude': 0.0, 'projection_x_coordinate': 1.0E5,
+             'projection_y_coordinate': -5.0E4, 'wmo_id': 2})
+        plugin = NeighbourSelection(
+            land_constraint=True, minimum_dz=True, search_radius=5E4,
+            site_coordinate_system=self.region_projection.as_cartopy_crs(),
+            site_x_coordinate='projection_x_coordinate',
+            site_y_coordinate='projection_y_coordinate', n_jobs=2)
+        result = plugin.process(self.region_sites, self.region_orography,
+                                self.region_land_mask)
+        expected = [[[4, 4, 2]], [[8, 0, 0]]]
+
+        self.assertArrayEqual(result.data, expected)
+
+
+class Test_process_cache(Test_NeighbourSelection):
+
+    """Test the caching of KDTree inputs and neighbour cubes by the process
+    method."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        super().setUp()
+        self.directory = mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'neighbour_cache')
+
+    def tearDown(self):
+        """Remove temporary directories created for testing."""
+        shutil.rmtree(self.directory)
+
+    def cache_files(self, prefix):
+        """Return the names of the cache files with the given prefix."""
+        return [filename for filename in os.listdir(self.cache_dir)
+                if filename.startswith(prefix)]
+
+    def test_cache_created(self):
+        """Test that the KDTree inputs and neighbour cube are written to the
+        cache directory, and that the cube matches the uncached result."""
+        expected = NeighbourSelection(
+            land_constraint=True, minimum_dz=True, search_radius=1E8).process(
+                self.global_sites, self.global_orography,
+                self.global_land_mask)
+        plugin = NeighbourSelection(
+            land_constraint=True, minimum_dz=True, search_radius=1E8,
+            cache_dir=self.cache_dir)
+        result = plugin.process(self.global_sites, self.global_orography,
+                                self.global_land_mask)
+
+        self.assertEqual(len(self.cache_files('kdtree')), 1)
+        self.assertEqual(len(self.cache_files('neighbours')), 1)
+        self.assertEqual(result, expected)
+
+    def test_cache_read(self):
+        """Test that the neighbour cube read from the cache matches the
+        uncached result."""
+        expected = NeighbourSelection(
+            land_constraint=True, minimum_dz=True, search_radius=1E8).process(
+                self.global_sites, self.global_orography,
+                self.global_land_mask)
+        plugin = NeighbourSelection(
+            land_constraint=True, minimum_dz=True, search_radius=1E8,
+            cache_dir=self.cache_dir)
+        plugin.process(self.global_sites, self.global_orography,
+                       self.global_land_mask)
+        result = plugin.process(self.global_sites, self.global_orography,
+                                self.global_land_mask)
+
+        self.assertEqual(result, expected)
+
+    def test_cache_used(self):
+        """Test that a cached neighbour cube is returned in preference to
+        recalculating it."""
+        plugin = NeighbourSelection(cache_dir=self.cache_dir)
+        modified = plugin.process(self.global_sites, self.global_orography,
+                                  self.global_land_mask)
+        modified.data[:] = -1
+        cache_key = plugin._neighbour_cache_key(
+            self.global_sites, self.global_orography, self.global_land_mask)
+        plugin._write_cache('neighbours', cache_key,
+                            plugin._neighbour_cube_to_arrays(modified))
+        result = plugin.process(self.global_sites, self.global_orography,
+                                self.global_land_mask)
+
+        self.assertArrayEqual(result.data, modified.data)
+
+    def test_unreadable_cache_entry(self):
+        """Test that cache entries that cannot be read, including entries
+        containing pickled objects, are recalculated and overwritten."""
+        expected = NeighbourSelection().process(
+            self.global_sites, self.global_orography, self.global_land_mask)
+        plugin = NeighbourSelection(cache_dir=self.cache_dir)
+        cache_key = plugin._neighbour_cache_key(
+            self.global_sites, self.global_orography, self.global_land_mask)
+        cache_path = plugin._cache_path('neighbours', cache_key)
+        os.makedirs(self.cache_dir)
+        for content in [b'not a cache entry', None]:
+            if content is None:
+                np.savez(cache_path, data=np.array([expected], dtype=object))
+            else:
+                with open(cache_path, 'wb') as cache_file:
+                    cache_file.write(content)
+            result = plugin.process(self.global_sites, self.global_orography,
+                                    self.global_land_mask)
+            self.assertEqual(result, expected)
+            self.assertIsNotNone(plugin._read_cache('neighbours', cache_key))
+
+    def test_kdtree_cache_shared(self):
+        """Test that the KDTree inputs are shared between neighbour cubes for
+        different site lists and options, while the neighbour cubes are
+        cached separately."""
+        plugin = NeighbourSelection(land_constraint=True, search_radius=1E8,
+                                    cache_dir=self.cache_dir)
+        plugin.process(self.global_sites, self.global_orography,
+                       self.global_land_mask)
+        self.global_sites[0]['altitude'] = 3.
+        plugin.process(self.global_sites, self.global_orography,
+                       self.global_land_mask)
+        NeighbourSelection(
+            land_constraint=True, minimum_dz=True, search_radius=1E8,
+            cache_dir=self.cache_dir).process(
+                self.global_sites, self.global_orography,
+                self.global_land_mask)
+
+        self.assertEqual(len(self.cache_files('kdtree')), 1)
+        self.assertEqual(len(self.cache_files('neighbours')), 3)
+
+    def test_cache_invalidated_by_data(self):
+        """Test that a change to the orography data results in the neighbour
+        cube being recalculated, rather than read from the cache."""
+        plugin = NeighbourSelection(land_constraint=True, minimum_dz=True,
+                                    search_radius=1E8,
+                                    cache_dir=self.cache_dir)
+        plugin.process(self.global_sites, self.global_orography,
+                       self.global_land_mask)
+        self.global_orography.data[4, 4] = 2.
+        result = plugin.process(self.global_sites, self.global_orography,
+                                self.global_land_mask)
+
+        self.assertEqual(len(self.cache_files('neighbours')), 2)
+        self.assertArrayEqual(result.data, [[[4, 4, 0]]])
+
+    def test_cache_eviction(self):
+        """Test that the least recently used entries are removed once the
+        number of entries exceeds max_cache_entries."""
+        plugin = NeighbourSelection(land_constraint=True, search_radius=1E8,
+                                    cache_dir=self.cache_dir,
+                                    max_cache_entries=2)
+        plugin.process(self.global_sites, self.global_orography,
+                       self.global_land_mask)
+        kdtree_file, = self.cache_files('kdtree')
+        self.global_sites[0]['altitude'] = 3.
+        plugin.process(self.global_sites, self.global_orography,
+                       self.global_land_mask)
+
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        self.assertEqual(self.cache_files('kdtree'), [kdtree_file])
+
+    def test_clear_cache(self):
+        """Test that clear_cache removes all the cache entries."""
+        plugin = NeighbourSelection(land_constraint=True, search_radius=1E8,
+                                    cache_dir=self.cache_dir)
+        plugin.process(self.global_sites, self.global_orography,
+                       self.global_land_mask)
+        plugin.clear_cache()
+
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
 
 if __name__ == '__main__':
     unittest.main()
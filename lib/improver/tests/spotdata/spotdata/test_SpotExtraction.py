@@ -188,6 +188,24 @@ class Test_extract_diagnostic_data(Test_SpotExtraction):
                                                 self.diagnostic_cube_yx)
         self.assertArrayEqual(result, expected)
 
+    def test_leading_dimensions(self):
+        """Test extraction of diagnostic data with a further dimension
+        between the x and y dimensions. The spot index becomes the first
+        dimension of the extracted data."""
+        plugin = SpotExtraction()
+        data = np.stack([self.diagnostic_cube_xy.data,
+                         self.diagnostic_cube_xy.data + 100], axis=1)
+        cube = iris.cube.Cube(
+            data, standard_name="air_temperature", units='K',
+            dim_coords_and_dims=[
+                (self.diagnostic_cube_xy.coord(axis='x'), 0),
+                (iris.coords.DimCoord([0, 1], standard_name='realization',
+                                      units=1), 1),
+                (self.diagnostic_cube_xy.coord(axis='y'), 2)])
+        expected = [[0, 100], [0, 100], [12, 112], [12, 112]]
+        result = plugin.extract_diagnostic_data(self.coordinate_cube, cube)
+        self.assertArrayEqual(result, expected)
+
 
 class Test_build_diagnostic_cube(Test_SpotExtraction):
 
@@ -284,6 +302,76 @@ class Test_process(Test_SpotExtraction):
         result.attributes.pop('model_grid_hash')
         self.assertDictEqual(result.attributes, cube.attributes)
 
+    def test_cube_with_multiple_leading_dimensions(self):
+        """Test that a cube with several leading dimensions, and auxiliary
+        and scalar coordinates on them, results in a spotdata cube with the
+        same leading dimensions and coordinates, followed by the spot
+        index."""
+        cubes = iris.cube.CubeList()
+        for realization in range(2):
+            for time in range(3):
+                cube = self.diagnostic_cube_yx.copy(
+                    data=self.diagnostic_cube_yx.data + 10*realization + time)
+                cube.add_aux_coord(iris.coords.DimCoord(
+                    [realization], standard_name='realization', units=1))
+                cube.add_aux_coord(iris.coords.DimCoord(
+                    [time], standard_name='time',
+                    units='hours since 1970-01-01 00:00:00'))
+                cube.add_aux_coord(iris.coords.AuxCoord(
+                    [time + 6], standard_name='forecast_period', units='h'))
+                cube.add_aux_coord(iris.coords.AuxCoord(
+                    [0], standard_name='height', units='m'))
+                cubes.append(cube)
+        cube = cubes.merge_cube()
+
+        plugin = SpotExtraction()
+        expected = (np.array([0, 0, 12, 12]) +
+                    np.array([[[0], [1], [2]], [[10], [11], [12]]]))
+        result = plugin.process(self.neighbour_cube, cube)
+        self.assertArrayEqual(result.data, expected)
+        self.assertEqual(result.coord_dims('realization'), (0,))
+        self.assertEqual(result.coord_dims('time'), (1,))
+        self.assertEqual(result.coord_dims('forecast_period'), (1,))
+        self.assertEqual(result.coord_dims('spot_index'), (2,))
+        self.assertArrayEqual(result.coord('forecast_period').points,
+                              [6, 7, 8])
+        self.assertEqual(result.coord('height').points, [0])
+        self.assertArrayEqual(result.coord('latitude').points, self.latitudes)
+
+
+class Test_process_multiple(Test_SpotExtraction):
+
+    """Test the process_multiple method which extracts data for several
+    diagnostics on the same grid."""
+
+    def test_basic(self):
+        """Test that a spot cube is returned for each diagnostic, matching
+        the cubes returned by process."""
+        plugin = SpotExtraction()
+        diagnostic_cubes = iris.cube.CubeList([
+            self.diagnostic_cube_yx,
+            self.diagnostic_cube_yx.copy(data=self.diagnostic_cube_yx.data*2)])
+        result = plugin.process_multiple(self.neighbour_cube,
+                                         diagnostic_cubes)
+        self.assertIsInstance(result, iris.cube.CubeList)
+        self.assertEqual(len(result), 2)
+        for spot_cube, diagnostic_cube in zip(result, diagnostic_cubes):
+            expected = plugin.process(self.neighbour_cube, diagnostic_cube)
+            self.assertEqual(spot_cube, expected)
+
+    def test_unmatched_cube_error(self):
+        """Test that an error is raised if any of the diagnostic cubes are
+        not on the grid of the neighbour cube."""
+        diagnostic_cube = self.diagnostic_cube_yx.copy()
+        diagnostic_cube.attributes['model_grid_hash'] = '123'
+        plugin = SpotExtraction()
+        msg = ("Cubes do not share or originate from the same grid, so cannot "
+               "be used together.")
+        with self.assertRaisesRegex(ValueError, msg):
+            plugin.process_multiple(
+                self.neighbour_cube,
+                [self.diagnostic_cube_yx, diagnostic_cube])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -39,7 +39,8 @@ from iris.coords import DimCoord
 from iris.cube import Cube
 from iris.tests import IrisTest
 
-from improver.tests.set_up_test_cubes import set_up_variable_cube
+from improver.tests.set_up_test_cubes import (
+    add_coordinate, set_up_variable_cube)
 from improver.threshold import BasicThreshold as Threshold
 
 
@@ -117,8 +118,8 @@ class Test__repr__(IrisTest):
         self.assertEqual(result, msg)
 
 
-class Test__add_threshold_coord(IrisTest):
-    """Test the _add_threshold_coord method"""
+class Test__create_threshold_coord(IrisTest):
+    """Test the _create_threshold_coord method"""
 
     def setUp(self):
         """Set up a cube and plugin for testing."""
@@ -127,31 +128,110 @@ class Test__add_threshold_coord(IrisTest):
         self.plugin.threshold_coord_name = self.cube.name()
 
     def test_basic(self):
-        """Test a scalar threshold coordinate is created"""
-        result = self.plugin._add_threshold_coord(self.cube, 1)
-        self.assertEqual(result.ndim, 3)
-        self.assertIn("air_temperature", [coord.standard_name for coord in
-                                          result.coords(dim_coords=True)])
-        threshold_coord = result.coord("air_temperature")
-        self.assertEqual(threshold_coord.var_name, "threshold")
-        self.assertEqual(threshold_coord.attributes,
+        """Test a threshold coordinate is created"""
+        result = self.plugin._create_threshold_coord([1], self.cube.units)
+        self.assertIsInstance(result, DimCoord)
+        self.assertEqual(result.standard_name, "air_temperature")
+        self.assertEqual(result.var_name, "threshold")
+        self.assertEqual(result.attributes,
                          {"spp__relative_to_threshold": "above"})
-        self.assertAlmostEqual(threshold_coord.points[0], 1)
-        self.assertEqual(threshold_coord.units, self.cube.units)
+        self.assertAlmostEqual(result.points[0], 1)
+        self.assertEqual(result.units, self.cube.units)
+
+    def test_multiple_thresholds(self):
+        """Test a coordinate is created with a point for each threshold"""
+        result = self.plugin._create_threshold_coord(
+            [1, 2, 3], self.cube.units)
+        self.assertArrayAlmostEqual(result.points, [1, 2, 3])
+        self.assertEqual(result.dtype, np.float32)
 
     def test_long_name(self):
         """Test coordinate is created with non-standard diagnostic name"""
-        self.cube.rename("sky_temperature")
-        self.plugin.threshold_coord_name = self.cube.name()
-        result = self.plugin._add_threshold_coord(self.cube, 1)
-        self.assertIn("sky_temperature", [coord.long_name for coord in
-                                          result.coords(dim_coords=True)])
+        self.plugin.threshold_coord_name = "sky_temperature"
+        result = self.plugin._create_threshold_coord([1], self.cube.units)
+        self.assertEqual(result.long_name, "sky_temperature")
 
     def test_value_error(self):
         """Test method catches ValueErrors unrelated to name, by passing it a
-        list of values where a scalar is required"""
+        list of values that cannot form a dimension coordinate"""
         with self.assertRaises(ValueError):
-            self.plugin._add_threshold_coord(self.cube, [1, 1])
+            self.plugin._create_threshold_coord([1, 1], self.cube.units)
+
+
+class Test__create_threshold_cube(IrisTest):
+    """Test the _create_threshold_cube method"""
+
+    def setUp(self):
+        """Set up a cube and plugin for testing."""
+        self.cube = set_up_variable_cube(np.ones((3, 3), dtype=np.float32))
+        self.plugin = Threshold([1, 2])
+        self.plugin.threshold_coord_name = self.cube.name()
+
+    def test_basic(self):
+        """Test a cube is created with a leading threshold dimension and
+        the coordinates of the template cube"""
+        data = np.zeros((2, 3, 3), dtype=np.float32)
+        result = self.plugin._create_threshold_cube(self.cube, data, [1, 2])
+        self.assertIsInstance(result, Cube)
+        self.assertEqual(result.coord_dims("air_temperature"), (0,))
+        self.assertEqual(result.coord_dims(self.cube.coord(axis="y")), (1,))
+        self.assertEqual(result.coord_dims(self.cube.coord(axis="x")), (2,))
+        self.assertEqual(result.coord("time"), self.cube.coord("time"))
+        self.assertEqual(result.name(), self.cube.name())
+        self.assertArrayEqual(result.data, data)
+
+
+class Test__threshold_data(IrisTest):
+    """Test the _threshold_data method"""
+
+    def setUp(self):
+        """Set up data with two realizations for testing."""
+        self.data = np.array([[0.5, 1., 1.5, 2., 2.25, 3.],
+                              [0.5, 1., 1., 1., 1., 1.]], dtype=np.float32)
+
+    def test_sharp_and_fuzzy(self):
+        """Test sharp and fuzzy thresholds are applied together"""
+        plugin = Threshold([1., 2.], fuzzy_bounds=[(1., 1.), (1.5, 2.5)])
+        expected = np.array([[[0., 0., 1., 1., 1., 1.],
+                              [0., 0., 0., 0., 0., 0.]],
+                             [[0., 0., 0., 0.5, 0.75, 1.],
+                              [0., 0., 0., 0., 0., 0.]]])
+        result = plugin._threshold_data(self.data, np.float32)
+        self.assertEqual(result.dtype, np.float32)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_collapse(self):
+        """Test thresholded values are averaged over the collapse axis"""
+        plugin = Threshold([1., 2.], fuzzy_bounds=[(1., 1.), (1.5, 2.5)])
+        expected = np.array([[0., 0., 0.5, 0.5, 0.5, 0.5],
+                             [0., 0., 0., 0.25, 0.375, 0.5]])
+        result = plugin._threshold_data(
+            self.data, np.float32, collapse_axis=0)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_collapse_masked(self):
+        """Test masked points are excluded from the average, and points
+        where all values are masked remain masked"""
+        plugin = Threshold(0.75)
+        mask = np.zeros(self.data.shape, dtype=bool)
+        mask[0, 1] = True
+        mask[:, 0] = True
+        data = np.ma.masked_array(self.data, mask=mask)
+        expected_data = np.array([[0., 1., 1., 1., 1., 1.]])
+        expected_mask = np.array([[True, False, False, False, False, False]])
+        result = plugin._threshold_data(data, np.float32, collapse_axis=0)
+        self.assertArrayAlmostEqual(result.data[~expected_mask],
+                                    expected_data[~expected_mask])
+        self.assertArrayEqual(result.mask, expected_mask)
+
+    def test_upper_bound_equal_to_threshold(self):
+        """Test a threshold with only a fuzzy lower bound gives 0.5 at the
+        threshold"""
+        plugin = Threshold(1., fuzzy_bounds=(0., 1.))
+        expected = np.array([[0.25, 0.5, 1., 1.]])
+        result = plugin._threshold_data(
+            np.array([0.5, 1., 1.5, 2.5]), np.float64)
+        self.assertArrayAlmostEqual(result, expected)
 
 
 class Test_process(IrisTest):
@@ -465,6 +545,42 @@ class Test_process(IrisTest):
         self.assertIsInstance(result, Cube)
         self.assertArrayAlmostEqual(result.data, expected_result_array)
 
+    def test_unordered_thresholds(self):
+        """Test thresholds given in any order are returned in ascending
+        order along with their fuzzy bounds."""
+        thresholds = [0.6, 0.2, 0.4]
+        bounds = [(0.55, 0.65), (0.1, 0.3), (0.3, 0.55)]
+        plugin = Threshold(thresholds, fuzzy_bounds=bounds)
+        result = plugin.process(self.cube)
+        expected_result_array = np.zeros((3, 1, 5, 5))
+        expected_result_array[0][0][2][2] = 1.
+        expected_result_array[1][0][2][2] = 5. / 6.
+        self.assertArrayAlmostEqual(
+            result.coord(var_name="threshold").points, [0.2, 0.4, 0.6])
+        self.assertArrayAlmostEqual(result.data, expected_result_array)
+
+    def test_collapse_realizations(self):
+        """Test the realization dimension is collapsed when requested."""
+        cube = add_coordinate(self.cube, [0, 1], "realization",
+                              dtype=np.int32)
+        cube.data[1, 0, 2, 2] = 0.
+        plugin = Threshold([0.2, 0.4], collapse_realizations=True)
+        result = plugin.process(cube)
+        expected_result_array = np.zeros((2, 1, 5, 5))
+        expected_result_array[:, 0, 2, 2] = 0.5
+        self.assertNotIn("realization",
+                         [coord.name() for coord in result.coords()])
+        self.assertArrayAlmostEqual(result.data, expected_result_array)
+        self.assertEqual(result.coord_dims(self.cube.name()), (0,))
+
+    def test_collapse_realizations_no_realization(self):
+        """Test an error is raised if collapsing realizations is requested
+        for a cube without a realization dimension."""
+        plugin = Threshold(0.2, collapse_realizations=True)
+        msg = "Cannot collapse realizations"
+        with self.assertRaisesRegex(ValueError, msg):
+            plugin.process(self.cube)
+
     def test_threshold_below_fuzzy_miss(self):
         """Test not meeting the threshold in fuzzy below-threshold-mode."""
         plugin = Threshold(
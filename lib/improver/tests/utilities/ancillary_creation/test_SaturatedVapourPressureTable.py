@@ -32,7 +32,10 @@
 Unit tests for the SaturatedVapourPressureTable utility.
 
 """
+import os
+import shutil
 import unittest
+from tempfile import mkdtemp
 
 import numpy as np
 from cf_units import Unit
@@ -49,7 +52,8 @@ class Test__repr__(IrisTest):
         """Test that the __repr__ returns the expected string."""
         result = str(SaturatedVapourPressureTable())
         msg = ('<SaturatedVapourPressureTable: t_min: {}; t_max: {}; '
-               't_increment: {}>'.format(183.15, 338.25, 0.1))
+               't_increment: {}; cache_dir: {}>'.format(
+                   183.15, 338.25, 0.1, None))
         self.assertEqual(result, msg)
 
 
@@ -92,5 +96,61 @@ class Test_process(IrisTest):
                                     expected)
 
 
+class Test_process_cache(IrisTest):
+
+    """Test that the plugin caches table values as expected."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        self.directory = mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'svp_cache')
+        self.plugin = SaturatedVapourPressureTable(
+            t_min=183.15, t_max=338.15, t_increment=10.,
+            cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        """Remove temporary directories created for testing."""
+        shutil.rmtree(self.directory)
+
+    def test_cache_created(self):
+        """Test that the table values are written to the cache directory and
+        match the uncached table."""
+        expected = SaturatedVapourPressureTable(
+            t_min=183.15, t_max=338.15, t_increment=10.).process()
+        result = self.plugin.process()
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
+    def test_existing_cache_dir(self):
+        """Test that the table values are written to a cache directory that
+        already exists, and that no temporary files are left behind."""
+        os.makedirs(self.cache_dir)
+        self.plugin.process()
+        cache_file, = os.listdir(self.cache_dir)
+        self.assertTrue(cache_file.endswith('.npy'))
+
+    def test_cache_used(self):
+        """Test that cached table values are read in preference to
+        recalculating them."""
+        self.plugin.process()
+        cache_file, = os.listdir(self.cache_dir)
+        cache_path = os.path.join(self.cache_dir, cache_file)
+        np.save(cache_path, np.ones(16))
+        result = self.plugin.process()
+        self.assertArrayEqual(result.data, np.ones(16))
+        self.assertEqual(result.units, Unit('Pa'))
+        self.assertArrayAlmostEqual(result.coord('air_temperature').points,
+                                    np.arange(183.15, 338.15, 10.))
+
+    def test_different_increments_cached_separately(self):
+        """Test that tables with different increments use different cache
+        files."""
+        self.plugin.process()
+        SaturatedVapourPressureTable(
+            t_min=183.15, t_max=338.15, t_increment=5.,
+            cache_dir=self.cache_dir).process()
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -31,6 +31,7 @@
 """ Unit tests for DayNightMask class """
 
 import unittest
+from datetime import datetime
 
 import cf_units as unit
 import iris
@@ -39,6 +40,8 @@ from iris.tests import IrisTest
 
 from improver.tests.nbhood.nbhood.test_BaseNeighbourhoodProcessing import (
     set_up_cube, set_up_cube_lat_long)
+from improver.tests.set_up_test_cubes import (
+    add_coordinate, set_up_variable_cube)
 from improver.utilities.solar import DayNightMask
 
 
@@ -207,6 +210,26 @@ class Test_process(IrisTest):
             [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]])
         self.assertArrayEqual(result.data, expected_result)
 
+    def test_multiple_times(self):
+        """Test day_night mask for lat lon and equal area cubes with
+        multiple times gives the same mask at each time as for that time
+        alone."""
+        times = [datetime(2017, 11, 1, hour) for hour in [6, 8, 12, 16]]
+        for spatial_grid in ['latlon', 'equalarea']:
+            cube = add_coordinate(
+                set_up_variable_cube(np.ones((10, 10), dtype=np.float32),
+                                     spatial_grid=spatial_grid,
+                                     time=times[0], frt=times[0]),
+                times, 'time', is_datetime=True)
+            result = DayNightMask().process(cube)
+            self.assertEqual(result.shape, (4, 10, 10))
+            self.assertTrue(result.data.any())
+            self.assertFalse(result.data.all())
+            for index in range(len(times)):
+                expected = DayNightMask().process(cube[index:index + 1])
+                self.assertArrayEqual(result.data[index:index + 1],
+                                      expected.data)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -30,14 +30,20 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Unit tests for the solar calculations in solar.py """
 
+import datetime
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 from iris.tests import IrisTest
 
+from improver.tests.set_up_test_cubes import (
+    add_coordinate, set_up_variable_cube)
 from improver.utilities.solar import (
-    calc_solar_declination, calc_solar_hour_angle, calc_solar_elevation,
-    daynight_terminator)
+    calc_day_of_year_and_utc_hour, calc_solar_declination,
+    calc_solar_elevation, calc_solar_elevation_at_times,
+    calc_solar_hour_angle, clear_grid_lat_lons_cache, daynight_terminator,
+    get_grid_lat_lons)
 
 
 class Test_calc_solar_declination(IrisTest):
@@ -148,6 +154,18 @@ class Test_calc_solar_elevation(IrisTest):
         self.assertIsInstance(result, np.ndarray)
         self.assertArrayAlmostEqual(result, expected_array)
 
+    def test_solar_elevation_multiple_times(self):
+        """Test the solar elevation for arrays of days of the year and hours
+        that are broadcast against the lats and lons."""
+        expected_array = np.array(
+            [[-3.1423043, -0.46061176, 2.09728301],
+             [4.51674841, 6.78261283, 8.87928653]])
+        day_of_year = np.array([[10], [10]])
+        utc_hour = np.array([[8.0], [9.0]])
+        result = calc_solar_elevation(self.latitudes, self.longitudes,
+                                      day_of_year, utc_hour)
+        self.assertArrayAlmostEqual(result, expected_array)
+
     def test_solar_elevation_raises_exception_lat(self):
         """Test an exception is raised if latitudes out of range"""
         latitudes = np.array([-150.0, 50.0, 50.0])
@@ -164,6 +182,14 @@ class Test_calc_solar_elevation(IrisTest):
             calc_solar_elevation(self.latitudes, self.longitudes,
                                  day_of_year, self.utc_hour)
 
+    def test_solar_elevation_raises_exception_hour_array(self):
+        """Test an exception is raised if any hour is out of range"""
+        utc_hour = np.array([[8.0], [25.0]])
+        msg = 'Hour must be between 0 and 24.0'
+        with self.assertRaisesRegex(ValueError, msg):
+            calc_solar_elevation(self.latitudes, self.longitudes,
+                                 self.day_of_year, utc_hour)
+
     def test_solar_elevation_raises_exception_hour(self):
         """Test an exception is raised if hour out of range"""
         utc_hour = -10.0
@@ -264,5 +290,141 @@ class Test_daynight_terminator(IrisTest):
                                 self.day_of_year, utc_hour)
 
 
+class Test_get_grid_lat_lons(IrisTest):
+
+    """Test Calculate lats and lons."""
+
+    def setUp(self):
+        """Set up the test inputs."""
+        time_start = datetime.datetime(2017, 11, 1, 3)
+        time_mid = datetime.datetime(2017, 11, 1, 6)
+        time_end = datetime.datetime(2017, 11, 1, 9)
+        self.npoints = 3
+        data_time_0 = np.ones((self.npoints, self.npoints), dtype=np.float32)
+        cube_time_0 = set_up_variable_cube(data_time_0,
+                                           time=time_start,
+                                           frt=time_start)
+        self.cube = add_coordinate(cube_time_0,
+                                   [time_start, time_mid, time_end],
+                                   'time', is_datetime=True)
+        cube_time_0_equalarea = set_up_variable_cube(data_time_0,
+                                                     time=time_start,
+                                                     frt=time_start,
+                                                     spatial_grid='equalarea')
+        self.cube_equalarea = add_coordinate(cube_time_0_equalarea,
+                                             [time_start, time_mid, time_end],
+                                             'time', is_datetime=True)
+
+    def test_lat_lon(self):
+        """Test that the function returns the lats and lons expected."""
+        expected_lons = np.array([[-20.0, 0.0, 20.0],
+                                  [-20.0, 0.0, 20.0],
+                                  [-20.0, 0.0, 20.0]])
+        expected_lats = np.array([[40.0, 40.0, 40.0],
+                                  [60.0, 60.0, 60.0],
+                                  [80.0, 80.0, 80.0]])
+        result_lats, result_lons = get_grid_lat_lons(self.cube)
+        self.assertIsInstance(result_lats, np.ndarray)
+        self.assertEqual(result_lats.shape, (3, 3))
+        self.assertIsInstance(result_lons, np.ndarray)
+        self.assertEqual(result_lons.shape, (3, 3))
+        self.assertArrayAlmostEqual(result_lats, expected_lats)
+        self.assertArrayAlmostEqual(result_lons, expected_lons)
+
+    def test_x_y(self):
+        """Test that the function returns the lats and lons expected."""
+        expected_lats = np.array([[53.84618597, 53.99730779, 53.93247526],
+                                  [56.82670954, 56.99111356, 56.9205672],
+                                  [59.8045105,  59.98499383, 59.90752513]])
+
+        expected_lons = np.array([[-8.58580705, -3.51660018, 1.56242662],
+                                  [-9.06131306, -3.59656346, 1.88105082],
+                                  [-9.63368459, -3.69298822, 2.26497216]])
+
+        result_lats, result_lons = get_grid_lat_lons(self.cube_equalarea)
+        self.assertIsInstance(result_lats, np.ndarray)
+        self.assertEqual(result_lats.shape, (3, 3))
+        self.assertIsInstance(result_lons, np.ndarray)
+        self.assertEqual(result_lons.shape, (3, 3))
+        self.assertArrayAlmostEqual(result_lats, expected_lats)
+        self.assertArrayAlmostEqual(result_lons, expected_lons)
+
+    def test_cached(self):
+        """Test that the same read-only arrays are returned for a second
+        cube on the same grid."""
+        result_lats, result_lons = get_grid_lat_lons(self.cube_equalarea)
+        second_lats, second_lons = get_grid_lat_lons(
+            self.cube_equalarea[0].copy())
+        self.assertIs(second_lats, result_lats)
+        self.assertIs(second_lons, result_lons)
+        self.assertFalse(result_lats.flags.writeable)
+        self.assertFalse(result_lons.flags.writeable)
+
+    def test_cache_bounded(self):
+        """Test that the least recently used grid is dropped from the cache
+        when the cache is full."""
+        clear_grid_lat_lons_cache()
+        with patch('improver.utilities.solar._GRID_LAT_LONS_MAXSIZE', 1):
+            result_lats, _ = get_grid_lat_lons(self.cube)
+            get_grid_lat_lons(self.cube_equalarea)
+            second_lats, _ = get_grid_lat_lons(self.cube)
+        self.assertIsNot(second_lats, result_lats)
+        self.assertArrayEqual(second_lats, result_lats)
+
+    def test_clear_cache(self):
+        """Test that the grids are recalculated once the cache has been
+        cleared."""
+        result_lats, _ = get_grid_lat_lons(self.cube_equalarea)
+        clear_grid_lat_lons_cache()
+        second_lats, _ = get_grid_lat_lons(self.cube_equalarea)
+        self.assertIsNot(second_lats, result_lats)
+        self.assertArrayEqual(second_lats, result_lats)
+
+
+class Test_calc_day_of_year_and_utc_hour(IrisTest):
+
+    """Test Calculate the day of the year and hour for datetimes."""
+
+    def test_basic(self):
+        """Test that the expected days of the year and hours are returned,
+        with the seconds of each datetime ignored."""
+        datetimes = [datetime.datetime(2017, 1, 11, 8),
+                     datetime.datetime(2017, 12, 31, 9, 30, 45)]
+        day_of_year, utc_hour = calc_day_of_year_and_utc_hour(datetimes)
+        self.assertArrayEqual(day_of_year, np.array([10, 364]))
+        self.assertArrayAlmostEqual(utc_hour, np.array([8.0, 9.5]))
+
+
+class Test_calc_solar_elevation_at_times(IrisTest):
+
+    """Test Calculate the solar elevation at multiple times."""
+
+    def setUp(self):
+        """Set up the lats and lons."""
+        self.latitudes = np.array([50.0, 50.0, 50.0])
+        self.longitudes = np.array([-5.0, 0.0, 5.0])
+
+    def test_sin_phi(self):
+        """Test that the function returns the values expected."""
+        dtval = datetime.datetime(2017, 1, 11, 8)
+        expected_array = np.array([[-0.05481607, -0.00803911, 0.03659632]])
+        result = calc_solar_elevation_at_times(
+            self.latitudes, self.longitudes, [dtval], return_sine=True)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertArrayAlmostEqual(result, expected_array)
+
+    def test_multiple_times(self):
+        """Test that the solar elevation is returned for each time, with
+        time as the leading dimension."""
+        datetimes = [datetime.datetime(2017, 1, 11, 8),
+                     datetime.datetime(2017, 1, 11, 9)]
+        expected_array = np.array(
+            [[-3.1423043, -0.46061176, 2.09728301],
+             [4.51674841, 6.78261283, 8.87928653]])
+        result = calc_solar_elevation_at_times(
+            self.latitudes, self.longitudes, datetimes)
+        self.assertArrayAlmostEqual(result, expected_array)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -31,6 +31,7 @@
 """Unit tests for the RegridLandSea class from spatial.py."""
 
 import unittest
+from unittest.mock import patch
 
 import iris
 import numpy as np
@@ -43,7 +44,8 @@ from improver.grids import ELLIPSOID
 from improver.tests.nbhood.nbhood.test_BaseNeighbourhoodProcessing import (
     set_up_cube)
 from improver.utilities.spatial import (
-    RegridLandSea, OccurrenceWithinVicinity)
+    RegridLandSea, OccurrenceWithinVicinity,
+    clear_land_sea_source_points_cache)
 from improver.utilities.warnings_handler import ManageWarnings
 
 
@@ -53,10 +55,8 @@ class Test__init__(IrisTest):
     def test_basic(self):
         """Test that instantiating the class results in an object with
         expected variables."""
-        expected_members = {'nearest_cube': None,
-                            'input_land': None,
-                            'output_land': None,
-                            'output_cube': None}
+        expected_members = {'input_land': None,
+                            'output_land': None}
         result = RegridLandSea()
         members = {attr: getattr(result, attr) for attr in dir(result)
                    if not callable(getattr(result, attr)) and
@@ -104,14 +104,14 @@ class Test__repr__(IrisTest):
         self.assertEqual(result, expected)
 
 
-class Test_correct_where_input_true(IrisTest):
-    """Tests the correct_where_input_true method of the RegridLandSea class."""
+class Test_find_replacement_points(IrisTest):
+    """Tests the find_replacement_points method of the RegridLandSea
+    class."""
 
     def setUp(self):
         """Create a class-object containing the necessary cubes.
         All cubes are on the target grid. Here this is defined as a 3x3 grid.
         The grid contains ones everywhere except the centre point (a zero).
-        The output_cube has a value of 0.5 at [0, 1].
         The move_sea_point cube has the zero value at [0, 1] instead of [1, 1],
         this allows it to be used in place of input_land to trigger the
         expected behaviour in the function.
@@ -122,110 +122,181 @@ class Test_correct_where_input_true(IrisTest):
                         zero_point_indices=((0, 0, 1, 1),)))
         self.plugin.input_land = cube.copy()
         self.plugin.output_land = cube.copy()
-        self.plugin.nearest_cube = cube.copy()
-        self.plugin.nearest_cube.data[0, 1] = 0.5
-        self.plugin.output_cube = self.plugin.nearest_cube.copy()
         self.move_sea_point = squeeze(
             set_up_cube(num_grid_points=3,
                         zero_point_indices=((0, 0, 0, 1),)))
 
+    def assert_no_points(self, result):
+        """Assert that no points to replace have been returned."""
+        mismatch_points, source_points = result
+        for indices in mismatch_points + source_points:
+            self.assertEqual(indices.size, 0)
+
     def test_basic_sea(self):
-        """Test that nothing changes with argument zero (sea)."""
-        input_land = self.plugin.input_land.copy()
-        output_land = self.plugin.output_land.copy()
-        output_cube = self.plugin.output_cube.copy()
-        self.plugin.correct_where_input_true(0)
-        self.assertArrayEqual(input_land.data, self.plugin.input_land.data)
-        self.assertArrayEqual(output_land.data, self.plugin.output_land.data)
-        self.assertArrayEqual(output_cube.data, self.plugin.output_cube.data)
+        """Test that no points are found with argument zero (sea)."""
+        result = self.plugin.find_replacement_points(0)
+        self.assert_no_points(result)
 
     def test_basic_land(self):
-        """Test that nothing changes with argument one (land)."""
-        input_land = self.plugin.input_land.copy()
-        output_land = self.plugin.output_land.copy()
-        output_cube = self.plugin.output_cube.copy()
-        self.plugin.correct_where_input_true(1)
-        self.assertArrayEqual(input_land.data, self.plugin.input_land.data)
-        self.assertArrayEqual(output_land.data, self.plugin.output_land.data)
-        self.assertArrayEqual(output_cube.data, self.plugin.output_cube.data)
+        """Test that no points are found with argument one (land)."""
+        result = self.plugin.find_replacement_points(1)
+        self.assert_no_points(result)
 
     def test_work_sea(self):
-        """Test for expected change with argument zero (sea)."""
+        """Test for expected points with argument zero (sea)."""
         self.plugin.input_land = self.move_sea_point
-        output_cube = self.plugin.output_cube.copy()
-        # The output sea point should have been changed to the value from the
+        # The output sea point should be replaced by the value from the
         # input sea point in the same grid.
-        output_cube.data[1, 1] = 0.5
-        self.plugin.correct_where_input_true(0)
-        self.assertArrayEqual(output_cube.data, self.plugin.output_cube.data)
+        mismatch_points, source_points = (
+            self.plugin.find_replacement_points(0))
+        self.assertArrayEqual(mismatch_points, ([1], [1]))
+        self.assertArrayEqual(source_points, ([0], [1]))
 
     def test_work_land(self):
-        """Test for expected change with argument one (land)."""
+        """Test for expected points with argument one (land)."""
         self.plugin.input_land = self.move_sea_point
-        output_cube = self.plugin.output_cube.copy()
-        # The input sea point should have been changed to the value from an
-        # input land point in the same grid.
-        output_cube.data[0, 1] = 1.0
-        self.plugin.correct_where_input_true(1)
-        self.assertArrayEqual(output_cube.data, self.plugin.output_cube.data)
-
-    def test_work_sealand_eq_landsea(self):
-        """Test result is independent of order of sea/land handling."""
-        self.plugin.input_land = self.move_sea_point.copy()
-        reset_cube = self.plugin.output_cube.copy()
-        self.plugin.correct_where_input_true(0)
-        self.plugin.correct_where_input_true(1)
-        attempt_01 = self.plugin.output_cube.data.copy()
-
-        self.plugin.output_cube = reset_cube
-        self.plugin.correct_where_input_true(1)
-        self.plugin.correct_where_input_true(0)
-        attempt_10 = self.plugin.output_cube.data.copy()
-
-        self.assertArrayEqual(attempt_01, attempt_10)
+        # The input sea point should be replaced by the value from an
+        # adjacent input land point in the same grid.
+        mismatch_points, source_points = (
+            self.plugin.find_replacement_points(1))
+        self.assertArrayEqual(mismatch_points, ([0], [1]))
+        self.assertArrayEqual(
+            self.move_sea_point.data[source_points], [1.])
+        distance = np.hypot(source_points[0] - mismatch_points[0],
+                            source_points[1] - mismatch_points[1])
+        self.assertArrayEqual(distance, [1.])
 
     def test_not_in_vicinity(self):
-        """Test for no change if the matching point is too far away."""
+        """Test no points are found if the matching point is too far
+        away."""
         # We need larger arrays for this.
         # Define 5 x 5 arrays with output sea point at [1, 1] and input sea
-        # point at [4, 4]. The alternative value of 0.5 at [4, 4] should not
-        # be selected with a small vicinity_radius.
-        self.plugin = RegridLandSea(vicinity_radius=2200.)
+        # point at [4, 4].
         cube = squeeze(
             set_up_cube(num_grid_points=5,
                         zero_point_indices=((0, 0, 1, 1),)))
         self.plugin.output_land = cube.copy()
-        self.plugin.nearest_cube = cube.copy()
-        self.plugin.nearest_cube.data[4, 4] = 0.5
-        self.plugin.output_cube = self.plugin.nearest_cube.copy()
         self.plugin.input_land = squeeze(
             set_up_cube(num_grid_points=5,
                         zero_point_indices=((0, 0, 4, 4),)))
-
-        output_cube = self.plugin.output_cube.copy()
-        self.plugin.correct_where_input_true(0)
-        self.assertArrayEqual(output_cube.data, self.plugin.output_cube.data)
+        result = self.plugin.find_replacement_points(0)
+        self.assert_no_points(result)
 
     def test_no_matching_points(self):
-        """Test code runs and makes no changes if no sea points are present."""
+        """Test code runs and finds no points if no sea points are
+        present."""
         self.plugin.input_land.data = np.ones_like(
             self.plugin.input_land.data)
         self.plugin.output_land.data = np.ones_like(
             self.plugin.output_land.data)
-        output_cube = self.plugin.output_cube.copy()
-        self.plugin.correct_where_input_true(0)
-        self.assertArrayEqual(output_cube.data, self.plugin.output_cube.data)
+        result = self.plugin.find_replacement_points(0)
+        self.assert_no_points(result)
 
     def test_all_matching_points(self):
-        """Test code runs and makes no changes if all land points are
+        """Test code runs and finds no points if all land points are
         present."""
         self.plugin.input_land.data = np.ones_like(
             self.plugin.input_land.data)
         self.plugin.output_land.data = np.ones_like(
             self.plugin.output_land.data)
-        output_cube = self.plugin.output_cube.copy()
-        self.plugin.correct_where_input_true(1)
-        self.assertArrayEqual(output_cube.data, self.plugin.output_cube.data)
+        result = self.plugin.find_replacement_points(1)
+        self.assert_no_points(result)
+
+
+class Test_get_source_points(IrisTest):
+    """Tests the get_source_points method of the RegridLandSea class."""
+
+    def setUp(self):
+        """Create land masks on a 5x5 grid. The output_land has sea points at
+        [0, 0] and [1, 1], and the input_land has sea points at [0, 1] and
+        [4, 4]."""
+        self.plugin = RegridLandSea(vicinity_radius=2200.)
+        self.output_land = squeeze(
+            set_up_cube(num_grid_points=5,
+                        zero_point_indices=((0, 0, 1, 1),
+                                            (0, 0, 0, 0))))
+        self.input_land = squeeze(
+            set_up_cube(num_grid_points=5,
+                        zero_point_indices=((0, 0, 0, 1),
+                                            (0, 0, 4, 4))))
+
+    # The warning messages are internal to the iris.analysis module v2.2.0.
+    @ManageWarnings(ignored_messages=["Using a non-tuple sequence for "],
+                    warning_types=[FutureWarning])
+    def test_basic(self):
+        """Test that each point takes its value from itself, except for the
+        points with mismatched land-sea masks."""
+        expected_y, expected_x = np.indices((5, 5))
+        # Output sea-points sourced from the input sea-point:
+        expected_y[0, 0], expected_x[0, 0] = 0, 1
+        expected_y[1, 1], expected_x[1, 1] = 0, 1
+        source_y, source_x = self.plugin.get_source_points(
+            self.input_land, self.output_land)
+        # Output land-points sourced from adjacent input land-points:
+        self.assertEqual(abs(source_y[0, 1] - 0) + abs(source_x[0, 1] - 1), 1)
+        self.assertEqual(abs(source_y[4, 4] - 4) + abs(source_x[4, 4] - 4), 1)
+        expected_y[0, 1], expected_x[0, 1] = source_y[0, 1], source_x[0, 1]
+        expected_y[4, 4], expected_x[4, 4] = source_y[4, 4], source_x[4, 4]
+        self.assertArrayEqual(source_y, expected_y)
+        self.assertArrayEqual(source_x, expected_x)
+
+    @ManageWarnings(ignored_messages=["Using a non-tuple sequence for "],
+                    warning_types=[FutureWarning])
+    def test_cached(self):
+        """Test that the same read-only arrays are returned for the same
+        land masks, even from a different instance of the plugin."""
+        source_y, source_x = self.plugin.get_source_points(
+            self.input_land, self.output_land)
+        result_y, result_x = RegridLandSea(
+            vicinity_radius=2200.).get_source_points(
+                self.input_land.copy(), self.output_land.copy())
+        self.assertIs(result_y, source_y)
+        self.assertIs(result_x, source_x)
+        self.assertFalse(source_y.flags.writeable)
+        self.assertFalse(source_x.flags.writeable)
+
+    @ManageWarnings(ignored_messages=["Using a non-tuple sequence for "],
+                    warning_types=[FutureWarning])
+    def test_different_vicinity(self):
+        """Test that cached points are not reused for a different
+        vicinity_radius."""
+        source_y, _ = self.plugin.get_source_points(
+            self.input_land, self.output_land)
+        result_y, _ = RegridLandSea(
+            vicinity_radius=4400.).get_source_points(
+                self.input_land, self.output_land)
+        self.assertIsNot(result_y, source_y)
+
+    @ManageWarnings(ignored_messages=["Using a non-tuple sequence for "],
+                    warning_types=[FutureWarning])
+    def test_cache_bounded(self):
+        """Test that the least recently used entry is dropped from the cache
+        when the cache is full."""
+        clear_land_sea_source_points_cache()
+        with patch(
+                'improver.utilities.spatial._LAND_SEA_SOURCE_POINTS_MAXSIZE',
+                1):
+            source_y, _ = self.plugin.get_source_points(
+                self.input_land, self.output_land)
+            RegridLandSea(vicinity_radius=4400.).get_source_points(
+                self.input_land, self.output_land)
+            result_y, _ = self.plugin.get_source_points(
+                self.input_land, self.output_land)
+        self.assertIsNot(result_y, source_y)
+        self.assertArrayEqual(result_y, source_y)
+
+    @ManageWarnings(ignored_messages=["Using a non-tuple sequence for "],
+                    warning_types=[FutureWarning])
+    def test_clear_cache(self):
+        """Test that the source points are recalculated once the cache has
+        been cleared."""
+        source_y, _ = self.plugin.get_source_points(
+            self.input_land, self.output_land)
+        clear_land_sea_source_points_cache()
+        result_y, _ = self.plugin.get_source_points(
+            self.input_land, self.output_land)
+        self.assertIsNot(result_y, source_y)
+        self.assertArrayEqual(result_y, source_y)
 
 
 class Test_process(IrisTest):
@@ -349,6 +420,28 @@ class Test_process(IrisTest):
         self.assertDictEqual(result.attributes, self.cube.attributes)
         self.assertEqual(result.name(), self.cube.name())
 
+    @ManageWarnings(ignored_messages=["Using a non-tuple sequence for "],
+                    warning_types=[FutureWarning])
+    def test_leading_x_dimension(self):
+        """Test that the expected changes occur when the x and y dimensions
+        are not the trailing dimensions of a multi-realization cube."""
+        cube = self.cube.copy()
+        cube.coord('realization').points = [1]
+        cubes = iris.cube.CubeList([self.cube, cube])
+        cube = cubes.merge_cube()
+        cube.transpose([2, 0, 1])
+
+        expected = cube.data.copy()
+        expected[0, :, 0] = 0.5
+        expected[1, :, 1] = 0.5
+        expected[1, :, 0] = 1.
+        expected[4, :, 4] = 1.
+        result = self.plugin.process(cube,
+                                     self.input_land,
+                                     self.output_land)
+        self.assertEqual(result.coord_dims('realization'), (1,))
+        self.assertArrayEqual(result.data, expected)
+
     def test_raises_gridding_error(self):
         """Test error raised when cube and output grids don't match."""
         self.cube = self.input_land_ll
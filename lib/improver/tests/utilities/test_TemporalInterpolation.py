@@ -267,89 +267,6 @@ class Test_enforce_time_coords_dtype(IrisTest):
                          self.coord_units['forecast_period'])
 
 
-class Test_calc_sin_phi(IrisTest):
-
-    """Test Calculate sin of solar elevation."""
-
-    def test_sin_phi(self):
-        """Test that the function returns the values expected."""
-        latitudes = np.array([50.0, 50.0, 50.0])
-        longitudes = np.array([-5.0, 0.0, 5.0])
-        dtval = datetime.datetime(2017, 1, 11, 8)
-        expected_array = np.array([-0.05481607, -0.00803911, 0.03659632])
-        plugin = TemporalInterpolation(interval_in_minutes=60,
-                                       interpolation_method='solar')
-        result = plugin.calc_sin_phi(dtval,
-                                     latitudes,
-                                     longitudes)
-        self.assertIsInstance(result, np.ndarray)
-        self.assertArrayAlmostEqual(result, expected_array)
-
-
-class Test_calc_lats_lons(IrisTest):
-
-    """Test Calculate lats and lons."""
-
-    def setUp(self):
-        """Set up the test inputs."""
-        time_start = datetime.datetime(2017, 11, 1, 3)
-        time_mid = datetime.datetime(2017, 11, 1, 6)
-        time_end = datetime.datetime(2017, 11, 1, 9)
-        self.npoints = 3
-        data_time_0 = np.ones((self.npoints, self.npoints), dtype=np.float32)
-        cube_time_0 = set_up_variable_cube(data_time_0,
-                                           time=time_start,
-                                           frt=time_start)
-        self.cube = add_coordinate(cube_time_0,
-                                   [time_start, time_mid, time_end],
-                                   'time', is_datetime=True)
-        cube_time_0_equalarea = set_up_variable_cube(data_time_0,
-                                                     time=time_start,
-                                                     frt=time_start,
-                                                     spatial_grid='equalarea')
-        self.cube_equalarea = add_coordinate(cube_time_0_equalarea,
-                                             [time_start, time_mid, time_end],
-                                             'time', is_datetime=True)
-
-    def test_lat_lon(self):
-        """Test that the function returns the lats and lons expected."""
-        expected_lons = np.array([[-20.0, 0.0, 20.0],
-                                  [-20.0, 0.0, 20.0],
-                                  [-20.0, 0.0, 20.0]])
-        expected_lats = np.array([[40.0, 40.0, 40.0],
-                                  [60.0, 60.0, 60.0],
-                                  [80.0, 80.0, 80.0]])
-        plugin = TemporalInterpolation(interval_in_minutes=60,
-                                       interpolation_method='solar')
-        result_lats, result_lons = plugin.calc_lats_lons(self.cube)
-        self.assertIsInstance(result_lats, np.ndarray)
-        self.assertEqual(result_lats.shape, (3, 3))
-        self.assertIsInstance(result_lons, np.ndarray)
-        self.assertEqual(result_lons.shape, (3, 3))
-        self.assertArrayAlmostEqual(result_lats, expected_lats)
-        self.assertArrayAlmostEqual(result_lons, expected_lons)
-
-    def test_x_y(self):
-        """Test that the function returns the lats and lons expected."""
-        expected_lats = np.array([[53.84618597, 53.99730779, 53.93247526],
-                                  [56.82670954, 56.99111356, 56.9205672],
-                                  [59.8045105,  59.98499383, 59.90752513]])
-
-        expected_lons = np.array([[-8.58580705, -3.51660018, 1.56242662],
-                                  [-9.06131306, -3.59656346, 1.88105082],
-                                  [-9.63368459, -3.69298822, 2.26497216]])
-
-        plugin = TemporalInterpolation(interval_in_minutes=60,
-                                       interpolation_method='solar')
-        result_lats, result_lons = plugin.calc_lats_lons(self.cube_equalarea)
-        self.assertIsInstance(result_lats, np.ndarray)
-        self.assertEqual(result_lats.shape, (3, 3))
-        self.assertIsInstance(result_lons, np.ndarray)
-        self.assertEqual(result_lons.shape, (3, 3))
-        self.assertArrayAlmostEqual(result_lats, expected_lats)
-        self.assertArrayAlmostEqual(result_lons, expected_lons)
-
-
 class Test_solar_interpolation(IrisTest):
 
     """Test Solar interpolation."""
@@ -448,6 +365,25 @@ class Test_solar_interpolation(IrisTest):
         self.assertAlmostEqual(result.coord('forecast_period').points[0],
                                expected_fp)
 
+    def test_solar_interpolation_multiple_times(self):
+        """Test interpolating using solar method to multiple times at once
+        gives the same result at each time as interpolating to that time
+        alone."""
+
+        times = [self.time_0 + datetime.timedelta(hours=hour)
+                 for hour in [1, 2, 3]]
+        interpolated_cube = add_coordinate(
+            self.interpolated_cube[0], times, 'time', is_datetime=True)
+        plugin = TemporalInterpolation(interpolation_method='solar',
+                                       times=times)
+        result = plugin.solar_interpolate(self.cube, interpolated_cube)
+        self.assertEqual(len(result), 3)
+        self.assertArrayAlmostEqual(result[1].data, self.expected)
+        for index, single_time in enumerate(result):
+            expected, = plugin.solar_interpolate(
+                self.cube, interpolated_cube[index:index + 1])
+            self.assertArrayAlmostEqual(single_time.data, expected.data)
+
 
 class Test_daynight_interpolation(IrisTest):
 
@@ -532,6 +468,23 @@ class Test_daynight_interpolation(IrisTest):
         self.assertAlmostEqual(result.coord('forecast_period').points[0],
                                expected_fp)
 
+    def test_daynight_interpolation_multiple_times(self):
+        """Test interpolating to multiple times at once, where the daynight
+           mask differs between the times."""
+
+        times = [self.time_mid, datetime.datetime(2017, 11, 1, 22)]
+        interpolated_cube = add_coordinate(
+            self.interpolated_cube[0], times, 'time', is_datetime=True)
+        expected_data = np.ones((2, self.npoints, self.npoints))*4
+        expected_data[0][self.daynight_mask == 0] = 0.0
+        expected_data[1] = 0.0
+        plugin = TemporalInterpolation(interpolation_method='daynight',
+                                       times=times)
+        result = plugin.daynight_interpolate(interpolated_cube)
+        self.assertEqual(len(result), 2)
+        self.assertArrayAlmostEqual(result[0].data, expected_data[0])
+        self.assertArrayAlmostEqual(result[1].data, expected_data[1])
+
 
 class Test_process(IrisTest):
 
@@ -39,7 +39,8 @@ from iris.tests import IrisTest
 
 from improver.tests.ensemble_calibration.ensemble_calibration. \
     helper_functions import set_up_temperature_cube
-from improver.utilities.mathematical_operations import Integration
+from improver.utilities.mathematical_operations import (
+    Integration, interpolate_along_last_axis, searchsorted_along_last_axis)
 
 
 def set_up_height_cube(height_points, cube=set_up_temperature_cube()):
@@ -167,69 +168,62 @@ class Test_ensure_monotonic_increase_in_chosen_direction(IrisTest):
             cube.coord(coord_name).points, self.descending_height_points)
 
 
-class Test_prepare_for_integration(IrisTest):
+class Test__levels_to_integrate(IrisTest):
 
-    """Test the prepare_for_integration method."""
+    """Test the _levels_to_integrate method."""
 
     def setUp(self):
-        """Set up the cube."""
-        self.height_points = np.array([5., 10., 20.])
-        cube = set_up_height_cube(self.height_points)[:, 0, :, :, :]
-        data = np.zeros(cube.shape)
-        data[0] = np.ones(cube[0].shape, dtype=np.int32)
-        data[1] = np.full(cube[1].shape, 2, dtype=np.int32)
-        data[2] = np.full(cube[2].shape, 3, dtype=np.int32)
-        data[0, :, 0, 0] = 6
-        cube.data = data
-        self.cube = cube
+        """Set up the bounds of each stride for integrating in the positive
+        and negative directions."""
+        self.positive_upper_bounds = np.array([10., 20.])
+        self.positive_lower_bounds = np.array([5., 10.])
+        self.negative_upper_bounds = np.array([20., 10.])
+        self.negative_lower_bounds = np.array([10., 5.])
 
     def test_basic(self):
-        """Test that the type of the returned value is as expected and the
-        expected number of items are returned."""
-        coord_name = "height"
-        direction = "negative"
-        result = (
-            Integration(
-                coord_name, direction_of_integration=direction
-                ).prepare_for_integration(self.cube))
-        self.assertIsInstance(result, tuple)
-        self.assertEqual(len(result), 3)
-        self.assertIsInstance(result[0], iris.cube.Cube)
-        self.assertIsInstance(result[1], iris.cube.Cube)
-        self.assertIsInstance(result[2], iris.cube.Cube)
-
-    def test_positive_points(self):
-        """Test that the expected coordinate points are returned for each
-        cube when the direction of integration is positive."""
-        coord_name = "height"
-        direction = "positive"
-        result = (
-            Integration(
-                coord_name, direction_of_integration=direction
-                ).prepare_for_integration(self.cube))
-        self.assertArrayAlmostEqual(
-            result[0].coord("height").points, np.array([10., 20.]))
-        self.assertArrayAlmostEqual(
-            result[1].coord("height").points, np.array([5., 10.]))
-        self.assertArrayAlmostEqual(
-            result[2].coord("height").points, np.array([10., 20.]))
+        """Test that all strides are included if no start_point or end_point
+        is specified."""
+        result = Integration(
+            "height", direction_of_integration="negative"
+            )._levels_to_integrate(
+                self.negative_upper_bounds, self.negative_lower_bounds)
+        self.assertArrayEqual(result, np.array([True, True]))
 
-    def test_negative_points(self):
-        """Test that the expected coordinate points are returned for each
-        cube when the direction of integration is negative."""
-        coord_name = "height"
-        direction = "negative"
-        self.cube.coord("height").points = np.array([20., 10., 5.])
-        result = (
-            Integration(
-                coord_name, direction_of_integration=direction
-                ).prepare_for_integration(self.cube))
-        self.assertArrayAlmostEqual(
-            result[0].coord("height").points, np.array([20., 10.]))
-        self.assertArrayAlmostEqual(
-            result[1].coord("height").points, np.array([10., 5.]))
-        self.assertArrayAlmostEqual(
-            result[2].coord("height").points, np.array([10., 5.]))
+    def test_start_point_positive_direction(self):
+        """Test that strides with a lower bound below the start_point are
+        excluded when integrating in the positive direction."""
+        result = Integration(
+            "height", start_point=8., direction_of_integration="positive"
+            )._levels_to_integrate(
+                self.positive_upper_bounds, self.positive_lower_bounds)
+        self.assertArrayEqual(result, np.array([False, True]))
+
+    def test_start_point_negative_direction(self):
+        """Test that strides with an upper bound above the start_point are
+        excluded when integrating in the negative direction."""
+        result = Integration(
+            "height", start_point=18., direction_of_integration="negative"
+            )._levels_to_integrate(
+                self.negative_upper_bounds, self.negative_lower_bounds)
+        self.assertArrayEqual(result, np.array([False, True]))
+
+    def test_end_point_positive_direction(self):
+        """Test that strides with an upper bound above the end_point are
+        excluded when integrating in the positive direction."""
+        result = Integration(
+            "height", end_point=18., direction_of_integration="positive"
+            )._levels_to_integrate(
+                self.positive_upper_bounds, self.positive_lower_bounds)
+        self.assertArrayEqual(result, np.array([True, False]))
+
+    def test_end_point_negative_direction(self):
+        """Test that strides with a lower bound below the end_point are
+        excluded when integrating in the negative direction."""
+        result = Integration(
+            "height", end_point=10., direction_of_integration="negative"
+            )._levels_to_integrate(
+                self.negative_upper_bounds, self.negative_lower_bounds)
+        self.assertArrayEqual(result, np.array([True, False]))
 
 
 class Test_perform_integration(IrisTest):
@@ -249,31 +243,21 @@ class Test_perform_integration(IrisTest):
         data[0, :, 0, 0] = 6
         cube.data = data
 
-        # Cubes for integrating in the positive direction.
-        self.positive_upper_bounds_cube = cube[1:, ...]
-        self.positive_lower_bounds_cube = cube[:-1, ...]
-        self.positive_integrated_cube = cube[1:, ...]
-        self.positive_integrated_cube.data = (
-            np.zeros(self.positive_integrated_cube.shape))
+        # Cube for integrating in the positive direction.
+        self.positive_cube = cube
 
-        # Cubes for integrating in the negative direction.
-        new_cube = cube.copy()
-        # Sort cube so that it is in the expected order.
+        # Cube for integrating in the negative direction, sorted so that
+        # it is in the expected order.
         index = [[2, 1, 0], slice(None), slice(None), slice(None)]
-        new_cube = new_cube[tuple(index)]
-        self.negative_upper_bounds_cube = new_cube[:-1, ...]
-        self.negative_lower_bounds_cube = new_cube[1:, ...]
-        self.negative_integrated_cube = new_cube[1:, ...]
-        self.negative_integrated_cube.data = (
-            np.zeros(self.negative_integrated_cube.shape))
+        self.negative_cube = cube[tuple(index)]
 
         self.expected_data_zero_or_negative = np.array(
-            [[[[30.00, 32.50, 32.50],
-               [32.50, 32.50, 32.50],
-               [32.50, 32.50, 32.50]]],
-             [[[10.00, 25.00, 25.00],
+            [[[[10.00, 25.00, 25.00],
                [25.00, 25.00, 25.00],
-               [25.00, 25.00, 25.00]]]])
+               [25.00, 25.00, 25.00]]],
+             [[[30.00, 32.50, 32.50],
+               [32.50, 32.50, 32.50],
+               [32.50, 32.50, 32.50]]]])
 
     def test_basic(self):
         """Test that a cube is returned by the perform_integration method with
@@ -283,35 +267,42 @@ class Test_perform_integration(IrisTest):
         result = (
             Integration(
                 coord_name, direction_of_integration=direction
-                ).perform_integration(
-                    self.negative_upper_bounds_cube,
-                    self.negative_lower_bounds_cube,
-                    self.negative_integrated_cube))
+                ).perform_integration(self.negative_cube))
         self.assertIsInstance(result, iris.cube.Cube)
         self.assertArrayAlmostEqual(
-            result.coord("height").points, np.array([5., 10.]))
+            result.coord("height").points, np.array([10., 5.]))
+
+    def test_bounds(self):
+        """Test that the bounds on the integrated coordinate span each
+        stride that has been integrated."""
+        coord_name = "height"
+        direction = "negative"
+        result = (
+            Integration(
+                coord_name, direction_of_integration=direction
+                ).perform_integration(self.negative_cube))
+        self.assertArrayAlmostEqual(
+            result.coord("height").bounds,
+            np.array([[10., 20.], [5., 10.]]))
 
     def test_positive_values_in_data(self):
         """Test that the resulting cube contains the expected data following
         vertical integration."""
         expected = np.array(
-            [[[[45.00, 32.50, 32.50],
-               [32.50, 32.50, 32.50],
-               [32.50, 32.50, 32.50]]],
-             [[[25.00, 25.00, 25.00],
+            [[[[25.00, 25.00, 25.00],
                [25.00, 25.00, 25.00],
-               [25.00, 25.00, 25.00]]]])
+               [25.00, 25.00, 25.00]]],
+             [[[45.00, 32.50, 32.50],
+               [32.50, 32.50, 32.50],
+               [32.50, 32.50, 32.50]]]])
         coord_name = "height"
         direction = "negative"
         result = (
             Integration(
                 coord_name, direction_of_integration=direction
-                ).perform_integration(
-                    self.negative_upper_bounds_cube,
-                    self.negative_lower_bounds_cube,
-                    self.negative_integrated_cube))
+                ).perform_integration(self.negative_cube))
         self.assertArrayAlmostEqual(
-            result.coord("height").points, np.array([5., 10.]))
+            result.coord("height").points, np.array([10., 5.]))
         self.assertArrayAlmostEqual(result.data, expected)
 
     def test_zero_values_in_data(self):
@@ -320,18 +311,15 @@ class Test_perform_integration(IrisTest):
         to zero. This provides a baseline as the Integration plugin is
         currently restricted so that only positive values contribute towards
         the integral."""
-        self.negative_upper_bounds_cube.data[0, :, 0, 0] = 0
+        self.negative_cube.data[0, :, 0, 0] = 0
         coord_name = "height"
         direction = "negative"
         result = (
             Integration(
                 coord_name, direction_of_integration=direction
-                ).perform_integration(
-                    self.negative_upper_bounds_cube,
-                    self.negative_lower_bounds_cube,
-                    self.negative_integrated_cube))
+                ).perform_integration(self.negative_cube))
         self.assertArrayAlmostEqual(
-            result.coord("height").points, np.array([5., 10.]))
+            result.coord("height").points, np.array([10., 5.]))
         self.assertArrayAlmostEqual(
             result.data, self.expected_data_zero_or_negative)
 
@@ -342,18 +330,15 @@ class Test_perform_integration(IrisTest):
         on the integration as the Integration plugin is currently
         restricted so that only positive values contribute towards the
         integral."""
-        self.negative_upper_bounds_cube.data[0, :, 0, 0] = -1
+        self.negative_cube.data[0, :, 0, 0] = -1
         coord_name = "height"
         direction = "negative"
         result = (
             Integration(
                 coord_name, direction_of_integration=direction
-                ).perform_integration(
-                    self.negative_upper_bounds_cube,
-                    self.negative_lower_bounds_cube,
-                    self.negative_integrated_cube))
+                ).perform_integration(self.negative_cube))
         self.assertArrayAlmostEqual(
-            result.coord("height").points, np.array([5., 10.]))
+            result.coord("height").points, np.array([10., 5.]))
         self.assertArrayAlmostEqual(
             result.data, self.expected_data_zero_or_negative)
 
@@ -365,9 +350,9 @@ class Test_perform_integration(IrisTest):
         the presence of a start_point indicates that the integration may start
         above the lowest height within the column to be integrated."""
         expected = np.array(
-            [[[25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00]]])
+            [[[[25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00]]]])
         coord_name = "height"
         start_point = 8.
         direction = "positive"
@@ -375,10 +360,7 @@ class Test_perform_integration(IrisTest):
             Integration(
                 coord_name, start_point=start_point,
                 direction_of_integration=direction
-                ).perform_integration(
-                    self.positive_upper_bounds_cube,
-                    self.positive_lower_bounds_cube,
-                    self.positive_integrated_cube))
+                ).perform_integration(self.positive_cube))
         self.assertArrayAlmostEqual(
             result.coord("height").points, np.array([20.]))
         self.assertArrayAlmostEqual(result.data, expected)
@@ -391,9 +373,9 @@ class Test_perform_integration(IrisTest):
         the presence of a start_point indicates that the integration may start
         below the highest height within the column to be integrated."""
         expected = np.array(
-            [[[20.00, 7.50, 7.50],
-              [7.50, 7.50, 7.50],
-              [7.50, 7.50, 7.50]]])
+            [[[[20.00, 7.50, 7.50],
+               [7.50, 7.50, 7.50],
+               [7.50, 7.50, 7.50]]]])
         coord_name = "height"
         start_point = 18.
         direction = "negative"
@@ -401,10 +383,7 @@ class Test_perform_integration(IrisTest):
             Integration(
                 coord_name, start_point=start_point,
                 direction_of_integration=direction
-                ).perform_integration(
-                    self.negative_upper_bounds_cube,
-                    self.negative_lower_bounds_cube,
-                    self.negative_integrated_cube))
+                ).perform_integration(self.negative_cube))
         self.assertArrayAlmostEqual(
             result.coord("height").points, np.array([5.]))
         self.assertArrayAlmostEqual(result.data, expected)
@@ -417,9 +396,9 @@ class Test_perform_integration(IrisTest):
         the presence of an end_point indicates that the integration may end
         below the highest height within the column to be integrated."""
         expected = np.array(
-            [[[20.00, 7.50, 7.50],
-              [7.50, 7.50, 7.50],
-              [7.50, 7.50, 7.50]]])
+            [[[[20.00, 7.50, 7.50],
+               [7.50, 7.50, 7.50],
+               [7.50, 7.50, 7.50]]]])
         coord_name = "height"
         end_point = 18.
         direction = "positive"
@@ -427,10 +406,7 @@ class Test_perform_integration(IrisTest):
             Integration(
                 coord_name, end_point=end_point,
                 direction_of_integration=direction
-                ).perform_integration(
-                    self.positive_upper_bounds_cube,
-                    self.positive_lower_bounds_cube,
-                    self.positive_integrated_cube))
+                ).perform_integration(self.positive_cube))
         self.assertArrayAlmostEqual(
             result.coord("height").points, np.array([10.]))
         self.assertArrayAlmostEqual(result.data, expected)
@@ -443,9 +419,9 @@ class Test_perform_integration(IrisTest):
         the presence of an end_point indicates that the integration may end
         above the lowest height within the column to be integrated."""
         expected = np.array(
-            [[[25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00]]])
+            [[[[25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00]]]])
         coord_name = "height"
         end_point = 8.
         direction = "negative"
@@ -453,10 +429,7 @@ class Test_perform_integration(IrisTest):
             Integration(
                 coord_name, end_point=end_point,
                 direction_of_integration=direction
-                ).perform_integration(
-                    self.negative_upper_bounds_cube,
-                    self.negative_lower_bounds_cube,
-                    self.negative_integrated_cube))
+                ).perform_integration(self.negative_cube))
         self.assertArrayAlmostEqual(
             result.coord("height").points, np.array([10.]))
         self.assertArrayAlmostEqual(result.data, expected)
@@ -476,9 +449,9 @@ class Test_perform_integration(IrisTest):
         the presence of a start_point indicates that the integration may start
         above the lowest height within the column to be integrated."""
         expected = np.array(
-            [[[25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00]]])
+            [[[[25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00]]]])
         coord_name = "height"
         start_point = 10.
         direction = "positive"
@@ -486,10 +459,7 @@ class Test_perform_integration(IrisTest):
             Integration(
                 coord_name, start_point=start_point,
                 direction_of_integration=direction
-                ).perform_integration(
-                    self.positive_upper_bounds_cube,
-                    self.positive_lower_bounds_cube,
-                    self.positive_integrated_cube))
+                ).perform_integration(self.positive_cube))
         self.assertArrayAlmostEqual(
             result.coord("height").points, np.array([20.]))
         self.assertArrayAlmostEqual(result.data, expected)
@@ -508,9 +478,9 @@ class Test_perform_integration(IrisTest):
         the presence of an end_point indicates that the integration may end
         above the lowest height within the column to be integrated."""
         expected = np.array(
-            [[[25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00],
-              [25.00, 25.00, 25.00]]])
+            [[[[25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00]]]])
         coord_name = "height"
         end_point = 10.
         direction = "negative"
@@ -518,10 +488,7 @@ class Test_perform_integration(IrisTest):
             Integration(
                 coord_name, end_point=end_point,
                 direction_of_integration=direction
-                ).perform_integration(
-                    self.negative_upper_bounds_cube,
-                    self.negative_lower_bounds_cube,
-                    self.negative_integrated_cube))
+                ).perform_integration(self.negative_cube))
         self.assertArrayAlmostEqual(
             result.coord("height").points, np.array([10.]))
         self.assertArrayAlmostEqual(result.data, expected)
@@ -539,10 +506,7 @@ class Test_perform_integration(IrisTest):
             Integration(
                 coord_name, start_point=start_point,
                 direction_of_integration=direction
-                ).perform_integration(
-                    self.positive_upper_bounds_cube,
-                    self.positive_lower_bounds_cube,
-                    self.positive_integrated_cube)
+                ).perform_integration(self.positive_cube)
 
 
 class Test_process(IrisTest):
@@ -594,6 +558,136 @@ class Test_process(IrisTest):
             result.coord("height").points, np.array([10., 5.]))
         self.assertArrayAlmostEqual(result.data, expected)
 
+    def test_integrated_coordinate_not_leading(self):
+        """Test that the expected data is returned, with the integrated
+        coordinate as the leading dimension, when the coordinate to be
+        integrated is not the leading dimension of the input cube."""
+        expected = np.array(
+            [[[[25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00],
+               [25.00, 25.00, 25.00]]],
+             [[[45.00, 32.50, 32.50],
+               [32.50, 32.50, 32.50],
+               [32.50, 32.50, 32.50]]]])
+        self.cube.transpose([1, 2, 3, 0])
+        coord_name = "height"
+        direction = "negative"
+        result = (
+            Integration(
+                coord_name, direction_of_integration=direction
+                ).process(self.cube))
+        self.assertEqual(result.coord_dims("height"), (0,))
+        self.assertArrayAlmostEqual(
+            result.coord("height").points, np.array([10., 5.]))
+        self.assertArrayAlmostEqual(result.data, expected)
+
+
+class Test_searchsorted_along_last_axis(IrisTest):
+
+    """Test the searchsorted_along_last_axis function."""
+
+    def setUp(self):
+        """Set up sorted rows, including repeated values."""
+        self.sorted_array = np.array([[0., 1., 2., 3.],
+                                      [1., 1., 1., 5.],
+                                      [-2., 0., 0., 0.]])
+        self.values = np.array([[-1., 1., 2.5, 4.],
+                                [1., 0.5, 5., 3.],
+                                [0., -2., 1., -3.]])
+
+    def test_basic(self):
+        """Test that the indices match those from numpy searchsorted with
+        side="right" applied to each row."""
+        expected = np.array([
+            np.searchsorted(row, vals, side="right") for row, vals in
+            zip(self.sorted_array, self.values)])
+        result = searchsorted_along_last_axis(self.sorted_array, self.values)
+        self.assertArrayEqual(result, expected)
+
+    def test_multiple_leading_dimensions(self):
+        """Test that arrays with more than one leading dimension are
+        supported."""
+        sorted_array = np.stack([self.sorted_array, self.sorted_array + 1])
+        values = np.stack([self.values, self.values])
+        result = searchsorted_along_last_axis(sorted_array, values)
+        self.assertEqual(result.shape, values.shape)
+        self.assertArrayEqual(
+            result[1], searchsorted_along_last_axis(
+                self.sorted_array + 1, self.values))
+
+    def test_mismatched_shapes(self):
+        """Test that an error is raised if the leading dimensions of the
+        inputs do not match."""
+        msg = "The leading dimensions of sorted_array and values must match"
+        with self.assertRaisesRegex(ValueError, msg):
+            searchsorted_along_last_axis(self.sorted_array, self.values[:2])
+
+
+class Test_interpolate_along_last_axis(IrisTest):
+
+    """Test the interpolate_along_last_axis function."""
+
+    def setUp(self):
+        """Set up rows of data points, including repeated values and values
+        outside the range of the data points."""
+        self.x = np.array([[-1., 0.5, 2.5, 4.],
+                           [1., 0.5, 5., 3.],
+                           [0., -2., -1., 1.]])
+        self.xp = np.array([[0., 1., 2., 3.],
+                            [1., 1., 1., 5.],
+                            [-2., 0., 0., 0.]])
+        self.fp = np.array([[0., 10., 20., 40.],
+                            [0., 0.2, 0.4, 1.],
+                            [5., 6., 7., 8.]])
+
+    def test_basic(self):
+        """Test that the result matches that of numpy interp applied to each
+        row."""
+        expected = np.array([
+            np.interp(x, xp, fp) for x, xp, fp in
+            zip(self.x, self.xp, self.fp)])
+        result = interpolate_along_last_axis(self.x, self.xp, self.fp)
+        self.assertArrayEqual(result, expected)
+
+    def test_one_dimensional_fp(self):
+        """Test that a one-dimensional fp is used for every row."""
+        fp = np.array([0., 25., 50., 100.])
+        expected = np.array([
+            np.interp(x, xp, fp) for x, xp in zip(self.x, self.xp)])
+        result = interpolate_along_last_axis(self.x, self.xp, fp)
+        self.assertArrayEqual(result, expected)
+
+    def test_single_data_point(self):
+        """Test that every value takes the single data point value if only
+        one data point is provided."""
+        result = interpolate_along_last_axis(
+            self.x, self.xp[:, :1], self.fp[:, :1])
+        expected = np.broadcast_to(self.fp[:, :1], self.x.shape)
+        self.assertArrayEqual(result, expected)
+
+    def test_one_dimensional_x_and_xp(self):
+        """Test that one-dimensional x and xp are used for every row."""
+        x = np.array([-1., 0.5, 1.5, 4.])
+        xp = np.array([0., 1., 1., 3.])
+        expected = np.array([np.interp(x, xp, fp) for fp in self.fp])
+        result = interpolate_along_last_axis(x, xp, self.fp)
+        self.assertArrayEqual(result, expected)
+
+    def test_max_rows(self):
+        """Test that the result is unchanged when a limited number of rows
+        are interpolated at a time."""
+        expected = interpolate_along_last_axis(self.x, self.xp, self.fp)
+        result = interpolate_along_last_axis(
+            self.x, self.xp, self.fp, max_rows=2)
+        self.assertArrayEqual(result, expected)
+
+    def test_unmatched_dimensions(self):
+        """Test that an error is raised if the leading dimensions of the
+        inputs do not match."""
+        msg = "The leading dimensions of x, xp and fp must match"
+        with self.assertRaisesRegex(ValueError, msg):
+            interpolate_along_last_axis(self.x[:2], self.xp, self.fp)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -34,7 +34,6 @@ import unittest
 
 import numpy as np
 from cf_units import Unit
-from iris.coords import DimCoord
 from iris.cube import Cube
 from iris.tests import IrisTest
 
@@ -257,11 +256,8 @@ class Test_calc_wind_dir_mean(IrisTest):
         self.plugin = WindDirection()
         # 5x3x4 3D Array containing wind direction in angles.
         cube = make_wdir_cube_534()
-        self.plugin.wdir_complex = self.plugin.deg_to_complex(
-            cube.data)
-        self.plugin.wdir_slice_mean = (
-            next(cube.slices_over("realization")))
-        self.plugin.realization_axis = 0
+        self.wdir_complex = self.plugin.deg_to_complex(cube.data)
+        self.realization_axis = 0
 
         self.expected_wind_mean = (
             np.array([[[176.636276, 46.002445, 90.0, 90.0],
@@ -270,20 +266,26 @@ class Test_calc_wind_dir_mean(IrisTest):
 
     def test_complex(self):
         """Test that the function defines correct complex mean."""
-        self.plugin.calc_wind_dir_mean()
-        result = self.plugin.wdir_mean_complex
+        result, _ = self.plugin.calc_wind_dir_mean(self.wdir_complex,
+                                                   self.realization_axis)
         expected_complex = (
             self.plugin.deg_to_complex(self.expected_wind_mean,
                                        radius=np.absolute(result)))
         self.assertArrayAlmostEqual(result, expected_complex)
 
     def test_degrees(self):
-        """Test that the function defines correct degrees cube."""
-        self.plugin.calc_wind_dir_mean()
-        result = self.plugin.wdir_slice_mean
-        self.assertIsInstance(result, Cube)
-        self.assertIsInstance(result.data, np.ndarray)
-        self.assertArrayAlmostEqual(result.data, self.expected_wind_mean)
+        """Test that the function defines correct degrees array."""
+        _, result = self.plugin.calc_wind_dir_mean(self.wdir_complex,
+                                                   self.realization_axis)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertArrayAlmostEqual(result, self.expected_wind_mean)
+
+    def test_realization_axis(self):
+        """Test that the function collapses a realization axis that is not
+        the leading dimension."""
+        wdir_complex = np.moveaxis(self.wdir_complex, 0, 1)
+        _, result = self.plugin.calc_wind_dir_mean(wdir_complex, 1)
+        self.assertArrayAlmostEqual(result, self.expected_wind_mean)
 
 
 class Test_find_r_values(IrisTest):
@@ -295,28 +297,15 @@ class Test_find_r_values(IrisTest):
 
     def test_converts_single(self):
         """Tests that r-value is correctly extracted from complex value."""
-        # Attach a cube for the plugin to copy in creating the resulting cube:
-        self.plugin.wdir_slice_mean = make_wdir_cube_222()[0][0][0]
         expected_out = 2.0
         # Set-up complex values for angle=45 and r=2
-        self.plugin.wdir_mean_complex = 1.4142135624+1.4142135624j
-        self.plugin.find_r_values()
-        self.assertAlmostEqual(self.plugin.r_vals_slice.data, expected_out)
+        result = self.plugin.find_r_values(1.4142135624+1.4142135624j)
+        self.assertAlmostEqual(result, expected_out)
 
     def test_converts_array(self):
         """Test that code can find r-values from array of complex numbers."""
-        longitude = DimCoord(np.linspace(-180, 180, 36),
-                             standard_name='longitude', units='degrees')
-
-        cube = Cube(COMPLEX_ANGLES, standard_name="wind_from_direction",
-                    dim_coords_and_dims=[(longitude, 0)],
-                    units="degree")
-        # Attach a cube for the plugin to copy in creating the resulting cube:
-        self.plugin.wdir_slice_mean = cube
-        self.plugin.wdir_mean_complex = COMPLEX_ANGLES
         expected_out = np.ones(COMPLEX_ANGLES.shape, dtype=np.float32)
-        self.plugin.find_r_values()
-        result = self.plugin.r_vals_slice.data
+        result = self.plugin.find_r_values(COMPLEX_ANGLES)
         self.assertIsInstance(result, np.ndarray)
         self.assertArrayAlmostEqual(result, expected_out)
 
@@ -327,15 +316,12 @@ class Test_calc_confidence_measure(IrisTest):
     def setUp(self):
         """Initialise plugin and supply data for tests"""
         self.plugin = WindDirection()
-        self.plugin.wdir_complex = WIND_DIR_COMPLEX
-        self.plugin.realization_axis = 0
-        self.plugin.r_vals_slice = make_wdir_cube_222()[0]
-        self.plugin.r_vals_slice.data = (
-            np.array([[6.12323400e-17, 0.996194698],
-                      [0.984807753, 0.984807753]]))
-        self.plugin.wdir_slice_mean = make_wdir_cube_222()[0]
-        self.plugin.wdir_slice_mean.data = np.array([[180.0, 55.0],
-                                                     [280.0, 0.0]])
+        self.r_vals = np.array([[6.12323400e-17, 0.996194698],
+                                [0.984807753, 0.984807753]])
+        self.wdir_mean = np.array([[180.0, 55.0],
+                                   [280.0, 0.0]])
+        self.expected_out = np.array([[0.0, 0.95638061],
+                                      [0.91284426, 0.91284426]])
 
     def test_returns_confidence(self):
         """First element has two angles directly opposite (90 & 270 degs).
@@ -343,12 +329,21 @@ class Test_calc_confidence_measure(IrisTest):
         meaningless. This code calculates a confidence measure based on how
         far the individual ensemble realizationss are away from
         the mean point."""
-        expected_out = np.array([[0.0, 0.95638061],
-                                 [0.91284426, 0.91284426]])
-        self.plugin.calc_confidence_measure()
-        result = self.plugin.confidence_slice.data
+        result = self.plugin.calc_confidence_measure(
+            WIND_DIR_COMPLEX, self.wdir_mean, self.r_vals, 0)
 
         self.assertIsInstance(result, np.ndarray)
+        self.assertArrayAlmostEqual(result, self.expected_out)
+
+    def test_multiple_slices(self):
+        """Test that the confidence is calculated for each leading slice
+        when the realization axis is not the leading dimension."""
+        wdir_complex = np.stack([WIND_DIR_COMPLEX, WIND_DIR_COMPLEX])
+        wdir_mean = np.stack([self.wdir_mean, self.wdir_mean])
+        r_vals = np.stack([self.r_vals, self.r_vals])
+        expected_out = np.stack([self.expected_out, self.expected_out])
+        result = self.plugin.calc_confidence_measure(
+            wdir_complex, wdir_mean, r_vals, 1)
         self.assertArrayAlmostEqual(result, expected_out)
 
 
@@ -361,20 +356,15 @@ class Test_wind_dir_decider(IrisTest):
         meaningless with an r value of nearly zero. So the code substitutes the
         wind direction taken from the first ensemble value in its place."""
         cube = make_wdir_cube_222()
-        self.plugin = WindDirection(backup_method="first_realization")
-        self.plugin.wdir_complex = WIND_DIR_COMPLEX
-        self.plugin.realization_axis = 0
-        self.plugin.wdir_slice_mean = make_wdir_cube_222()[0]
-        self.plugin.wdir_slice_mean.data = np.array([[180.0, 55.0],
-                                                     [280.0, 0.0]])
-        self.plugin.wdir_mean_complex = (
-            self.plugin.deg_to_complex(self.plugin.wdir_slice_mean.data))
+        plugin = WindDirection(backup_method="first_realization")
+        wdir_mean = np.array([[180.0, 55.0],
+                              [280.0, 0.0]])
         expected_out = np.array([[90.0, 55.0],
                                  [280.0, 0.0]])
         where_low_r = np.array([[True, False],
                                 [False, False]])
-        self.plugin.wind_dir_decider(where_low_r, cube)
-        result = self.plugin.wdir_slice_mean.data
+        result = plugin.wind_dir_decider(where_low_r, cube,
+                                         WIND_DIR_COMPLEX, wdir_mean)
 
         self.assertIsInstance(result, np.ndarray)
         self.assertArrayAlmostEqual(result, expected_out)
@@ -393,29 +383,19 @@ class Test_wind_dir_decider(IrisTest):
                       [False, False]]),
             ((4, 4), (4, 4)), "constant", constant_values=(True, True))
 
-        wind_dir_deg_mean = np.array([[180.0, 55.0],
-                                      [280.0, 0.0]])
-
-        self.plugin = WindDirection(backup_method="neighbourhood")
-        self.plugin.realization_axis = 0
-        self.plugin.n_realizations = 1
-        self.plugin.wdir_mean_complex = np.pad(
-            self.plugin.deg_to_complex(wind_dir_deg_mean),
-            ((4, 4), (4, 4)),
-            "constant",
-            constant_values=(0.0, 0.0))
-        self.plugin.wdir_complex = np.pad(WIND_DIR_COMPLEX,
-                                          ((0, 0), (4, 4), (4, 4)),
-                                          "constant",
-                                          constant_values=(0.0 + 0.0j))
-        self.plugin.wdir_slice_mean = pad_wdir_cube_222()[0]
-        self.plugin.wdir_slice_mean.data = np.pad(wind_dir_deg_mean,
-                                                  ((4, 4), (4, 4)),
-                                                  "constant",
-                                                  constant_values=0.0)
-
-        self.plugin.wind_dir_decider(where_low_r, cube)
-        result = self.plugin.wdir_slice_mean.data
+        wind_dir_deg_mean = np.pad(np.array([[180.0, 55.0],
+                                             [280.0, 0.0]]),
+                                   ((4, 4), (4, 4)),
+                                   "constant",
+                                   constant_values=0.0)
+        wdir_complex = np.pad(WIND_DIR_COMPLEX,
+                              ((0, 0), (4, 4), (4, 4)),
+                              "constant",
+                              constant_values=(0.0 + 0.0j))
+
+        plugin = WindDirection(backup_method="neighbourhood")
+        result = plugin.wind_dir_decider(where_low_r, cube, wdir_complex,
+                                         wind_dir_deg_mean)
         self.assertIsInstance(result, np.ndarray)
         self.assertArrayAlmostEqual(result[4:6, 4:6], expected_out, decimal=2)
 
@@ -432,14 +412,15 @@ class Test_process(IrisTest):
                        [170.0, 170.0, 47.0, 36.54423141],
                        [333.41320801, 320.03521729, 10.0, 10.0]]]))
 
-        self.expected_r_vals = np.array([[0.5919044, 0.99634719, 0.2, 0.6],
-                                         [1.0, 1.0, 1.0, 0.92427504],
-                                         [0.87177974, 0.91385943, 1.0, 1.0]])
+        self.expected_r_vals = np.array([[[0.5919044, 0.99634719, 0.2, 0.6],
+                                          [1.0, 1.0, 1.0, 0.92427504],
+                                          [0.87177974, 0.91385943, 1.0,
+                                           1.0]]])
 
         self.expected_confidence_measure = (
-            np.array([[0.73166388, 0.95813018, 0.6, 0.8],
-                      [1.0, 1.0, 1.0, 0.84808648],
-                      [0.75270665, 0.83861077, 1.0, 1.0]]))
+            np.array([[[0.73166388, 0.95813018, 0.6, 0.8],
+                       [1.0, 1.0, 1.0, 0.84808648],
+                       [0.75270665, 0.83861077, 1.0, 1.0]]]))
 
     def test_basic(self):
         """Test that the plugin returns expected data types. """
@@ -500,8 +481,8 @@ class Test_process(IrisTest):
 
         self.cube.data[:, 0, 1, 1] = [0., 72., 144., 216., 288.]
         self.expected_wind_mean[0, 1, 1] = 30.77989074
-        self.expected_r_vals[1, 1] = 2.384186e-08
-        self.expected_confidence_measure[1, 1] = 0.0
+        self.expected_r_vals[0, 1, 1] = 2.384186e-08
+        self.expected_confidence_measure[0, 1, 1] = 0.0
 
         result_cube, r_vals_cube, confidence_measure_cube = (
             WindDirection().process(self.cube))
@@ -518,6 +499,39 @@ class Test_process(IrisTest):
         self.assertArrayAlmostEqual(
             confidence_measure, self.expected_confidence_measure)
 
+    def test_multiple_times_with_backup(self):
+        """Test that all time slices are processed together, with the
+        backup method only changing the low-confidence point in the time
+        slice that contains it."""
+        cube = set_up_cube(num_grid_points=4,
+                           num_realization_points=5,
+                           num_time_points=2,
+                           zero_point_indices=[[0, 0, 0, 0]])
+        cube = cube[:, :, 0:-1, :]
+        cube.data = np.concatenate([self.cube.data, self.cube.data], axis=1)
+        cube.data[:, 1, 1, 1] = [0., 72., 144., 216., 288.]
+        cube.units = Unit('degrees')
+
+        expected_wind_mean = np.concatenate(
+            [self.expected_wind_mean, self.expected_wind_mean])
+        expected_wind_mean[1, 1, 1] = 30.77989074
+        expected_r_vals = np.concatenate([self.expected_r_vals,
+                                          self.expected_r_vals])
+        expected_r_vals[1, 1, 1] = 2.384186e-08
+        expected_confidence_measure = np.concatenate(
+            [self.expected_confidence_measure,
+             self.expected_confidence_measure])
+        expected_confidence_measure[1, 1, 1] = 0.0
+
+        result_cube, r_vals_cube, confidence_measure_cube = (
+            WindDirection().process(cube))
+
+        self.assertEqual(result_cube.coord_dims("time"), (0,))
+        self.assertArrayAlmostEqual(result_cube.data, expected_wind_mean)
+        self.assertArrayAlmostEqual(r_vals_cube.data, expected_r_vals)
+        self.assertArrayAlmostEqual(confidence_measure_cube.data,
+                                    expected_confidence_measure)
+
 
 if __name__ == '__main__':
     unittest.main()
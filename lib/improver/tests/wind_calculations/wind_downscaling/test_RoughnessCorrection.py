@@ -741,6 +741,39 @@ class Test2D(IrisTest):
         land_hc_rc = multip_hc_rc.run_hc_rc(uin, dtime=1, height=heights)
         self.assertEqual(land_hc_rc.dtype, np.float32)
 
+    def test_section2e(self):
+        """Test different wind profiles at multiple timesteps.
+
+        All timesteps are corrected together, so each timestep of the
+        result should equal the result of correcting that timestep on
+        its own.
+
+        """
+        heights = ((np.arange(10)+1)**2.)*12
+        uin = np.stack([np.ones(10)*20, np.linspace(5, 30, 10)], axis=1)
+        multip_hc_rc = TestMultiPoint(
+            nx_ny=[3, 1], AoS=[0, 0.2, 0.2], pporog=[0, 250, 250],
+            modelorog=[0, 250, 230])
+        land_hc_rc = multip_hc_rc.run_hc_rc(uin, dtime=2, height=heights)
+        tidx = land_hc_rc.coord_dims("time")[0]
+        for time_index in range(2):
+            single_time = multip_hc_rc.run_hc_rc(
+                uin[:, time_index], dtime=1, height=heights)
+            self.assertArrayEqual(
+                land_hc_rc.data.take(time_index, axis=tidx), single_time.data)
+
+    def test_section2f(self):
+        """Test that negative wind at any timestep raises an error."""
+        heights = ((np.arange(10)+1)**2.)*12
+        uin = np.ones((10, 2))*20
+        uin[3, 1] = -1.
+        multip_hc_rc = TestMultiPoint(
+            nx_ny=[3, 1], AoS=[0, 0.2, 0.2], pporog=[0, 250, 250],
+            modelorog=[0, 250, 230])
+        msg = "has invalid wind data"
+        with self.assertRaisesRegex(ValueError, msg):
+            _ = multip_hc_rc.run_hc_rc(uin, dtime=2, height=heights)
+
     def test_section3a(self):
         """As test 1c, however with manipulated z_0 cube.
 
@@ -321,143 +321,6 @@ class Test_invert_condition(IrisTest):
             self.assertEqual(result[1], inverse_outputs[i])
 
 
-class Test_construct_condition(IrisTest):
-
-    """Test the construct condition method."""
-
-    def test_basic(self):
-        """Test that the construct_condition method returns a string."""
-        plugin = WeatherSymbols()
-        constraint_value = iris.Constraint(
-            name='probability_of_rainfall_rate_above_threshold',
-            coord_values={'threshold': 0.03})
-        condition = '<'
-        prob_threshold = 0.5
-        gamma = None
-        expected = ("cubes.extract(Constraint(name="
-                    "'probability_of_rainfall_rate_above_threshold',"
-                    " coord_values={'threshold': 0.03})"
-                    ")[0].data < 0.5")
-        result = plugin.construct_condition(constraint_value,
-                                            condition,
-                                            prob_threshold,
-                                            gamma)
-        self.assertIsInstance(result, str)
-        self.assertEqual(result, expected)
-
-    def test_works_with_lists(self):
-        """Test that the construct_condition method works with a list
-        of Constraints. """
-        plugin = WeatherSymbols()
-        constraint_list = [
-            iris.Constraint(
-                name='probability_of_lwe_snowfall_rate_above_threshold',
-                coord_values={'threshold': 0.03}),
-            iris.Constraint(
-                name='probability_of_rainfall_rate_above_threshold',
-                coord_values={'threshold': 0.03})]
-        condition = '<'
-        prob_threshold = 0.5
-        gamma = 0.7
-        expected = ("(cubes.extract(Constraint(name="
-                    "'probability_of_lwe_snowfall_rate_above_threshold', "
-                    "coord_values={'threshold': 0.03}))[0].data - "
-                    "cubes.extract(Constraint(name="
-                    "'probability_of_rainfall_rate_above_threshold', "
-                    "coord_values={'threshold': 0.03}))[0].data * 0.7) < 0.5")
-        result = plugin.construct_condition(constraint_list,
-                                            condition,
-                                            prob_threshold,
-                                            gamma)
-        self.assertIsInstance(result, str)
-        self.assertEqual(result, expected)
-
-
-class Test_format_condition_chain(IrisTest):
-
-    """Test the format_condition_chain method."""
-
-    def test_basic(self):
-        """Test that the format_condition_chain method returns a string."""
-        plugin = WeatherSymbols()
-        conditions = ['condition1', 'condition2']
-        expected = '(condition1) & (condition2)'
-        result = plugin.format_condition_chain(conditions)
-        self.assertIsInstance(result, str)
-        self.assertEqual(result, expected)
-
-    def test_works_with_or(self):
-        """Test that the format_condition_chain method works with OR."""
-        plugin = WeatherSymbols()
-        conditions = ['condition1', 'condition2']
-        expected = '(condition1) | (condition2)'
-        result = plugin.format_condition_chain(conditions,
-                                               condition_combination='OR')
-        self.assertIsInstance(result, str)
-        self.assertEqual(result, expected)
-
-
-class Test_create_condition_chain(IrisTest):
-    """Test the create_condition_chain method."""
-
-    def setUp(self):
-        """ Set up queries for testing"""
-        self.dummy_queries = {
-            'significant_precipitation': {
-                'succeed': 'heavy_precipitation',
-                'fail': 'any_precipitation',
-                'probability_thresholds': [0.5, 0.5],
-                'threshold_condition': '>=',
-                'condition_combination': 'OR',
-                'diagnostic_fields':
-                    ['probability_of_rainfall_rate_above_threshold',
-                     'probability_of_lwe_snowfall_rate_above_threshold'],
-                'diagnostic_thresholds': [AuxCoord(0.03, units='mm hr-1'),
-                                          AuxCoord(0.03, units='mm hr-1')],
-                'diagnostic_conditions': ['above', 'above']}
-        }
-
-    def test_basic(self):
-        """Test create_condition_chain returns a list of strings."""
-        plugin = WeatherSymbols()
-        test_condition = self.dummy_queries['significant_precipitation']
-        result = plugin.create_condition_chain(test_condition)
-        expected = ("(cubes.extract(iris.Constraint(name='probability_of_"
-                    "rainfall_rate_above_threshold', rainfall_rate=lambda "
-                    "cell: 0.03 * {t_min} < "
-                    "cell < 0.03 * {t_max}))[0].data >= 0.5) | (cubes.extract"
-                    "(iris.Constraint("
-                    "name='probability_of_lwe_snowfall_rate_above_threshold',"
-                    " lwe_snowfall_rate=lambda cell: 0.03 * {t_min} < cell < "
-                    "0.03 * {t_max}))[0].data >= 0.5)".format(
-                        t_min=(1. - WeatherSymbols().float_tolerance),
-                        t_max=(1. + WeatherSymbols().float_tolerance)))
-        self.assertIsInstance(result, list)
-        self.assertIsInstance(result[0], str)
-        self.assertEqual(result[0], expected)
-
-    def test_old_naming_convention(self):
-        """Test create_condition_chain can return conditions using old
-        threshold coordinate name"""
-        plugin = WeatherSymbols()
-        plugin.coord_named_threshold = True
-        test_condition = self.dummy_queries['significant_precipitation']
-        result = plugin.create_condition_chain(test_condition)
-        expected = ("(cubes.extract(iris.Constraint(name='probability_of_"
-                    "rainfall_rate_above_threshold', threshold=lambda "
-                    "cell: 0.03 * {t_min} < "
-                    "cell < 0.03 * {t_max}))[0].data >= 0.5) | (cubes.extract"
-                    "(iris.Constraint("
-                    "name='probability_of_lwe_snowfall_rate_above_threshold',"
-                    " threshold=lambda cell: 0.03 * {t_min} < cell < "
-                    "0.03 * {t_max}))[0].data >= 0.5)".format(
-                        t_min=(1. - WeatherSymbols().float_tolerance),
-                        t_max=(1. + WeatherSymbols().float_tolerance)))
-        self.assertIsInstance(result, list)
-        self.assertIsInstance(result[0], str)
-        self.assertEqual(result[0], expected)
-
-
 class Test_construct_extract_constraint(IrisTest):
 
     """Test the construct_extract_constraint method ."""
@@ -518,47 +381,82 @@ class Test_construct_extract_constraint(IrisTest):
         self.assertEqual(result[1], expected)
 
 
-class Test_find_all_routes(IrisTest):
+class Test_compile_tree(IrisTest):
 
-    """Test the find_all_routes method ."""
+    """Test the compile_tree method."""
 
     def setUp(self):
-        """ Setup testing graph """
-        self.test_graph = {'start_node': ['success_1', 'fail_0'],
-                           'success_1': ['success_1_1', 'fail_1_0'],
-                           'fail_0': ['success_0_1', 3],
-                           'success_1_1': [1, 2],
-                           'fail_1_0': [2, 4],
-                           'success_0_1': [5, 1]}
+        """Set up a testing tree in which two nodes share a child."""
+        self.queries = {'start_node': {'succeed': 'success_1',
+                                       'fail': 'fail_0'},
+                        'success_1': {'succeed': 'shared', 'fail': 2},
+                        'fail_0': {'succeed': 'shared', 'fail': 3},
+                        'shared': {'succeed': 1, 'fail': 4},
+                        'unreachable': {'succeed': 5, 'fail': 6}}
 
     def test_basic(self):
-        """Test find_all_routes returns a list of expected nodes."""
-        plugin = WeatherSymbols()
-        result = plugin.find_all_routes(self.test_graph,
-                                        'start_node',
-                                        3)
-        expected_nodes = [['start_node',
-                           'fail_0',
-                           3]]
+        """Test compile_tree returns each reachable node once, with every
+        node after all of the nodes that lead to it."""
+        result = WeatherSymbols.compile_tree(self.queries, start='start_node')
         self.assertIsInstance(result, list)
-        self.assertListEqual(result, expected_nodes)
+        self.assertEqual(sorted(result),
+                         ['fail_0', 'shared', 'start_node', 'success_1'])
+        self.assertEqual(result[0], 'start_node')
+        self.assertEqual(result[-1], 'shared')
+
+    def test_decision_trees(self):
+        """Test that all the nodes of each decision tree are ordered after
+        their parents."""
+        for wxtree in ['high_resolution', 'global']:
+            plugin = WeatherSymbols(wxtree=wxtree)
+            result = plugin.node_order
+            self.assertEqual(len(result), len(set(result)))
+            for node in result:
+                for child in (plugin.queries[node]['succeed'],
+                              plugin.queries[node]['fail']):
+                    if not isinstance(child, int):
+                        self.assertGreater(result.index(child),
+                                           result.index(node))
+
+    def test_cached(self):
+        """Test that the compiled tree is shared between instances."""
+        result = WeatherSymbols().node_order
+        self.assertIs(WeatherSymbols().node_order, result)
+
+
+class Test_evaluate_query(IrisTest):
+
+    """Test the evaluate_query method."""
 
-    def test_multiple_routes(self):
-        """Test find_all_routes finds multiple routes."""
-        plugin = WeatherSymbols()
-        result = plugin.find_all_routes(self.test_graph,
-                                        'start_node',
-                                        1)
-        expected_nodes = [['start_node',
-                           'success_1',
-                           'success_1_1',
-                           1],
-                          ['start_node',
-                           'fail_0',
-                           'success_0_1',
-                           1]]
-        self.assertIsInstance(result, list)
-        self.assertListEqual(result, expected_nodes)
+    def setUp(self):
+        """Set up wxcubes for testing."""
+        self.cubes = set_up_wxcubes()
+        self.plugin = WeatherSymbols()
+        self.plugin.check_input_cubes(self.cubes)
+
+    def test_basic(self):
+        """Test evaluate_query returns complementary boolean arrays and
+        stores the extracted data."""
+        self.cubes[1].data[2, 0, 2, 0] = 1.0
+        self.cubes[1].data[2, 0, 2, 2] = 1.0
+        extracted_data = {}
+        succeed, fail = self.plugin.evaluate_query(
+            self.cubes, self.plugin.queries['heavy_precipitation'],
+            extracted_data)
+        expected = np.array([[[False, False, False],
+                              [False, False, False],
+                              [True, False, True]]])
+        self.assertArrayEqual(succeed, expected)
+        self.assertArrayEqual(fail, ~expected)
+        self.assertEqual(len(extracted_data), 2)
+
+    def test_nan_fails_both(self):
+        """Test that points with NaN data neither succeed nor fail."""
+        self.cubes[1].data[2, 0, 2, 0] = np.nan
+        succeed, fail = self.plugin.evaluate_query(
+            self.cubes, self.plugin.queries['heavy_precipitation'], {})
+        self.assertFalse(succeed[0, 2, 0])
+        self.assertFalse(fail[0, 2, 0])
 
 
 class Test_create_symbol_cube(IrisTest):
@@ -590,7 +488,7 @@ class Test_create_symbol_cube(IrisTest):
 
 class Test_process(IrisTest):
 
-    """Test the find_all_routes method ."""
+    """Test the process method."""
 
     def setUp(self):
         """ Set up wxcubes for testing. """
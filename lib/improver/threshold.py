@@ -30,13 +30,13 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Module containing thresholding classes."""
 
+from copy import deepcopy
 
 import iris
 import numpy as np
 from cf_units import Unit
 
 from improver.utilities.cube_manipulation import enforce_coordinate_ordering
-from improver.utilities.rescale import rescale
 
 
 class BasicThreshold(object):
@@ -52,7 +52,7 @@ class BasicThreshold(object):
 
     def __init__(self, thresholds, fuzzy_factor=None,
                  fuzzy_bounds=None, threshold_units=None,
-                 below_thresh_ok=False):
+                 below_thresh_ok=False, collapse_realizations=False):
         """
         Set up for processing an in-or-out of threshold field, including the
         generation of fuzzy_bounds which are required to threshold an input
@@ -101,6 +101,12 @@ class BasicThreshold(object):
             below_thresh_ok (bool):
                 True to count points as significant if *below* the threshold,
                 False to count points as significant if *above* the threshold.
+            collapse_realizations (bool):
+                If True, the thresholded values are averaged over the
+                realization dimension as they are calculated, so that the
+                output is the probability of exceeding each threshold across
+                the ensemble. The thresholded values for the individual
+                realizations are never held in memory at the same time.
 
         Raises:
             ValueError: If a threshold of 0.0 is requested when using a fuzzy
@@ -172,6 +178,7 @@ class BasicThreshold(object):
             assert bounds[1] >= thr, bounds_msg
 
         self.below_thresh_ok = below_thresh_ok
+        self.collapse_realizations = collapse_realizations
 
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
@@ -182,33 +189,33 @@ class BasicThreshold(object):
         ).format(self.thresholds, self.fuzzy_bounds,
                  self.below_thresh_ok)
 
-    def _add_threshold_coord(self, cube, threshold):
+    def _create_threshold_coord(self, thresholds, units):
         """
-        Add a scalar threshold-type coordinate to a cube containing
-        thresholded data and promote the new coordinate to be the
-        leading dimension of the cube.
+        Create a threshold-type dimension coordinate for a cube containing
+        thresholded data.
 
         Args:
-            cube (iris.cube.Cube):
-                Cube containing thresholded data (1s and 0s)
-            threshold (float):
-                Value at which the data has been thresholded
+            thresholds (list of float):
+                Values at which the data has been thresholded, in ascending
+                order.
+            units (cf_units.Unit):
+                Units of the threshold values.
 
         Returns:
-            iris.cube.Cube:
-                With new "threshold" axis
+            iris.coords.DimCoord:
+                Threshold coordinate named after the diagnostic.
         """
         try:
             coord = iris.coords.DimCoord(
-                np.array([threshold], dtype=np.float32),
+                np.array(thresholds, dtype=np.float32),
                 standard_name=self.threshold_coord_name,
-                var_name="threshold", units=cube.units)
+                var_name="threshold", units=units)
         except ValueError as cause:
             if 'is not a valid standard_name' in str(cause):
                 coord = iris.coords.DimCoord(
-                    np.array([threshold], dtype=np.float32),
+                    np.array(thresholds, dtype=np.float32),
                     long_name=self.threshold_coord_name,
-                    var_name="threshold", units=cube.units)
+                    var_name="threshold", units=units)
             else:
                 raise ValueError(cause)
 
@@ -218,9 +225,159 @@ class BasicThreshold(object):
             coord.attributes.update({'spp__relative_to_threshold': 'below'})
         else:
             coord.attributes.update({'spp__relative_to_threshold': 'above'})
+        return coord
 
-        cube.add_aux_coord(coord)
-        return iris.util.new_axis(cube, coord)
+    def _create_threshold_cube(self, template, data, thresholds):
+        """
+        Create the output cube from a template cube, with a leading threshold
+        dimension.
+
+        Args:
+            template (iris.cube.Cube):
+                Cube providing the metadata and coordinates for all of the
+                dimensions apart from the threshold dimension.
+            data (numpy.ndarray):
+                The thresholded data, with a leading threshold dimension.
+            thresholds (list of float):
+                Values at which the data has been thresholded, in ascending
+                order.
+
+        Returns:
+            iris.cube.Cube:
+                Cube containing the thresholded data with a new "threshold"
+                dimension.
+        """
+        cube = iris.cube.Cube(data, **deepcopy(template.metadata._asdict()))
+        cube.add_dim_coord(
+            self._create_threshold_coord(thresholds, template.units), 0)
+        for coord in template.coords():
+            coord_dims = tuple(
+                dim + 1 for dim in template.coord_dims(coord))
+            if template.coords(coord, dim_coords=True):
+                cube.add_dim_coord(coord.copy(), coord_dims)
+            else:
+                cube.add_aux_coord(coord.copy(), coord_dims)
+        return cube
+
+    def _calculate_truth_values(self, data, thresholds, fuzzy_bounds, out):
+        """
+        Calculate the truth values of the data for all thresholds at once by
+        broadcasting the data against the thresholds.
+
+        Exceedance probabilities are scaled linearly between 0/1 at the
+        min/max fuzzy bounds and 0.5 at the threshold value. Where the lower
+        and upper bounds are equal to the threshold, this gives a
+        deterministic 0/1 probability based on exceedance of the threshold.
+
+        Args:
+            data (numpy.ndarray):
+                Unmasked data to be thresholded.
+            thresholds (numpy.ndarray):
+                1D array of the threshold values.
+            fuzzy_bounds (numpy.ndarray):
+                Array of shape (len(thresholds), 2) containing the lower and
+                upper fuzzy bounds for each threshold.
+            out (numpy.ndarray):
+                Preallocated array of shape (len(thresholds),) + data.shape
+                into which the truth values are written.
+        """
+        expand = (slice(None),) + (np.newaxis,) * data.ndim
+        lower_width = (thresholds - fuzzy_bounds[:, 0])[expand]
+        upper_width = (fuzzy_bounds[:, 1] - thresholds)[expand]
+
+        if not (lower_width.any() or upper_width.any()):
+            # All thresholds are sharp.
+            np.greater(data, thresholds[expand], out=out)
+        else:
+            np.subtract(data, thresholds[expand], out=out)
+            below = out < 0
+            # Zero width bounds send points either side of the threshold to
+            # -/+ infinity, which are clipped to 0/1 below.
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.divide(out, lower_width, out=out, where=below)
+                np.divide(out, upper_width, out=out, where=~below)
+            np.multiply(out, 0.5, out=out)
+            np.add(out, 0.5, out=out)
+            np.clip(out, 0., 1., out=out)
+
+            # Points exactly on a threshold with a zero width upper bound are
+            # undefined. These do not exceed a sharp threshold, and are set to
+            # 0.5 if only the lower bound is fuzzy.
+            zero_width = upper_width.ravel() == 0
+            for index in np.flatnonzero(zero_width):
+                fill_value = 0.5 if lower_width.ravel()[index] > 0 else 0.
+                out[index][np.isnan(out[index])] = fill_value
+
+        # if requirement is for probabilities below threshold (rather than
+        # above), invert the exceedance probability
+        if self.below_thresh_ok:
+            np.subtract(1., out, out=out)
+
+    def _threshold_data(self, data, dtype, collapse_axis=None):
+        """
+        Threshold the data for all thresholds, writing into a single
+        preallocated output array with a leading threshold dimension.
+
+        Args:
+            data (numpy.ndarray):
+                Data to be thresholded. May be a masked array.
+            dtype (numpy.dtype):
+                Data type of the output array.
+            collapse_axis (int or None):
+                If set, the axis of data over which the thresholded values
+                are averaged. Each slice along this axis is thresholded in
+                turn and accumulated into the output.
+
+        Returns:
+            numpy.ndarray:
+                Array of shape (n_thresholds,) + data.shape, with the
+                collapse_axis removed if set. If the input data is masked,
+                the output is masked wherever the input is masked (or, when
+                collapsing, wherever all of the collapsed slices are masked).
+        """
+        thresholds = np.array(self.thresholds, dtype=dtype)
+        fuzzy_bounds = np.array(self.fuzzy_bounds, dtype=dtype)
+        is_masked = np.ma.isMaskedArray(data)
+        mask = np.ma.getmaskarray(data) if is_masked else None
+        unmasked_data = np.ma.getdata(data)
+
+        if collapse_axis is None:
+            result = np.empty(
+                (len(thresholds),) + unmasked_data.shape, dtype=dtype)
+            self._calculate_truth_values(
+                unmasked_data, thresholds, fuzzy_bounds, result)
+            if is_masked:
+                # Overwrite masked values that have been thresholded
+                # with the un-thresholded values from the input data.
+                np.copyto(result, unmasked_data, casting='unsafe',
+                          where=mask)
+                result = np.ma.masked_array(
+                    result, mask=np.broadcast_to(mask, result.shape).copy())
+            return result
+
+        slice_shape = np.delete(unmasked_data.shape, collapse_axis)
+        result = np.zeros(
+            (len(thresholds),) + tuple(slice_shape), dtype=dtype)
+        truth_values = np.empty_like(result)
+        n_valid = np.zeros(tuple(slice_shape), dtype=dtype)
+        for index in range(unmasked_data.shape[collapse_axis]):
+            self._calculate_truth_values(
+                np.take(unmasked_data, index, axis=collapse_axis),
+                thresholds, fuzzy_bounds, truth_values)
+            if is_masked:
+                valid = ~np.take(mask, index, axis=collapse_axis)
+                np.multiply(truth_values, valid, out=truth_values)
+                n_valid += valid
+            result += truth_values
+
+        if is_masked:
+            no_valid = n_valid == 0
+            n_valid[no_valid] = 1
+            result /= n_valid
+            return np.ma.masked_array(
+                result, mask=np.broadcast_to(no_valid, result.shape).copy())
+        result /= unmasked_data.shape[collapse_axis]
+        return result
 
     def process(self, input_cube):
         """Convert each point to a truth value based on provided threshold
@@ -229,6 +386,10 @@ class BasicThreshold(object):
         member, this is used to convert both thresholds and fuzzy bounds into
         the units of the input cube.
 
+        All of the thresholds are applied in a single vectorised operation.
+        If collapse_realizations is set, the realization dimension is
+        averaged over as each realization is thresholded.
+
         Args:
             input_cube (iris.cube.Cube):
                 Cube to threshold. The code is dimension-agnostic.
@@ -249,6 +410,8 @@ class BasicThreshold(object):
 
         Raises:
             ValueError: if a np.nan value is detected within the input cube.
+            ValueError: if collapse_realizations is set and the input cube
+                has no realization dimension.
 
         """
         # Record input cube data type to ensure consistent output, though
@@ -257,7 +420,6 @@ class BasicThreshold(object):
         if input_cube.dtype.kind == 'i':
             input_cube_dtype = np.float32
 
-        thresholded_cubes = iris.cube.CubeList()
         if np.isnan(input_cube.data).any():
             raise ValueError("Error: NaN detected in input cube data")
 
@@ -270,46 +432,30 @@ class BasicThreshold(object):
                 self.threshold_units.convert(threshold, input_cube.units)
                 for threshold in bounds]) for bounds in self.fuzzy_bounds]
 
+        # The threshold coordinate is in ascending order.
+        order = np.argsort(self.thresholds, kind='mergesort')
+        self.thresholds = [self.thresholds[index] for index in order]
+        self.fuzzy_bounds = [self.fuzzy_bounds[index] for index in order]
+
         # set name of threshold coordinate to match input diagnostic
         self.threshold_coord_name = input_cube.name()
 
-        # apply fuzzy thresholding
-        for threshold, bounds in zip(self.thresholds, self.fuzzy_bounds):
-            cube = input_cube.copy()
-            # if upper and lower bounds are equal, set a deterministic 0/1
-            # probability based on exceedance of the threshold
-            if bounds[0] == bounds[1]:
-                truth_value = cube.data > threshold
-            # otherwise, scale exceedance probabilities linearly between 0/1
-            # at the min/max fuzzy bounds and 0.5 at the threshold value
-            else:
-                truth_value = np.where(
-                    cube.data < threshold,
-                    rescale(cube.data,
-                            data_range=(bounds[0], threshold),
-                            scale_range=(0., 0.5),
-                            clip=True),
-                    rescale(cube.data,
-                            data_range=(threshold, bounds[1]),
-                            scale_range=(0.5, 1.),
-                            clip=True),
-                )
-            truth_value = truth_value.astype(input_cube_dtype)
-            # if requirement is for probabilities below threshold (rather than
-            # above), invert the exceedance probability
-            if self.below_thresh_ok:
-                truth_value = 1. - truth_value
-
-            cube.data = truth_value
-            # Overwrite masked values that have been thresholded
-            # with the un-thresholded values from the input cube.
-            if np.ma.is_masked(cube.data):
-                cube.data[input_cube.data.mask] = (
-                    input_cube.data[input_cube.data.mask])
-            cube = self._add_threshold_coord(cube, threshold)
-            thresholded_cubes.append(cube)
-
-        cube, = thresholded_cubes.concatenate()
+        if self.collapse_realizations:
+            if not input_cube.coords("realization", dim_coords=True):
+                raise ValueError(
+                    "Cannot collapse realizations as the input cube has no "
+                    "realization dimension: {}".format(input_cube))
+            collapse_axis, = input_cube.coord_dims("realization")
+            template = next(input_cube.slices_over("realization"))
+            template.remove_coord("realization")
+        else:
+            collapse_axis = None
+            template = input_cube
+
+        truth_values = self._threshold_data(
+            input_cube.data, input_cube_dtype, collapse_axis=collapse_axis)
+        cube = self._create_threshold_cube(
+            template, truth_values, self.thresholds)
 
         if self.below_thresh_ok:
             cube.rename(
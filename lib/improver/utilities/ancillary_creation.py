@@ -29,6 +29,8 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import os
+
 import iris
 import numpy as np
 
@@ -226,7 +228,8 @@ class SaturatedVapourPressureTable(object):
     Plugin to create a saturated vapour pressure lookup table.
     """
 
-    def __init__(self, t_min=183.15, t_max=338.25, t_increment=0.1):
+    def __init__(self, t_min=183.15, t_max=338.25, t_increment=0.1,
+                 cache_dir=None):
         """
         Create a table of saturated vapour pressures that can be interpolated
         through to obtain an SVP value for any temperature within the range
@@ -245,23 +248,46 @@ class SaturatedVapourPressureTable(object):
             t_increment (float):
                 The temperature increment at which to create values for the
                 saturated vapour pressure between t_min and t_max.
+            cache_dir (str or None):
+                Directory in which to cache the table values. If a table
+                with the same range and increment has previously been
+                created in this directory it is read rather than
+                recalculated. If None, the table is always calculated.
         """
         self.t_min = t_min
         self.t_max = t_max
         self.t_increment = t_increment
+        self.cache_dir = cache_dir
 
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
         result = ('<SaturatedVapourPressureTable: t_min: {}; t_max: {}; '
-                  't_increment: {}>'.format(self.t_min, self.t_max,
-                                            self.t_increment))
+                  't_increment: {}; cache_dir: {}>'.format(
+                      self.t_min, self.t_max, self.t_increment,
+                      self.cache_dir))
         return result
 
+    def _cache_path(self):
+        """
+        Return the path of the file in which the table values are cached.
+
+        Returns:
+            (str):
+                Path of the cache file within the cache directory.
+        """
+        filename = 'svp_table_{!r}_{!r}_{!r}.npy'.format(
+            float(self.t_min), float(self.t_max), float(self.t_increment))
+        return os.path.join(self.cache_dir, filename)
+
     def process(self):
         """
         Create a saturated vapour pressure lookup table by calling the
         Utilities.saturation_vapour_pressure_goff_gratch function in
-        psychrometric_calculations.Utilities.
+        psychrometric_calculations.Utilities. If a cache directory has been
+        provided, the table values are read from the cache if available, and
+        written to it otherwise. The values are written to a temporary file
+        which is then moved into place, so that concurrent readers never
+        encounter a partially written table.
 
         Returns:
             svp (iris.cube.Cube):
@@ -273,7 +299,27 @@ class SaturatedVapourPressureTable(object):
         temperature = iris.cube.Cube(temperatures, 'air_temperature',
                                      units='K')
 
-        svp = Utilities.saturation_vapour_pressure_goff_gratch(temperature)
+        cached_data = None
+        if self.cache_dir is not None:
+            cache_path = self._cache_path()
+            if os.path.exists(cache_path):
+                cached_data = np.load(cache_path)
+                if cached_data.shape != temperatures.shape:
+                    cached_data = None
+
+        if cached_data is None:
+            svp = Utilities.saturation_vapour_pressure_goff_gratch(
+                temperature)
+            if self.cache_dir is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temporary_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+                with open(temporary_path, 'wb') as cache_file:
+                    np.save(cache_file, svp.data)
+                os.replace(temporary_path, cache_path)
+        else:
+            svp = iris.cube.Cube(
+                cached_data, long_name='saturated_vapour_pressure',
+                units='Pa')
 
         temperature_coord = iris.coords.DimCoord(
             temperature.data, 'air_temperature', units='K')
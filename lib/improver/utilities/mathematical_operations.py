@@ -30,10 +30,10 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Module to contain mathematical operations."""
 
-import iris
 import numpy as np
 
-from improver.utilities.cube_manipulation import sort_coord_in_cube
+from improver.utilities.cube_manipulation import (
+    enforce_coordinate_ordering, sort_coord_in_cube)
 
 
 class Integration(object):
@@ -117,67 +117,32 @@ class Integration(object):
             pass
         return cube
 
-    def prepare_for_integration(self, cube):
-        """Prepare for integration by creating the cubes needed for the
-        integration. These are separate cubes for representing the upper
-        limit of the integration and the lower limit of the integration,
-        as well as setting up the output cube for the integrated output.
+    def _levels_to_integrate(self, upper_bounds, lower_bounds):
+        """Find which of the strides between consecutive points along the
+        chosen coordinate are included in the integration, given the
+        start_point and end_point.
 
         Args:
-            cube (iris.cube.Cube):
-                Cube containing the data to be integrated.
+            upper_bounds (numpy.ndarray):
+                The upper bound of each stride.
+            lower_bounds (numpy.ndarray):
+                The lower bound of each stride.
 
         Returns:
-            (tuple): tuple containing
-                **upper_bounds_cube** (iris.cube.Cube):
-                    Cube containing the upper bounds to be used during the
-                    integration.
-                **lower_bounds_cube** (iris.cube.Cube):
-                    Cube containing the lower bounds to be used during the
-                    integration.
-                **integrated_cube** (iris.cube.Cube):
-                    Cube that will be used for storing the output of the
-                    integration containing the most appropriate coordinates.
-
+            numpy.ndarray:
+                Boolean array which is True for the strides to be integrated.
         """
-
-        # Define upper and lower level cubes for the integration.
-        if self.direction_of_integration == "positive":
-            upper_bounds = cube.coord(self.coord_name_to_integrate).points[1:]
-            lower_bounds = cube.coord(self.coord_name_to_integrate).points[:-1]
-        elif self.direction_of_integration == "negative":
-            upper_bounds = cube.coord(self.coord_name_to_integrate).points[:-1]
-            lower_bounds = cube.coord(self.coord_name_to_integrate).points[1:]
-
-        upper_bounds_cube = (
-            cube.extract(
-                iris.Constraint(
-                    coord_values={self.coord_name_to_integrate:
-                                  upper_bounds})))
-        lower_bounds_cube = (
-            cube.extract(
-                iris.Constraint(
-                    coord_values={self.coord_name_to_integrate:
-                                  lower_bounds})))
-
-        # Determine which cube to copy in order to have the most appropriate
-        # points within the coordinate that is being integrated.
-        # TODO: Update metadata convention for bounds to better represent
-        # integrated quantities.
-        if self.direction_of_integration == "positive":
-            integrated_cube = upper_bounds_cube.copy()
-            integrated_cube.coord(self.coord_name_to_integrate).bounds = (
-                list(zip(lower_bounds, upper_bounds)))
-        elif self.direction_of_integration == "negative":
-            integrated_cube = lower_bounds_cube.copy()
-            integrated_cube.coord(self.coord_name_to_integrate).bounds = (
-                list(zip(lower_bounds, upper_bounds)))
-
-        integrated_cube.data = np.zeros(lower_bounds_cube.shape)
-        return upper_bounds_cube, lower_bounds_cube, integrated_cube
-
-    def perform_integration(
-            self, upper_bounds_cube, lower_bounds_cube, integrated_cube):
+        if self.start_point:
+            if self.direction_of_integration == "positive":
+                return lower_bounds >= self.start_point
+            return upper_bounds <= self.start_point
+        if self.end_point:
+            if self.direction_of_integration == "positive":
+                return upper_bounds <= self.end_point
+            return lower_bounds >= self.end_point
+        return np.ones(upper_bounds.shape, dtype=bool)
+
+    def perform_integration(self, cube):
         """Perform the integration.
 
         Integration is performed by firstly defining the stride as the
@@ -190,87 +155,80 @@ class Integration(object):
         summed.
 
         As the coordinate is progressively integrated, the contribution of
-        each stride is cumulatively summed.
+        each stride is cumulatively summed. The contributions of all strides
+        are calculated for the whole array at once, and cumulatively summed
+        along the chosen coordinate.
 
         Args:
-            upper_bounds_cube (iris.cube.Cube):
-                Cube containing the upper bounds to be used during the
-                integration.
-            lower_bounds_cube (iris.cube.Cube):
-                Cube containing the lower bounds to be used during the
-                integration.
-            integrated_cube (iris.cube.Cube):
-                Cube that will be used for storing the output of the
-                integration containing the most appropriate coordinates.
+            cube (iris.cube.Cube):
+                Cube containing the data to be integrated, with the chosen
+                coordinate as a dimension coordinate that is monotonically
+                increasing in the direction of integration.
 
         Returns:
             integrated_cube (iris.cube.Cube):
-                Cube containing the output from the integration.
-
+                Cube containing the output from the integration. The points
+                of the chosen coordinate are the end point of each stride
+                in the direction of integration, with bounds from the lower
+                to the upper bound of each stride.
+
+        Raises:
+            ValueError: If no integration can be performed because none of
+                the strides are within the start_point and end_point.
         """
-        # Create a zip for looping over.
-        levels_tuple = list(zip(
-            upper_bounds_cube.slices_over(self.coord_name_to_integrate),
-            lower_bounds_cube.slices_over(self.coord_name_to_integrate),
-            integrated_cube.slices_over(self.coord_name_to_integrate)))
-
-        # Perform the integration
-        stride_sum = 0
-        integrated_cubelist = iris.cube.CubeList([])
-        for (upper_bounds_slice, lower_bounds_slice,
-             integrated_slice) in levels_tuple:
-            upper_bound = (
-                upper_bounds_slice.coord(
-                    self.coord_name_to_integrate).points.item())
-            lower_bound = (
-                lower_bounds_slice.coord(
-                    self.coord_name_to_integrate).points.item())
-            if not self.start_point and not self.end_point:
-                pass
-            elif self.start_point:
-                if self.direction_of_integration == "positive":
-                    if lower_bound < self.start_point:
-                        continue
-                elif self.direction_of_integration == "negative":
-                    if upper_bound > self.start_point:
-                        continue
-            elif self.end_point:
-                if self.direction_of_integration == "positive":
-                    if upper_bound > self.end_point:
-                        continue
-                elif self.direction_of_integration == "negative":
-                    if lower_bound < self.end_point:
-                        continue
-            stride = np.abs(upper_bound - lower_bound)
-            upper_half_of_stride = upper_bounds_slice.data * 0.0
-            # Restrict the integration to only consider positive values.
-            # This condition is specific for the computation of the wet-bulb
-            # temperature integral.
-            uindex = np.where(upper_bounds_slice.data > 0)
-            upper_half_of_stride[uindex] = (upper_bounds_slice.data[uindex] *
-                                            0.5 * stride)
-            # Restrict the integration to only consider positive values.
-            # This condition is specific for the computation of the wet-bulb
-            # temperature integral.
-            lindex = np.where(lower_bounds_slice.data > 0)
-            lower_half_of_stride = lower_bounds_slice.data * 0.0
-            lower_half_of_stride[lindex] = (lower_bounds_slice.data[lindex] *
-                                            0.5 * stride)
-            stride_sum += lower_half_of_stride + upper_half_of_stride
-            integrated_slice.data = stride_sum
-            integrated_cubelist.append(integrated_slice.copy())
-
-        if len(integrated_cubelist) == 0:
+        coord = cube.coord(self.coord_name_to_integrate)
+        axis, = cube.coord_dims(coord)
+        points = coord.points
+
+        # Define upper and lower bounds for each stride.
+        if self.direction_of_integration == "positive":
+            upper_bounds = points[1:]
+            lower_bounds = points[:-1]
+        elif self.direction_of_integration == "negative":
+            upper_bounds = points[:-1]
+            lower_bounds = points[1:]
+
+        levels = np.flatnonzero(
+            self._levels_to_integrate(upper_bounds, lower_bounds))
+        if len(levels) == 0:
             msg = ("No integration could be performed for "
                    "coord_to_integrate: {}, start_point: {}, end_point: {}, "
                    "direction_of_integration: {}. "
-                   "The resulting cubelist was empty.".format(
+                   "No strides were found to integrate.".format(
                        self.coord_name_to_integrate, self.start_point,
                        self.end_point, self.direction_of_integration))
             raise ValueError(msg)
 
-        # Merge resulting cubes back together
-        integrated_cube = integrated_cubelist.merge_cube()
+        # The included strides are always consecutive.
+        lower_level = [slice(None)] * cube.ndim
+        upper_level = [slice(None)] * cube.ndim
+        lower_level[axis] = slice(levels[0], levels[-1] + 1)
+        upper_level[axis] = slice(levels[0] + 1, levels[-1] + 2)
+
+        # Restrict the integration to only consider positive values.
+        # This condition is specific for the computation of the wet-bulb
+        # temperature integral.
+        dtype = np.result_type(cube.dtype, np.float32)
+        positive_data = np.maximum(cube.data, 0).astype(dtype, copy=False)
+        stride_shape = [1] * cube.ndim
+        stride_shape[axis] = len(levels)
+        half_strides = (0.5 * np.abs(
+            upper_bounds[levels] - lower_bounds[levels])).reshape(
+                stride_shape)
+        integrated_data = (
+            positive_data[tuple(lower_level)] +
+            positive_data[tuple(upper_level)])
+        integrated_data *= half_strides.astype(dtype)
+        np.cumsum(integrated_data, axis=axis, out=integrated_data)
+
+        # The output takes the coordinates at the end of each stride in the
+        # direction of integration.
+        # TODO: Update metadata convention for bounds to better represent
+        # integrated quantities.
+        integrated_cube = cube[tuple(upper_level)]
+        integrated_cube.coord(self.coord_name_to_integrate).bounds = (
+            list(zip(lower_bounds[levels], upper_bounds[levels])))
+        integrated_cube.data = integrated_data
         return integrated_cube
 
     def process(self, cube):
@@ -281,11 +239,9 @@ class Integration(object):
         Functions utilised are:
             1. Ensure the cube is sorted in the direction desired for
                integration.
-            2. Prepare for integration by creating cubes that represent the
-               upper and lower limits of the integration, as well as as a
-               template cube to put the integrated output.
-            3. Perform the integration using the trapezoidal rule.
-            4. Ensure that the integrated coordinate is a dimension coordinate
+            2. Perform the integration using the trapezoidal rule, for all
+               of the points along the chosen coordinate at once.
+            3. Ensure that the integrated coordinate is the leading dimension
                and ensure that the integrated coordinate is sorted in the
                desired direction.
 
@@ -302,18 +258,12 @@ class Integration(object):
         # Make coordinate monotonic in the direction desired for integration.
         cube = self.ensure_monotonic_increase_in_chosen_direction(cube)
 
-        upper_bounds_cube, lower_bounds_cube, integrated_cube = (
-            self.prepare_for_integration(cube))
+        integrated_cube = self.perform_integration(cube)
 
-        integrated_cube = self.perform_integration(
-            upper_bounds_cube, lower_bounds_cube, integrated_cube)
-
-        # Make sure that the coordinate that has been integrated is a
-        # dimension coordinate.
-        for coord in integrated_cube.aux_coords[::-1]:
-            if coord.name() == self.coord_name_to_integrate:
-                integrated_cube = iris.util.new_axis(
-                    integrated_cube, self.coord_name_to_integrate)
+        # Make sure that the coordinate that has been integrated is the
+        # leading dimension.
+        integrated_cube = enforce_coordinate_ordering(
+            integrated_cube, self.coord_name_to_integrate)
         # Make sure that the order of the coordinate that has been integrated
         # within the integrated_cube corresponds the direction in which the
         # cube has been integrated.
@@ -321,3 +271,171 @@ class Integration(object):
             self.ensure_monotonic_increase_in_chosen_direction(
                 integrated_cube))
         return integrated_cube
+
+
+def searchsorted_along_last_axis(sorted_array, values):
+    """
+    Find the insertion indices of values into sorted_array independently
+    for every row along the last axis. This is equivalent to calling
+    np.searchsorted(sorted_array[i], values[i], side="right") for every
+    leading index i, but is performed for all rows at once.
+
+    The insertion indices are found by a bisection search that is carried
+    out simultaneously for every value, so the number of array operations
+    required scales with the logarithm of the length of sorted_array.
+
+    Args:
+        sorted_array (numpy.ndarray):
+            Array that is sorted in ascending order along the last axis.
+        values (numpy.ndarray):
+            Array of values to be inserted into sorted_array. The leading
+            dimensions must match those of sorted_array.
+
+    Returns:
+        indices (numpy.ndarray):
+            Array of insertion indices with the same shape as values.
+
+    Raises:
+        ValueError: If the leading dimensions of the inputs do not match.
+    """
+    if sorted_array.shape[:-1] != values.shape[:-1]:
+        msg = ("The leading dimensions of sorted_array and values must "
+               "match. sorted_array shape: {}, values shape: {}".format(
+                   sorted_array.shape, values.shape))
+        raise ValueError(msg)
+    # Pad each row with infinity to a power of two in length, so that every
+    # step of the bisection halves the remaining interval.
+    length = sorted_array.shape[-1]
+    n_steps = int(np.ceil(np.log2(length + 1)))
+    padded = np.full(sorted_array.shape[:-1] + (2 ** n_steps,), np.inf,
+                     dtype=np.result_type(sorted_array, np.float32))
+    padded[..., :length] = sorted_array
+    row_offsets = (np.arange(np.prod(sorted_array.shape[:-1], dtype=int)) *
+                   2 ** n_steps).reshape(sorted_array.shape[:-1] + (1,))
+
+    indices = np.broadcast_to(row_offsets, values.shape).copy()
+    step = 2 ** (n_steps - 1)
+    while step >= 1:
+        indices += step * (padded.take(indices + (step - 1)) <= values)
+        step //= 2
+    return indices - row_offsets
+
+
+def interpolate_along_last_axis(x, xp, fp, max_rows=None):
+    """
+    Perform one-dimensional linear interpolation independently for every
+    row along the last axis. For each leading index i this gives the same
+    result as np.interp(x[i], xp[i], fp[i]), including the behaviour of
+    np.interp for repeated values within xp and for points outside the
+    range of xp, which take the value of the nearest end point of fp.
+
+    Any of x, xp and fp may be one-dimensional, in which case the same
+    values are used for every row.
+
+    Args:
+        x (numpy.ndarray):
+            Array of the x-coordinates at which to evaluate the
+            interpolated values.
+        xp (numpy.ndarray):
+            Array of the x-coordinates of the data points, which must be
+            increasing along the last axis.
+        fp (numpy.ndarray):
+            Array of the y-coordinates of the data points, with the same
+            length along the last axis as xp.
+        max_rows (int or None):
+            Maximum number of rows to interpolate at once. This bounds the
+            memory used by the temporary arrays. If None, all the rows are
+            interpolated at once.
+
+    Returns:
+        result (numpy.ndarray):
+            Array of interpolated values as float64, with the leading
+            dimensions of the inputs and the length of x along the last
+            axis.
+
+    Raises:
+        ValueError: If the leading dimensions of the inputs do not match.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    xp = np.asarray(xp, dtype=np.float64)
+    fp = np.asarray(fp, dtype=np.float64)
+    leading_shapes = set(array.shape[:-1] for array in (x, xp, fp)
+                         if array.ndim > 1)
+    if len(leading_shapes) > 1:
+        msg = ("The leading dimensions of x, xp and fp must match. "
+               "x shape: {}, xp shape: {}, fp shape: {}".format(
+                   x.shape, xp.shape, fp.shape))
+        raise ValueError(msg)
+    leading_shape = leading_shapes.pop() if leading_shapes else ()
+    x = np.broadcast_to(x, leading_shape + x.shape[-1:])
+
+    n_rows = int(np.prod(leading_shape, dtype=int))
+    if max_rows is None or n_rows <= max_rows:
+        return _interpolate_rows(x, xp, fp)
+
+    # Interpolate a limited number of rows at a time, flattening the
+    # leading dimensions so that the rows can be sliced.
+    x = x.reshape(n_rows, x.shape[-1])
+    if xp.ndim > 1:
+        xp = xp.reshape(n_rows, xp.shape[-1])
+    if fp.ndim > 1:
+        fp = fp.reshape(n_rows, fp.shape[-1])
+    result = np.empty(x.shape, dtype=np.float64)
+    for start in range(0, n_rows, max_rows):
+        rows = slice(start, start + max_rows)
+        result[rows] = _interpolate_rows(
+            x[rows], xp[rows] if xp.ndim > 1 else xp,
+            fp[rows] if fp.ndim > 1 else fp)
+    return result.reshape(leading_shape + x.shape[-1:])
+
+
+def _interpolate_rows(x, xp, fp):
+    """
+    Perform the linear interpolation for interpolate_along_last_axis.
+
+    Args:
+        x (numpy.ndarray):
+            Array of the x-coordinates at which to evaluate the
+            interpolated values, with the leading dimensions of all rows.
+        xp (numpy.ndarray):
+            Array of the x-coordinates of the data points, either for every
+            row or one-dimensional.
+        fp (numpy.ndarray):
+            Array of the y-coordinates of the data points, either for every
+            row or one-dimensional.
+
+    Returns:
+        result (numpy.ndarray):
+            Array of interpolated values with the same shape as x.
+    """
+    length = xp.shape[-1]
+    if length == 1:
+        return np.broadcast_to(fp[..., :1], x.shape).copy()
+
+    row_offsets = (np.arange(np.prod(x.shape[:-1], dtype=int)) *
+                   length).reshape(x.shape[:-1] + (1,))
+    if xp.ndim == 1:
+        upper = np.clip(np.searchsorted(xp, x, side="right"), 1, length - 1)
+        x_upper = xp.take(upper)
+        x_lower = xp.take(upper - 1)
+    else:
+        upper = np.clip(searchsorted_along_last_axis(xp, x), 1, length - 1)
+        x_upper = xp.take(upper + row_offsets)
+        x_lower = xp.take(upper + (row_offsets - 1))
+    if fp.ndim == 1:
+        f_upper = fp.take(upper)
+        f_lower = fp.take(upper - 1)
+    else:
+        f_upper = fp.take(upper + row_offsets)
+        f_lower = fp.take(upper + (row_offsets - 1))
+
+    # Within the range of xp the insertion indices guarantee that
+    # x_lower <= x < x_upper, so the denominator is only zero where the
+    # values are overwritten by the end point values below.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = ((f_upper - f_lower) / (x_upper - x_lower) *
+                  (x - x_lower) + f_lower)
+    result = np.where(x == x_lower, f_lower, result)
+    result = np.where(x < xp[..., :1], fp[..., :1], result)
+    result = np.where(x >= xp[..., -1:], fp[..., -1:], result)
+    return result
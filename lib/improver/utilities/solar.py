@@ -30,15 +30,24 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """ Utilities to find the relative position of the sun."""
 
+from collections import OrderedDict
 import datetime as dt
 
 import cf_units as unit
 import numpy as np
 
+from improver.utilities.cube_metadata import create_coordinate_hash
 from improver.utilities.spatial import (
     lat_lon_determine, transform_grid_to_lat_lon)
 from improver.utilities.temporal import iris_time_to_datetime
 
+# Latitudes and longitudes of each grid point, keyed by the hash of the
+# x and y coordinates of the grid, so that the grid only needs to be
+# transformed once. Only the _GRID_LAT_LONS_MAXSIZE most recently used grids
+# are retained; the cache can be emptied using clear_grid_lat_lons_cache.
+_GRID_LAT_LONS = OrderedDict()
+_GRID_LAT_LONS_MAXSIZE = 8
+
 
 def calc_solar_declination(day_of_year):
     """
@@ -49,16 +58,17 @@ def calc_solar_declination(day_of_year):
     https://www.esrl.noaa.gov/gmd/grad/solcalc/sollinks.html
 
     Args:
-        day_of_year (int):
-            Day of the year 0 to 365, 0 = 1st January
+        day_of_year (int or numpy.ndarray):
+            Day of the year 0 to 365, 0 = 1st January, or an array of days
+            of the year.
 
     Returns:
-        solar_declination (float):
+        solar_declination (float or numpy.ndarray):
             Declination in degrees.North-South
     """
     # Declination (degrees):
     # = -(axial_tilt)*cos(360./orbital_year * day_of_year - solstice_offset)
-    if day_of_year < 0 or day_of_year > 365:
+    if np.min(day_of_year) < 0 or np.max(day_of_year) > 365:
         msg = ('Day of the year must be between 0 and 365')
         raise ValueError(msg)
     solar_declination = -23.5 * np.cos(np.radians(0.9856 * day_of_year + 9.3))
@@ -77,19 +87,19 @@ def calc_solar_hour_angle(longitudes, day_of_year, utc_hour):
         longitudes (float or numpy.ndarray):
             A single Longitude or array of Longitudes
             longitudes needs to be between 180.0 and -180.0 degrees
-        day_of_year (int):
+        day_of_year (int or numpy.ndarray):
             Day of the year 0 to 365, 0 = 1st January
-        utc_hour (float):
+        utc_hour (float or numpy.ndarray):
             Hour of the day in UTC
 
     Returns:
         solar_hour_angle (float or numpy.ndarray)
             Hour angles in degrees East-West
     """
-    if day_of_year < 0 or day_of_year > 365:
+    if np.min(day_of_year) < 0 or np.max(day_of_year) > 365:
         msg = ('Day of the year must be between 0 and 365')
         raise ValueError(msg)
-    if utc_hour < 0.0 or utc_hour > 24.0:
+    if np.min(utc_hour) < 0.0 or np.max(utc_hour) > 24.0:
         msg = ('Hour must be between 0 and 24.0')
         raise ValueError(msg)
     thetao = 2*np.pi*day_of_year/365.0
@@ -110,7 +120,10 @@ def calc_solar_hour_angle(longitudes, day_of_year, utc_hour):
 def calc_solar_elevation(latitudes, longitudes, day_of_year, utc_hour,
                          return_sine=False):
     """
-    Calculate the Solar elevation.
+    Calculate the Solar elevation. If arrays of day_of_year and utc_hour are
+    provided, these must be broadcastable against the latitudes and
+    longitudes, e.g. an array of shape (time, 1, 1) will give the solar
+    elevation as a (time, y, x) array for 2d latitudes and longitudes.
 
     Args:
         latitudes (float or numpy.ndarray):
@@ -119,9 +132,9 @@ def calc_solar_elevation(latitudes, longitudes, day_of_year, utc_hour,
         longitudes (float or numpy.ndarray):
             A single Longitude or array of Longitudes
             longitudes needs to be between 180.0 and -180.0
-        day_of_year (int):
+        day_of_year (int or numpy.ndarray):
             Day of the year 0 to 365, 0 = 1st January
-        utc_hour (float):
+        utc_hour (float or numpy.ndarray):
             Hour of the day in UTC in hours
         return_sine (bool):
             If True return sine of solar elevation.
@@ -134,10 +147,10 @@ def calc_solar_elevation(latitudes, longitudes, day_of_year, utc_hour,
     if np.min(latitudes) < -90.0 or np.max(latitudes) > 90.0:
         msg = ('Latitudes must be between -90.0 and 90.0')
         raise ValueError(msg)
-    if day_of_year < 0 or day_of_year > 365:
+    if np.min(day_of_year) < 0 or np.max(day_of_year) > 365:
         msg = ('Day of the year must be between 0 and 365')
         raise ValueError(msg)
-    if utc_hour < 0.0 or utc_hour > 24.0:
+    if np.min(utc_hour) < 0.0 or np.max(utc_hour) > 24.0:
         msg = ('Hour must be between 0 and 24.0')
         raise ValueError(msg)
     declination = calc_solar_declination(day_of_year)
@@ -165,19 +178,19 @@ def daynight_terminator(longitudes, day_of_year, utc_hour):
         longitudes (numpy.ndarray):
             Array of longitudes.
             longitudes needs to be between 180.0 and -180.0 degrees
-        day_of_year (int):
+        day_of_year (int or numpy.ndarray):
             Day of the year 0 to 365, 0 = 1st January
-        utc_hour (float):
+        utc_hour (float or numpy.ndarray):
             Hour of the day in UTC
 
     Returns:
         latitudes (numpy.ndarray):
             latitudes of the daynight terminator
     """
-    if day_of_year < 0 or day_of_year > 365:
+    if np.min(day_of_year) < 0 or np.max(day_of_year) > 365:
         msg = ('Day of the year must be between 0 and 365')
         raise ValueError(msg)
-    if utc_hour < 0.0 or utc_hour > 24.0:
+    if np.min(utc_hour) < 0.0 or np.max(utc_hour) > 24.0:
         msg = ('Hour must be between 0 and 24.0')
         raise ValueError(msg)
     declination = calc_solar_declination(day_of_year)
@@ -189,6 +202,106 @@ def daynight_terminator(longitudes, day_of_year, utc_hour):
     return lats
 
 
+def get_grid_lat_lons(cube):
+    """
+    Calculate the latitude and longitude of each point on the x-y grid of
+    the cube. The results are cached using a hash of the x and y coordinates,
+    so that each grid is only transformed to latitude and longitude once.
+    The least recently used grid is dropped from the cache when it is full.
+
+    Args:
+        cube (iris.cube.Cube):
+            Cube containing x and y axis.
+
+    Returns:
+        (tuple): tuple containing
+            **lats** (numpy.ndarray):
+                2d Array of latitudes for each point. This array is read-only.
+            **lons** (numpy.ndarray):
+                2d Array of longitudes for each point. This array is
+                read-only.
+    """
+    grid_hash = create_coordinate_hash(cube)
+    if grid_hash not in _GRID_LAT_LONS:
+        if lat_lon_determine(cube) is not None:
+            lats, lons = transform_grid_to_lat_lon(cube)
+        else:
+            lats, lons = np.meshgrid(cube.coord('latitude').points,
+                                     cube.coord('longitude').points,
+                                     indexing='ij')
+        for array in (lats, lons):
+            array.setflags(write=False)
+        _GRID_LAT_LONS[grid_hash] = (lats, lons)
+        while len(_GRID_LAT_LONS) > _GRID_LAT_LONS_MAXSIZE:
+            _GRID_LAT_LONS.popitem(last=False)
+    else:
+        _GRID_LAT_LONS.move_to_end(grid_hash)
+    return _GRID_LAT_LONS[grid_hash]
+
+
+def clear_grid_lat_lons_cache():
+    """
+    Remove all the grids from the cache of latitudes and longitudes used by
+    get_grid_lat_lons.
+    """
+    _GRID_LAT_LONS.clear()
+
+
+def calc_day_of_year_and_utc_hour(datetimes):
+    """
+    Calculate the day of the year and the hour in UTC of each datetime.
+    Only the hours and minutes of each datetime contribute to the hour.
+
+    Args:
+        datetimes (list of datetime.datetime):
+            Datetimes for which to calculate the day of the year and hour.
+
+    Returns:
+        (tuple): tuple containing
+            **day_of_year** (numpy.ndarray):
+                Day of the year 0 to 365, 0 = 1st January, for each datetime.
+            **utc_hour** (numpy.ndarray):
+                Hour of the day in UTC for each datetime.
+    """
+    day_of_year = np.array(
+        [(dtval - dt.datetime(dtval.year, 1, 1)).days
+         for dtval in datetimes])
+    utc_hour = np.array(
+        [(dtval.hour * 60.0 + dtval.minute) / 60.0 for dtval in datetimes])
+    return day_of_year, utc_hour
+
+
+def calc_solar_elevation_at_times(latitudes, longitudes, datetimes,
+                                  return_sine=False):
+    """
+    Calculate the Solar elevation at each of a list of datetimes, for all
+    of the datetimes at once.
+
+    Args:
+        latitudes (numpy.ndarray):
+            Array of Latitudes
+            latitudes needs to be between -90.0 and 90.0
+        longitudes (numpy.ndarray):
+            Array of Longitudes of the same shape as the latitudes
+            longitudes needs to be between 180.0 and -180.0
+        datetimes (list of datetime.datetime):
+            Datetimes at which to calculate the solar elevation.
+        return_sine (bool):
+            If True return sine of solar elevation.
+            Default False.
+
+    Returns:
+        solar_elevation (numpy.ndarray):
+            Solar elevation in degrees for each location, with a leading
+            dimension of the same length as the datetimes.
+    """
+    day_of_year, utc_hour = calc_day_of_year_and_utc_hour(datetimes)
+    time_shape = (len(datetimes),) + (1,) * np.ndim(latitudes)
+    return calc_solar_elevation(
+        latitudes, longitudes, day_of_year.reshape(time_shape),
+        utc_hour.reshape(time_shape), return_sine=return_sine)
+
+
 class DayNightMask(object):
     """
     Plugin Class to generate a daynight mask for the provided cube
@@ -237,10 +350,13 @@ class DayNightMask(object):
         Args:
             mask_cube (iris.cube.Cube):
                 daynight mask cube - data initially set to self.night
-            day_of_year (int):
-                day of the year 0 to 365, 0 = 1st January
-            utc_hour (float):
-                Hour in UTC
+            day_of_year (int or numpy.ndarray):
+                day of the year 0 to 365, 0 = 1st January. If an array is
+                provided, this must have shape (time, 1, 1) to match a
+                mask_cube with a leading time dimension.
+            utc_hour (float or numpy.ndarray):
+                Hour in UTC, as a float or an array of the same shape as
+                day_of_year.
 
         Returns:
             mask_cube (iris.cube.Cube):
@@ -249,16 +365,12 @@ class DayNightMask(object):
         lons = mask_cube.coord('longitude').points
         lats = mask_cube.coord('latitude').points
         terminator_lats = daynight_terminator(lons, day_of_year, utc_hour)
-        lons_zeros = np.zeros_like(lons)
-        lats_zeros = np.zeros_like(lats).reshape(len(lats), 1)
-        lats_on_lon = lats.reshape(len(lats), 1) + lons_zeros
-        terminator_on_lon = lats_zeros + terminator_lats
+        lats_on_lon = lats.reshape(len(lats), 1)
         dec = calc_solar_declination(day_of_year)
-        if dec > 0.0:
-            index = np.where(lats_on_lon >= terminator_on_lon)
-        else:
-            index = np.where(lats_on_lon < terminator_on_lon)
-        mask_cube.data[index] = self.day
+        daytime = np.where(dec > 0.0,
+                           lats_on_lon >= terminator_lats,
+                           lats_on_lon < terminator_lats)
+        mask_cube.data[daytime] = self.day
         return mask_cube
 
     def process(self, cube):
@@ -288,21 +400,18 @@ class DayNightMask(object):
                 on the cube as it is extracted from the first slice.
         """
         daynight_mask = self._create_daynight_mask(cube)
-        dtvalues = iris_time_to_datetime(daynight_mask.coord('time'))
-        for i, dtval in enumerate(dtvalues):
-            mask_cube = daynight_mask[i]
-            day_of_year = (dtval - dt.datetime(dtval.year, 1, 1)).days
-            dtval = dtval + dt.timedelta(seconds=dtval.second)
-            utc_hour = (dtval.hour * 60.0 + dtval.minute) / 60.0
-            trg_crs = lat_lon_determine(mask_cube)
-            # Grids that are not Lat Lon
-            if trg_crs is not None:
-                lats, lons = transform_grid_to_lat_lon(mask_cube)
-                solar_el = calc_solar_elevation(lats, lons,
-                                                day_of_year, utc_hour)
-                mask_cube.data[np.where(solar_el > 0.0)] = self.day
-            else:
-                mask_cube = self._daynight_lat_lon_cube(mask_cube,
-                                                        day_of_year, utc_hour)
-            daynight_mask.data[i, ::] = mask_cube.data
+        dtvalues = [dtval + dt.timedelta(seconds=dtval.second)
+                    for dtval in iris_time_to_datetime(
+                        daynight_mask.coord('time'))]
+        trg_crs = lat_lon_determine(daynight_mask)
+        # Grids that are not Lat Lon
+        if trg_crs is not None:
+            lats, lons = get_grid_lat_lons(daynight_mask)
+            solar_el = calc_solar_elevation_at_times(lats, lons, dtvalues)
+            daynight_mask.data[solar_el > 0.0] = self.day
+        else:
+            day_of_year, utc_hour = calc_day_of_year_and_utc_hour(dtvalues)
+            daynight_mask = self._daynight_lat_lon_cube(
+                daynight_mask, day_of_year.reshape(-1, 1, 1),
+                utc_hour.reshape(-1, 1, 1))
         return daynight_mask
@@ -31,6 +31,7 @@
 """ Provides support utilities."""
 
 import copy
+from collections import OrderedDict
 
 import cartopy.crs as ccrs
 import iris
@@ -44,10 +45,27 @@ from scipy.interpolate import griddata
 from improver.threshold import BasicThreshold
 from improver.utilities.cube_checker import (
     check_cube_coordinates, spatial_coords_match)
+from improver.utilities.cube_metadata import generate_hash
 
 # Maximum radius of the neighbourhood width in grid cells.
 MAX_DISTANCE_IN_GRID_CELLS = 500
 
+# Indices of the source point for each point on the output grid used by
+# RegridLandSea, keyed by a hash of the land masks and plugin options. Each
+# entry holds two arrays the size of the output grid, so only the
+# _LAND_SEA_SOURCE_POINTS_MAXSIZE most recently used entries are retained;
+# the cache can be emptied using clear_land_sea_source_points_cache.
+_LAND_SEA_SOURCE_POINTS = OrderedDict()
+_LAND_SEA_SOURCE_POINTS_MAXSIZE = 4
+
+
+def clear_land_sea_source_points_cache():
+    """
+    Remove all the entries from the cache of source points used by
+    RegridLandSea.
+    """
+    _LAND_SEA_SOURCE_POINTS.clear()
+
 
 def check_if_grid_is_equal_area(cube):
     """Identify whether the grid is an equal area grid.
@@ -577,9 +595,7 @@ class RegridLandSea():
                 Distance in metres to search for a sea or land point.
         """
         self.input_land = None
-        self.nearest_cube = None
         self.output_land = None
-        self.output_cube = None
         self.regridder = iris.analysis.Nearest(
             extrapolation_mode=extrapolation_mode)
         self.vicinity = OccurrenceWithinVicinity(vicinity_radius)
@@ -591,40 +607,35 @@ class RegridLandSea():
         return "<RegridLandSea: regridder: {}; vicinity: {}>".format(
             self.regridder, self.vicinity)
 
-    def correct_where_input_true(self, selector_val):
+    def find_replacement_points(self, selector_val):
         """
-        Replace points in the output_cube where output_land matches the
+        Find points on the output grid where output_land matches the
         selector_val and the input_land does not match, but has matching
-        points in the vicinity, with the nearest matching point in the
-        vicinity in the original nearest_cube.
-
-        Updates self.output_cube.data
+        points in the vicinity. For each of these points, find the nearest
+        matching point in the vicinity, from which the replacement value will
+        be taken.
 
         Args:
             selector_val (int):
                 Value of mask to replace if needed.
                 Intended to be 1 for filling land points near the coast
                 and 0 for filling sea points near the coast.
+
+        Returns:
+            (tuple): tuple containing
+                **mismatch_points** (tuple of numpy.ndarray):
+                    The y and x indices of the points to be replaced.
+                **source_points** (tuple of numpy.ndarray):
+                    The y and x indices of the points from which the
+                    replacement values are taken.
         """
         # Find all points on output grid matching selector_val
         use_points = np.where(self.input_land.data == selector_val)
 
         # If there are no matching points on the input grid, no alteration can
         # be made. This tests the size of the y-coordinate of use_points.
-        if use_points[0].size is 0:
-            return
-
-        # Get shape of output grid
-        ynum, xnum = self.output_land.shape
-
-        # Using only these points, extrapolate to fill domain using nearest
-        # neighbour. This will generate a grid where the non-selector_val
-        # points are filled with the nearest value in the same mask
-        # classification.
-        (y_points, x_points) = np.mgrid[0:ynum, 0:xnum]
-        selector_data = griddata(use_points,
-                                 self.nearest_cube.data[use_points],
-                                 (y_points, x_points), method="nearest")
+        if use_points[0].size == 0:
+            return use_points, use_points
 
         # Identify nearby points on regridded input_land that match the
         # selector_value
@@ -637,14 +648,76 @@ class RegridLandSea():
 
         # Identify those points sourced from the opposite mask that are
         # close to a source point of the correct mask
-        mismatch_points, = np.logical_and(
+        mismatch_mask, = np.logical_and(
             np.logical_and(self.output_land.data == selector_val,
                            self.input_land.data != selector_val),
             in_vicinity.data > 0.5)
+        mismatch_points = np.where(mismatch_mask)
+        if mismatch_points[0].size == 0:
+            return mismatch_points, mismatch_points
+
+        # Using only the matching points, find the nearest neighbour of each
+        # mismatched point. The neighbours are found by interpolating the
+        # flattened indices of the matching points.
+        use_indices = np.ravel_multi_index(use_points, self.output_land.shape)
+        source_indices = griddata(use_points, use_indices, mismatch_points,
+                                  method="nearest")
+        source_points = np.unravel_index(
+            source_indices.astype(int), self.output_land.shape)
+        return mismatch_points, source_points
+
+    def get_source_points(self, input_land, output_land):
+        """
+        Find the point in the nearest-regridded data from which each point
+        on the output grid takes its value, once the land and sea points
+        have been corrected. These depend only upon the land masks, so are
+        cached for each pair of input and output land masks. The least
+        recently used entry is dropped from the cache when it is full.
+
+        Args:
+            input_land (iris.cube.Cube):
+                Cube of land_binary_mask data on the grid from which the data
+                has been reprojected.
+            output_land (iris.cube.Cube):
+                Cube of land_binary_mask data on target grid.
 
-        # Replace these points with the filled-domain data
-        self.output_cube.data[mismatch_points] = (
-            selector_data[mismatch_points])
+        Returns:
+            (tuple): tuple containing
+                **source_y** (numpy.ndarray):
+                    The y index of the point from which each point on the
+                    output grid takes its value.
+                **source_x** (numpy.ndarray):
+                    The x index of the point from which each point on the
+                    output grid takes its value.
+            These arrays are read-only.
+        """
+        key = generate_hash([input_land, output_land, self.vicinity.distance,
+                             repr(self.regridder)])
+        if key not in _LAND_SEA_SOURCE_POINTS:
+            self.output_land = output_land
+
+            # Regrid input_land to output_land grid.
+            self.input_land = input_land.regrid(self.output_land,
+                                                self.regridder)
+
+            source_y, source_x = np.indices(self.output_land.shape)
+            # Update sea points that were incorrectly sourced from land
+            # points, and land points that were incorrectly sourced from sea
+            # points.
+            for selector_val in [0, 1]:
+                mismatch_points, source_points = (
+                    self.find_replacement_points(selector_val))
+                source_y[mismatch_points] = source_points[0]
+                source_x[mismatch_points] = source_points[1]
+            for array in (source_y, source_x):
+                array.setflags(write=False)
+            _LAND_SEA_SOURCE_POINTS[key] = (source_y, source_x)
+            while (len(_LAND_SEA_SOURCE_POINTS) >
+                   _LAND_SEA_SOURCE_POINTS_MAXSIZE):
+                _LAND_SEA_SOURCE_POINTS.popitem(last=False)
+        else:
+            _LAND_SEA_SOURCE_POINTS.move_to_end(key)
+        return _LAND_SEA_SOURCE_POINTS[key]
 
     def process(self, cube, input_land, output_land):
         """
@@ -668,27 +741,15 @@ class RegridLandSea():
         if not spatial_coords_match(cube, output_land):
             raise ValueError('X and Y coordinates do not match for cubes {}'
                              'and {}'.format(repr(cube), repr(output_land)))
-        self.output_land = output_land
-
-        # Regrid input_land to output_land grid.
-        self.input_land = input_land.regrid(self.output_land, self.regridder)
-
-        # Slice over x-y grids for multi-realization data.
-        result = iris.cube.CubeList()
-        for xyslice in cube.slices(
-                [cube.coord(axis='y'), cube.coord(axis='x')]):
-
-            # Store and copy cube ready for the output data
-            self.nearest_cube = xyslice
-            self.output_cube = self.nearest_cube.copy()
-
-            # Update sea points that were incorrectly sourced from land points
-            self.correct_where_input_true(0)
-
-            # Update land points that were incorrectly sourced from sea points
-            self.correct_where_input_true(1)
 
-            result.append(self.output_cube)
+        source_y, source_x = self.get_source_points(input_land, output_land)
 
-        result = result.merge_cube()
+        # Take the value for each output point from its source point, for
+        # all x-y grids of multi-realization data at once.
+        y_axis, = cube.coord_dims(cube.coord(axis='y'))
+        x_axis, = cube.coord_dims(cube.coord(axis='x'))
+        data = np.moveaxis(cube.data, [y_axis, x_axis], [-2, -1])
+        data = data[..., source_y, source_x]
+        result = cube.copy(
+            data=np.moveaxis(data, [-2, -1], [y_axis, x_axis]))
         return result
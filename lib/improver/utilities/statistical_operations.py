@@ -222,10 +222,11 @@ class ProbabilitiesFromPercentiles2D(object):
                    [-1, -1, -1],
                    [-1, -1, -1]] ]
 
-            1. Create slices over each percentile, and using the correct
-               inequality (as determined by inverse_ordering) compare the
-               threshold values to the percentiles slice; here we assume
-               inverse_ordering is False, so we use >=. We then populate the
+            1. Using the correct inequality (as determined by
+               inverse_ordering) compare the threshold values to the values
+               at every percentile at once; here we assume inverse_ordering
+               is False, so we use >=. For each point, the highest percentile
+               that the threshold reaches is used to populate the
                value_bounds and percentile_bounds arrays.
 
                Slice 0 - 0th Percentile::
@@ -240,9 +241,10 @@ class ProbabilitiesFromPercentiles2D(object):
 
                The value_bounds array has a leading dimensions with 2 indices
                to be associated with the lower [0] and upper bounds [1] about
-               the threshold being considered. The [0] index is populated with
-               the values in the slice of percentiles_cube at every True index.
-               The [1] index is populated with the values in the next slice of
+               the threshold being considered. Considering the 0th percentile
+               alone, the [0] index is populated with the values in the slice
+               of percentiles_cube at every True index. The [1] index is
+               populated with the values in the next slice of
                percentiles_cube.
                ::
 
@@ -270,8 +272,9 @@ class ProbabilitiesFromPercentiles2D(object):
                       [50, 50, 50],
                       [50, 50, 50]] ]
 
-               After the same process is applied to the next slice, the 50th
-               percentile, we end up with value_bounds::
+               Where the threshold also reaches the next slice, the 50th
+               percentile, that slice is used instead, and we end up with
+               value_bounds::
 
                    [ [[np.nan, np.nan, np.nan],
                       [2.0, 2.0, 2.0],
@@ -295,7 +298,7 @@ class ProbabilitiesFromPercentiles2D(object):
                percentiles_cube the upper bound is set to be the same as the
                lower_bound.
 
-            2. When all slices have been interated over, the interpolants are
+            2. When the bounds have been found, the interpolants are
                calculated using the threshold values and the values_bounds.
                ::
 
@@ -346,31 +349,29 @@ class ProbabilitiesFromPercentiles2D(object):
         probabilities = self.create_probability_cube(percentiles_cube,
                                                      threshold_cube)
 
-        # Create array with additional 2 dimensions to contain upper and lower
-        # bounds.
-        array_shape = [2] + list(threshold_cube.shape)
-        percentile_bounds = np.full(array_shape, -1, dtype=np.float32)
-        value_bounds = np.full(array_shape, np.nan, dtype=np.float32)
-
-        for index, pslice in enumerate(percentiles_cube.slices_over(
-                self.percentile_coordinate)):
-            # Change to use < & > to force degenerate percentile distributions
-            # to use the first percentile band that the threshold falls within.
-            indices = (threshold_cube.data <= pslice.data
-                       if self.inverse_ordering else
-                       threshold_cube.data >= pslice.data)
-            percentile_bounds[0, indices] = percentiles[index]
-            value_bounds[0, indices] = pslice.data[indices]
-            try:
-                # Usual behaviour where the threshold value falls between
-                # values corresponding to percentiles.
-                percentile_bounds[1, indices] = percentiles[index + 1]
-                value_bounds[1, indices] = percentiles_cube[index+1].data[
-                    indices]
-            except IndexError:
-                # Invoked if we have reached the top of the available values.
-                percentile_bounds[1, indices] = percentiles[index]
-                value_bounds[1, indices] = pslice.data[indices]
+        # Compare the thresholds with the values at every percentile at once.
+        # For each point, the lower bounds are taken from the highest
+        # percentile that the threshold reaches, and the upper bounds from
+        # the next percentile, or the same percentile at the top of the
+        # distribution.
+        values = np.asarray(percentiles_cube.data)
+        thresholds = np.asarray(threshold_cube.data)
+        reached = (thresholds <= values if self.inverse_ordering else
+                   thresholds >= values)
+        n_percentiles = len(percentiles)
+        lower_index = n_percentiles - 1 - np.argmax(reached[::-1], axis=0)
+        upper_index = np.minimum(lower_index + 1, n_percentiles - 1)
+        bound_indices = np.stack([lower_index, upper_index])
+        grid_indices = tuple(np.indices(bound_indices.shape)[1:])
+
+        # Create arrays with an additional leading dimension to contain the
+        # lower and upper bounds.
+        percentile_bounds = percentiles[bound_indices].astype(np.float32)
+        value_bounds = values[(bound_indices,) + grid_indices].astype(
+            np.float32)
+        not_reached = ~np.any(reached, axis=0)
+        percentile_bounds[:, not_reached] = -1
+        value_bounds[:, not_reached] = np.nan
 
         with np.errstate(divide='ignore', invalid='ignore'):
             numerator = (threshold_cube.data - value_bounds[0])
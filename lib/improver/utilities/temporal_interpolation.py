@@ -30,16 +30,15 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Class for Temporal Interpolation calculations."""
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 import iris
 import numpy as np
 from iris.exceptions import CoordinateNotFoundError
 
 from improver.utilities.cube_manipulation import merge_cubes
-from improver.utilities.solar import DayNightMask, calc_solar_elevation
-from improver.utilities.spatial import (
-    lat_lon_determine, transform_grid_to_lat_lon)
+from improver.utilities.solar import (
+    DayNightMask, calc_solar_elevation_at_times, get_grid_lat_lons)
 from improver.utilities.temporal import iris_time_to_datetime
 
 
@@ -206,59 +205,6 @@ class TemporalInterpolation(object):
                         coord.bounds.astype(coord_dtypes[coord_name]))
         return cube
 
-    @staticmethod
-    def calc_sin_phi(dtval, lats, lons):
-        """
-        Calculate sin of solar elevation
-
-        Args:
-            dtval (datetime.datetime):
-                Date and time.
-            lats (numpy.ndarray):
-                Array 2d of latitudes for each point
-            lons (numpy.ndarray):
-                Array 2d of longitudes for each point
-        Returns:
-            sin_phi (numpy.ndarray):
-                Array of sine of solar elevation at each point
-
-        """
-        day_of_year = (dtval - datetime(dtval.year, 1, 1)).days
-        utc_hour = (dtval.hour * 60.0 + dtval.minute) / 60.0
-        sin_phi = calc_solar_elevation(lats, lons, day_of_year,
-                                       utc_hour, return_sine=True)
-        return sin_phi
-
-    @staticmethod
-    def calc_lats_lons(cube):
-        """
-        Calculate the lats and lons of each point from a non-latlon cube,
-        or output a 2d array of lats and lons, if the input cube has latitude
-        and longitude coordinates.
-
-        Args:
-            cube (iris.cube.Cube):
-                cube containing x and y axis
-        Returns:
-            (tuple) : tuple containing:
-                **lats** (numpy.ndarray):
-                    2d Array of latitudes for each point.
-                **lons** (numpy.ndarray):
-                    2d Array of longitudes for each point.
-
-        """
-        trg_crs = lat_lon_determine(cube)
-        if trg_crs is not None:
-            xycube = next(cube.slices([cube.coord(axis='y'),
-                                       cube.coord(axis='x')]))
-            lats, lons = transform_grid_to_lat_lon(xycube)
-        else:
-            lats_row = cube.coord('latitude').points
-            lons_col = cube.coord('longitude').points
-            lats = np.repeat(lats_row[:, np.newaxis], len(lons_col), axis=1)
-            lons = np.repeat(lons_col[np.newaxis, :], len(lats_row), axis=0)
-        return lats, lons
-
     def solar_interpolate(self, diag_cube, interpolated_cube):
         """
         Temporal Interpolation code using solar elevation for
@@ -281,59 +227,49 @@ class TemporalInterpolation(object):
 
         """
 
-        interpolated_cubes = iris.cube.CubeList()
-        (lats, lons) = self.calc_lats_lons(diag_cube)
+        lats, lons = get_grid_lat_lons(diag_cube)
         prev_data = diag_cube[0].data
         next_data = diag_cube[1].data
         dtvals = iris_time_to_datetime(diag_cube.coord('time'))
-        # Calculate sine of solar elevation for cube valid at the
-        # beginning of the period.
-        dtval_prev = dtvals[0]
-        sin_phi_prev = self.calc_sin_phi(dtval_prev, lats, lons)
-        # Calculate sine of solar elevation for cube valid at the
-        # end of the period.
-        dtval_next = dtvals[1]
-        sin_phi_next = self.calc_sin_phi(dtval_next, lats, lons)
-        # Length of time between beginning and end in seconds
-        diff_step = (dtval_next - dtval_prev).seconds
-
-        for single_time in interpolated_cube.slices_over('time'):
-            # Calculate sine of solar elevation for cube at this
-            # interpolated time.
-            dtval_interp = iris_time_to_datetime(single_time.coord('time'))[0]
-            sin_phi_interp = self.calc_sin_phi(dtval_interp, lats, lons)
-            # Length of time between beginning and interpolated time in seconds
-            diff_interp = (dtval_interp - dtval_prev).seconds
-            # Set all values to 0.0, to be replaced
-            # with values calculated through this solar method.
-            single_time.data[:] = 0.0
-            sun_up = np.where(sin_phi_interp > 0.0)
-            # Solar value is calculated only for points where the sun is up
-            # and is a weighted combination of the data using the sine of
-            # solar elevation and the data in the diag_cube valid
-            # at the beginning and end.
-
-            # If the diag_cube containing data valid at the
-            # beginning of the period and at the end of the period
-            # has more than x and y coordinates
-            # the calculation needs to adapted to accommodate this.
-            if len(single_time.shape) > 2:
-                prevv = (
-                    prev_data[..., sun_up[0], sun_up[1]]/sin_phi_prev[sun_up])
-                nextv = (
-                    next_data[..., sun_up[0], sun_up[1]]/sin_phi_next[sun_up])
-                single_time.data[..., sun_up[0], sun_up[1]] = (
-                    sin_phi_interp[sun_up] *
-                    (prevv + (nextv - prevv) * (diff_interp/diff_step)))
-            else:
-                prevv = prev_data[sun_up]/sin_phi_prev[sun_up]
-                nextv = next_data[sun_up]/sin_phi_next[sun_up]
-                single_time.data[sun_up] = (sin_phi_interp[sun_up] *
-                                            (prevv + (nextv - prevv)
-                                             * (diff_interp/diff_step)))
-            # cube with new data added to interpolated_cubes cube List.
-            interpolated_cubes.append(single_time)
-        return interpolated_cubes
+        dtvals_interp = iris_time_to_datetime(interpolated_cube.coord('time'))
+        # Calculate sine of solar elevation for the cubes valid at the
+        # beginning and end of the period, and for all of the interpolated
+        # times at once.
+        sin_phi_prev, sin_phi_next = calc_solar_elevation_at_times(
+            lats, lons, dtvals, return_sine=True)
+        sin_phi_interp = calc_solar_elevation_at_times(
+            lats, lons, dtvals_interp, return_sine=True)
+
+        # Move the time dimension of the interpolated data to the front, so
+        # that it can be broadcast against the diagnostic data at the
+        # beginning and end of the period, which may have more than x and y
+        # dimensions.
+        time_axis, = interpolated_cube.coord_dims('time')
+        interpolated_data = np.moveaxis(interpolated_cube.data, time_axis, 0)
+        time_shape = (
+            (len(dtvals_interp),) + (1,) * (prev_data.ndim - 2) +
+            sin_phi_interp.shape[1:])
+        sin_phi_interp = sin_phi_interp.reshape(time_shape)
+        # Length of time between beginning and end in seconds, and between
+        # beginning and each interpolated time in seconds.
+        diff_step = (dtvals[1] - dtvals[0]).seconds
+        diff_interp = np.array(
+            [(dtval - dtvals[0]).seconds for dtval in dtvals_interp])
+        fraction = (diff_interp / diff_step).reshape(
+            (-1,) + (1,) * prev_data.ndim)
+
+        # Solar value is calculated only for points where the sun is up
+        # and is a weighted combination of the data using the sine of
+        # solar elevation and the data in the diag_cube valid
+        # at the beginning and end. All other values are set to 0.0.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prevv = prev_data / sin_phi_prev
+            nextv = next_data / sin_phi_next
+            solar_data = sin_phi_interp * (prevv + (nextv - prevv) * fraction)
+        interpolated_data[...] = np.where(
+            sin_phi_interp > 0.0, solar_data, 0.0)
+
+        return iris.cube.CubeList(interpolated_cube.slices_over('time'))
 
     @staticmethod
     def daynight_interpolate(interpolated_cube):
@@ -353,19 +289,22 @@ class TemporalInterpolation(object):
 
         """
 
-        interpolated_cubes = iris.cube.CubeList()
         daynightplugin = DayNightMask()
         daynight_mask = daynightplugin.process(interpolated_cube)
 
-        for i, single_time in enumerate(interpolated_cube.slices_over('time')):
-            index = np.where(daynight_mask.data[i] == daynightplugin.night)
-            if len(single_time.shape) > 2:
-                single_time.data[..., index[0], index[1]] = 0.0
-            else:
-                single_time.data[index] = 0.0
-            interpolated_cubes.append(single_time)
-
-        return interpolated_cubes
+        # Move the time dimension of the interpolated data to the front, so
+        # that the mask can be broadcast against data that has more than
+        # time, x and y dimensions.
+        time_axis, = interpolated_cube.coord_dims('time')
+        interpolated_data = np.moveaxis(interpolated_cube.data, time_axis, 0)
+        night = daynight_mask.data == daynightplugin.night
+        night = night.reshape(
+            night.shape[:1] + (1,) * (interpolated_data.ndim - 3) +
+            night.shape[1:])
+        interpolated_data[np.broadcast_to(
+            night, interpolated_data.shape)] = 0.0
+
+        return iris.cube.CubeList(interpolated_cube.slices_over('time'))
 
     def process(self, cube_t0, cube_t1):
         """
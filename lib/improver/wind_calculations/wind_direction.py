@@ -35,8 +35,7 @@ import numpy as np
 from iris.coords import CellMethod
 
 from improver.nbhood.nbhood import NeighbourhoodProcessing
-from improver.utilities.cube_checker import (
-    check_cube_coordinates, check_cube_not_float64)
+from improver.utilities.cube_checker import check_cube_not_float64
 
 
 class WindDirection(object):
@@ -106,10 +105,6 @@ class WindDirection(object):
         # containing ambigous data.
         self.r_thresh = 0.01
 
-        # Creates cubelists to hold data.
-        self.wdir_cube_list = iris.cube.CubeList()
-        self.r_vals_cube_list = iris.cube.CubeList()
-        self.confidence_measure_cube_list = iris.cube.CubeList()
         # Radius used in neighbourhood plugin as determined in IMPRO-491
         self.nb_radius = 6000.  # metres
         # Initialise neighbourhood plugin ready for use
@@ -123,15 +118,6 @@ class WindDirection(object):
             '<WindDirection: backup_method "{}"; neighbourhood radius "{}"m>'
         ).format(self.backup_method, self.nb_radius)
 
-    def _reset(self):
-        """Empties working data objects"""
-        self.realization_axis = None
-        self.wdir_complex = None
-        self.wdir_slice_mean = None
-        self.wdir_mean_complex = None
-        self.r_vals_slice = None
-        self.confidence_slice = None
-
     @staticmethod
     def deg_to_complex(angle_deg, radius=1):
         """Converts degrees to complex values.
@@ -205,59 +191,59 @@ class WindDirection(object):
 
         return angle
 
-    def calc_wind_dir_mean(self):
+    @staticmethod
+    def calc_wind_dir_mean(wdir_complex, realization_axis):
         """Find the mean wind direction using complex average which actually
            signifies a point between all of the data points in POLAR
            coordinates - NOT the average DEGREE ANGLE.
 
-        Uses:
-            self.wdir_complex (numpy.ndarray or float):
-                3D array or float - wind direction angles in degrees.
-            self.realization_axis (int):
+        Args:
+            wdir_complex (numpy.ndarray):
+                Array of wind direction angles as complex numbers, with any
+                number of leading and trailing dimensions.
+            realization_axis (int):
                 Axis to collapse over.
 
-        Defines:
-            self.wdir_mean_complex (numpy.ndarray or float):
-                3D array or float - wind direction angles as complex numbers
-                collapsed along an axis using np.mean().
-            self.wdir_slice_mean (numpy.ndarray or float):
-                3D array or float - wind direction angles in degrees collapsed
-                along an axis using np.mean().
+        Returns:
+            (tuple): tuple containing:
+                **wdir_mean_complex** (numpy.ndarray):
+                    Wind direction angles as complex numbers collapsed along
+                    the realization axis using np.mean().
+                **wdir_mean** (numpy.ndarray):
+                    Wind direction angles in degrees collapsed along the
+                    realization axis.
         """
-        self.wdir_mean_complex = np.mean(self.wdir_complex,
-                                         axis=self.realization_axis)
-        self.wdir_slice_mean.data = self.complex_to_deg(self.wdir_mean_complex)
+        wdir_mean_complex = np.mean(wdir_complex, axis=realization_axis)
+        wdir_mean = WindDirection.complex_to_deg(wdir_mean_complex)
+        return wdir_mean_complex, wdir_mean
 
-    def find_r_values(self):
+    @staticmethod
+    def find_r_values(wdir_mean_complex):
         """Find radius values from complex numbers.
 
         Takes input wind direction in complex values and returns array
         containing r values using Pythagoras theorem.
 
-        Uses:
-            self.wdir_mean_complex (numpy.ndarray or float):
-                3D array or float - wind direction angles in complex numbers.
-            self.wdir_slice_mean (iris.cube.Cube):
-                3D array or float - mean wind direction angles in complex
-                numbers.
-
-        Defines:
-            self.r_vals_slice (iris.cube.Cube):
-                Contains r values and inherits meta-data from
-                self.wdir_slice_mean.
-        """
+        Args:
+            wdir_mean_complex (numpy.ndarray or complex):
+                Mean wind direction angles in complex numbers.
 
-        r_vals = (np.sqrt(np.square(self.wdir_mean_complex.real) +
-                          np.square(self.wdir_mean_complex.imag)))
-        self.r_vals_slice = self.wdir_slice_mean.copy(data=r_vals)
+        Returns:
+            r_vals (numpy.ndarray or float):
+                Radius of each of the complex values.
+        """
+        r_vals = (np.sqrt(np.square(wdir_mean_complex.real) +
+                          np.square(wdir_mean_complex.imag)))
+        return r_vals
 
-    def calc_confidence_measure(self):
+    def calc_confidence_measure(self, wdir_complex, wdir_mean, r_vals,
+                                realization_axis):
         """Find confidence measure of polar numbers.
 
         The average wind direction complex values represent the midpoint
         between the different values and so have r values between 0-1.
 
-        1) From self.wdir_slice_mean - create a new set of complex values.
+        1) From wdir_mean - create a new set of complex values.
            Therefore they will have the same angle but r is fixed as r=1.
         2) Find the distance between the mean point and all the ensemble
            realization wind direction complex values.
@@ -267,46 +253,37 @@ class WindDirection(object):
            ensemble realizations) and 0 for no-confidence. Set to 0 if r value
            is below threshold as any r value is regarded as meaningless.
 
-        Uses:
-            self.wdir_complex (numpy.ndarray):
-                3D array - wind direction angles in complex numbers.
-            self.wdir_slice_mean (iris.cube.Cube):
-                Contains average wind direction in angles.
-            self.realization_axis (int):
+        Args:
+            wdir_complex (numpy.ndarray):
+                Wind direction angles in complex numbers, including the
+                realization axis.
+            wdir_mean (numpy.ndarray):
+                Average wind direction in angles, without the realization
+                axis.
+            r_vals (numpy.ndarray):
+                Radius taken from average complex wind direction angle.
+            realization_axis (int):
                 Axis to collapse over.
-            self.r_vals_slice.data (numpy.ndarray):
-                3D array - Radius taken from average complex wind direction
-                angle.
-            self.r_thresh (float):
-                Any r value below threshold is regarded as meaningless.
-
-        Defines:
-            self.confidence_slice (iris.cube.Cube):
-                Contains the average distance from mean normalised - used
-                as a confidence value. Inherits meta-data from
-                self.wdir_slice_mean
+
+        Returns:
+            dist_from_mean_norm (numpy.ndarray):
+                The average distance from mean normalised - used as a
+                confidence value.
         """
 
         # Recalculate complex mean with radius=1.
-        wdir_mean_complex_r1 = self.deg_to_complex(self.wdir_slice_mean.data)
+        wdir_mean_complex_r1 = self.deg_to_complex(wdir_mean)
 
         # Find difference in the distance between all the observed points and
-        # mean point with fixed r=1.
-        # For maths to work - the "wdir_mean_complex_r1 array" needs to
-        # be "tiled" so that it is the same dimension as "self.wdir_complex".
-        wind_dir_complex_mean_tile = np.tile(wdir_mean_complex_r1,
-                                             (self.wdir_complex.shape[0],
-                                              1, 1))
-
-        # Calculate distance from each wind direction data point to the
-        # average point.
-        difference = self.wdir_complex - wind_dir_complex_mean_tile
+        # mean point with fixed r=1. Reinstating the collapsed realization
+        # axis allows the mean to be broadcast against every realization.
+        difference = wdir_complex - np.expand_dims(wdir_mean_complex_r1,
+                                                   realization_axis)
         dist_from_mean = np.sqrt(np.square(difference.real) +
                                  np.square(difference.imag))
 
         # Find average distance.
-        dist_from_mean_avg = np.mean(dist_from_mean,
-                                     axis=self.realization_axis)
+        dist_from_mean_avg = np.mean(dist_from_mean, axis=realization_axis)
 
         # If we have two points at opposite ends of the compass
         # (eg. 270 and 90), then their separation distance is 2.
@@ -324,12 +301,12 @@ class WindDirection(object):
         # 270/87 | 0.30221
         # Therefore any confidence value where the r is less than the threshold
         # should be set to zero.
-        dist_from_mean_norm = np.where(self.r_vals_slice.data < self.r_thresh,
+        dist_from_mean_norm = np.where(r_vals < self.r_thresh,
                                        0.0, dist_from_mean_norm)
-        self.confidence_slice = self.wdir_slice_mean.copy(
-            data=dist_from_mean_norm)
+        return dist_from_mean_norm
 
-    def wind_dir_decider(self, where_low_r, wdir_cube):
+    def wind_dir_decider(self, where_low_r, wdir_cube, wdir_complex,
+                         wdir_mean):
         """If the wind direction is so widely scattered that the r value
            is nearly zero then this indicates that the average wind direction
            is essentially meaningless.
@@ -339,60 +316,54 @@ class WindDirection(object):
            rerunning the main technique.
            This is invoked rarely (1 : 100 000)
 
-        Arguments:
+        The backup values are calculated for the whole of wdir_cube at once,
+        so all of the time and height slices are handled in a single call.
+
+        Args:
             where_low_r (numpy.ndarray):
                 Array of boolean values. True where original wind direction
                 estimate has low confidence. These points are replaced
                 according to self.backup_method
             wdir_cube (iris.cube.Cube):
-                Contains array of wind direction data (realization, y, x)
-
-        Uses:
-            self.wdir_slice_mean (iris.cube.Cube):
-                Containing average wind direction angle (in degrees).
-            self.wdir_complex (numpy.ndarray):
-                3D array - wind direction angles from ensembles (in complex).
-            self.r_vals_slice.data (numpy.ndarray):
-                2D array - Radius taken from average complex wind direction
-                angle.
-            self.r_thresh (float):
-                Any r value below threshold is regarded as meaningless.
-            self.realization_axis (int):
-                Axis to collapse over.
-            self.n_realizations (int):
-                Number of realizations available in the plugin. Used to set the
-                neighbourhood radius as this is used to adjust the radius again
-                in the neighbourhooding plugin.
-
-        Defines:
-            self.wdir_slice_mean.data (numpy.ndarray):
-                2D array - Wind direction degrees where ambigious values have
-                been replaced with data from first ensemble realization.
+                Contains array of wind direction data in degrees, including
+                a realization dimension.
+            wdir_complex (numpy.ndarray):
+                Wind direction angles from ensembles (in complex), matching
+                the shape of wdir_cube.
+            wdir_mean (numpy.ndarray):
+                Average wind direction angle (in degrees), matching the
+                shape of where_low_r.
+
+        Returns:
+            (numpy.ndarray):
+                Wind direction degrees where ambiguous values have been
+                replaced using the backup method.
         """
+        realization_axis, = wdir_cube.coord_dims("realization")
         if self.backup_method == 'neighbourhood':
-            # Performs smoothing over a 6km square neighbourhood.
+            # Performs smoothing over a 6km square neighbourhood for all
+            # realizations and slices at once.
             # Then calculates the mean wind direction.
-            child_class = WindDirection(backup_method="first_realization")
-            child_class.wdir_complex = self.nbhood.process(
-                wdir_cube.copy(data=self.wdir_complex)).data
-            child_class.realization_axis = self.realization_axis
-            child_class.wdir_slice_mean = self.wdir_slice_mean.copy()
-            child_class.calc_wind_dir_mean()
-            improved_values = child_class.wdir_slice_mean.data
+            nbhood_complex = self.nbhood.process(
+                wdir_cube.copy(data=wdir_complex)).data
+            _, improved_values = self.calc_wind_dir_mean(nbhood_complex,
+                                                         realization_axis)
         else:
             # Takes realization zero (control member).
             improved_values = wdir_cube.extract(
                 iris.Constraint(realization=0)).data
 
         # If the r-value is low - substitute average wind direction value for
-        # the wind direction taken from the first ensemble realization.
-        self.wdir_slice_mean.data = np.where(where_low_r, improved_values,
-                                             self.wdir_slice_mean.data)
+        # the wind direction taken from the backup method.
+        return np.where(where_low_r, improved_values, wdir_mean)
 
     def process(self, cube_ens_wdir):
         """Create a cube containing the wind direction averaged over the
         ensemble realizations.
 
+        The realization dimension is collapsed for all of the other
+        dimensions (e.g. time and height) in a single pass.
+
         Args:
             cube_ens_wdir (iris.cube.Cube):
                 Cube containing wind direction from multiple ensemble
@@ -428,59 +399,41 @@ class WindDirection(object):
         # Demote input cube data and coords to float32 if float64
         check_cube_not_float64(cube_ens_wdir, fix=True)
 
-        self.n_realizations = len(cube_ens_wdir.coord('realization').points)
-        y_coord_name = cube_ens_wdir.coord(axis="y").name()
-        x_coord_name = cube_ens_wdir.coord(axis="x").name()
-        for wdir_slice in cube_ens_wdir.slices(["realization",
-                                                y_coord_name,
-                                                x_coord_name]):
-            self._reset()
-            # Extract wind direction data.
-            self.wdir_complex = self.deg_to_complex(wdir_slice.data)
-            self.realization_axis, = wdir_slice.coord_dims("realization")
-
-            # Copies input cube and remove realization dimension to create
-            # cubes for storing results.
-            self.wdir_slice_mean = next(
-                wdir_slice.slices_over("realization"))
-            self.wdir_slice_mean.remove_coord("realization")
-
-            # Derive average wind direction.
-            self.calc_wind_dir_mean()
-
-            # Find radius values for wind direction average.
-            self.find_r_values()
-
-            # Calculate the confidence measure based on the difference
-            # between the complex average and the individual ensemble
-            # realizations.
-            self.calc_confidence_measure()
-
-            # Finds any meaningless averages and substitute with
-            # the wind direction taken from the first ensemble realization.
-            # Mask True if r values below threshold.
-            where_low_r = np.where(self.r_vals_slice.data < self.r_thresh,
-                                   True, False)
-            # If the any point in the array contains poor r-values,
-            # trigger decider function.
-            if where_low_r.any():
-                self.wind_dir_decider(where_low_r, wdir_slice)
-
-            # Append to cubelists.
-            self.wdir_cube_list.append(self.wdir_slice_mean)
-            self.r_vals_cube_list.append(self.r_vals_slice)
-            self.confidence_measure_cube_list.append(self.confidence_slice)
-
-        # Combine cubelists into cube.
-        cube_mean_wdir = self.wdir_cube_list.merge_cube()
-        cube_r_vals = self.r_vals_cube_list.merge_cube()
-        cube_confidence_measure = (
-            self.confidence_measure_cube_list.merge_cube())
-
-        # Check that the dimensionality of coordinates of the output cube
-        # matches the input cube.
-        first_slice = next(cube_ens_wdir.slices_over(["realization"]))
-        cube_mean_wdir = check_cube_coordinates(first_slice, cube_mean_wdir)
+        # Extract wind direction data for all slices at once.
+        wdir_complex = self.deg_to_complex(cube_ens_wdir.data)
+        realization_axis, = cube_ens_wdir.coord_dims("realization")
+
+        # Derive average wind direction.
+        wdir_mean_complex, wdir_mean = self.calc_wind_dir_mean(
+            wdir_complex, realization_axis)
+
+        # Find radius values for wind direction average.
+        r_vals = self.find_r_values(wdir_mean_complex)
+
+        # Calculate the confidence measure based on the difference
+        # between the complex average and the individual ensemble
+        # realizations.
+        confidence = self.calc_confidence_measure(
+            wdir_complex, wdir_mean, r_vals, realization_axis)
+
+        # Finds any meaningless averages and substitute with
+        # the wind direction taken from the backup method.
+        # Mask True if r values below threshold.
+        where_low_r = r_vals < self.r_thresh
+        # If the any point in the array contains poor r-values,
+        # trigger decider function.
+        if where_low_r.any():
+            wdir_mean = self.wind_dir_decider(
+                where_low_r, cube_ens_wdir, wdir_complex, wdir_mean)
+
+        # Copies input cube and remove realization dimension to create
+        # cubes for storing results.
+        template = next(cube_ens_wdir.slices_over("realization"))
+        template.remove_coord("realization")
+        cube_mean_wdir = template.copy(data=wdir_mean.astype(np.float32))
+        cube_r_vals = template.copy(data=r_vals.astype(np.float32))
+        cube_confidence_measure = template.copy(
+            data=confidence.astype(np.float32))
 
         # Change cube identifiers.
         cube_mean_wdir.add_cell_method(CellMethod("mean",
@@ -30,7 +30,6 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Module containing wind downscaling plugins."""
 
-import copy
 import itertools
 
 import iris
@@ -133,6 +132,10 @@ class RoughnessCorrectionUtilities(object):
      * height level 3D/ 1D grid
      * windspeed 3D field on height level 3D grid (from above).
 
+    Everything that depends only on the ancillaries is calculated once on
+    initialisation, so an instance can be reused to correct any number of
+    wind fields on the same grid.
+
     """
 
     def __init__(self, a_over_s, sigma, z_0, pporo, modoro, ppres, modres):
@@ -171,7 +174,7 @@ class RoughnessCorrectionUtilities(object):
         self.h_over_2 = self.sigma2hover2(sigma)  # half peak to trough height
         self.hcmask, self.rcmask = self._setmask()  # HC mask, RC mask
         if self.z_0 is not None:
-            self.z_0[z_0 <= 0] = Z0M_SEA
+            self.z_0 = np.where(z_0 <= 0, np.float32(Z0M_SEA), z_0)
         self.dx_min = ppres / 2.  # scales smaller than this not resolved in pp
         # the original code had hardcoded 500
         self.dx_max = 3. * modres  # scales larger than this resolved in model
@@ -363,15 +366,17 @@ class RoughnessCorrectionUtilities(object):
             hgrid (numpy.ndarray):
                 3D or 1D array float32 - height above orography
             uold (numpy.ndarray):
-                3D array float32 - original velocities at hgrid.
+                3D or higher array float32 - original velocities at hgrid,
+                ordered as (..., y, x, z).
             mask (numpy.ndarray):
-                 2D array of bools that is True for land-points, False for Sea
-                 and False for invalid z_0.
+                 2D or higher array of bools that is True for land-points,
+                 False for Sea and False for invalid z_0, ordered as
+                 (..., y, x).
 
         Returns:
             unew (numpy.ndarray):
-                3D np.array float32 - Corrected wind speed on hgrid. Above
-                href, this is equal to uold.
+                3D or higher np.array float32 - Corrected wind speed on hgrid.
+                Above href, this is equal to uold.
 
         Comments:
             Replace the windspeed profile below the reference height with one
@@ -383,20 +388,17 @@ class RoughnessCorrectionUtilities(object):
         uhref = self._calc_u_at_h(uold, hgrid, self.h_ref, mask)
         if hgrid.ndim == 1:
             hgrid = hgrid[np.newaxis, np.newaxis, :]
-        ustar = FrictionVelocity(uhref, self.h_ref, self.z_0,
+        h_ref = np.broadcast_to(self.h_ref, mask.shape)
+        ustar = FrictionVelocity(uhref, h_ref,
+                                 np.broadcast_to(self.z_0, mask.shape),
                                  mask).process()
         unew = np.copy(uold)
-        mhref = self.h_ref
-        mhref[~mask] = RMDI
-        cond = hgrid < self.h_ref[:, :, np.newaxis]
-
-        # Create array of ones.
-        arr_ones = np.ones(unew.shape, dtype=np.float32)
+        mhref = np.where(mask, h_ref, np.float32(RMDI))
+        cond = hgrid < mhref[..., np.newaxis]
 
-        first_arg = (ustar[:, :, np.newaxis] * arr_ones)[cond]
-        sec_arg = np.log(hgrid /
-                         (np.reshape(self.z_0, self.z_0.shape + (1,)) *
-                          arr_ones))[cond]
+        first_arg = np.broadcast_to(ustar[..., np.newaxis], unew.shape)[cond]
+        sec_arg = np.broadcast_to(
+            np.log(hgrid / self.z_0[:, :, np.newaxis]), unew.shape)[cond]
 
         unew[cond] = (first_arg * sec_arg) / VONKARMAN
 
@@ -407,19 +409,27 @@ class RoughnessCorrectionUtilities(object):
 
         Args:
             u_in (numpy.ndarray):
-                3D array float32 - velocity on h_in layer, last dim is height
+                3D or higher array float32 - velocity on h_in layer, ordered
+                as (..., y, x, z)
             h_in(numpy.ndarray):
                 3D or 1D array float32 - height layer array
             hhere (numpy.ndarray):
                 2D array float32 - height grid to interpolate at
             mask (numpy.ndarray):
-                2D array of bools - mask the final result for uath
+                2D or higher array of bools - mask the final result for uath,
+                ordered as (..., y, x)
             dolog (bool):
                 if True, log interpolation, default False
 
         Returns:
             uath (numpy.ndarray):
-                2D array float32 - velocity interpolated at h
+                2D or higher array float32 - velocity interpolated at h,
+                with the same shape as mask
+
+        Comments:
+            The levels bracketing hhere depend only on the height grids,
+            so they are found once and used to gather the velocities for
+            all leading (e.g. time) dimensions of u_in.
 
         """
         u_in = np.ma.masked_less(u_in, 0.0)
@@ -434,33 +444,27 @@ class RoughnessCorrectionUtilities(object):
         loidx = np.argmin(np.ma.masked_less(hhere[:, :, np.newaxis] -
                                             h_in, 0.0), axis=2)
 
+        yidx, xidx = np.indices(upidx.shape)
         if h_in.ndim == 3:
-            hup = h_in.take(upidx.flatten() + np.arange(0, upidx.size *
-                                                        h_in.shape[2],
-                                                        h_in.shape[2]))
-            hlow = h_in.take(loidx.flatten() + np.arange(0, loidx.size *
-                                                         h_in.shape[2],
-                                                         h_in.shape[2]))
+            hup = h_in[yidx, xidx, upidx]
+            hlow = h_in[yidx, xidx, loidx]
         elif h_in.ndim == 1:
-            hup = h_in[upidx].flatten()
-            hlow = h_in[loidx].flatten()
-        uup = u_in.take(
-            upidx.flatten() + np.arange(0, upidx.size * u_in.shape[2],
-                                        u_in.shape[2]))
-        ulow = u_in.take(
-            loidx.flatten() + np.arange(0, loidx.size * u_in.shape[2],
-                                        u_in.shape[2]))
-        mask = mask.flatten()
+            hup = h_in[upidx]
+            hlow = h_in[loidx]
+        uup = u_in[..., yidx, xidx, upidx]
+        ulow = u_in[..., yidx, xidx, loidx]
+        # The (y, x) indices of each point to interpolate, for indexing
+        # the arrays that do not have the leading dimensions.
+        points = np.nonzero(mask)[-2:]
         uath = np.full(mask.shape, RMDI, dtype=np.float32)
         if dolog:
-            uath[mask] = self._interpolate_log(hup[mask], hlow[mask],
-                                               hhere.flatten()[mask],
+            uath[mask] = self._interpolate_log(hup[points], hlow[points],
+                                               hhere[points],
                                                uup[mask], ulow[mask])
         else:
-            uath[mask] = self._interpolate_1d(hup[mask], hlow[mask],
-                                              hhere.flatten()[mask],
+            uath[mask] = self._interpolate_1d(hup[points], hlow[points],
+                                              hhere[points],
                                               uup[mask], ulow[mask])
-        uath = np.reshape(uath, hhere.shape)
         return uath
 
     @staticmethod
@@ -536,18 +540,21 @@ class RoughnessCorrectionUtilities(object):
 
         Args:
             u_a (numpy.ndarray):
-                2D array float32 - outer velocity, e.g. velocity at h_ref_orig
+                2D or higher array float32 - outer velocity, e.g. velocity at
+                h_ref_orig, ordered as (..., y, x)
             heightg (numpy.ndarray):
                 1D or 3D array float32 - heights above orography
             mask (numpy.ndarray):
-                3D array of bools - Masks the hc_add result
+                Array of bools with the same shape as u_a - Masks the hc_add
+                result
             onemfrac (float or numpy.ndarray):
                 Currently, scalar = 1. But can be a function of position and
                 height, e.g. a 3D array (float32)
 
         Returns:
             hc_add (numpy.ndarray):
-                3D array float32 - additive height correction to wind speed
+                3D or higher array float32 - additive height correction to
+                wind speed, ordered as (..., y, x, z)
 
         Comments:
             The height correction is a disturbance of the flow that
@@ -565,17 +572,13 @@ class RoughnessCorrectionUtilities(object):
             function term.
 
         """
-        (xdim, ydim) = u_a.shape
         if heightg.ndim == 1:
-            zdim = heightg.shape[0]
             heightg = heightg[np.newaxis, np.newaxis, :]
-        elif heightg.ndim == 3:
-            zdim = heightg.shape[2]
         ml2 = self.h_at0 * self.wavenum
-        expon = np.ones([xdim, ydim, zdim], dtype=np.float32)
         mult = self.wavenum[:, :, np.newaxis] * heightg
+        expon = np.ones(mult.shape, dtype=np.float32)
         expon[mult > 0.0001] = np.exp(-mult[mult > 0.0001])
-        hc_add = (expon * u_a[:, :, np.newaxis] *
+        hc_add = (expon * u_a[..., np.newaxis] *
                   ml2[:, :, np.newaxis] * onemfrac)
         hc_add[~mask, :] = 0
         return hc_add
@@ -603,25 +606,28 @@ class RoughnessCorrectionUtilities(object):
             hgrid (numpy.ndarray):
                 1D or 3D array float32 - height grid of wind input
             uorig (numpy.ndarray):
-                3D array float32 - wind speed on these levels
+                3D or higher array float32 - wind speed on these levels,
+                ordered as (..., y, x, z). Any leading dimensions, e.g.
+                time, are corrected together in one call.
 
         Returns:
             result (numpy.ndarray):
-                sum of  unew: 3D array float32 - RC corrected windspeed
-                on levels HC: 3D array float32 - HC additional part
+                sum of  unew: array float32 - RC corrected windspeed
+                on levels HC: array float32 - HC additional part,
+                with the same shape as uorig
 
         Friedrich, M. M., 2016
         Wind Downscaling Program (Internal Met Office Report)
 
         """
+        mask_rc = self.rcmask
+        mask_hc = self.hcmask
         if hgrid.ndim == 3:
             condition1 = ((hgrid == RMDI).any(axis=2))
-            self.hcmask[condition1] = False
-            self.rcmask[condition1] = False
-        mask_rc = np.copy(self.rcmask)
-        mask_rc[(uorig == RMDI).any(axis=2)] = False
-        mask_hc = np.copy(self.hcmask)
-        mask_hc[(uorig == RMDI).any(axis=2)] = False
+            mask_rc = mask_rc & ~condition1
+            mask_hc = mask_hc & ~condition1
+        mask_rc = mask_rc & ~(uorig == RMDI).any(axis=-1)
+        mask_hc = mask_hc & ~(uorig == RMDI).any(axis=-1)
         if self.z_0 is not None:
             unew = self.calc_roughness_correction(hgrid, uorig, mask_rc)
         else:
@@ -697,6 +703,13 @@ class RoughnessCorrection(object):
         self.ppres = self.calc_av_ppgrid_res(pporo_cube)
         self.modres = modres
         self.height_levels = height_levels_cube
+        if self.z_0 is None:
+            z0_data = None
+        else:
+            z0_data = self.z_0.data
+        self.roughness_correction = RoughnessCorrectionUtilities(
+            self.a_over_s.data, self.sigma.data, z0_data, self.pp_oro.data,
+            self.model_oro.data, self.ppres, self.modres)
         self.x_name = None
         self.y_name = None
         self.z_name = None
@@ -957,33 +970,23 @@ class RoughnessCorrection(object):
          self.t_name) = self.find_coord_names(input_cube)
         xwp, ywp, zwp, twp = self.find_coord_order(input_cube)
         if np.isnan(twp):
-            input_cube.transpose([ywp, xwp, zwp])
+            order = [ywp, xwp, zwp]
         else:
-            input_cube.transpose([ywp, xwp, zwp, twp])  # problems with slices
-        rchc_list = iris.cube.CubeList()
-        if self.z_0 is None:
-            z0_data = None
-        else:
-            z0_data = self.z_0.data
-        roughness_correction = RoughnessCorrectionUtilities(
-            self.a_over_s.data, self.sigma.data, z0_data, self.pp_oro.data,
-            self.model_oro.data, self.ppres, self.modres)
+            order = [twp, ywp, xwp, zwp]
         self.check_wind_ancil(xwp, ywp)
         hld = self.find_heightgrid(input_cube)
-        for time_slice in input_cube.slices_over("time"):
-            if np.isnan(time_slice.data).any() or (time_slice.data < 0.).any():
-                msg = ('{} has invalid wind data')
-                raise ValueError(msg.format(time_slice.coord(self.t_name)))
-            rc_hc = copy.deepcopy(time_slice)
-            rc_hc.data = roughness_correction.do_rc_hc_all(
-                hld, time_slice.data)
-            rchc_list.append(rc_hc)
-        output_cube = rchc_list.merge_cube()
-        # reorder input_cube and output_cube as original
-        if np.isnan(twp):
-            input_cube.transpose(np.argsort([ywp, xwp, zwp]))
-            output_cube.transpose(np.argsort([ywp, xwp, zwp]))
-        else:
-            input_cube.transpose(np.argsort([ywp, xwp, zwp, twp]))
-            output_cube.transpose(np.argsort([twp, ywp, xwp, zwp]))
+        wind = np.transpose(input_cube.data, order)
+        invalid = (np.isnan(wind) | (wind < 0.)).reshape(
+            wind.shape[:-3] + (-1,)).any(axis=-1)
+        if invalid.any():
+            msg = ('{} has invalid wind data')
+            time_coord = input_cube.coord(self.t_name)
+            if not np.isnan(twp):
+                time_coord = time_coord[np.argmax(invalid)]
+            raise ValueError(msg.format(time_coord))
+        # All times are corrected at once on (time, y, x, z) data, then
+        # returned to the order of the input cube.
+        rc_hc = self.roughness_correction.do_rc_hc_all(hld, wind)
+        output_cube = input_cube.copy(
+            data=np.transpose(rc_hc, np.argsort(order)))
         return output_cube
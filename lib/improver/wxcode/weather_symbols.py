@@ -31,7 +31,7 @@
 """Module containing weather symbol implementation."""
 
 
-import copy
+import operator
 
 import iris
 import numpy as np
@@ -54,6 +54,13 @@ class WeatherSymbols(object):
     defined in the input cubes.
     """
 
+    # Functions used to evaluate the comparisons within queries.
+    comparison_operators = {'>=': operator.ge, '<=': operator.le,
+                            '>': operator.gt, '<': operator.lt}
+
+    # Compiled node evaluation orders, keyed by decision tree name.
+    _compiled_trees = {}
+
     def __init__(self, wxtree='high_resolution'):
         """
         Define a decision tree for determining weather symbols based upon
@@ -199,116 +206,6 @@ class WeatherSymbols(object):
 
         return inverted_threshold, inverted_combination
 
-    @staticmethod
-    def construct_condition(extract_constraint, condition,
-                            probability_threshold, gamma):
-        """
-        Create a string representing a comparison condition.
-
-        Args:
-            extract_constraint (str or list of str):
-                A string, or list of strings, encoding iris constraints
-                that will be used to extract the correct diagnostic cube
-                (by name) from the input cube list and the correct threshold
-                from that cube.
-            condition (str):
-                The condition statement (e.g. greater than, >).
-            probability_threshold (float):
-                The probability value to use in the comparison.
-            gamma (float or None):
-                The gamma factor to multiply one field by when performing
-                a subtraction. This value will be None in the case that
-                extract_constraint is not a list; it will not be used.
-        Returns:
-            string:
-                The formatted condition statement,
-                e.g.::
-
-                  cubes.extract(Constraint(
-                          name='probability_of_rainfall_rate_above_threshold',
-                          coord_values={'threshold': 0.03})
-                                )[0].data < 0.5)
-        """
-        if isinstance(extract_constraint, list):
-            return ('(cubes.extract({})[0].data - cubes.extract({})[0].data * '
-                    '{}) {} {}'.format(
-                        extract_constraint[0], extract_constraint[1], gamma,
-                        condition, probability_threshold))
-        return 'cubes.extract({})[0].data {} {}'.format(
-            extract_constraint, condition, probability_threshold)
-
-    @staticmethod
-    def format_condition_chain(conditions, condition_combination='AND'):
-        """
-        Chain individual condition statements together in a format that
-        numpy.where can use to make a series of comparisons.
-
-        Args:
-            conditions (list):
-                A list of conditions to be combined into a single comparison
-                statement.
-            condition_combination (str):
-                The method by which multiple conditions should be combined,
-                either AND or OR.
-        Returns:
-            string:
-                A string formatted as a chain of conditions suitable for use in
-                a numpy.where statement.
-                e.g. (condition 1) & (condition 2)
-        """
-        if condition_combination == 'OR':
-            return ('({}) | '*len(conditions)).format(*conditions).strip('| ')
-        return ('({}) & '*len(conditions)).format(*conditions).strip('& ')
-
-    def create_condition_chain(self, test_conditions):
-        """
-        A wrapper to call the construct_condition function for all the
-        conditions specified in a single query.
-
-        Args:
-            test_conditions (dict):
-                A query from the decision tree.
-        Returns:
-            condition_chain (list):
-                A list of strings that describe the conditions comprising the
-                query.
-                e.g.::
-
-                  [
-                    "(cubes.extract(Constraint(
-                          name='probability_of_rainfall_rate_above_threshold',
-                          coord_values={'threshold': 0.03})
-                     )[0].data < 0.5) |
-                     (cubes.extract(Constraint(
-                          name=
-                          'probability_of_lwe_snowfall_rate_above_threshold',
-                          coord_values={'threshold': 0.03})
-                     )[0].data < 0.5)"
-                  ]
-        """
-        conditions = []
-        loop = 0
-        for diagnostic, p_threshold, d_threshold in zip(
-                test_conditions['diagnostic_fields'],
-                test_conditions['probability_thresholds'],
-                test_conditions['diagnostic_thresholds']):
-
-            gamma = test_conditions.get('diagnostic_gamma')
-            if gamma is not None:
-                gamma = gamma[loop]
-            loop += 1
-
-            extract_constraint = self.construct_extract_constraint(
-                diagnostic, d_threshold, self.coord_named_threshold)
-            conditions.append(
-                WeatherSymbols.construct_condition(
-                    extract_constraint, test_conditions['threshold_condition'],
-                    p_threshold, gamma))
-        condition_chain = WeatherSymbols.format_condition_chain(
-            conditions,
-            condition_combination=test_conditions['condition_combination'])
-        return [condition_chain]
-
     def construct_extract_constraint(
             self, diagnostics, thresholds, coord_named_threshold):
         """
@@ -381,47 +278,130 @@ class WeatherSymbols(object):
         return constraint
 
     @staticmethod
-    def find_all_routes(graph, start, end, route=None):
+    def compile_tree(queries, start='heavy_precipitation'):
         """
-        Function to trace all routes through the decision tree.
+        Order the nodes of the decision tree so that every node comes after
+        all of the nodes that lead to it. Evaluating the nodes in this order
+        means that the set of points reaching each node is complete before
+        the node itself is evaluated.
 
         Args:
-            graph (dict):
-                A dictionary that describes each node in the tree,
-                e.g. {<node_name>: [<succeed_name>, <fail_name>]}
+            queries (dict):
+                The queries that comprise the decision tree.
             start (str):
-                The node name of the tree root (currently always
-                heavy_precipitation).
-            end (int):
-                The weather symbol code to which we are tracing all routes.
-            route (list):
-                A list of node names found so far.
+                The node name of the tree root.
 
         Returns:
-            routes (list):
-                A list of node names that defines the route from the tree root
-                to the weather symbol leaf (end of chain).
+            node_order (list of str):
+                The names of all the nodes that can be reached from the
+                tree root, in evaluation order.
+        """
+        visited = set()
+        post_order = []
+        # Depth first search using an explicit stack of (node, expanded).
+        stack = [(start, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                post_order.append(node)
+                continue
+            if node in visited:
+                continue
+            visited.add(node)
+            stack.append((node, True))
+            for child in (queries[node]['fail'], queries[node]['succeed']):
+                if not isinstance(child, int) and child not in visited:
+                    stack.append((child, False))
+        return post_order[::-1]
+
+    @property
+    def node_order(self):
+        """
+        The evaluation order of the nodes of the decision tree, compiled once
+        per tree and then shared between instances of the plugin.
+
+        Returns:
+            node_order (list of str):
+                The names of the nodes in evaluation order.
+        """
+        if self.wxtree not in self._compiled_trees:
+            self._compiled_trees[self.wxtree] = self.compile_tree(
+                self.queries)
+        return self._compiled_trees[self.wxtree]
+
+    def evaluate_query(self, cubes, test_conditions, extracted_data):
+        """
+        Evaluate the conditions of a single query across the whole grid.
 
-        References:
-            Method based upon Python Patterns - Implementing Graphs essay
-            https://www.python.org/doc/essays/graphs/
+        Args:
+            cubes (iris.cube.CubeList):
+                A cubelist containing the diagnostics required for the
+                weather symbols decision tree.
+            test_conditions (dict):
+                A query from the decision tree.
+            extracted_data (dict):
+                Data already extracted from the cubes, keyed by constraint
+                string. Any data extracted by this method are added to it so
+                that each diagnostic threshold is extracted only once.
+
+        Returns:
+            (tuple): tuple containing:
+                **succeed** (numpy.ndarray):
+                    Boolean array that is True where the query succeeds.
+                **fail** (numpy.ndarray):
+                    Boolean array that is True where the inverted query
+                    succeeds. This is not simply the negation of succeed, as
+                    comparisons involving NaN values are always False.
         """
-        if route is None:
-            route = []
-
-        route = route + [start]
-        if start == end:
-            return [route]
-        if start not in graph.keys():
-            return []
-
-        routes = []
-        for node in graph[start]:
-            if node not in route:
-                newroutes = WeatherSymbols.find_all_routes(graph, node, end,
-                                                           route)
-                routes.extend(newroutes)
-        return routes
+        def _extract(constraint):
+            """Extract data for a constraint string, reusing earlier
+            extractions."""
+            if constraint not in extracted_data:
+                extracted_data[constraint] = (
+                    cubes.extract(eval(constraint))[0].data)
+            return extracted_data[constraint]
+
+        inverted_conditions = {}
+        (inverted_conditions['threshold_condition'],
+         inverted_conditions['condition_combination']) = (
+             self.invert_condition(test_conditions))
+
+        values = []
+        loop = 0
+        for diagnostic, p_threshold, d_threshold in zip(
+                test_conditions['diagnostic_fields'],
+                test_conditions['probability_thresholds'],
+                test_conditions['diagnostic_thresholds']):
+
+            gamma = test_conditions.get('diagnostic_gamma')
+            if gamma is not None:
+                gamma = gamma[loop]
+            loop += 1
+
+            extract_constraint = self.construct_extract_constraint(
+                diagnostic, d_threshold, self.coord_named_threshold)
+            if isinstance(extract_constraint, list):
+                value = (_extract(extract_constraint[0]) -
+                         _extract(extract_constraint[1]) * gamma)
+            else:
+                value = _extract(extract_constraint)
+            values.append((value, p_threshold))
+
+        results = []
+        for conditions in [test_conditions, inverted_conditions]:
+            comparison = self.comparison_operators[
+                conditions['threshold_condition']]
+            if conditions['condition_combination'] == 'OR':
+                combine = np.logical_or
+            else:
+                combine = np.logical_and
+            result = None
+            for value, p_threshold in values:
+                condition = comparison(value, p_threshold)
+                result = (condition if result is None
+                          else combine(result, condition))
+            results.append(np.asarray(result, dtype=bool))
+        return tuple(results)
 
     @staticmethod
     def create_symbol_cube(cube):
@@ -464,49 +444,30 @@ class WeatherSymbols(object):
         # Check input cubes contain required data
         self.check_input_cubes(cubes)
 
-        # Construct graph nodes dictionary
-        graph = {key: [self.queries[key]['succeed'], self.queries[key]['fail']]
-                 for key in self.queries.keys()}
-
-        # Search through tree for all leaves (weather code end points)
-        defined_symbols = []
-        for item in self.queries.values():
-            for value in item.values():
-                if isinstance(value, int):
-                    defined_symbols.append(value)
-
         # Create symbol cube
         symbols = self.create_symbol_cube(cubes[0])
 
-        # Loop over possible symbols
-        for symbol_code in defined_symbols:
-            # In current decision tree
-            # start node is heavy_precipitation
-            routes = self.find_all_routes(graph, 'heavy_precipitation',
-                                          symbol_code)
-
-            # Loop over possible routes from root to leaf
-            for route in routes:
-                conditions = []
-                for i_node in range(len(route)-1):
-                    current_node = route[i_node]
-                    current = copy.copy(self.queries[current_node])
-                    try:
-                        next_node = route[i_node+1]
-                    except KeyError:
-                        next_node = symbol_code
-
-                    if current['fail'] == next_node:
-                        (current['threshold_condition'],
-                         current['condition_combination']) = (
-                             self.invert_condition(current))
-
-                    conditions.extend(self.create_condition_chain(current))
-
-                test_chain = self.format_condition_chain(conditions)
-
-                # Set grid locations to suitable weather symbol
-                symbols.data[np.where(eval(test_chain))] = symbol_code
+        # Work down the tree, evaluating each query once and passing the
+        # points that succeed or fail on to the next query, or setting the
+        # weather symbol where a leaf is reached.
+        extracted_data = {}
+        reaches_node = {self.node_order[0]: np.ones(symbols.data.shape,
+                                                    dtype=bool)}
+        for node in self.node_order:
+            reached = reaches_node.pop(node)
+            succeed, fail = self.evaluate_query(
+                cubes, self.queries[node], extracted_data)
+            for next_node, condition in [
+                    (self.queries[node]['succeed'], succeed),
+                    (self.queries[node]['fail'], fail)]:
+                selected = reached & condition
+                if isinstance(next_node, int):
+                    symbols.data[selected] = next_node
+                elif next_node in reaches_node:
+                    reaches_node[next_node] |= selected
+                else:
+                    reaches_node[next_node] = selected
+
         # Update symbols for day or night.
         symbols = update_daynight(symbols)
         return symbols
@@ -43,6 +43,11 @@ usage: improver estimate-emos-coefficients [-h] [--profile]
                                            [--units UNITS]
                                            [--predictor_of_mean PREDICTOR_OF_MEAN]
                                            [--max_iterations MAX_ITERATIONS]
+                                           [--minimisation_method METHOD]
+                                           [--previous_coefficients_filepath PREVIOUS_COEFFICIENTS_FILEPATH]
+                                           [--streaming]
+                                           [--subsample_step SUBSAMPLE_STEP]
+                                           [--window_length WINDOW_LENGTH]
                                            DISTRIBUTION CYCLETIME
                                            OUTPUT_FILEPATH
 
@@ -128,6 +133,33 @@ optional arguments:
                         predictor_of_mean is "realizations", then the number
                         of iterations may require increasing, as there will be
                         more coefficients to solve for.
+  --minimisation_method METHOD
+                        The method used to minimise the CRPS. Either "Nelder-
+                        Mead" or a gradient based method ("L-BFGS-B", "BFGS"
+                        or "CG"), for which the analytic gradient of the CRPS
+                        is used. Default: "Nelder-Mead".
+  --previous_coefficients_filepath PREVIOUS_COEFFICIENTS_FILEPATH
+                        The path to a NetCDF file containing previously
+                        estimated coefficients, for example from the previous
+                        day, which are used as the initial guess for the
+                        minimisation.
+  --streaming           Load the historic forecast and truth files one pair at
+                        a time, retaining only the data required for the
+                        minimisation, rather than loading all the historic
+                        forecasts at once. The historic_filepath and
+                        truth_filepath arguments must list the files for each
+                        validity time in the same order, once any wildcards
+                        have been expanded and sorted.
+  --subsample_step SUBSAMPLE_STEP
+                        The step used to subsample the grid points along the y
+                        and x axes of the historic forecasts and truths used
+                        to estimate the coefficients. Default: 1.
+  --window_length WINDOW_LENGTH
+                        The maximum number of validity times retained in the
+                        rolling window of training data when streaming. Once
+                        the window is full, the oldest validity time is
+                        dropped as each new validity time is added. Default:
+                        retain all the validity times.
 __HELP__
   [[ "$output" == "$expected" ]]
 }
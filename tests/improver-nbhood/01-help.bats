@@ -38,6 +38,7 @@ usage: improver nbhood [-h] [--profile] [--profile_file PROFILE_FILE]
                        [--degrees_as_complex] [--weighted_mode]
                        [--sum_or_fraction {sum,fraction}] [--re_mask]
                        [--percentiles PERCENTILES [PERCENTILES ...]]
+                       [--max_memory_mb MAX_MEMORY_MB]
                        [--input_mask_filepath INPUT_MASK_FILE]
                        [--halo_radius HALO_RADIUS] [--apply-recursive-filter]
                        [--input_filepath_alphas_x_cube ALPHAS_X_FILE]
@@ -108,6 +109,15 @@ optional arguments:
   --percentiles PERCENTILES [PERCENTILES ...]
                         Calculate values at the specified percentiles from the
                         neighbourhood surrounding each grid point.
+  --max_memory_mb MAX_MEMORY_MB
+                        Approximate maximum memory in megabytes to use for the
+                        neighbourhood values from which percentiles are
+                        calculated. If set, the percentiles are calculated for
+                        tiles of rows of the grid in turn, so that the memory
+                        required scales with the tile rather than the number
+                        of points within the kernel. Only applicable for
+                        calculating "percentiles" neighbourhood output.
+                        Default=None
   --input_mask_filepath INPUT_MASK_FILE
                         A path to an input mask NetCDF file to be used to mask
                         the input file. This is currently only supported for
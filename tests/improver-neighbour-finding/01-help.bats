@@ -42,6 +42,8 @@ usage: improver neighbour-finding [-h] [--profile]
                                   [--site_coordinate_system SITE_COORDINATE_SYSTEM]
                                   [--site_x_coordinate SITE_X_COORDINATE]
                                   [--site_y_coordinate SITE_Y_COORDINATE]
+                                  [--cache_dir CACHE_DIR]
+                                  [--max_cache_entries MAX_CACHE_ENTRIES]
                                   [--metadata_json METADATA_JSON]
                                   SITE_LIST_FILEPATH OROGRAPHY_FILEPATH
                                   LANDMASK_FILEPATH OUTPUT_FILEPATH
@@ -121,6 +123,18 @@ Site list options:
                         default is 'latitude', but can be changed using this
                         option if required.
 
+Caching options:
+  --cache_dir CACHE_DIR
+                        Directory in which to cache neighbour cubes and the
+                        grid points used to construct the KDTree. Results are
+                        reused by later runs with identical grids, site lists
+                        and options. By default nothing is cached.
+  --max_cache_entries MAX_CACHE_ENTRIES
+                        The maximum number of entries to keep in the cache
+                        directory. The least recently used entries are removed
+                        once this is exceeded. By default the number of
+                        entries is not limited.
+
 Metadata:
   --metadata_json METADATA_JSON
                         If provided, this JSON file can be used to modify the
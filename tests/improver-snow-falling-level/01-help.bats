@@ -37,6 +37,9 @@ usage: improver snow-falling-level [-h] [--profile]
                                    [--profile_file PROFILE_FILE]
                                    [--precision NEWTON_PRECISION]
                                    [--falling_level_threshold FALLING_LEVEL_THRESHOLD]
+                                   [--fill_method FILL_METHOD]
+                                   [--svp_table_cache_dir SVP_TABLE_CACHE_DIR]
+                                   [--svp_table_increment SVP_TABLE_INCREMENT]
                                    TEMPERATURE RELATIVE_HUMIDITY PRESSURE
                                    OROGRAPHY LAND_SEA_MASK OUTPUT_FILE
 
@@ -76,6 +79,21 @@ optional arguments:
                         indicates the level at which falling snow is deemed to
                         have melted to become rain. The default value is 90.0,
                         an empirically derived value.
+  --fill_method FILL_METHOD
+                        Method used to fill in gaps in the falling snow level
+                        by horizontal interpolation. 'griddata' (default) uses
+                        linear interpolation over the whole grid. 'nearest'
+                        sets each gap to the value of the nearest valid point,
+                        which is much faster for large gaps.
+  --svp_table_cache_dir SVP_TABLE_CACHE_DIR
+                        Directory in which to cache the table of saturated
+                        vapour pressures, so that a table created by an
+                        earlier run is read rather than recalculated. If not
+                        specified, the default static table is used.
+  --svp_table_increment SVP_TABLE_INCREMENT
+                        The temperature increment in K of the cached table of
+                        saturated vapour pressures. Only used with
+                        svp_table_cache_dir. Default: 0.1.
 __HELP__
   [[ "$output" == "$expected" ]]
 }
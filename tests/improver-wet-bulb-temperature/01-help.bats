@@ -36,6 +36,8 @@
 usage: improver wet-bulb-temperature [-h] [--profile]
                                      [--profile_file PROFILE_FILE]
                                      [--convergence_condition CONVERGENCE_CONDITION]
+                                     [--svp_table_cache_dir SVP_TABLE_CACHE_DIR]
+                                     [--svp_table_increment SVP_TABLE_INCREMENT]
                                      TEMPERATURE RELATIVE_HUMIDITY PRESSURE
                                      OUTPUT_FILE
 
@@ -63,6 +65,15 @@ optional arguments:
                         K. When the wet bulb temperature stops changing by
                         more than this amount between iterations, the solution
                         is accepted.
+  --svp_table_cache_dir SVP_TABLE_CACHE_DIR
+                        Directory in which to cache the table of saturated
+                        vapour pressures, so that a table created by an
+                        earlier run is read rather than recalculated. If not
+                        specified, the default static table is used.
+  --svp_table_increment SVP_TABLE_INCREMENT
+                        The temperature increment in K of the cached table of
+                        saturated vapour pressures. Only used with
+                        svp_table_cache_dir. Default: 0.1.
 __HELP__
   [[ "$output" == "$expected" ]]
 }
@@ -0,0 +1,54 @@
+#!/usr/bin/env bats
+# -----------------------------------------------------------------------------
+# (C) British Crown Copyright 2017-2019 Met Office.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+. $IMPROVER_DIR/tests/lib/utils
+
+@test "wet-bulb-temperature with a cached saturated vapour pressure table" {
+  improver_check_skip_acceptance
+  KGO="wet-bulb-temperature/basic/kgo.nc"
+
+  # Run wet-bulb-temperature twice with a cache directory, so that the
+  # saturated vapour pressure table is written to the cache by the first run
+  # and read from the cache by the second run, and check the result.
+  for run_number in 1 2; do
+    run improver wet-bulb-temperature \
+        "$IMPROVER_ACC_TEST_DIR/wet-bulb-temperature/basic/enukx_temperature.nc" \
+        "$IMPROVER_ACC_TEST_DIR/wet-bulb-temperature/basic/enukx_relative_humidity.nc" \
+        "$IMPROVER_ACC_TEST_DIR/wet-bulb-temperature/basic/enukx_pressure.nc" \
+        "$TEST_DIR/output.nc" --svp_table_cache_dir "$TEST_DIR/svp_cache"
+    [[ "$status" -eq 0 ]]
+    [[ -n "$(ls "$TEST_DIR/svp_cache")" ]]
+  done
+
+  # Run nccmp to compare the output and kgo.
+  improver_compare_output_lower_precision "$TEST_DIR/output.nc" \
+      "$IMPROVER_ACC_TEST_DIR/$KGO"
+}